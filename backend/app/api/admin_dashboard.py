@@ -1,25 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, func, case, desc, and_
+from sqlalchemy import select, func, case, desc, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import datetime
 
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.core.auth import User as CurrentUser
 from app.core.rbac import require_role
 from app.core import tenancy
 from app.models import Tenant, User, UserRole, Recognition, PointsLedger
+from app.services.milestone_service import month_day_window, next_occurrence
 
 router = APIRouter(prefix="/admin")
 
 
-def _next_occurrence(base_date: datetime.date, today: datetime.date) -> datetime.date:
-    next_date = base_date.replace(year=today.year)
-    if next_date < today:
-        next_date = next_date.replace(year=today.year + 1)
-    return next_date
-
-
 def _years_since(base_date: datetime.date, reference: datetime.date) -> int:
     years = reference.year - base_date.year
     if (base_date.month, base_date.day) > (reference.month, reference.day):
@@ -30,7 +24,7 @@ def _years_since(base_date: datetime.date, reference: datetime.date) -> int:
 @router.get("/stats")
 async def admin_stats(
     tenant_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user: CurrentUser = Depends(require_role("PLATFORM_OWNER", "SUPER_ADMIN")),
 ):
     now = datetime.datetime.utcnow()
@@ -108,12 +102,21 @@ async def admin_stats(
                 for row in leaderboard_rows
             ]
 
-            users = (await db.execute(select(User).where(User.tenant_id == tenant_id))).scalars().all()
-            milestone_alerts = []
             today = datetime.date.today()
+            window_end = today + datetime.timedelta(days=30)
+            users = (await db.execute(
+                select(User).where(
+                    User.tenant_id == tenant_id,
+                    or_(
+                        month_day_window(User.birthday_md, today, window_end),
+                        month_day_window(User.hire_md, today, window_end),
+                    ),
+                )
+            )).scalars().all()
+            milestone_alerts = []
             for user_row in users:
                 if user_row.date_of_birth:
-                    next_birthday = _next_occurrence(user_row.date_of_birth, today)
+                    next_birthday = next_occurrence(user_row.date_of_birth, today)
                     days_until = (next_birthday - today).days
                     if days_until <= 30:
                         milestone_alerts.append({
@@ -124,7 +127,7 @@ async def admin_stats(
                             "days_until": days_until,
                         })
                 if user_row.hire_date:
-                    next_anniversary = _next_occurrence(user_row.hire_date, today)
+                    next_anniversary = next_occurrence(user_row.hire_date, today)
                     days_until = (next_anniversary - today).days
                     if days_until <= 30:
                         milestone_alerts.append({
@@ -208,7 +211,7 @@ async def admin_stats(
         for tenant in tenant_rows:
             if not tenant.created_at:
                 continue
-            anniversary = _next_occurrence(tenant.created_at.date(), today)
+            anniversary = next_occurrence(tenant.created_at.date(), today)
             years = _years_since(tenant.created_at.date(), today) + 1
             days_until = (anniversary - today).days
             global_milestones.append({
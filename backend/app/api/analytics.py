@@ -1,15 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select, func, case
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 import datetime
 
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.models import Recognition, PointsLedger, Redemption, User
 from app.models.redemptions import RedemptionStatus
 from app.core.auth import get_current_user, User as CurrentUser
 from app.core.rbac import require_role
 from app.core import tenancy
+from app.services.latency_service import get_latency_quantiles
+from app.services.department_flow_service import get_flow_matrix, get_flow_summary
 
 router = APIRouter(prefix="/analytics")
 
@@ -21,7 +23,7 @@ def _ensure_aggregate_allowed(user: CurrentUser, aggregate: bool):
 
 @router.get("/recognitions/frequency")
 async def recognition_frequency(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user: CurrentUser = Depends(require_role("TENANT_ADMIN", "SUPER_ADMIN")),
     aggregate: bool = False,
     limit: int = 100,
@@ -51,7 +53,7 @@ async def recognition_frequency(
 
 @router.get("/budget/utilization")
 async def budget_utilization(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user: CurrentUser = Depends(require_role("TENANT_ADMIN", "SUPER_ADMIN")),
     aggregate: bool = False,
 ):
@@ -79,7 +81,7 @@ async def budget_utilization(
 
 @router.get("/recognitions/manager_vs_peer")
 async def manager_vs_peer(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user: CurrentUser = Depends(require_role("TENANT_ADMIN", "SUPER_ADMIN")),
     aggregate: bool = False,
 ):
@@ -107,41 +109,50 @@ async def manager_vs_peer(
 
 @router.get("/redemptions/velocity")
 async def redemption_velocity(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user: CurrentUser = Depends(require_role("TENANT_ADMIN", "SUPER_ADMIN")),
     aggregate: bool = False,
-    sample_limit: int = 1000,
+    start_date: Optional[datetime.date] = None,
+    end_date: Optional[datetime.date] = None,
 ):
-    """Average time (seconds) between redemption creation and completion for completed redemptions.
+    """Fulfilment latency (seconds from creation to completion) for completed redemptions.
 
-    Tenant-scoped by default. This is computed in Python for portability across DBs.
+    Served from the per-day latency sketches maintained when a redemption
+    completes, so every completed redemption in the range is counted. Returns
+    the exact mean plus p50/p90/p99 estimates. Tenant-scoped by default.
     """
     _ensure_aggregate_allowed(user, aggregate)
     if aggregate:
         ctx = tenancy.without_tenant()
+        tenant_id = None
     else:
         ctx = None
+        tenant_id = tenancy.CURRENT_TENANT.get(None) or user.tenant_id
 
     with ctx if ctx else dummy_context():
-        stmt = (
-            select(Redemption.created_at, Redemption.completed_at)
-            .where(Redemption.status == RedemptionStatus.COMPLETED)
-            .limit(sample_limit)
-        )
-        res = await db.execute(stmt)
-        rows = res.all()
-        deltas = []
-        for created, completed in rows:
-            if not created or not completed:
-                continue
-            if isinstance(created, datetime.datetime) and isinstance(completed, datetime.datetime):
-                delta = (completed - created).total_seconds()
-                if delta >= 0:
-                    deltas.append(delta)
-        if not deltas:
-            return {"average_seconds": None, "samples": 0}
-        avg = sum(deltas) / len(deltas)
-        return {"average_seconds": avg, "samples": len(deltas)}
+        stats = await get_latency_quantiles(db, tenant_id=tenant_id, start_date=start_date, end_date=end_date)
+        stats["start_date"] = start_date.isoformat() if start_date else None
+        stats["end_date"] = end_date.isoformat() if end_date else None
+        return stats
+
+
+@router.get("/recognitions/department-flow")
+async def department_flow(
+    db: AsyncSession = Depends(get_read_db),
+    user: CurrentUser = Depends(require_role("TENANT_ADMIN", "SUPER_ADMIN")),
+    start_month: Optional[datetime.date] = None,
+    end_month: Optional[datetime.date] = None,
+    summary_only: bool = False,
+):
+    """Department -> department recognition matrix for the caller's tenant.
+
+    Months are inclusive and any day within a month selects that month. Set
+    `summary_only=true` to get just the cross/intra department ratios.
+    """
+    tenant_id = tenancy.CURRENT_TENANT.get(None) or user.tenant_id
+    if summary_only:
+        return await get_flow_summary(db, tenant_id, start_month, end_month)
+    return await get_flow_matrix(db, tenant_id, start_month, end_month)
 
 
 # small helper dummy context manager
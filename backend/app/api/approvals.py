@@ -8,8 +8,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
 from typing import List
 
-from app.db.database import get_db
-from app.core.security import get_current_user
+from app.db.session import get_db
+from app.core.auth import get_current_user
 from app.models.users import User, UserRole
 from app.models.approvals import ApprovalStatus
 from app.services.approval_service import ApprovalService
@@ -171,7 +171,7 @@ async def get_request_details(
         # Authorization: lead or admin can view
         if (
             current_user.id != approval_request.lead_id
-            and current_user.role != UserRole.ADMIN
+            and current_user.role != UserRole.TENANT_ADMIN.value
         ):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -226,7 +226,7 @@ async def approve_request(
         # Authorization
         if (
             current_user.id != approval_request.lead_id
-            and current_user.role != UserRole.ADMIN
+            and current_user.role != UserRole.TENANT_ADMIN.value
         ):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -298,7 +298,7 @@ async def decline_request(
         # Authorization
         if (
             current_user.id != approval_request.lead_id
-            and current_user.role != UserRole.ADMIN
+            and current_user.role != UserRole.TENANT_ADMIN.value
         ):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
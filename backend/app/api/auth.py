@@ -6,7 +6,6 @@ from pydantic import BaseModel
 from datetime import timedelta
 from uuid import UUID
 from jose import jwt
-from authlib.integrations.httpx_client import AsyncOAuth2Client
 from app.db.session import get_db
 from app.models.users import User, UserRole
 from app.core.security import verify_password
@@ -93,6 +92,14 @@ async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
     )
 
 
+def _oauth_client(**kwargs):
+    # authlib is only needed for Google sign-in; importing it lazily keeps it
+    # (and its crypto dependencies) off every worker's startup path
+    from authlib.integrations.httpx_client import AsyncOAuth2Client
+
+    return AsyncOAuth2Client(**kwargs)
+
+
 @router.get("/google")
 async def google_login():
     """Initiate Google OAuth login"""
@@ -102,7 +109,7 @@ async def google_login():
             detail="Google OAuth not configured"
         )
 
-    client = AsyncOAuth2Client(
+    client = _oauth_client(
         client_id=settings.google_oidc_client_id,
         client_secret=settings.google_oidc_client_secret,
         redirect_uri=settings.google_oidc_redirect_uri,
@@ -125,7 +132,7 @@ async def google_callback(code: str, state: str, db: AsyncSession = Depends(get_
             detail="Google OAuth not configured"
         )
 
-    client = AsyncOAuth2Client(
+    client = _oauth_client(
         client_id=settings.google_oidc_client_id,
         client_secret=settings.google_oidc_client_secret,
         redirect_uri=settings.google_oidc_redirect_uri,
@@ -138,7 +145,7 @@ async def google_callback(code: str, state: str, db: AsyncSession = Depends(get_
         )
 
         # Get user info from Google
-        async with AsyncOAuth2Client(
+        async with _oauth_client(
             client_id=settings.google_oidc_client_id,
             token=token
         ) as client:
@@ -6,6 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
+from app.core import response_cache
 from app.core.auth import get_current_user, User as CurrentUser
 from app.core.rbac import require_role
 from app.models import Badge
@@ -23,11 +24,23 @@ async def list_badges(
     db: AsyncSession = Depends(get_db),
 ):
     tenant = getattr(request.state, "tenant_id", None)
-    # return global (tenant_id is NULL) and tenant-specific badges
-    stmt = select(Badge).where((Badge.tenant_id == None) | (Badge.tenant_id == tenant)).offset(offset).limit(limit)
-    res = await db.execute(stmt)
-    items = res.scalars().all()
-    return items
+
+    async def build():
+        # return global (tenant_id is NULL) and tenant-specific badges
+        stmt = select(Badge).where((Badge.tenant_id == None) | (Badge.tenant_id == tenant)).offset(offset).limit(limit)
+        res = await db.execute(stmt)
+        return [BadgeOut.from_orm(b) for b in res.scalars().all()]
+
+    return await response_cache.cached_json(request, _badge_namespaces(tenant), build, tenant=tenant)
+
+
+def _badge_namespaces(tenant):
+    """Badge lists combine global badges with the tenant's own."""
+    return ("badges:global", f"badges:{tenant}")
+
+
+def _badge_namespace(badge_tenant):
+    return "badges:global" if badge_tenant is None else f"badges:{badge_tenant}"
 
 
 @router.post("/", response_model=BadgeOut, status_code=201)
@@ -53,6 +66,7 @@ async def create_badge(
     except Exception as exc:
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    await response_cache.bump(_badge_namespace(badge.tenant_id))
     return badge
 
 
@@ -99,6 +113,7 @@ async def update_badge(
     except Exception as exc:
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    await response_cache.bump(_badge_namespace(b.tenant_id))
 
     return b
 
@@ -121,11 +136,13 @@ async def delete_badge(
     if b.tenant_id and str(b.tenant_id) != str(tenant):
         raise HTTPException(status_code=403, detail="Forbidden")
 
+    badge_tenant = b.tenant_id
     await db.delete(b)
     try:
         await db.commit()
     except Exception:
         await db.rollback()
         raise HTTPException(status_code=500, detail="Delete failed")
+    await response_cache.bump(_badge_namespace(badge_tenant))
 
     return None
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.core.rbac import require_role
 from app.core.auth import get_current_user, User as CurrentUser
-from app.core import tenancy
+from app.core import response_cache, tenancy
 from app.models.tenants import Tenant
 from app.models.users import User, UserRole
 from app.models.transactions import Transaction, TransactionType
@@ -142,7 +142,7 @@ async def redeem_points(request: RedeemPointsRequest, db: AsyncSession = Depends
 
 
 @router.get("/rewards")
-async def get_available_rewards(db: AsyncSession = Depends(get_db), user: CurrentUser = Depends(require_role("CORPORATE_USER"))):
+async def get_available_rewards(request: Request, db: AsyncSession = Depends(get_db), user: CurrentUser = Depends(require_role("CORPORATE_USER"))):
     """Get available rewards catalog"""
     # Load ORM user to determine affordability
     user_q = await db.execute(select(User).where(User.id == user.id))
@@ -150,19 +150,19 @@ async def get_available_rewards(db: AsyncSession = Depends(get_db), user: Curren
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    rewards_q = await db.execute(select(GlobalReward).where(GlobalReward.is_enabled == True))
-    rewards = rewards_q.scalars().all()
+    async def build():
+        rewards_q = await db.execute(select(GlobalReward).where(GlobalReward.is_enabled == True))
+        return [
+            {"id": str(r.id), "title": r.title, "provider": r.provider, "points_cost": r.points_cost}
+            for r in rewards_q.scalars().all()
+        ]
 
-    return [
-        {
-            "id": str(r.id),
-            "title": r.title,
-            "provider": r.provider,
-            "points_cost": r.points_cost,
-            "can_afford": db_user.points_balance >= r.points_cost
-        }
+    # the catalog is global; affordability is per user, so only the catalog is cached
+    rewards = await response_cache.cached_data(request, "global_rewards", build, tenant=None)
+    return response_cache.json_response(request, [
+        {**r, "can_afford": db_user.points_balance >= r["points_cost"]}
         for r in rewards
-    ]
+    ])
 
 
 @router.get("/redemptions")
@@ -3,7 +3,7 @@ from sqlalchemy import select, func, case, and_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 import datetime
 
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.models import User, Recognition, PointsLedger, Redemption, Tenant
 from app.core.auth import get_current_user, User as CurrentUser
 from app.core import tenancy
@@ -12,7 +12,7 @@ router = APIRouter(prefix="/dashboard")
 
 
 @router.get("/stats")
-async def dashboard_stats(db: AsyncSession = Depends(get_db), user: CurrentUser = Depends(get_current_user)):
+async def dashboard_stats(db: AsyncSession = Depends(get_read_db), user: CurrentUser = Depends(get_current_user)):
     """Return role-aware dashboard stats.
 
     - SUPER_ADMIN / PLATFORM_OWNER: global aggregates across tenants.
@@ -4,26 +4,78 @@ Routes: /analytics/event/*
 Separate from existing analytics routes - focused on post-event metrics
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime
+from datetime import datetime, date
+from typing import Optional
 
-from app.db.database import get_db
-from app.core.security import get_current_user
+from app.db.session import get_db, get_read_db
+from app.core.auth import get_current_user
 from app.models.users import User, UserRole
 from app.services.analytics_service import AnalyticsService
-from app.services.report_service import ReportService
+from app.services import export_job_service
+from app.services.year_in_review_service import YearInReviewService
 from app.schemas.analytics import (
     EventSummary,
     TimelineData,
     ExportRequest,
+    ExportJobOut,
     RoiMetrics,
 )
 
 router = APIRouter(prefix="/analytics/event", tags=["post-event analytics"])
 
 
+@router.get(
+    "/year-in-review",
+    summary="Tenant-wide multi-event analytics",
+    description="Participation, spend, collection rate and department breakdown across all events in a date range",
+)
+async def get_year_in_review(
+    start_date: Optional[date] = Query(None, description="Defaults to 1 January of the current year"),
+    end_date: Optional[date] = Query(None, description="Defaults to 31 December of start_date's year"),
+    refresh: bool = False,
+    # writes the per-event rollup cache, so it stays on the primary
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Aggregate every event whose event date falls in the range.
+
+    Per-event figures are cached and only recomputed for events whose
+    approvals/collections changed since the last call; `refresh=true`
+    recomputes everything. `cache.recomputed` reports how many events were
+    rebuilt for this response.
+    """
+    if current_user.role not in [
+        UserRole.TENANT_ADMIN.value,
+        UserRole.TENANT_LEAD.value,
+    ]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only tenant admin/lead can view year-in-review analytics",
+        )
+
+    if start_date is None:
+        start_date = date(datetime.utcnow().year, 1, 1)
+    if end_date is None:
+        end_date = date(start_date.year, 12, 31)
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must be on or after start_date",
+        )
+
+    service = YearInReviewService(db)
+    return await service.get_year_in_review(
+        tenant_id=current_user.tenant_id,
+        start_date=start_date,
+        end_date=end_date,
+        force=refresh,
+    )
+
+
 @router.get(
     "/{event_id}/summary",
     response_model=EventSummary,
@@ -32,7 +84,7 @@ router = APIRouter(prefix="/analytics/event", tags=["post-event analytics"])
 )
 async def get_event_summary(
     event_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -87,8 +139,8 @@ async def get_event_summary(
     """
     # Tenant admin or lead required
     if current_user.role not in [
-        UserRole.TENANT_ADMIN,
-        UserRole.TENANT_LEAD,
+        UserRole.TENANT_ADMIN.value,
+        UserRole.TENANT_LEAD.value,
     ]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -118,13 +170,13 @@ async def get_event_summary(
 )
 async def get_event_timeline(
     event_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get timeline of collections by hour throughout the event"""
     if current_user.role not in [
-        UserRole.TENANT_ADMIN,
-        UserRole.TENANT_LEAD,
+        UserRole.TENANT_ADMIN.value,
+        UserRole.TENANT_LEAD.value,
     ]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -148,7 +200,7 @@ async def get_event_timeline(
 )
 async def get_roi_metrics(
     event_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -168,8 +220,8 @@ async def get_roi_metrics(
     ```
     """
     if current_user.role not in [
-        UserRole.TENANT_ADMIN,
-        UserRole.TENANT_LEAD,
+        UserRole.TENANT_ADMIN.value,
+        UserRole.TENANT_LEAD.value,
     ]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -213,10 +265,30 @@ async def get_roi_metrics(
     )
 
 
+def _ensure_can_export(current_user: User):
+    if current_user.role not in [
+        UserRole.TENANT_ADMIN.value,
+        UserRole.TENANT_LEAD.value,
+    ]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only tenant admin/lead can export analytics",
+        )
+
+
+def _job_out(job) -> ExportJobOut:
+    out = export_job_service.job_to_dict(job)
+    if export_job_service.is_downloadable(job):
+        out["download_url"] = f"/analytics/event/{job.event_id}/export/jobs/{job.id}/download"
+    return ExportJobOut(**out)
+
+
 @router.post(
     "/{event_id}/export",
+    response_model=ExportJobOut,
+    status_code=status.HTTP_202_ACCEPTED,
     summary="Export analytics report",
-    description="Export analytics as CSV",
+    description="Queue a CSV export; poll the job and download the artifact when complete",
 )
 async def export_analytics(
     event_id: str,
@@ -225,14 +297,14 @@ async def export_analytics(
     current_user: User = Depends(get_current_user),
 ):
     """
-    Export event analytics as CSV.
-    
+    Queue an event analytics export.
+
     Export types:
     - participation: Department attendance breakdown
     - distribution: Full distribution log with timestamps
     - budget: Budget reconciliation details by option
     - summary: Executive summary with all metrics
-    
+
     Request:
     ```json
     {
@@ -240,22 +312,15 @@ async def export_analytics(
         "type": "summary"
     }
     ```
-    
-    Returns: CSV file download
+
+    Returns the export job. The file is generated in the background; poll
+    `GET /{event_id}/export/jobs/{job_id}` and fetch `download_url` once the
+    status is COMPLETED. An identical export already queued or running for
+    this event is returned instead of starting a second one.
     """
-    if current_user.role not in [
-        UserRole.TENANT_ADMIN,
-        UserRole.TENANT_LEAD,
-    ]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only tenant admin/lead can export analytics",
-        )
+    _ensure_can_export(current_user)
 
     analytics_service = AnalyticsService(db)
-    report_service = ReportService(db)
-
-    # Get summary for reference
     summary = await analytics_service.get_event_summary(
         event_id=event_id,
         tenant_id=current_user.tenant_id,
@@ -267,27 +332,62 @@ async def export_analytics(
             detail=summary["error"],
         )
 
-    # Generate report based on type
-    if export_req.type == "participation":
-        content = await report_service.generate_participation_csv(event_id)
-        filename = f"participation_{event_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    elif export_req.type == "distribution":
-        content = await report_service.generate_distribution_csv(event_id)
-        filename = f"distribution_{event_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    elif export_req.type == "budget":
-        content = await report_service.generate_budget_csv(event_id)
-        filename = f"budget_{event_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    else:  # summary
-        content = await report_service.generate_summary_csv(event_id, summary)
-        filename = f"summary_{event_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-
-    data = report_service.csv_to_bytes(content)
-
-    return StreamingResponse(
-        iter([data]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
-    )
+    try:
+        job, _created = await export_job_service.submit_export(
+            db,
+            tenant_id=current_user.tenant_id,
+            user_id=current_user.id,
+            event_id=event_id,
+            export_type=export_req.type,
+            fmt=(export_req.format or "csv").lower(),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    return _job_out(job)
+
+
+@router.get(
+    "/{event_id}/export/jobs/{job_id}",
+    response_model=ExportJobOut,
+    summary="Get export job status",
+)
+async def get_export_job(
+    event_id: str,
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Status and progress (0-100) of an export job."""
+    _ensure_can_export(current_user)
+    job = await export_job_service.get_export_job(db, current_user.tenant_id, job_id)
+    if not job or job.event_id != event_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+    return _job_out(job)
+
+
+@router.get(
+    "/{event_id}/export/jobs/{job_id}/download",
+    summary="Download export artifact",
+)
+async def download_export(
+    event_id: str,
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Serve a completed export. Returns 409 while the job is still running
+    and 410 once the artifact has expired."""
+    _ensure_can_export(current_user)
+    job = await export_job_service.get_export_job(db, current_user.tenant_id, job_id)
+    if not job or job.event_id != event_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+    if job.status in export_job_service.ACTIVE_STATUSES:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Export is not ready yet")
+    if not export_job_service.is_downloadable(job):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Export is no longer available")
+
+    return FileResponse(job.file_path, media_type="text/csv", filename=job.filename)
 
 
 @router.get(
@@ -297,7 +397,7 @@ async def export_analytics(
 )
 async def get_key_insights(
     event_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -336,8 +436,8 @@ async def get_key_insights(
     ```
     """
     if current_user.role not in [
-        UserRole.TENANT_ADMIN,
-        UserRole.TENANT_LEAD,
+        UserRole.TENANT_ADMIN.value,
+        UserRole.TENANT_LEAD.value,
     ]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -9,11 +9,11 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File,
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-import os
 from datetime import datetime
 
 from app.core.auth import get_current_user
 from app.core import tenancy
+from app.core.config import settings
 from app.db.session import get_db
 from app.models.events import Event, EventOption, EventPickupLocation
 from app.models.users import User
@@ -30,6 +30,8 @@ from app.schemas.event_wizard import (
 )
 from app.services.event_service import EventService
 from app.services.scheduling_engine import SchedulingEngine
+from app.services.upload_storage import StoredUpload, UploadTooLarge, store_upload
+from app.services.image_variants import schedule_variants, variant_urls
 
 router = APIRouter(prefix="/events/wizard", tags=["event-studio"])
 
@@ -37,48 +39,31 @@ router = APIRouter(prefix="/events/wizard", tags=["event-studio"])
 # HELPER FUNCTIONS
 # ============================================================================
 
-def get_upload_dir() -> str:
-    """Get or create uploads directory for gift images"""
-    upload_dir = os.path.join(os.getcwd(), "uploads", "gifts")
-    os.makedirs(upload_dir, exist_ok=True)
-    return upload_dir
-
-
-async def save_gift_image(file: UploadFile) -> tuple[str, str]:
+async def save_gift_image(file: UploadFile) -> StoredUpload:
     """
-    Save uploaded gift image and return (file_key, public_url)
-    
-    file_key: Unique identifier for storage
-    public_url: URL to access the image
+    Stream an uploaded gift image into content-addressed storage.
+
+    The returned `key` is the storage key (relative to uploads/gifts) and
+    `url` the public URL; identical images share one file.
     """
-    upload_dir = get_upload_dir()
-    
     # Validate file
-    if not file.content_type.startswith("image/"):
+    if not (file.content_type or "").startswith("image/"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File must be an image"
         )
-    
-    # Generate unique filename
-    file_extension = os.path.splitext(file.filename)[1]
-    file_key = f"gift-{uuid4().hex}{file_extension}"
-    file_path = os.path.join(upload_dir, file_key)
-    
-    # Save file
-    contents = await file.read()
-    if len(contents) > 5 * 1024 * 1024:  # 5MB limit
+
+    try:
+        stored = await store_upload(file, "gifts", max_bytes=settings.GIFT_IMAGE_MAX_BYTES)
+    except UploadTooLarge as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File size exceeds 5MB limit"
-        )
-    
-    with open(file_path, "wb") as f:
-        f.write(contents)
-    
-    # Return file key and public URL
-    public_url = f"/uploads/gifts/{file_key}"
-    return file_key, public_url
+            detail=str(exc)
+        ) from exc
+
+    # thumb/medium variants are rendered off the request path
+    schedule_variants(stored.url)
+    return stored
 
 
 # ============================================================================
@@ -236,17 +221,15 @@ async def upload_gift_image(
     
     Returns file_key and public_url for use in gift configuration.
     """
-    file_key, public_url = await save_gift_image(file)
-    
-    file_size = len(await file.read())
-    await file.seek(0)
-    
+    stored = await save_gift_image(file)
+
     return ImageUploadResponse(
-        file_key=file_key,
-        url=public_url,
+        file_key=stored.key,
+        url=stored.url,
         content_type=file.content_type,
-        size_bytes=file_size,
-        uploaded_at=datetime.utcnow()
+        size_bytes=stored.size,
+        uploaded_at=datetime.utcnow(),
+        variants=variant_urls(stored.url),
     )
 
 
@@ -502,6 +485,7 @@ async def preview_wizard_event(
                 "committed": opt.committed_count,
                 "available": opt.available_slots,
                 "image_url": opt.gift_image_url,
+                "image_variants": variant_urls(opt.gift_image_url),
             }
             for opt in event.options
         ],
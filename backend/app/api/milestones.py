@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy import select, extract
+from sqlalchemy import select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 
 from app.db.session import get_db
 from app.models.users import User
 from app.core.auth import get_current_user
+from app.services.milestone_service import month_day_window, next_occurrence
 
 router = APIRouter(prefix="/milestones", tags=["milestones"])
 
@@ -21,60 +22,51 @@ async def get_upcoming_milestones(request: Request, db: AsyncSession = Depends(g
 
     today = datetime.utcnow().date()
     end_date = today + timedelta(days=days)
-    
-    stmt = select(User).where(User.tenant_id == tenant_id, User.is_active == True)
+    if end_date < today:
+        return []
+
+    # Range scan on the indexed month/day columns; only celebrants come back
+    stmt = select(
+        User.id, User.full_name, User.department, User.date_of_birth, User.hire_date
+    ).where(
+        User.tenant_id == tenant_id,
+        User.is_active == True,
+        or_(
+            month_day_window(User.birthday_md, today, end_date),
+            month_day_window(User.hire_md, today, end_date),
+        ),
+    )
     res = await db.execute(stmt)
-    users = res.scalars().all()
-    
+
     upcoming = []
-    for u in users:
+    for user_id, full_name, department, date_of_birth, hire_date in res.all():
         # Check birthday
-        if u.date_of_birth:
-            try:
-                next_bday = u.date_of_birth.replace(year=today.year)
-            except ValueError: # Leap year case (Feb 29)
-                next_bday = u.date_of_birth.replace(year=today.year, month=3, day=1)
-
-            if next_bday < today:
-                try:
-                    next_bday = next_bday.replace(year=today.year + 1)
-                except ValueError:
-                    next_bday = next_bday.replace(year=today.year + 1, month=3, day=1)
-            
-            if today <= next_bday <= end_date:
+        if date_of_birth:
+            next_bday = next_occurrence(date_of_birth, today)
+            if next_bday <= end_date:
                 upcoming.append({
-                    "user_id": u.id,
-                    "full_name": u.full_name,
+                    "user_id": user_id,
+                    "full_name": full_name,
                     "type": "BIRTHDAY",
                     "date": next_bday.isoformat(),
                     "days_away": (next_bday - today).days,
-                    "department": u.department
+                    "department": department
                 })
 
         # Check anniversary
-        if u.hire_date:
-            try:
-                next_anniv = u.hire_date.replace(year=today.year)
-            except ValueError:
-                 next_anniv = u.hire_date.replace(year=today.year, month=3, day=1)
-
-            if next_anniv < today:
-                try:
-                    next_anniv = next_anniv.replace(year=today.year + 1)
-                except ValueError:
-                    next_anniv = next_anniv.replace(year=today.year + 1, month=3, day=1)
-            
-            if today <= next_anniv <= end_date:
-                years = next_anniv.year - u.hire_date.year
+        if hire_date:
+            next_anniv = next_occurrence(hire_date, today)
+            if next_anniv <= end_date:
+                years = next_anniv.year - hire_date.year
                 if years > 0:
                     upcoming.append({
-                        "user_id": u.id,
-                        "full_name": u.full_name,
+                        "user_id": user_id,
+                        "full_name": full_name,
                         "type": "ANNIVERSARY",
                         "date": next_anniv.isoformat(),
                         "days_away": (next_anniv - today).days,
                         "years": years,
-                        "department": u.department
+                        "department": department
                     })
 
     upcoming.sort(key=lambda x: x['days_away'])
@@ -91,15 +83,12 @@ async def get_today_milestones(request: Request, db: AsyncSession = Depends(get_
         # If no tenant context, fallback to current user's tenant
         tenant_id = getattr(current_user, 'tenant_id', None)
 
-    today = datetime.utcnow()
-    month = today.month
-    day = today.day
+    today = datetime.utcnow().date()
 
     # Birthdays
     bday_stmt = select(User).where(
         User.tenant_id == tenant_id,
-        extract('month', User.date_of_birth) == month,
-        extract('day', User.date_of_birth) == day
+        month_day_window(User.birthday_md, today, today),
     )
     bday_res = await db.execute(bday_stmt)
     birthdays = bday_res.scalars().all()
@@ -107,8 +96,7 @@ async def get_today_milestones(request: Request, db: AsyncSession = Depends(get_
     # Anniversaries
     anniv_stmt = select(User).where(
         User.tenant_id == tenant_id,
-        extract('month', User.hire_date) == month,
-        extract('day', User.hire_date) == day
+        month_day_window(User.hire_md, today, today),
     )
     anniv_res = await db.execute(anniv_stmt)
     anniversaries = anniv_res.scalars().all()
@@ -1,7 +1,7 @@
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Query, UploadFile, File, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query, UploadFile, File
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -12,7 +12,10 @@ from app.db.session import get_db
 from app.models.recognition import Recognition, RecognitionStatus
 from app.models.users import User
 from app.services.recognition_service import create_recognition, approve_recognition
-from app.services.notification_service import send_recognition_email
+from app.services.email_outbox import enqueue_email
+from app.services.upload_storage import UploadTooLarge, store_upload
+from app.services.image_variants import schedule_variants, variant_urls
+from app.services.department_flow_service import record_recognition_flow
 from app.schemas.recognition import RecognitionCreate, RecognitionOut
 from app.models.users import User
 from app.models.transactions import Transaction, TransactionType
@@ -27,29 +30,29 @@ router = APIRouter(prefix="/recognition")
 
 @router.post("/uploads")
 async def upload_files(files: List[UploadFile] = File(...)):
-    """Accept multiple files and save them to the backend `uploads/` folder.
+    """Accept multiple files and store them under `uploads/media/`.
 
-    Returns a list of uploaded file metadata with URLs.
+    Files are streamed to disk and stored by content hash, so re-uploading
+    the same image returns the existing URL. Returns a list of uploaded
+    file metadata with URLs.
     """
-    import os
-    from uuid import uuid4
-
-    upload_dir = os.path.join(os.getcwd(), "uploads")
-    os.makedirs(upload_dir, exist_ok=True)
-
     out = []
     for f in files:
         try:
-            contents = await f.read()
-            ext = os.path.splitext(f.filename)[1]
-            fname = f"{uuid4().hex}{ext}"
-            path = os.path.join(upload_dir, fname)
-            with open(path, "wb") as fh:
-                fh.write(contents)
-            url = f"/uploads/{fname}"
-            out.append({"name": f.filename, "url": url, "type": f.content_type})
+            stored = await store_upload(f, "media")
+        except UploadTooLarge as exc:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"{f.filename}: {exc}") from exc
         except Exception as exc:
             raise HTTPException(status_code=400, detail=f"Failed to save file: {f.filename}") from exc
+        schedule_variants(stored.url)
+        out.append({
+            "name": f.filename,
+            "url": stored.url,
+            "type": f.content_type,
+            "size": stored.size,
+            "sha256": stored.sha256,
+            "variants": variant_urls(stored.url),
+        })
 
     return out
 
@@ -142,6 +145,7 @@ async def list_recognitions(
                 "ecard_design": getattr(r, "ecard_design", None),
                 "area_of_focus": getattr(r, "area_of_focus", None),
                 "media_url": getattr(r, "media_url", None),
+                "media_variants": variant_urls(getattr(r, "media_url", None)),
                 "message": r.message,
                 "is_public": getattr(r, "is_public", True),
                 "created_at": r.created_at.isoformat() if getattr(r, "created_at", None) else None,
@@ -156,7 +160,6 @@ async def create_recognition_endpoint(
     payload: RecognitionCreate,
     request: Request,
     db: AsyncSession = Depends(get_db),
-    background_tasks: BackgroundTasks = None,
     user: CurrentUser = Depends(get_current_user),
 ):
     # Get tenant from request state (set by middleware) or fall back to user's tenant
@@ -173,28 +176,21 @@ async def create_recognition_endpoint(
 
     try:
         rec = await create_recognition(db=db, tenant_id=tenant, nominator_id=user.id, payload=payload)
+        # nominee email goes into the outbox in the same transaction
+        res = await db.execute(select(User.email).where(User.id == str(rec.nominee_id)))
+        nominee_email = res.scalar_one_or_none()
+        if nominee_email:
+            subject = f"You received recognition from {getattr(user, 'full_name', getattr(user, 'email', 'Someone'))}"
+            html = f"<p>{rec.message or ''}</p>"
+            if getattr(rec, 'ecard_url', None):
+                html += f'<p><a href="{rec.ecard_url}">View E-Card</a></p>'
+            enqueue_email(db, str(tenant), nominee_email, subject, html)
         await db.commit()
         await db.refresh(rec)
     except Exception as exc:
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    # Fire-and-forget email notification to nominee (best-effort)
-    try:
-        # fetch nominee email
-        stmt = select(User).where(User.id == str(rec.nominee_id))
-        res = await db.execute(stmt)
-        nominee = res.scalar_one_or_none()
-        if nominee and getattr(nominee, 'email', None):
-            subject = f"You received recognition from {getattr(user, 'full_name', getattr(user, 'email', 'Someone'))}"
-            html = f"<p>{rec.message or ''}</p>"
-            if getattr(rec, 'ecard_url', None):
-                html += f'<p><a href="{rec.ecard_url}">View E-Card</a></p>'
-            if background_tasks is not None:
-                background_tasks.add_task(send_recognition_email, str(tenant), nominee.email, subject, html)
-    except Exception:
-        pass
-
     out = {
         "id": rec.id,
         "nominee_id": rec.nominee_id,
@@ -209,6 +205,7 @@ async def create_recognition_endpoint(
         "ecard_design": getattr(rec, "ecard_design", None),
         "area_of_focus": getattr(rec, "area_of_focus", None),
         "media_url": getattr(rec, "media_url", None),
+        "media_variants": variant_urls(getattr(rec, "media_url", None)),
         "is_public": getattr(rec, "is_public", True),
         "created_at": rec.created_at.isoformat() if getattr(rec, "created_at", None) else None,
     }
@@ -302,6 +299,8 @@ async def give_check(
         )
         db.add(ledger)
 
+        await record_recognition_flow(db, tenant, nominator.id, nominee.id, points)
+
         await db.commit()
         await db.refresh(rec)
 
@@ -360,6 +359,7 @@ async def recognition_feed(request: Request, limit: int = 50, db: AsyncSession =
                 "ecard_url": getattr(r, "ecard_url", None),
                 "area_of_focus": getattr(r, "area_of_focus", None),
                 "media_url": getattr(r, "media_url", None),
+                "media_variants": variant_urls(getattr(r, "media_url", None)),
                 "created_at": r.created_at.isoformat() if getattr(r, "created_at", None) else None,
             }
             for r in recs
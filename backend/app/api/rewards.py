@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy import select, func
 from app.core.rbac import require_role
 from app.core.auth import User, get_current_user
@@ -8,6 +8,7 @@ from app.models.points_ledger import PointsLedger
 from app.models.redemptions import Redemption, RedemptionStatus
 from app.core import tenancy
 from app.core import cache as _cache
+from app.core import response_cache
 from typing import Optional
 import uuid
 import asyncio
@@ -17,15 +18,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.redeem_service import redeem_reward as redeem_service
 from app.services.points_service import get_balance
+from app.services.latency_service import record_redemption_latency
 
 router = APIRouter(prefix="/rewards")
 
 
 @router.get("/")
-async def list_rewards(db: AsyncSession = Depends(get_db)):
-    q = await db.execute(select(Reward))
-    rows = q.scalars().all()
-    return rows
+async def list_rewards(request: Request, db: AsyncSession = Depends(get_db)):
+    async def build():
+        q = await db.execute(select(Reward))
+        return q.scalars().all()
+
+    # rows are scoped to the current tenant, which is part of the cache key
+    return await response_cache.cached_json(request, "rewards", build)
 
 
 @router.post("/")
@@ -121,6 +126,8 @@ async def _process_redemption_async(redemption_id: str, tenant_id: str):
                 r.status = RedemptionStatus.COMPLETED
                 r.completed_at = datetime.datetime.utcnow()
                 session.add(r)
+                # fold fulfilment latency into the tenant's daily sketch in the same transaction
+                await record_redemption_latency(session, r.tenant_id, r.created_at, r.completed_at)
     finally:
         tenancy.CURRENT_TENANT.reset(token)
 
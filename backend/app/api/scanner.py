@@ -9,8 +9,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, List
 import json
 
-from app.db.database import get_db
-from app.core.security import get_current_user
+from app.db.session import get_db
+from app.core.auth import get_current_user
 from app.models.users import User, UserRole
 from app.services.scanner_service import ScannerService
 from app.schemas.scanner import (
@@ -75,7 +75,7 @@ async def verify_qr_code(
     ```
     """
     # Admin or higher required
-    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
+    if current_user.role not in [UserRole.TENANT_ADMIN.value, UserRole.TENANT_LEAD.value]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admin can collect gifts at event",
@@ -151,7 +151,7 @@ async def get_event_inventory(
     ```
     """
     # Admin or higher required
-    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
+    if current_user.role not in [UserRole.TENANT_ADMIN.value, UserRole.TENANT_LEAD.value]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admin can view event inventory",
@@ -211,7 +211,7 @@ async def get_collection_status(
     ```
     """
     # Admin or higher required
-    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
+    if current_user.role not in [UserRole.TENANT_ADMIN.value, UserRole.TENANT_LEAD.value]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admin can view collection status",
@@ -275,7 +275,7 @@ async def get_scanner_dashboard(
     ```
     """
     # Admin or higher required
-    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
+    if current_user.role not in [UserRole.TENANT_ADMIN.value, UserRole.TENANT_LEAD.value]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admin can access scanner dashboard",
@@ -3,6 +3,9 @@ from fastapi import Request, HTTPException, status
 from jose import jwt, JWTError
 from app.core.config import settings
 from datetime import timedelta
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class TokenPayload(BaseModel):
@@ -39,7 +42,7 @@ def get_current_user(request: Request) -> User:
     if not tp.sub or not tp.role:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
 
-    print(f"DEBUG: get_current_user - sub: {tp.sub}, role: {tp.role}, tenant_id: {tp.tenant_id}")
+    logger.debug("get_current_user - sub: %s, role: %s, tenant_id: %s", tp.sub, tp.role, tp.tenant_id)
     # Allow missing tenant_id for legacy/dev tokens by falling back to DEV_DEFAULT_TENANT
     tenant_id = tp.tenant_id if tp.tenant_id else settings.DEV_DEFAULT_TENANT
     return User(id=tp.sub, tenant_id=tenant_id, role=tp.role)
@@ -2,6 +2,7 @@ import time
 import asyncio
 from typing import Optional
 from app.core.config import settings
+from app.core.metrics import record_cache
 
 # If a Redis URL is configured we delegate to the redis client; otherwise
 # fall back to a simple in-process TTL cache implemented below.
@@ -61,8 +62,11 @@ async def get_cached_balance(user_key: str) -> Optional[int]:
             _, tenant, user_id = user_key.split(":", 2)
         except Exception:
             return None
-        return await _redis_get_balance(tenant, user_id)
-    return await _local_cache.get(user_key)
+        value = await _redis_get_balance(tenant, user_id)
+    else:
+        value = await _local_cache.get(user_key)
+    record_cache("balance", value is not None)
+    return value
 
 
 async def set_cached_balance(user_key: str, value: int, ttl: int = 60) -> None:
@@ -8,6 +8,24 @@ except Exception:
 class Settings(BaseSettings):
     APP_NAME: str = "lighthouse"
     DATABASE_URL: str = "sqlite+aiosqlite:///./test.db"
+    # Comma-separated read replica URLs used by `get_read_db` (dashboards and
+    # analytics). Replicas lagging more than DATABASE_REPLICA_MAX_LAG_SECONDS,
+    # or failing the lag probe, are skipped until the next check.
+    DATABASE_REPLICA_URLS: str | None = None
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 10.0
+    DATABASE_REPLICA_CHECK_INTERVAL_SECONDS: float = 5.0
+    # Connection pool per engine (primary and each replica). Ignored for SQLite.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Per-request SQL accounting: a statement shape repeated more than this many
+    # times in one request is logged as a suspected N+1. SQL_STATS_HEADERS
+    # adds X-DB-Queries / X-DB-Time-Ms response headers; unset means on
+    # everywhere except the production profile.
+    SQL_REPEAT_WARN_THRESHOLD: int = 10
+    SQL_STATS_HEADERS: bool | None = None
 
     # JWT settings for tenant extraction
     JWT_SECRET: str = "changeme"
@@ -25,6 +43,34 @@ class Settings(BaseSettings):
 
     # Platform admin email (maps to PLATFORM_OWNER for dev-created users)
     PLATFORM_ADMIN_EMAIL: str = "super_user@lighthouse.com"
+    # Expose Prometheus metrics at /metrics (scrape each worker)
+    METRICS_ENABLED: bool = True
+
+    # Per-tenant and per-user token buckets (requests/second and burst). Each
+    # request takes its route's cost in tokens (RATE_LIMIT_ROUTE_COSTS adds
+    # "METHOD /prefix=cost" entries to the built-in table). With REDIS_URL set
+    # the limits are shared by all workers as fixed windows.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TENANT_PER_SECOND: float = 100.0
+    RATE_LIMIT_TENANT_BURST: int = 400
+    RATE_LIMIT_USER_PER_SECOND: float = 20.0
+    RATE_LIMIT_USER_BURST: int = 100
+    RATE_LIMIT_ROUTE_COSTS: str | None = None
+    # Shed expensive requests with 429 once recent DB pool checkout wait
+    # exceeds this many milliseconds, and all requests above twice that.
+    LOAD_SHED_POOL_WAIT_MS: float = 250.0
+    LOAD_SHED_RETRY_AFTER_SECONDS: int = 2
+    # Catalog responses cached per worker, keyed by route, tenant and query.
+    # Writes bump a version (in Redis when configured, so every worker sees
+    # it); the TTL bounds staleness from writes made outside the API.
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2000
+    # Tenant metadata (flags, status, subdomain, plan) cached per worker.
+    # Platform admin changes invalidate it everywhere via Redis pub/sub when
+    # configured; the TTL bounds staleness otherwise.
+    TENANT_CACHE_TTL_SECONDS: int = 30
+
     # Optional Redis URL for caching, social feed, rate limiting, etc.
     REDIS_URL: str | None = None
     # Social feed length cap
@@ -32,6 +78,62 @@ class Settings(BaseSettings):
     # Development-only: when set, use this tenant id as a fallback when no
     # tenant header or JWT is provided. Set via environment variable in dev.
     DEV_DEFAULT_TENANT: str | None = "dev-tenant"
+    # Startup profile. "production" skips Base.metadata.create_all (alembic
+    # owns the schema) and dev persona seeding, so rolling restarts do not
+    # touch the database; "development" keeps both.
+    STARTUP_PROFILE: str = "development"
+    # Comma-separated subset of routers (module names under app/api) to load,
+    # e.g. "scanner,events" for a dedicated event-day worker. Default: all.
+    API_ROUTERS: str | None = None
+    # Tenant insights snapshots: refresh when older than this many seconds, or
+    # when at least this many recognitions were created since the last build.
+    INSIGHTS_SNAPSHOT_MAX_AGE_SECONDS: int = 900
+    INSIGHTS_SNAPSHOT_ACTIVITY_THRESHOLD: int = 50
+    # Background analytics exports: artifact directory, concurrent generators
+    # per process, and how long a finished file stays downloadable.
+    EXPORT_DIR: str = "exports"
+    EXPORT_MAX_WORKERS: int = 2
+    EXPORT_TTL_SECONDS: int = 3600
+    # Queued/running exports refresh heartbeat_at this often; one silent for
+    # EXPORT_STALE_SECONDS belongs to a dead worker and is failed/replaced.
+    EXPORT_HEARTBEAT_SECONDS: int = 15
+    EXPORT_STALE_SECONDS: int = 120
+    # Directory connectors (Okta / Azure AD / Workday): shared HTTP pool size,
+    # request timeout, retries on 429/5xx and pages fetched ahead of the sync.
+    INTEGRATION_HTTP_MAX_CONNECTIONS: int = 20
+    INTEGRATION_HTTP_TIMEOUT_SECONDS: float = 30.0
+    INTEGRATION_MAX_RETRIES: int = 5
+    INTEGRATION_PAGE_PREFETCH: int = 2
+    # Directory sync runs incrementally from the stored watermark/delta token;
+    # a full pull that also deactivates missing users runs at this interval.
+    DIRECTORY_FULL_SYNC_INTERVAL_HOURS: int = 24
+    # Daily milestone job: tenants processed concurrently, each in its own transaction
+    MILESTONE_MAX_CONCURRENCY: int = 4
+    # Outgoing email. Messages are queued in the email_outbox table and sent
+    # by app/jobs/email_outbox.py over pooled SMTP connections; without
+    # SMTP_HOST they are written under uploads/ instead.
+    SMTP_HOST: str | None = None
+    SMTP_PORT: int = 587
+    SMTP_USER: str | None = None
+    SMTP_PASS: str | None = None
+    SMTP_STARTTLS: bool = True
+    FROM_EMAIL: str | None = None
+    EMAIL_SMTP_POOL_SIZE: int = 2
+    EMAIL_BATCH_SIZE: int = 100
+    EMAIL_MAX_ATTEMPTS: int = 6
+    EMAIL_TENANT_RATE_PER_MINUTE: int = 120
+    # User uploads (served at /uploads). Files are streamed to disk in chunks
+    # and stored by SHA-256, so identical content is kept once.
+    UPLOAD_DIR: str = "uploads"
+    # Partial uploads; must not be under UPLOAD_DIR (it is served) but should
+    # share its filesystem so finished files are moved with an atomic rename.
+    # Defaults to "<UPLOAD_DIR>.tmp" beside it.
+    UPLOAD_TMP_DIR: str | None = None
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    UPLOAD_MAX_BYTES: int = 25 * 1024 * 1024
+    GIFT_IMAGE_MAX_BYTES: int = 5 * 1024 * 1024
+    # Processes rendering thumb/medium image variants off the request path
+    IMAGE_PROCESS_WORKERS: int = 2
 
     class Config:
         env_file = ".env"
@@ -1,9 +1,8 @@
 from fastapi import Depends, HTTPException, status
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import tenant_cache
 from app.core.auth import get_current_user, User as CurrentUser
 from app.db.session import get_db
-from app.models.tenants import Tenant
 
 
 def check_module_access(module_name: str):
@@ -22,12 +21,12 @@ def check_module_access(module_name: str):
         if not tenant_id:
             return True
 
-        q = await db.execute(select(Tenant).where(Tenant.id == tenant_id))
-        tenant = q.scalar_one_or_none()
+        # served from the tenant cache, so guarded requests normally skip the DB
+        tenant = await tenant_cache.get_tenant_info(db, tenant_id)
         if not tenant:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tenant not found")
 
-        flags = getattr(tenant, 'feature_flags', None) or {}
+        flags = tenant.feature_flags
         # flag key convention: module_name + '_enabled' or direct module_name boolean
         enabled = flags.get(f"{module_name}_enabled", flags.get(module_name, True))
         if enabled is False:
@@ -0,0 +1,201 @@
+"""Per-tenant / per-user rate limiting and DB-pressure load shedding.
+
+Every request (apart from CORS preflights and a few exempt paths such as
+static /uploads) spends
+its route's cost from two token buckets: one for its user (the client
+address when unauthenticated) and one for the tenant in its verified token.
+Unauthenticated requests only spend from their address's bucket. When either is empty the request is answered
+with 429 and a `Retry-After` telling the client when enough tokens will be
+back.
+
+Without Redis the buckets live in the process, so each worker enforces the
+limits on its own share of traffic. With `REDIS_URL` set they are shared
+fixed windows built on `redis_client.rate_limit_increment` (a window lasts
+burst/rate seconds and admits `burst` tokens); if Redis fails the in-process
+buckets take over rather than failing requests.
+
+Independently of the buckets, when the recent DB pool checkout wait
+(`session.pool_wait`) exceeds LOAD_SHED_POOL_WAIT_MS, requests costing more
+than one token are shed, and above twice the threshold everything is, until
+the pool recovers. Cheap interactive requests keep their latency while
+dashboards and exports back off.
+"""
+import json
+import logging
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+from jose import JWTError, jwt
+
+from app.core import metrics, redis_client
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EXEMPT_PATHS = {"/", "/metrics", "/docs", "/redoc", "/openapi.json"}
+EXEMPT_PREFIXES = ("/ws", "/uploads")
+
+# (method or "*", path prefix) -> tokens; longest matching prefix wins.
+# Aggregations and exports scan many rows and cost accordingly.
+ROUTE_COSTS: Dict[Tuple[str, str], int] = {
+    ("*", "/analytics"): 5,
+    ("*", "/admin/stats"): 10,
+    ("*", "/platform/overview"): 10,
+    ("*", "/platform/stats"): 5,
+    ("*", "/platform/tenants"): 5,
+    ("*", "/platform/tenant-insights"): 10,
+    ("*", "/dashboard/stats"): 5,
+    ("*", "/tenant/dashboard"): 5,
+    ("*", "/scanner/event"): 3,
+    ("POST", "/recognition/uploads"): 5,
+    ("POST", "/events/wizard/upload-gift-image"): 5,
+}
+
+REJECTED = metrics.REGISTRY.register(metrics.Counter(
+    "rate_limited_requests_total", "Requests rejected with 429, by reason (tenant, user, shed).", ("reason",),
+))
+
+
+def parse_route_costs(spec: Optional[str]) -> Dict[Tuple[str, str], int]:
+    """"GET /analytics=8, /exports=20" -> {("GET", "/analytics"): 8, ("*", "/exports"): 20}"""
+    costs = {}
+    for entry in (spec or "").split(","):
+        if "=" not in entry:
+            continue
+        route, cost = entry.rsplit("=", 1)
+        parts = route.split()
+        method, prefix = (parts[0].upper(), parts[1]) if len(parts) == 2 else ("*", parts[0])
+        costs[(method, prefix)] = int(cost)
+    return costs
+
+
+def route_cost(method: str, path: str, costs: Dict[Tuple[str, str], int]) -> int:
+    best, best_len = 1, -1
+    for (m, prefix), cost in costs.items():
+        if (m == "*" or m == method) and path.startswith(prefix) and len(prefix) > best_len:
+            best, best_len = cost, len(prefix)
+    return best
+
+
+class TokenBuckets:
+    """In-process token buckets keyed by string."""
+
+    def __init__(self, clock=time.monotonic, max_keys: int = 100_000):
+        self.clock = clock
+        self.max_keys = max_keys
+        # key -> (tokens, updated_at)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1) -> float:
+        """Spend `cost` tokens. Returns 0 when allowed, otherwise the seconds
+        until the bucket will hold `cost` tokens (nothing is spent)."""
+        now = self.clock()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens >= cost:
+            if len(self._buckets) >= self.max_keys and key not in self._buckets:
+                # full buckets are the default, so forgetting them loses nothing
+                self._buckets = {k: v for k, v in self._buckets.items() if v[0] < burst}
+            self._buckets[key] = (tokens - cost, now)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (min(cost, burst) - tokens) / rate
+
+
+async def _take_redis(key: str, rate: float, burst: float, cost: int) -> float:
+    window = max(1, math.ceil(burst / rate))
+    now = time.time()
+    index = int(now // window)
+    used = await redis_client.rate_limit_increment(f"rl:{key}:{index}", window_seconds=window, amount=cost)
+    if used <= burst:
+        return 0.0
+    return (index + 1) * window - now
+
+
+def _identity(scope) -> Tuple[Optional[str], str]:
+    """(tenant, user) for bucketing from the bearer token when valid,
+    otherwise (None, client address). The X-Tenant-ID header is not
+    trusted: anyone could name a tenant and drain its bucket."""
+    headers = dict(scope.get("headers") or [])
+    auth = headers.get(b"authorization", b"").decode()
+    if auth.startswith("Bearer "):
+        try:
+            claims = jwt.decode(auth[7:], settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+            return claims.get("tenant_id") or None, f"user:{claims.get('sub')}"
+        except JWTError:
+            pass
+    client = scope.get("client") or ("unknown", 0)
+    return None, f"ip:{client[0]}"
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware applying the buckets and load shedding."""
+
+    def __init__(self, app, buckets: TokenBuckets = None, pool_wait=None):
+        self.app = app
+        self.buckets = buckets or TokenBuckets()
+        if pool_wait is None:
+            from app.db.session import pool_wait
+        self.pool_wait = pool_wait
+        self.costs = {**ROUTE_COSTS, **parse_route_costs(settings.RATE_LIMIT_ROUTE_COSTS)}
+
+    async def _take(self, key: str, rate: float, burst: float, cost: int) -> float:
+        if settings.REDIS_URL:
+            try:
+                return await _take_redis(key, rate, burst, cost)
+            except Exception as exc:
+                logger.warning("redis rate limiting unavailable, using in-process buckets: %s", exc)
+        return self.buckets.take(key, rate, burst, cost)
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            # preflights are answered by CORSMiddleware and carry no credentials
+            or scope["method"] == "OPTIONS"
+            or path in EXEMPT_PATHS
+            or path.startswith(EXEMPT_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        cost = route_cost(scope["method"], path, self.costs)
+
+        threshold = settings.LOAD_SHED_POOL_WAIT_MS / 1000
+        wait = self.pool_wait.value()
+        if wait > threshold and (cost > 1 or wait > 2 * threshold):
+            await self._reject(send, "shed", settings.LOAD_SHED_RETRY_AFTER_SECONDS,
+                               "Service is under heavy load, retry shortly")
+            return
+
+        tenant, user = _identity(scope)
+        # user first, so one client hammering the API does not drain its
+        # colleagues' shared tenant budget with requests it gets refused
+        retry_after = await self._take(user, settings.RATE_LIMIT_USER_PER_SECOND, settings.RATE_LIMIT_USER_BURST, cost)
+        if retry_after:
+            await self._reject(send, "user", retry_after, "Rate limit exceeded")
+            return
+        if tenant:
+            retry_after = await self._take(
+                f"tenant:{tenant}", settings.RATE_LIMIT_TENANT_PER_SECOND, settings.RATE_LIMIT_TENANT_BURST, cost
+            )
+            if retry_after:
+                await self._reject(send, "tenant", retry_after, "Tenant rate limit exceeded")
+                return
+        await self.app(scope, receive, send)
+
+    async def _reject(self, send, reason: str, retry_after: float, detail: str) -> None:
+        REJECTED.inc(reason)
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -60,14 +60,14 @@ async def get_social_feed(tenant: str, limit: int = 50) -> List[str]:
     return await r.lrange(key, 0, end)
 
 
-async def rate_limit_increment(key: str, window_seconds: int = 60) -> int:
-    """Increment a counter for `key` and set expiry to window_seconds when creating.
+async def rate_limit_increment(key: str, window_seconds: int = 60, amount: int = 1) -> int:
+    """Increment a counter for `key` by `amount` and set expiry to window_seconds when creating.
 
     Returns the new count.
     """
     r = await get_redis()
-    # Use INCR and set expiry if newly created
-    cnt = await r.incr(key)
-    if cnt == 1:
+    # Use INCRBY and set expiry if newly created
+    cnt = await r.incrby(key, amount)
+    if cnt == amount:
         await r.expire(key, window_seconds)
     return int(cnt)
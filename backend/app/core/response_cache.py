@@ -0,0 +1,173 @@
+"""Response cache with strong ETags for catalog-style endpoints.
+
+Endpoints whose data changes rarely build their payload through
+`cached_data` / `cached_json`. Entries live in a per-worker LRU keyed by
+route, tenant and query string, and each one records the versions of the
+*namespaces* it was built from ("badges:<tenant>", "global_rewards", ...).
+Writers call `bump(namespace)` after committing; the version change makes
+every entry built from the old data unreachable. With `REDIS_URL` set the
+versions are Redis counters, so a write on one worker invalidates the
+entries of all of them; otherwise they are process-local. Writes made
+outside the API (scripts, SQL) are picked up after RESPONSE_CACHE_TTL_SECONDS.
+
+Responses carry a strong ETag (a hash of the exact body) and
+`Cache-Control: private, no-cache`, so clients revalidate with
+`If-None-Match` and get an empty 304 while the catalog is unchanged.
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple, Union
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core import metrics, redis_client, tenancy
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_CONTROL = "private, no-cache"
+_VERSION_KEY = "respcache:version:{}"
+
+# namespace -> version, used when Redis is not configured
+_local_versions: dict = {}
+
+
+class _Entry:
+    __slots__ = ("versions", "expires_at", "data", "body", "etag")
+
+    def __init__(self, versions, expires_at, data):
+        self.versions = versions
+        self.expires_at = expires_at
+        self.data = data
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+
+
+_entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+
+
+async def _versions(namespaces: Tuple[str, ...]) -> Optional[Tuple]:
+    """Current versions of `namespaces`, or None when they cannot be read
+    (the caller then serves uncached)."""
+    if not settings.REDIS_URL:
+        return tuple(_local_versions.get(ns, 0) for ns in namespaces)
+    try:
+        r = await redis_client.get_redis()
+        return tuple(await r.mget([_VERSION_KEY.format(ns) for ns in namespaces]))
+    except Exception as exc:
+        logger.warning("response cache versions unavailable: %s", exc)
+        return None
+
+
+async def bump(*namespaces: str) -> None:
+    """Invalidate everything cached from `namespaces`. Call after commit."""
+    if not settings.REDIS_URL:
+        for ns in namespaces:
+            _local_versions[ns] = _local_versions.get(ns, 0) + 1
+        return
+    try:
+        r = await redis_client.get_redis()
+        for ns in namespaces:
+            await r.incr(_VERSION_KEY.format(ns))
+    except Exception as exc:
+        logger.warning("response cache invalidation of %s failed: %s", namespaces, exc)
+
+
+def clear() -> None:
+    _entries.clear()
+
+
+def _encode(data: Any) -> Tuple[bytes, str]:
+    # same serialisation as fastapi's JSONResponse
+    body = json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+    return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _respond(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+_UNSET: Any = object()
+
+
+async def _lookup(
+    request: Request,
+    namespaces: Union[str, Iterable[str]],
+    build: Callable[[], Awaitable[Any]],
+    tenant: Optional[str],
+) -> _Entry:
+    if isinstance(namespaces, str):
+        namespaces = (namespaces,)
+    namespaces = tuple(namespaces)
+    if tenant is _UNSET:
+        tenant = tenancy.CURRENT_TENANT.get(None)
+    key = (
+        metrics.route_template(request.scope),
+        str(tenant) if tenant is not None else None,
+        tuple(sorted(request.query_params.multi_items())),
+    )
+
+    versions = await _versions(namespaces) if settings.RESPONSE_CACHE_ENABLED else None
+    now = time.monotonic()
+    if versions is not None:
+        entry = _entries.get(key)
+        if entry is not None and entry.versions == versions and entry.expires_at > now:
+            _entries.move_to_end(key)
+            metrics.record_cache("response", True)
+            return entry
+        metrics.record_cache("response", False)
+
+    entry = _Entry(versions, now + settings.RESPONSE_CACHE_TTL_SECONDS, jsonable_encoder(await build()))
+    if versions is not None:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > settings.RESPONSE_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+    return entry
+
+
+async def cached_data(
+    request: Request,
+    namespaces: Union[str, Iterable[str]],
+    build: Callable[[], Awaitable[Any]],
+    tenant: Optional[str] = _UNSET,
+) -> Any:
+    """The JSON-compatible result of `build()`, cached for this route, tenant
+    (default: the current one) and query. Treat it as read-only."""
+    return (await _lookup(request, namespaces, build, tenant)).data
+
+
+async def cached_json(
+    request: Request,
+    namespaces: Union[str, Iterable[str]],
+    build: Callable[[], Awaitable[Any]],
+    tenant: Optional[str] = _UNSET,
+) -> Response:
+    """Like `cached_data`, but returns the response itself, with the encoded
+    body and ETag cached alongside the data."""
+    entry = await _lookup(request, namespaces, build, tenant)
+    if entry.body is None:
+        entry.body, entry.etag = _encode(entry.data)
+    return _respond(request, entry.body, entry.etag)
+
+
+def json_response(request: Request, data: Any) -> Response:
+    """ETag/304 handling for a payload assembled per request (e.g. from
+    `cached_data` plus per-user fields)."""
+    return _respond(request, *_encode(jsonable_encoder(data)))
@@ -0,0 +1,147 @@
+"""Mergeable streaming sketches used by analytics rollups.
+
+`TDigest` is a small, dependency-free merging t-digest (Dunning & Ertl).
+It keeps a bounded list of weighted centroids so quantiles can be answered
+from a few kilobytes of state, and two digests built on disjoint data can be
+merged into one that summarises the union. That lets us keep one digest per
+tenant per day and combine any date range on read.
+"""
+import math
+from typing import Iterable, List, Optional
+
+
+class TDigest:
+    """Merging t-digest with the k1 (arcsine) scale function.
+
+    Accuracy is best at the tails (p1/p99) and degrades gracefully towards the
+    median; with the default compression of 100 the relative rank error is
+    well below 1% for the percentiles we report.
+    """
+
+    def __init__(self, compression: float = 100.0, centroids: Optional[Iterable] = None,
+                 min_value: Optional[float] = None, max_value: Optional[float] = None):
+        self.compression = float(compression)
+        self._centroids: List[List[float]] = [[float(m), float(w)] for m, w in (centroids or [])]
+        self._buffer: List[List[float]] = []
+        self.min = min_value
+        self.max = max_value
+
+    # ------------------------------------------------------------------
+    # building
+    # ------------------------------------------------------------------
+    @property
+    def count(self) -> float:
+        return sum(w for _, w in self._centroids) + sum(w for _, w in self._buffer)
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        value = float(value)
+        self._buffer.append([value, float(weight)])
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self._buffer) >= 5 * int(self.compression):
+            self._compress()
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Fold `other` into this digest in place and return self."""
+        other._compress()
+        if not other._centroids:
+            return self
+        self._buffer.extend([m, w] for m, w in other._centroids)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inv(self, k: float) -> float:
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        points = sorted(self._centroids + self._buffer, key=lambda c: c[0])
+        self._buffer = []
+        total = sum(w for _, w in points)
+
+        merged: List[List[float]] = []
+        cur_mean, cur_weight = points[0]
+        weight_so_far = 0.0
+        q_limit = self._k_inv(self._k(0.0) + 1)
+        for mean, weight in points[1:]:
+            q = (weight_so_far + cur_weight + weight) / total
+            if q <= q_limit:
+                cur_weight += weight
+                cur_mean += (mean - cur_mean) * weight / cur_weight
+            else:
+                merged.append([cur_mean, cur_weight])
+                weight_so_far += cur_weight
+                q_limit = self._k_inv(self._k(weight_so_far / total) + 1)
+                cur_mean, cur_weight = mean, weight
+        merged.append([cur_mean, cur_weight])
+        self._centroids = merged
+
+    # ------------------------------------------------------------------
+    # querying
+    # ------------------------------------------------------------------
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the value at quantile `q` (0..1). Returns None when empty."""
+        self._compress()
+        cents = self._centroids
+        if not cents:
+            return None
+        if len(cents) == 1:
+            return cents[0][0]
+        q = min(max(q, 0.0), 1.0)
+        total = sum(w for _, w in cents)
+        target = q * total
+
+        # centroid i is centred on cumulative weight cum_i + w_i / 2
+        first_center = cents[0][1] / 2
+        if target <= first_center:
+            lo = self.min if self.min is not None else cents[0][0]
+            if first_center == 0:
+                return lo
+            return lo + (cents[0][0] - lo) * (target / first_center)
+
+        cum = 0.0
+        for i in range(len(cents) - 1):
+            left_center = cum + cents[i][1] / 2
+            right_center = cum + cents[i][1] + cents[i + 1][1] / 2
+            if target <= right_center:
+                span = right_center - left_center
+                frac = (target - left_center) / span if span else 0.0
+                return cents[i][0] + (cents[i + 1][0] - cents[i][0]) * frac
+            cum += cents[i][1]
+
+        last_center = total - cents[-1][1] / 2
+        hi = self.max if self.max is not None else cents[-1][0]
+        tail = total - last_center
+        frac = (target - last_center) / tail if tail else 1.0
+        return cents[-1][0] + (hi - cents[-1][0]) * frac
+
+    # ------------------------------------------------------------------
+    # (de)serialisation for JSON columns
+    # ------------------------------------------------------------------
+    def to_dict(self) -> dict:
+        self._compress()
+        return {
+            "compression": self.compression,
+            "min": self.min,
+            "max": self.max,
+            "centroids": [[round(m, 6), w] for m, w in self._centroids],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "TDigest":
+        if not data:
+            return cls()
+        return cls(
+            compression=data.get("compression", 100.0),
+            centroids=data.get("centroids") or [],
+            min_value=data.get("min"),
+            max_value=data.get("max"),
+        )
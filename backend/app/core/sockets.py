@@ -1,6 +1,9 @@
+import logging
 import socketio
 from typing import Any
 
+logger = logging.getLogger(__name__)
+
 # Standard socket.io server
 sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
 socket_app = socketio.ASGIApp(sio)
@@ -12,8 +15,8 @@ async def emit_platform_event(event_name: str, data: Any):
 @sio.event
 async def connect(sid, environ):
     # In a real app, we would verify the user role from JWT here
-    print(f"Socket connected: {sid}")
+    logger.info("Socket connected: %s", sid)
 
 @sio.event
 async def disconnect(sid):
-    print(f"Socket disconnected: {sid}")
+    logger.info("Socket disconnected: %s", sid)
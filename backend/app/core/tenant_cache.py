@@ -0,0 +1,121 @@
+"""Short-lived per-worker cache of tenant metadata.
+
+Guards such as `check_module_access` need a tenant's feature flags and
+status on every request, and these change only through a few platform admin
+endpoints. `get_tenant_info` serves them from a process-local dict for
+TENANT_CACHE_TTL_SECONDS and loads the tenant (with its active plan) in one
+query on a miss.
+
+Writers call `invalidate(tenant_id)` after committing. It drops the local
+entry and, with `REDIS_URL` set, publishes the id on a channel every worker
+subscribes to at startup (`listen_for_invalidations`), so the change is
+visible everywhere immediately. A worker that loses its subscription clears
+its cache on reconnect, since it may have missed messages; without Redis
+other workers converge within the TTL.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics, redis_client
+from app.core.config import settings
+from app.models.subscriptions import SubscriptionPlan, TenantSubscription
+from app.models.tenants import Tenant
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "tenant-cache:invalidate"
+
+
+class TenantInfo(NamedTuple):
+    id: str
+    name: str
+    subdomain: str
+    status: str
+    suspended: bool
+    feature_flags: dict  # shared between requests: do not mutate
+    plan: Optional[str]
+
+
+# tenant id -> (expires_at, info)
+_entries: Dict[str, Tuple[float, TenantInfo]] = {}
+
+
+async def _load(db: AsyncSession, tenant_id: str) -> Optional[TenantInfo]:
+    row = (await db.execute(
+        select(
+            Tenant.id, Tenant.name, Tenant.subdomain, Tenant.status,
+            Tenant.suspended, Tenant.feature_flags, SubscriptionPlan.name,
+        )
+        .outerjoin(TenantSubscription, and_(
+            TenantSubscription.tenant_id == Tenant.id, TenantSubscription.is_active == True
+        ))
+        .outerjoin(SubscriptionPlan, SubscriptionPlan.id == TenantSubscription.plan_id)
+        .where(Tenant.id == tenant_id)
+        .limit(1)
+    )).first()
+    if row is None:
+        return None
+    id_, name, subdomain, status, suspended, flags, plan = row
+    return TenantInfo(str(id_), name, subdomain, status, bool(suspended), flags or {}, plan)
+
+
+async def get_tenant_info(db: AsyncSession, tenant_id: str) -> Optional[TenantInfo]:
+    """Cached metadata for `tenant_id`, or None if there is no such tenant
+    (unknown ids are not cached)."""
+    key = str(tenant_id)
+    cached = _entries.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        metrics.record_cache("tenant", True)
+        return cached[1]
+    metrics.record_cache("tenant", False)
+    info = await _load(db, key)
+    if info is not None:
+        _entries[key] = (time.monotonic() + settings.TENANT_CACHE_TTL_SECONDS, info)
+    return info
+
+
+def _drop(tenant_id: str) -> None:
+    _entries.pop(str(tenant_id), None)
+
+
+def clear() -> None:
+    _entries.clear()
+
+
+async def invalidate(tenant_id: str) -> None:
+    """Forget `tenant_id` in this worker and, via Redis, in all others."""
+    _drop(tenant_id)
+    if not settings.REDIS_URL:
+        return
+    try:
+        r = await redis_client.get_redis()
+        await r.publish(CHANNEL, str(tenant_id))
+    except Exception as exc:
+        logger.warning("tenant cache invalidation of %s not published: %s", tenant_id, exc)
+
+
+async def listen_for_invalidations(retry_seconds: float = 5.0) -> None:
+    """Apply invalidations published by other workers until cancelled."""
+    while True:
+        try:
+            r = await redis_client.get_redis()
+            pubsub = r.pubsub()
+            await pubsub.subscribe(CHANNEL)
+            try:
+                # anything published while we were not subscribed is lost
+                clear()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        _drop(message["data"])
+            finally:
+                await pubsub.close()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("tenant cache subscription lost, retrying in %ss: %s", retry_seconds, exc)
+            await asyncio.sleep(retry_seconds)
@@ -0,0 +1,141 @@
+"""Per-request SQL accounting and N+1 detection.
+
+Engine-level cursor events count every statement and its DB time into the
+`QueryStats` objects active in the current context. `QueryStatsMiddleware`
+opens one per HTTP request; `track_queries()` opens one anywhere else (jobs,
+tests). Trackers nest, so a test can wrap a request and see its queries.
+
+A statement *shape* is its SQL text with expanded IN lists collapsed, so the
+same query run with different parameters counts as a repeat. A shape repeated
+more than `SQL_REPEAT_WARN_THRESHOLD` times in one request is the signature of
+a query in a loop and is logged once per request.
+"""
+import contextvars
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_ACTIVE: contextvars.ContextVar[Tuple["QueryStats", ...]] = contextvars.ContextVar("query_stats", default=())
+
+# "(?, ?, ?)", "($1, $2)", "(%(p_1)s, %(p_2)s)" -> "(?)"
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|\$\d+|%\(\w+\)s)(?:\s*,\s*(?:\?|\$\d+|%\(\w+\)s))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+QUERIES_PER_REQUEST = metrics.REGISTRY.register(metrics.Histogram(
+    "db_queries_per_request", "SQL statements executed per request.", ("method", "route"),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 250, 1000),
+))
+DB_TIME_PER_REQUEST = metrics.REGISTRY.register(metrics.Histogram(
+    "db_time_per_request_seconds", "Time spent executing SQL per request.", ("method", "route"),
+))
+REPEATED_STATEMENTS = metrics.REGISTRY.register(metrics.Counter(
+    "db_repeated_statement_requests_total", "Requests that repeated one statement shape above the threshold.",
+    ("method", "route"),
+))
+
+
+# compiled statements come from SQLAlchemy's cache, so the same strings recur
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Shapes executed more than `threshold` times, most repeated first."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+@contextmanager
+def track_queries():
+    """Count the statements executed inside the block (including nested
+    requests served in the same context)."""
+    stats = QueryStats()
+    token = _ACTIVE.set(_ACTIVE.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _ACTIVE.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if _ACTIVE.get():
+        conn.info["query_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    active = _ACTIVE.get()
+    if not active:
+        return
+    elapsed = time.perf_counter() - conn.info.pop("query_started", time.perf_counter())
+    shape = statement_shape(statement)
+    for stats in active:
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.shapes[shape] += 1
+
+
+def _headers_enabled() -> bool:
+    if settings.SQL_STATS_HEADERS is not None:
+        return settings.SQL_STATS_HEADERS
+    return settings.STARTUP_PROFILE != "production"
+
+
+class QueryStatsMiddleware:
+    """Tracks the SQL issued while serving each HTTP request, records it in
+    the `db_*_per_request` metrics and logs suspected N+1 patterns."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = _headers_enabled()
+        with track_queries() as stats:
+
+            async def send_wrapper(message):
+                if headers and message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-queries", str(stats.count).encode()),
+                        (b"x-db-time-ms", f"{stats.seconds * 1000:.1f}".encode()),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                method, route = scope["method"], metrics.route_template(scope)
+                QUERIES_PER_REQUEST.observe(method, route, value=stats.count)
+                DB_TIME_PER_REQUEST.observe(method, route, value=stats.seconds)
+                repeated = stats.repeated(settings.SQL_REPEAT_WARN_THRESHOLD)
+                if repeated:
+                    REPEATED_STATEMENTS.inc(method, route)
+                    shape, times = repeated[0]
+                    logger.warning(
+                        "possible N+1 in %s %s: statement ran %d times (%d queries total): %s",
+                        method, route, times, stats.count, shape[:300],
+                    )
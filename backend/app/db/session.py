@@ -1,22 +1,211 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import asyncio
+import logging
+import time
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import event
+from sqlalchemy import String, bindparam, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CacheStats
 from sqlalchemy.orm import Session, with_loader_criteria
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
-from app.core import tenancy
+from app.core import metrics, tenancy
 from app.db.base import TenantMixin
 
+logger = logging.getLogger(__name__)
+
+
+class WaitTracker:
+    """Recent pool checkout wait: an exponentially weighted average that also
+    decays toward zero with `half_life` while no checkouts happen, so a pool
+    that stops being used (e.g. because load is being shed) reads as idle."""
+
+    def __init__(self, half_life: float = 1.0, clock=time.monotonic):
+        self.half_life = half_life
+        self.clock = clock
+        self._value = 0.0
+        self._at = clock()
+
+    def _decayed(self, now: float) -> float:
+        return self._value * 0.5 ** ((now - self._at) / self.half_life)
+
+    def observe(self, seconds: float) -> None:
+        now = self.clock()
+        self._value = 0.8 * self._decayed(now) + 0.2 * seconds
+        self._at = now
+
+    def value(self) -> float:
+        return self._decayed(self.clock())
+
+
+# recent checkout wait across all timed pools; read by load shedding
+pool_wait = WaitTracker()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a
+    connection in `db_pool_checkout_wait_seconds`. A rising wait means the
+    pool is saturated, long before checkouts start timing out."""
+
+    label = "primary"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            metrics.POOL_WAIT.observe(self.label, value=waited)
+            pool_wait.observe(waited)
+
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+_timed_pools: dict = {}
+
+
+def timed_pool_class(label: str) -> type:
+    """`TimedQueuePool` subclass reporting under `label`; a class rather than
+    an instance attribute so it survives `engine.dispose()` recreating the pool."""
+    if label not in _timed_pools:
+        _timed_pools[label] = type(f"TimedQueuePool_{label}", (TimedQueuePool,), {"label": label})
+    return _timed_pools[label]
+
+
+def engine_options(url: str, label: str = "primary") -> dict:
+    """Explicit pool settings for server databases. SQLite keeps SQLAlchemy's
+    defaults (in-memory databases use a single static connection)."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": timed_pool_class(label),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def replica_urls() -> List[str]:
+    return [u.strip() for u in (settings.DATABASE_REPLICA_URLS or "").split(",") if u.strip()]
+
+
+engine = create_async_engine(settings.DATABASE_URL, echo=False, **engine_options(settings.DATABASE_URL))
 AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
+# seconds behind the primary; 0 when the replica has replayed everything it received
+_PG_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+async def probe_lag(replica: AsyncEngine) -> float:
+    """Replication lag in seconds. Non-PostgreSQL replicas only get a
+    connectivity check and report 0."""
+    async with replica.connect() as conn:
+        if replica.dialect.name == "postgresql":
+            return float((await conn.execute(_PG_LAG_SQL)).scalar() or 0)
+        await conn.execute(text("SELECT 1"))
+        return 0.0
+
+
+class ReplicaRouter:
+    """Round-robin over read replicas, skipping any that lag or fail.
+
+    Each replica's lag is probed at most once per `check_interval`; between
+    probes the cached verdict is used, so routing costs nothing on the hot
+    path. When no replica is usable reads fall back to the primary.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: List[AsyncEngine],
+        max_lag: float = 10.0,
+        check_interval: float = 5.0,
+        probe=probe_lag,
+        clock=time.monotonic,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.probe = probe
+        self.clock = clock
+        self._next = 0
+        # replica index -> (healthy, checked_at)
+        self._status: dict = {}
+        self._locks = [asyncio.Lock() for _ in replicas]
+
+    async def _healthy(self, index: int) -> bool:
+        healthy, checked_at = self._status.get(index, (False, None))
+        if checked_at is not None and self.clock() - checked_at < self.check_interval:
+            return healthy
+        async with self._locks[index]:
+            healthy, checked_at = self._status.get(index, (False, None))
+            if checked_at is not None and self.clock() - checked_at < self.check_interval:
+                return healthy
+            try:
+                lag = await asyncio.wait_for(self.probe(self.replicas[index]), timeout=2.0)
+                healthy = lag <= self.max_lag
+                if not healthy:
+                    logger.warning("read replica %d is %.1fs behind; using other replicas", index, lag)
+            except Exception as exc:
+                healthy = False
+                logger.warning("read replica %d unavailable: %s", index, exc)
+            self._status[index] = (healthy, self.clock())
+            return healthy
+
+    async def choose(self) -> AsyncEngine:
+        count = len(self.replicas)
+        start = self._next
+        self._next = (self._next + 1) % count if count else 0
+        for offset in range(count):
+            index = (start + offset) % count
+            if await self._healthy(index):
+                return self.replicas[index]
+        return self.primary
+
+
+replica_engines = [
+    create_async_engine(url, echo=False, **engine_options(url, f"replica{i}")) for i, url in enumerate(replica_urls())
+]
+replica_router = ReplicaRouter(
+    engine,
+    replica_engines,
+    max_lag=settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DATABASE_REPLICA_CHECK_INTERVAL_SECONDS,
+)
+
+
+# One loader-criteria option shared by every tenant-scoped query. The tenant
+# is a bound parameter whose value is read from CURRENT_TENANT when the
+# statement executes, so the option (and the compiled SQL) is identical for
+# all tenants and the compiled-statement cache is hit across requests.
+_TENANT_PARAM = bindparam(
+    "_tenant_scope",
+    type_=String(36),
+    callable_=lambda: tenancy.CURRENT_TENANT.get(None),
+)
+TENANT_CRITERIA = with_loader_criteria(
+    TenantMixin,
+    lambda cls: cls.tenant_id == _TENANT_PARAM,
+    include_aliases=True,
+    # relationship loads run through do_orm_execute themselves
+    propagate_to_loaders=False,
+    track_closure_variables=False,
+)
+
 
 @event.listens_for(Session, "do_orm_execute")
 def _add_tenant_criteria(execute_state):
     """Apply tenant scoping automatically for ORM SELECT statements when a current
     tenant is present in the context variable.
 
-    This injects a loader criteria so mapped classes inheriting `TenantMixin`
+    This adds `TENANT_CRITERIA` so mapped classes inheriting `TenantMixin`
     have `tenant_id` filtered automatically.
     """
     if not execute_state.is_select:
@@ -26,8 +215,7 @@ def _add_tenant_criteria(execute_state):
     if getattr(tenancy, "is_bypass_enabled", None) and tenancy.is_bypass_enabled():
         return
 
-    tenant = tenancy.CURRENT_TENANT.get(None)
-    if tenant is None:
+    if tenancy.CURRENT_TENANT.get(None) is None:
         return
 
     # If the caller set execution option `ignore_tenant=True`, opt-out of automatic scoping
@@ -35,11 +223,73 @@ def _add_tenant_criteria(execute_state):
     if exec_opts.get("ignore_tenant"):
         return
 
-    execute_state.statement = execute_state.statement.options(
-        with_loader_criteria(TenantMixin, lambda cls: cls.tenant_id == tenant, include_aliases=True)
+    execute_state.statement = execute_state.statement.options(TENANT_CRITERIA)
+
+
+# Per-process compiled statement cache counters (all engines), for monitoring.
+_statement_cache = {"compiled": 0, "cache_hits": 0, "uncached": 0}
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement_cache(conn, cursor, statement, parameters, context, executemany):
+    if context is None:
+        return
+    hit = getattr(context, "cache_hit", None)
+    if hit is CacheStats.CACHE_HIT:
+        _statement_cache["cache_hits"] += 1
+    elif hit is CacheStats.CACHE_MISS:
+        _statement_cache["compiled"] += 1
+    else:
+        _statement_cache["uncached"] += 1
+
+
+def statement_cache_stats() -> dict:
+    """`compiled` counts statements compiled because they missed the cache;
+    a steadily growing value under constant traffic means cache churn."""
+    stats = dict(_statement_cache)
+    executed = stats["compiled"] + stats["cache_hits"]
+    stats["hit_ratio"] = round(stats["cache_hits"] / executed, 4) if executed else None
+    return stats
+
+
+def reset_statement_cache_stats() -> None:
+    for key in _statement_cache:
+        _statement_cache[key] = 0
+
+
+def _collect_db_metrics():
+    stats = statement_cache_stats()
+    yield (
+        "sqlalchemy_statement_cache_total", "counter", "Executed statements by compiled-cache outcome.",
+        [({"result": "hit"}, stats["cache_hits"]), ({"result": "miss"}, stats["compiled"]),
+         ({"result": "uncached"}, stats["uncached"])],
     )
+    pools = [("primary", engine)] + [(f"replica{i}", e) for i, e in enumerate(replica_engines)]
+    pools = [(label, e.sync_engine.pool) for label, e in pools if isinstance(e.sync_engine.pool, QueuePool)]
+    yield ("db_pool_checked_out", "gauge", "Connections currently checked out.",
+           [({"pool": label}, pool.checkedout()) for label, pool in pools])
+    yield ("db_pool_size", "gauge", "Configured pool size (excluding overflow).",
+           [({"pool": label}, pool.size()) for label, pool in pools])
+    yield ("db_pool_overflow", "gauge", "Connections opened beyond the pool size.",
+           [({"pool": label}, max(pool.overflow(), 0)) for label, pool in pools])
+
+
+metrics.REGISTRY.add_collector(_collect_db_metrics)
 
 
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def get_read_db():
+    """Session for read-only endpoints (dashboards, analytics).
+
+    Served by a read replica when `DATABASE_REPLICA_URLS` is set and the
+    replica is within the lag budget, otherwise by the primary. Results may
+    be a few seconds stale; anything that must see the caller's own writes
+    should keep using `get_db`.
+    """
+    bind = await replica_router.choose()
+    async with AsyncSession(bind=bind, expire_on_commit=False) as session:
+        yield session
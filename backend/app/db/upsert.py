@@ -0,0 +1,21 @@
+"""INSERT ... ON CONFLICT for the backends the app runs on.
+
+Rollup tables are written concurrently by every request that completes a
+redemption or approves a recognition. "SELECT ... FOR UPDATE, INSERT if
+missing" races when the row does not exist yet (there is nothing to lock),
+and the losing INSERT's IntegrityError aborts the caller's transaction.
+Upserting against the unique key lets the database arbitrate instead.
+"""
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def insert_stmt(db: AsyncSession, model):
+    """`insert(model)` supporting `.on_conflict_do_nothing()` /
+    `.on_conflict_do_update()` for the session's dialect."""
+    dialect = (await db.connection()).dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"upserts are not implemented for {dialect}")
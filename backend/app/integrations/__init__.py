@@ -1,7 +1,7 @@
 """Integrations package for HRIS and SSO providers.
 
 Each provider module exposes a lightweight async client with at least:
-- `async def fetch_users()` -> iterable of external user dicts
+- `async def fetch_users()` -> async iterator of external user dicts
 - `def map_to_local(external_user)` -> canonical dict for upsert
 
 Design note: keep provider-specific code isolated here. The `jobs/user_sync.py`
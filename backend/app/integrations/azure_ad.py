@@ -1,28 +1,134 @@
-"""Azure AD integration placeholder.
+"""Azure AD (Microsoft Graph) integration.
 
-Provide a minimal client skeleton to fetch users from Azure AD and map them
-into a canonical shape for the sync job.
+`AzureADClient.fetch_users` authenticates with the client-credentials flow
+and pages through `GET /v1.0/users` (manager expanded inline) following
+`@odata.nextLink`, prefetching up to `prefetch_depth` pages over the shared
+pooled HTTP client.
+
+`fetch_delta` uses the Graph delta query instead: without a token it lists
+every user, with the `@odata.deltaLink` saved from the previous run it only
+returns changes (removed users carry `@removed`). After the stream is
+exhausted `delta_link` holds the link for the next run.
 """
-from typing import Any, AsyncIterator, Dict
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.integrations.http_client import get_http_client, prefetch, request_with_backoff
+
+LOGIN_URL = "https://login.microsoftonline.com"
+GRAPH_URL = "https://graph.microsoft.com"
+USER_FIELDS = "id,mail,userPrincipalName,givenName,surname,accountEnabled"
 
 
 class AzureADClient:
-    def __init__(self, tenant_id: str, client_id: str, client_secret: str):
+    def __init__(
+        self,
+        tenant_id: str,
+        client_id: str,
+        client_secret: str,
+        page_size: int = 999,
+        http: Optional[httpx.AsyncClient] = None,
+        prefetch_depth: Optional[int] = None,
+        login_url: str = LOGIN_URL,
+        graph_url: str = GRAPH_URL,
+    ):
         self.tenant_id = tenant_id
         self.client_id = client_id
         self.client_secret = client_secret
+        self.page_size = page_size
+        self.http = http
+        self.prefetch_depth = prefetch_depth
+        self.login_url = login_url.rstrip("/")
+        self.graph_url = graph_url.rstrip("/")
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self.delta_link: Optional[str] = None
+
+    async def _access_token(self, client: httpx.AsyncClient) -> str:
+        if self._token and time.time() < self._token_expires - 60:
+            return self._token
+        resp = await request_with_backoff(
+            client,
+            "POST",
+            f"{self.login_url}/{self.tenant_id}/oauth2/v2.0/token",
+            data={
+                "grant_type": "client_credentials",
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "scope": f"{GRAPH_URL}/.default",
+            },
+        )
+        body = resp.json()
+        self._token = body["access_token"]
+        self._token_expires = time.time() + float(body.get("expires_in", 3600))
+        return self._token
+
+    async def _pages(self, url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]] = None):
+        client = self.http or get_http_client()
+        next_url: Optional[str] = url
+        while next_url:
+            token = await self._access_token(client)
+            resp = await request_with_backoff(
+                client, "GET", next_url, params=params, headers={"Authorization": f"Bearer {token}", **(headers or {})}
+            )
+            body = resp.json()
+            yield body
+            next_url = body.get("@odata.nextLink")
+            params = None
 
     async def fetch_users(self) -> AsyncIterator[Dict[str, Any]]:
-        """Yield user objects from Azure AD. Replace with MS Graph calls."""
-        if False:
-            yield {}
+        """Yield user objects from Azure AD."""
+        params = {"$select": USER_FIELDS, "$expand": "manager($select=id)", "$top": self.page_size}
+        async for page in prefetch(self._pages(f"{self.graph_url}/v1.0/users", params), self.prefetch_depth):
+            for user in page.get("value", []):
+                yield user
+
+    async def fetch_delta(self, delta_link: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield users changed since `delta_link` (all users when None).
+
+        An expired link makes Graph answer 410, surfaced as `ProviderError`;
+        callers should then start over without a link.
+        """
+        self.delta_link = None
+        if delta_link:
+            url, params = delta_link, None
+        else:
+            url = f"{self.graph_url}/v1.0/users/delta"
+            params = {"$select": USER_FIELDS, "$expand": "manager($select=id)"}
+        headers = {"Prefer": f"odata.maxpagesize={self.page_size}"}
+        async for page in prefetch(self._pages(url, params, headers), self.prefetch_depth):
+            for user in page.get("value", []):
+                yield user
+            if page.get("@odata.deltaLink"):
+                self.delta_link = page["@odata.deltaLink"]
+
+
+def _manager_ref(external_user: Dict[str, Any]) -> Dict[str, Any]:
+    """`manager_external_id` from an expanded `manager` or a delta `manager@delta`.
+
+    Returns {} when the payload says nothing about the manager (an unchanged
+    delta record), so the sync keeps the current link.
+    """
+    if "manager" in external_user:
+        manager = external_user.get("manager")
+        return {"manager_external_id": manager.get("id") if manager else None}
+    if "manager@delta" in external_user:
+        current = [ref for ref in external_user["manager@delta"] or [] if "@removed" not in ref]
+        return {"manager_external_id": current[0].get("id") if current else None}
+    return {}
 
 
 def map_to_local(external_user: Dict[str, Any]) -> Dict[str, Any]:
+    if "@removed" in external_user:
+        # delta tombstone: only the id is reliable
+        return {"external_id": external_user.get("id"), "active": False}
     return {
         "external_id": external_user.get("id"),
         "email": external_user.get("mail") or external_user.get("userPrincipalName"),
-        "manager_external_id": external_user.get("manager", {}).get("id") if external_user.get("manager") else None,
+        **_manager_ref(external_user),
         "first_name": external_user.get("givenName"),
         "last_name": external_user.get("surname"),
+        "active": external_user.get("accountEnabled"),
     }
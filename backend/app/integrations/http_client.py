@@ -0,0 +1,168 @@
+"""Shared HTTP plumbing for provider connectors.
+
+- `get_http_client()` returns one pooled `httpx.AsyncClient` per process so
+  every connector reuses keep-alive connections.
+- `request_with_backoff()` retries 429/5xx responses, honouring `Retry-After`
+  and Okta-style `X-Rate-Limit-Reset` headers, with capped exponential
+  backoff otherwise.
+- `prefetch()` runs a page producer ahead of its consumer with a bounded
+  buffer, and `fetch_offset_pages()` fetches offset-paginated pages with
+  bounded concurrency while yielding them in order.
+"""
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.INTEGRATION_HTTP_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=settings.INTEGRATION_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.INTEGRATION_HTTP_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+class ProviderError(Exception):
+    """Raised when a provider keeps failing after all retries."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def retry_delay(response: Optional[httpx.Response], attempt: int, base: float = 0.5, cap: float = 60.0) -> float:
+    """Seconds to wait before retrying `response` (None for transport errors)."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), cap)
+            except ValueError:
+                try:
+                    delta = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    return min(max(delta, 0.0), cap)
+                except (TypeError, ValueError):
+                    pass
+        reset = response.headers.get("X-Rate-Limit-Reset")
+        if reset and response.status_code == 429:
+            try:
+                return min(max(float(reset) - time.time(), 0.0), cap)
+            except ValueError:
+                pass
+    # full jitter exponential backoff
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+async def request_with_backoff(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    max_retries: Optional[int] = None,
+    **kwargs,
+) -> httpx.Response:
+    retries = settings.INTEGRATION_MAX_RETRIES if max_retries is None else max_retries
+    attempt = 0
+    while True:
+        response = None
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError as exc:
+            if attempt >= retries:
+                raise ProviderError(f"{method} {url} failed: {exc}") from exc
+        else:
+            if response.status_code not in RETRY_STATUSES:
+                if response.status_code >= 400:
+                    raise ProviderError(
+                        f"{method} {url} returned {response.status_code}: {response.text[:200]}",
+                        response.status_code,
+                    )
+                return response
+            if attempt >= retries:
+                raise ProviderError(f"{method} {url} still {response.status_code} after {retries} retries", response.status_code)
+        await asyncio.sleep(retry_delay(response, attempt))
+        attempt += 1
+
+
+async def prefetch(pages: AsyncIterator[Any], depth: Optional[int] = None) -> AsyncIterator[Any]:
+    """Run `pages` in a background task up to `depth` items ahead of the consumer.
+
+    Cursor-paginated APIs only reveal the next URL after a page arrives, so
+    this overlaps network I/O for page N+1 with processing of page N while
+    the bounded buffer stops a slow consumer from pulling the whole directory
+    into memory.
+    """
+    depth = settings.INTEGRATION_PAGE_PREFETCH if depth is None else depth
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, depth))
+    done = object()
+
+    async def _produce():
+        try:
+            async for item in pages:
+                await queue.put((True, item))
+            await queue.put((True, done))
+        except BaseException as exc:  # propagate to the consumer
+            await queue.put((False, exc))
+
+    task = asyncio.create_task(_produce())
+    try:
+        while True:
+            ok, item = await queue.get()
+            if not ok:
+                raise item
+            if item is done:
+                return
+            yield item
+    finally:
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
+async def fetch_offset_pages(
+    fetch_page: Callable[[int], Awaitable[Dict[str, Any]]],
+    page_size: int,
+    total: int,
+    first_offset: int = 0,
+    concurrency: Optional[int] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Fetch offset-paginated pages with at most `concurrency` in flight.
+
+    Pages are yielded in offset order; at most `concurrency` pages are buffered.
+    """
+    concurrency = max(1, settings.INTEGRATION_PAGE_PREFETCH if concurrency is None else concurrency)
+    offsets = iter(range(first_offset, total, page_size))
+    pending = []
+    try:
+        for offset in offsets:
+            pending.append(asyncio.create_task(fetch_page(offset)))
+            if len(pending) >= concurrency:
+                yield await pending.pop(0)
+        while pending:
+            yield await pending.pop(0)
+    finally:
+        for task in pending:
+            task.cancel()
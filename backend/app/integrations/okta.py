@@ -1,35 +1,77 @@
-"""Okta integration placeholder.
+"""Okta integration.
 
-This module contains a small async client skeleton and mapping helper. Replace
-HTTP call placeholders with a real Okta SDK or `aiohttp` requests.
+`OktaClient.fetch_users` pages through `GET /api/v1/users` following the
+`Link: rel="next"` cursor, fetching up to `prefetch_depth` pages ahead of the
+consumer over the shared pooled HTTP client, and yields raw Okta user
+objects one at a time. With `updated_since` only users modified after that
+instant are listed (including suspended/deprovisioned ones), which is what
+incremental sync uses.
 """
-from typing import Any, AsyncIterator, Dict, List
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.integrations.http_client import get_http_client, prefetch, request_with_backoff
+
+INACTIVE_STATUSES = {"SUSPENDED", "DEPROVISIONED"}
 
 
 class OktaClient:
-    def __init__(self, base_url: str, token: str):
-        self.base_url = base_url
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        page_size: int = 200,
+        http: Optional[httpx.AsyncClient] = None,
+        prefetch_depth: Optional[int] = None,
+    ):
+        self.base_url = (base_url or "").rstrip("/")
         self.token = token
+        self.page_size = page_size
+        self.http = http
+        self.prefetch_depth = prefetch_depth
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"SSWS {self.token}", "Accept": "application/json"}
 
-    async def fetch_users(self) -> AsyncIterator[Dict[str, Any]]:
-        """Yield user objects from Okta.
+    async def _pages(self, params: Dict[str, Any]) -> AsyncIterator[list]:
+        client = self.http or get_http_client()
+        url: Optional[str] = f"{self.base_url}/api/v1/users"
+        while url:
+            resp = await request_with_backoff(client, "GET", url, params=params, headers=self._headers())
+            yield resp.json()
+            # the next link already carries the cursor and original query
+            url = resp.links.get("next", {}).get("url")
+            params = None
 
-        Real implementation should call Okta's API and yield normalized user dicts.
-        """
-        # Placeholder: yield nothing
-        if False:
-            yield {}
+    async def fetch_users(self, updated_since: Optional[datetime] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield user objects from Okta, optionally only those updated after `updated_since`."""
+        params: Dict[str, Any] = {"limit": self.page_size}
+        if updated_since is not None:
+            if updated_since.tzinfo is not None:
+                updated_since = updated_since.astimezone(timezone.utc)
+            params["filter"] = f'lastUpdated gt "{updated_since.strftime("%Y-%m-%dT%H:%M:%S.000Z")}"'
+        async for page in prefetch(self._pages(params), self.prefetch_depth):
+            for user in page:
+                yield user
 
 
 def map_to_local(external_user: Dict[str, Any]) -> Dict[str, Any]:
     """Map an Okta user payload to local user shape used by user-sync.
 
     Expected return keys: external_id, email, manager_external_id, first_name, last_name
+    (plus `active` and `updated_at` when the payload carries status/lastUpdated)
     """
+    profile = external_user.get("profile") or {}
+    manager = external_user.get("manager")
+    status = external_user.get("status")
     return {
         "external_id": external_user.get("id") or external_user.get("sub"),
-        "email": external_user.get("email") or external_user.get("profile", {}).get("email"),
-        "manager_external_id": external_user.get("manager", {}).get("id") if external_user.get("manager") else None,
-        "first_name": external_user.get("profile", {}).get("firstName"),
-        "last_name": external_user.get("profile", {}).get("lastName"),
+        "email": external_user.get("email") or profile.get("email"),
+        "manager_external_id": (manager.get("id") if manager else None) or profile.get("managerId"),
+        "first_name": profile.get("firstName"),
+        "last_name": profile.get("lastName"),
+        "active": status not in INACTIVE_STATUSES if status else None,
+        "updated_at": external_user.get("lastUpdated"),
     }
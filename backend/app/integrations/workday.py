@@ -1,21 +1,65 @@
-"""Workday / HRIS integration placeholder.
+"""Workday / HRIS integration.
 
 Workday often provides employee records (HRIS). The sync job should map HRIS
 records to tenants/users in Lighthouse. Workday may be used to populate
 org-hierarchy, cost-centers and long-term HR attributes.
+
+`WorkdayClient.fetch_employees` reads the offset-paginated workers endpoint
+(`{"total": n, "data": [...]}`). After the first page reveals the total, up
+to `concurrency` further pages are fetched in parallel over the shared
+pooled HTTP client and yielded in order. `updated_since` maps to the
+`updatedFrom` filter for incremental sync.
 """
-from typing import Any, AsyncIterator, Dict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.integrations.http_client import fetch_offset_pages, get_http_client, request_with_backoff
 
 
 class WorkdayClient:
-    def __init__(self, base_url: str, api_key: str):
-        self.base_url = base_url
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        page_size: int = 100,
+        http: Optional[httpx.AsyncClient] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.base_url = (base_url or "").rstrip("/")
         self.api_key = api_key
+        self.page_size = page_size
+        self.http = http
+        self.concurrency = concurrency
+
+    async def _page(self, offset: int, updated_since: Optional[datetime] = None) -> Dict[str, Any]:
+        client = self.http or get_http_client()
+        params: Dict[str, Any] = {"limit": self.page_size, "offset": offset}
+        if updated_since is not None:
+            params["updatedFrom"] = updated_since.isoformat()
+        resp = await request_with_backoff(
+            client,
+            "GET",
+            f"{self.base_url}/workers",
+            params=params,
+            headers={"Authorization": f"Bearer {self.api_key}", "Accept": "application/json"},
+        )
+        return resp.json()
+
+    async def fetch_employees(self, updated_since: Optional[datetime] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield employee records from Workday, optionally only those updated since `updated_since`."""
+        first = await self._page(0, updated_since)
+        for employee in first.get("data", []):
+            yield employee
+        total = int(first.get("total") or 0)
+
+        async def _fetch(offset: int) -> Dict[str, Any]:
+            return await self._page(offset, updated_since)
 
-    async def fetch_employees(self) -> AsyncIterator[Dict[str, Any]]:
-        """Yield employee records from Workday."""
-        if False:
-            yield {}
+        async for page in fetch_offset_pages(_fetch, self.page_size, total, self.page_size, self.concurrency):
+            for employee in page.get("data", []):
+                yield employee
 
 
 def map_to_local(employee: Dict[str, Any]) -> Dict[str, Any]:
@@ -25,4 +69,6 @@ def map_to_local(employee: Dict[str, Any]) -> Dict[str, Any]:
         "manager_external_id": employee.get("managerEmployeeId"),
         "first_name": employee.get("firstName"),
         "last_name": employee.get("lastName"),
+        "active": employee.get("active"),
+        "updated_at": employee.get("lastModified"),
     }
@@ -0,0 +1,59 @@
+"""Department recognition flow backfill.
+
+`department_recognition_flows` is only fed by recognitions approved after it
+was deployed, while the tenant insights cross-department figures and
+/analytics/recognitions/department-flow read nothing else. Until this job
+has rebuilt the matrix from the recognitions table, existing tenants report
+no cross-department activity.
+
+Run once after `alembic upgrade` has created the table (migration 0023):
+
+    python -m app.jobs.department_flow_backfill
+
+Each tenant is rebuilt and committed on its own, replacing its existing
+cells, so the job is safe to re-run (e.g. with `--tenant` to repair one
+tenant). A tenant that fails, for instance because a recognition was
+approved while it was being rebuilt, is logged and can simply be run again.
+"""
+import asyncio
+import logging
+
+from sqlalchemy import select
+
+from app.core import tenancy
+from app.db.session import AsyncSessionLocal
+from app.models.tenants import Tenant
+from app.services.department_flow_service import rebuild_department_flows
+
+logger = logging.getLogger(__name__)
+
+
+async def run(tenant_id: str = None) -> int:
+    rebuilt = 0
+    with tenancy.bypass_tenant_context():
+        async with AsyncSessionLocal() as session:
+            if tenant_id:
+                tenant_ids = [tenant_id]
+            else:
+                tenant_ids = [r[0] for r in (await session.execute(select(Tenant.id))).all()]
+            for t_id in tenant_ids:
+                try:
+                    cells = await rebuild_department_flows(session, tenant_id=t_id)
+                    await session.commit()
+                    rebuilt += cells
+                except Exception:
+                    await session.rollback()
+                    logger.exception("Failed to rebuild department flows for tenant %s", t_id)
+    logger.info("department flow cells rebuilt: %d", rebuilt)
+    return rebuilt
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tenant", help="rebuild a single tenant")
+    args = parser.parse_args()
+    asyncio.run(run(tenant_id=args.tenant))
@@ -0,0 +1,48 @@
+"""Email outbox worker.
+
+Delivers emails queued by `app.services.email_outbox.enqueue_email` over
+pooled SMTP connections, retrying transient failures with backoff.
+
+Scheduling: run once from cron, or with `--loop` as a long-running worker
+that drains the outbox every `--interval` seconds. Several workers may run
+side by side; rows are claimed with SKIP LOCKED.
+"""
+import asyncio
+import logging
+
+from app.services.email_outbox import TenantRateLimiter, default_transport, drain_outbox
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def run(loop: bool = False, interval: int = 5):
+    # one transport and limiter for the worker's lifetime so SMTP connections
+    # and per-tenant budgets carry over between passes
+    transport = default_transport()
+    limiter = TenantRateLimiter(settings.EMAIL_TENANT_RATE_PER_MINUTE)
+    try:
+        while True:
+            summary = await drain_outbox(transport=transport, limiter=limiter)
+            if summary["batches"]:
+                logger.info(
+                    "email outbox: %d sent, %d retried, %d failed, %d deferred",
+                    summary["sent"], summary["retried"], summary["failed"], summary["deferred"],
+                )
+            if not loop:
+                return summary
+            await asyncio.sleep(interval)
+    finally:
+        await transport.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loop", action="store_true", help="keep running and drain every --interval seconds")
+    parser.add_argument("--interval", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(loop=args.loop, interval=args.interval))
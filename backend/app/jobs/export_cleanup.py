@@ -0,0 +1,39 @@
+"""Export artifact cleanup job.
+
+Deletes analytics export files whose download window
+(`EXPORT_TTL_SECONDS`) has passed and fails jobs orphaned by a dead worker.
+
+Scheduling: run once from cron / a Kubernetes CronJob, or with `--loop` as a
+long-running worker that checks every `--interval` seconds.
+"""
+import asyncio
+import logging
+
+from app.core import tenancy
+from app.db.session import AsyncSessionLocal
+from app.services.export_job_service import cleanup_expired_exports
+
+logger = logging.getLogger(__name__)
+
+
+async def run(loop: bool = False, interval: int = 300):
+    while True:
+        with tenancy.bypass_tenant_context():
+            async with AsyncSessionLocal() as db:
+                cleaned = await cleanup_expired_exports(db)
+        logger.info("export jobs cleaned: %d", cleaned)
+        if not loop:
+            return cleaned
+        await asyncio.sleep(interval)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loop", action="store_true", help="keep running and re-check every --interval seconds")
+    parser.add_argument("--interval", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(run(loop=args.loop, interval=args.interval))
@@ -0,0 +1,38 @@
+"""Tenant insights snapshot job.
+
+Rebuilds `TenantInsightsSnapshot` rows for tenants whose snapshot is missing,
+older than `INSIGHTS_SNAPSHOT_MAX_AGE_SECONDS`, or behind by at least
+`INSIGHTS_SNAPSHOT_ACTIVITY_THRESHOLD` new recognitions.
+
+Scheduling: run once from cron / a Kubernetes CronJob, or with `--loop` as a
+long-running worker that checks every `--interval` seconds.
+"""
+import asyncio
+import logging
+
+from app.services.insights_service import refresh_stale_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+async def run(loop: bool = False, interval: int = 60, force: bool = False):
+    while True:
+        rebuilt = await refresh_stale_snapshots(force=force)
+        logger.info("insights snapshots rebuilt: %d", rebuilt)
+        if not loop:
+            return rebuilt
+        force = False
+        await asyncio.sleep(interval)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loop", action="store_true", help="keep running and re-check every --interval seconds")
+    parser.add_argument("--interval", type=int, default=60)
+    parser.add_argument("--force", action="store_true", help="rebuild every tenant regardless of staleness")
+    args = parser.parse_args()
+    asyncio.run(run(loop=args.loop, interval=args.interval, force=args.force))
@@ -0,0 +1,57 @@
+"""Redemption latency sketch backfill.
+
+`redemption_latency_sketches` is only fed by redemptions completed after it
+was deployed, so /analytics/redemptions/velocity reports no history until
+this job has rebuilt the daily sketches from the redemptions table.
+
+Run once after `alembic upgrade` has created the table (migration 0021):
+
+    python -m app.jobs.latency_backfill
+
+Each tenant is rebuilt and committed on its own, replacing its existing
+sketches, so the job is safe to re-run (e.g. with `--tenant` to repair one
+tenant). A tenant that fails, for instance because a redemption completed
+while it was being rebuilt, is logged and can simply be run again.
+"""
+import asyncio
+import logging
+
+from sqlalchemy import select
+
+from app.core import tenancy
+from app.db.session import AsyncSessionLocal
+from app.models.tenants import Tenant
+from app.services.latency_service import rebuild_latency_sketches
+
+logger = logging.getLogger(__name__)
+
+
+async def run(tenant_id: str = None) -> int:
+    rebuilt = 0
+    with tenancy.bypass_tenant_context():
+        async with AsyncSessionLocal() as session:
+            if tenant_id:
+                tenant_ids = [tenant_id]
+            else:
+                tenant_ids = [r[0] for r in (await session.execute(select(Tenant.id))).all()]
+            for t_id in tenant_ids:
+                try:
+                    days = await rebuild_latency_sketches(session, tenant_id=t_id)
+                    await session.commit()
+                    rebuilt += days
+                except Exception:
+                    await session.rollback()
+                    logger.exception("Failed to rebuild latency sketches for tenant %s", t_id)
+    logger.info("latency sketches rebuilt: %d tenant-days", rebuilt)
+    return rebuilt
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tenant", help="rebuild a single tenant")
+    args = parser.parse_args()
+    asyncio.run(run(tenant_id=args.tenant))
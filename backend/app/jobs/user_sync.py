@@ -1,102 +1,474 @@
-"""User sync job skeleton.
+"""User sync job.
 
-This job demonstrates a safe pattern for syncing users from SSO/HRIS
-providers into local `User` records using `external_id` and `sso_provider`.
+Syncs users from SSO/HRIS providers into local `User` records keyed by
+(`tenant_id`, `sso_provider`, `external_id`).
 
 Pattern:
-- Fetch external users
-- Upsert local users keyed by (tenant_id, external_id, sso_provider)
-- After creating/updating users, run a pass to resolve manager relationships
+- Preload an `external_id -> user` map for the tenant/provider (one query)
+- Stream external users in batches; each batch is diffed against the map in
+  memory and written with one bulk INSERT and one bulk UPDATE
+- After all users exist, resolve manager relationships from the map and
+  write every changed link with a single `UPDATE ... FROM (VALUES ...)`
+
+The database cost is therefore a handful of statements per batch, not one
+round trip per user.
+
+Incremental runs: `sync_from_provider` keeps a `DirectorySyncState` per
+tenant/provider and only asks the provider for changes since the stored
+watermark (Okta `lastUpdated`, Workday `updatedFrom`) or delta link (Graph
+delta query). Every `DIRECTORY_FULL_SYNC_INTERVAL_HOURS`, or when no state
+exists yet or the delta link has expired, it does a full pull instead, which
+also deactivates local users that are no longer in the directory.
 
 Scheduling: run this via an async worker (Celery, APScheduler) or a Kubernetes CronJob.
 """
-from typing import Iterable
+from typing import AsyncIterable, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 import asyncio
+import time
+import uuid
 
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, values, column, String
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.users import User as UserModel
+from app.models.users import User as UserModel, UserRole
+from app.models.directory_sync import DirectorySyncState
 from app.db.session import AsyncSessionLocal
 from app.integrations import okta, azure_ad, workday
+from app.integrations.http_client import ProviderError, close_http_client
 from app.core.config import settings
 
+BATCH_SIZE = 1000
+# rows per UPDATE ... FROM (VALUES ...) statement; 2 bind params per row keeps
+# us well under PostgreSQL's 65535 parameter limit
+MANAGER_LINK_BATCH = 20000
+# incremental queries re-read this much before the watermark to tolerate
+# clock skew and records committed out of order on the provider side
+WATERMARK_OVERLAP = timedelta(minutes=5)
+# marks a record that says nothing about its manager (keep the current link)
+_KEEP = object()
+
+
+class _Local:
+    """In-memory view of a synced user (avoids holding ORM instances)."""
+    __slots__ = ("id", "email", "full_name", "manager_id", "is_active", "manager_external_id")
+
+    def __init__(self, id, email, full_name, manager_id, is_active=True, manager_external_id=_KEEP):
+        self.id = id
+        self.email = email
+        self.full_name = full_name
+        self.manager_id = manager_id
+        self.is_active = is_active
+        self.manager_external_id = manager_external_id
+
+
+def _full_name(mapped: dict) -> Optional[str]:
+    name = " ".join(p for p in (mapped.get("first_name"), mapped.get("last_name")) if p)
+    return name or None
+
+
+async def _load_external_id_map(session: AsyncSession, tenant_id: str, provider: str) -> Dict[str, _Local]:
+    res = await session.execute(
+        select(
+            UserModel.external_id, UserModel.id, UserModel.email, UserModel.full_name,
+            UserModel.manager_id, UserModel.is_active,
+        ).where(
+            UserModel.tenant_id == tenant_id,
+            UserModel.sso_provider == provider,
+            UserModel.external_id.isnot(None),
+        )
+    )
+    return {ext: _Local(uid, email, name, mgr, active) for ext, uid, email, name, mgr, active in res.all()}
+
+
+async def _upsert_batch(
+    session: AsyncSession,
+    tenant_id: str,
+    provider: str,
+    batch: List[dict],
+    id_map: Dict[str, _Local],
+    summary: dict,
+) -> None:
+    """Diff one batch against `id_map` and write it with bulk statements.
+
+    Users of this tenant that already exist locally by email (invited, HR
+    CSV, another provider) are adopted: their external_id/sso_provider are set
+    instead of inserting a duplicate. An email owned by another tenant or by
+    a tenant-less platform account, or repeated within the batch, is counted
+    as a conflict and skipped.
+
+    `active` in a record is authoritative when present: False deactivates
+    the local user (unknown inactive users are not created), True
+    reactivates it; None/missing leaves `is_active` alone.
+    """
+    new = {}
+    for mapped in batch:
+        ext = mapped["external_id"]
+        if ext not in id_map and mapped.get("active") is not False:
+            new[ext] = mapped
+
+    adopt = {}
+    emails = [m["email"] for m in new.values() if m.get("email")]
+    if emails:
+        res = await session.execute(
+            select(UserModel.email, UserModel.id, UserModel.tenant_id, UserModel.full_name, UserModel.manager_id).where(
+                UserModel.email.in_(emails)
+            )
+        )
+        adopt = {email: (uid, tid, name, mgr) for email, uid, tid, name, mgr in res.all()}
+
+    inserts = []
+    updates = []
+    batch_emails = set()
+    for mapped in batch:
+        ext = mapped["external_id"]
+        local = id_map.get(ext)
+        active = mapped.get("active")
+        if active is False:
+            if local is None:
+                summary["skipped_inactive"] += 1
+            elif local.is_active:
+                updates.append({"id": local.id, "is_active": False})
+                local.is_active = False
+                summary["deactivated"] += 1
+            else:
+                summary["unchanged"] += 1
+            continue
+        email = mapped.get("email") or f"{ext}@unknown"
+        full_name = _full_name(mapped)
+        if local is None and (email in batch_emails or (email in adopt and adopt[email][1] != tenant_id)):
+            summary["conflicts"] += 1
+            continue
+        batch_emails.add(email)
+        if local is None and email in adopt:
+            uid, _tenant, name, mgr = adopt.pop(email)
+            local = id_map[ext] = _Local(uid, email, name, mgr)
+            row = {"id": uid, "external_id": ext, "sso_provider": provider,
+                   "email": email, "full_name": full_name or name}
+            if active:
+                row["is_active"] = True
+            updates.append(row)
+            summary["adopted"] += 1
+        elif local is None:
+            uid = str(uuid.uuid4())
+            local = id_map[ext] = _Local(uid, email, full_name, None)
+            inserts.append({
+                "id": uid,
+                "tenant_id": tenant_id,
+                "email": email,
+                "full_name": full_name,
+                "role": UserRole.CORPORATE_USER,
+                "is_active": True,
+                "points_balance": 0,
+                "lead_budget_balance": 0,
+                "external_id": ext,
+                "sso_provider": provider,
+            })
+        elif email != local.email or (full_name and full_name != local.full_name) or (active and not local.is_active):
+            row = {"id": local.id, "email": email, "full_name": full_name or local.full_name}
+            if active and not local.is_active:
+                row["is_active"] = True
+                summary["reactivated"] += 1
+            updates.append(row)
+            summary["updated"] += 1
+        else:
+            summary["unchanged"] += 1
+        local.email = email
+        local.full_name = full_name or local.full_name
+        local.is_active = local.is_active or bool(active)
+        local.manager_external_id = mapped.get("manager_external_id", _KEEP)
+
+    if inserts:
+        await session.execute(insert(UserModel), inserts)
+        summary["inserted"] += len(inserts)
+    for columns in {tuple(sorted(u)) for u in updates}:
+        await session.execute(update(UserModel), [u for u in updates if tuple(sorted(u)) == columns])
+
 
-async def _upsert_user(session: AsyncSession, tenant_id: str, provider: str, mapped: dict):
-    """Upsert a single user record based on external_id and provider.
+async def _link_managers(session: AsyncSession, links: List[Tuple[str, Optional[str]]]) -> None:
+    """Set users.manager_id for (user_id, manager_id) pairs.
 
-    `mapped` is expected to come from provider.map_to_local()
+    PostgreSQL gets one `UPDATE users SET manager_id = v.manager_id FROM
+    (VALUES ...) AS v(id, manager_id) WHERE users.id = v.id` per
+    MANAGER_LINK_BATCH rows; other backends fall back to an executemany
+    UPDATE by primary key.
     """
-    external_id = mapped.get("external_id")
-    if not external_id:
+    if not links:
+        return
+    if session.bind.dialect.name != "postgresql":
+        await session.execute(update(UserModel), [{"id": uid, "manager_id": mgr} for uid, mgr in links])
+        return
+    for i in range(0, len(links), MANAGER_LINK_BATCH):
+        v = values(column("id", String), column("manager_id", String), name="v").data(links[i:i + MANAGER_LINK_BATCH])
+        await session.execute(
+            update(UserModel)
+            .where(UserModel.id == v.c.id)
+            .values(manager_id=v.c.manager_id)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def _deactivate_missing(session: AsyncSession, id_map: Dict[str, _Local], seen: set) -> int:
+    missing = [local.id for ext, local in id_map.items() if ext not in seen and local.is_active]
+    for i in range(0, len(missing), BATCH_SIZE):
+        await session.execute(update(UserModel), [{"id": uid, "is_active": False} for uid in missing[i:i + BATCH_SIZE]])
+    for ext, local in id_map.items():
+        if ext not in seen:
+            local.is_active = False
+    return len(missing)
+
+
+async def sync_users(
+    tenant_id: str,
+    provider: str,
+    mapped_users: AsyncIterable[dict],
+    batch_size: int = BATCH_SIZE,
+    session_factory=AsyncSessionLocal,
+    deactivate_missing: bool = False,
+) -> dict:
+    """Upsert a stream of canonical user dicts (see `integrations.*.map_to_local`).
+
+    With `deactivate_missing` the stream is treated as the complete directory:
+    active users of this tenant/provider that did not appear in it are
+    deactivated (skipped if the stream was empty).
+    Returns a summary with counts and throughput.
+    """
+    started = time.perf_counter()
+    summary = {"fetched": 0, "inserted": 0, "updated": 0, "adopted": 0, "unchanged": 0, "conflicts": 0,
+               "deactivated": 0, "reactivated": 0, "skipped_inactive": 0,
+               "managers_linked": 0, "unresolved_managers": 0}
+
+    async with session_factory() as session:
+        id_map = await _load_external_id_map(session, tenant_id, provider)
+        seen = set()
+
+        # first pass: users
+        batch: List[dict] = []
+        async for mapped in mapped_users:
+            ext = mapped.get("external_id")
+            if not ext or ext in seen:
+                continue
+            seen.add(ext)
+            batch.append(mapped)
+            if len(batch) >= batch_size:
+                await _upsert_batch(session, tenant_id, provider, batch, id_map, summary)
+                await session.commit()
+                batch = []
+        if batch:
+            await _upsert_batch(session, tenant_id, provider, batch, id_map, summary)
+            await session.commit()
+        summary["fetched"] = len(seen)
+
+        if deactivate_missing and seen:
+            summary["deactivated"] += await _deactivate_missing(session, id_map, seen)
+            await session.commit()
+
+        # second pass: manager relationships, resolved entirely from the map
+        links = []
+        for ext in seen:
+            local = id_map.get(ext)
+            if local is None:  # skipped as a conflict
+                continue
+            mgr_ext = local.manager_external_id
+            if mgr_ext is _KEEP:
+                continue
+            mgr = id_map.get(mgr_ext) if mgr_ext else None
+            if mgr_ext and mgr is None:
+                summary["unresolved_managers"] += 1
+            mgr_id = mgr.id if mgr else None
+            if mgr_id != local.manager_id:
+                links.append((local.id, mgr_id))
+                local.manager_id = mgr_id
+        await _link_managers(session, links)
+        await session.commit()
+        summary["managers_linked"] = len(links)
+
+    elapsed = time.perf_counter() - started
+    summary["elapsed_seconds"] = round(elapsed, 3)
+    summary["users_per_second"] = round(summary["fetched"] / elapsed, 1) if elapsed > 0 else None
+    return summary
+
+
+async def _mapped(source: AsyncIterable[dict], mapper) -> AsyncIterable[dict]:
+    async for ext in source:
+        yield mapper(ext)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if not value:
         return None
+    if isinstance(value, datetime):
+        return _as_aware(value)
+    try:
+        return _as_aware(datetime.fromisoformat(str(value).replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
+class _Cursor:
+    """Next watermark / delta token, collected while a source is consumed."""
+
+    def __init__(self, watermark: Optional[datetime] = None):
+        self.watermark = watermark
+        self.delta_token: Optional[str] = None
+
+    def advance(self, updated_at) -> None:
+        ts = _parse_timestamp(updated_at)
+        if ts is not None and (self.watermark is None or ts > self.watermark):
+            self.watermark = ts
+
+
+async def _tracked(source: AsyncIterable[dict], mapper, cursor: _Cursor) -> AsyncIterable[dict]:
+    async for ext in source:
+        mapped = mapper(ext)
+        cursor.advance(mapped.get("updated_at"))
+        yield mapped
+
+
+def _since(state: Optional[DirectorySyncState], full: bool) -> Optional[datetime]:
+    if full or state is None or state.watermark is None:
+        return None
+    return _as_aware(state.watermark) - WATERMARK_OVERLAP
 
-    stmt = select(UserModel).where(
-        UserModel.tenant_id == tenant_id,
-        UserModel.external_id == external_id,
-        UserModel.sso_provider == provider,
+
+def _okta_source(config: dict, state, full: bool, cursor: _Cursor, http=None):
+    client = okta.OktaClient(config.get("base_url"), config.get("token"), http=http)
+    return _tracked(client.fetch_users(updated_since=_since(state, full)), okta.map_to_local, cursor)
+
+
+def _azure_ad_source(config: dict, state, full: bool, cursor: _Cursor, http=None):
+    client = azure_ad.AzureADClient(
+        config.get("tenant_id"), config.get("client_id"), config.get("client_secret"), http=http,
+        **{k: config[k] for k in ("login_url", "graph_url") if config.get(k)},
     )
-    res = await session.execute(stmt)
-    user = res.scalar_one_or_none()
-    if user is None:
-        user = UserModel(
-            id=None,  # let application generate/assign ID if needed (fill in your generator)
-            tenant_id=tenant_id,
-            email=mapped.get("email") or f"{external_id}@unknown",
-            role="EMPLOYEE",
-            external_id=external_id,
-            sso_provider=provider,
+    delta_link = None if full or state is None else state.delta_token
+
+    async def _source():
+        async for mapped in _mapped(client.fetch_delta(delta_link), azure_ad.map_to_local):
+            yield mapped
+        cursor.delta_token = client.delta_link
+
+    return _source()
+
+
+def _workday_source(config: dict, state, full: bool, cursor: _Cursor, http=None):
+    client = workday.WorkdayClient(config.get("base_url"), config.get("api_key"), http=http)
+    return _tracked(client.fetch_employees(updated_since=_since(state, full)), workday.map_to_local, cursor)
+
+
+SOURCES = {
+    "okta": _okta_source,
+    "azure_ad": _azure_ad_source,
+    "workday": _workday_source,
+}
+
+
+async def _load_state(session_factory, tenant_id: str, provider: str) -> Optional[DirectorySyncState]:
+    async with session_factory() as session:
+        res = await session.execute(
+            select(DirectorySyncState).where(
+                DirectorySyncState.tenant_id == tenant_id, DirectorySyncState.provider == provider
+            )
         )
-        session.add(user)
-        await session.flush()
-    else:
-        # update fields
-        user.email = mapped.get("email") or user.email
-        user.external_id = external_id
-        user.sso_provider = provider
-        session.add(user)
-
-    return user
-
-
-async def sync_from_okta(tenant_id: str, okta_base: str, okta_token: str):
-    client = okta.OktaClient(okta_base, okta_token)
-    users = []
-    async with AsyncSessionLocal() as session:
-        async with session.begin():
-            async for ext in client.fetch_users():
-                mapped = okta.map_to_local(ext)
-                u = await _upsert_user(session, tenant_id, "okta", mapped)
-                users.append((mapped, u))
-
-    # second pass: resolve manager relationships (using external ids)
-    async with AsyncSessionLocal() as session:
-        async with session.begin():
-            for mapped, local in users:
-                mgr_ext = mapped.get("manager_external_id")
-                if mgr_ext:
-                    stmt = select(UserModel).where(
-                        UserModel.tenant_id == tenant_id,
-                        UserModel.external_id == mgr_ext,
-                    )
-                    res = await session.execute(stmt)
-                    mgr = res.scalar_one_or_none()
-                    if mgr and local:
-                        local.manager_id = mgr.id
-                        session.add(local)
-
-
-async def sync_from_provider(provider: str, tenant_id: str, config: dict):
-    if provider == "okta":
-        await sync_from_okta(tenant_id, config.get("base_url"), config.get("token"))
-    elif provider == "azure_ad":
-        # add azure sync implementation
-        pass
-    elif provider == "workday":
-        # add workday sync implementation
-        pass
-    else:
+        state = res.scalar_one_or_none()
+        if state is not None:
+            session.expunge(state)
+        return state
+
+
+async def _save_state(session_factory, tenant_id: str, provider: str, full: bool, cursor: _Cursor, summary: dict):
+    now = _utcnow()
+    async with session_factory() as session:
+        res = await session.execute(
+            select(DirectorySyncState).where(
+                DirectorySyncState.tenant_id == tenant_id, DirectorySyncState.provider == provider
+            )
+        )
+        state = res.scalar_one_or_none()
+        if state is None:
+            state = DirectorySyncState(tenant_id=tenant_id, provider=provider)
+            session.add(state)
+        if cursor.watermark is not None:
+            state.watermark = cursor.watermark
+        if cursor.delta_token is not None:
+            state.delta_token = cursor.delta_token
+        state.last_sync_at = now
+        if full:
+            state.last_full_sync_at = now
+        state.last_mode = "full" if full else "delta"
+        state.last_summary = {k: v for k, v in summary.items() if k != "mode"}
+        await session.commit()
+
+
+def _full_sync_due(state: Optional[DirectorySyncState]) -> bool:
+    if state is None or state.last_full_sync_at is None:
+        return True
+    if state.provider == "azure_ad" and not state.delta_token:
+        return True
+    interval = timedelta(hours=settings.DIRECTORY_FULL_SYNC_INTERVAL_HOURS)
+    return _utcnow() - _as_aware(state.last_full_sync_at) >= interval
+
+
+async def sync_from_provider(
+    provider: str,
+    tenant_id: str,
+    config: dict,
+    full: Optional[bool] = None,
+    session_factory=AsyncSessionLocal,
+    http=None,
+):
+    """Sync one tenant's directory, incrementally when possible.
+
+    `full=None` picks a full reconciliation when one is due (see
+    `_full_sync_due`), otherwise a delta run from the stored cursor. Sync
+    state is only advanced after the run succeeds, so a failed run is simply
+    retried from the same point next time.
+    """
+    if provider not in SOURCES:
         raise ValueError("unknown provider")
+    state = await _load_state(session_factory, tenant_id, provider)
+    if full is None:
+        full = _full_sync_due(state)
+
+    cursor = _Cursor(_as_aware(state.watermark) if state is not None else None)
+    source = SOURCES[provider](config, state, full, cursor, http)
+    try:
+        summary = await sync_users(tenant_id, provider, source, session_factory=session_factory,
+                                   deactivate_missing=full)
+    except ProviderError as exc:
+        if full or exc.status_code != 410:
+            raise
+        # delta link expired: start over with a full pull
+        return await sync_from_provider(provider, tenant_id, config, True, session_factory, http)
+
+    summary["mode"] = "full" if full else "delta"
+    await _save_state(session_factory, tenant_id, provider, full, cursor, summary)
+    return summary
+
+
+async def sync_from_okta(tenant_id: str, okta_base: str, okta_token: str, full: Optional[bool] = None):
+    return await sync_from_provider("okta", tenant_id, {"base_url": okta_base, "token": okta_token}, full)
+
+
+async def sync_from_azure_ad(
+    tenant_id: str, directory_id: str, client_id: str, client_secret: str, full: Optional[bool] = None
+):
+    config = {"tenant_id": directory_id, "client_id": client_id, "client_secret": client_secret}
+    return await sync_from_provider("azure_ad", tenant_id, config, full)
+
+
+async def sync_from_workday(tenant_id: str, base_url: str, api_key: str, full: Optional[bool] = None):
+    return await sync_from_provider("workday", tenant_id, {"base_url": base_url, "api_key": api_key}, full)
 
 
 if __name__ == "__main__":
@@ -106,8 +478,16 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("provider")
     parser.add_argument("tenant_id")
+    parser.add_argument("--full", action="store_true", default=None, help="force a full reconciliation")
     args = parser.parse_args()
 
     # config would typically come from vault or environment
     cfg = {}
-    asyncio.run(sync_from_provider(args.provider, args.tenant_id, cfg))
+
+    async def _main():
+        try:
+            return await sync_from_provider(args.provider, args.tenant_id, cfg, args.full)
+        finally:
+            await close_http_client()
+
+    print(asyncio.run(_main()))
@@ -1,64 +1,73 @@
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.core import tenancy
-from app.api import auth, recognition, rewards, platform_admin, tenant_admin, analytics, tenant_lead, corporate_user, badges, milestones, events, event_studio, approvals, scanner, event_analytics
-from app.api import dashboard, admin_dashboard
+from app.core import metrics, tenancy, tenant_cache
+from app.core.config import settings
+from app.core.rate_limit import RateLimitMiddleware
 from app.db.base import Base
 from app.db.session import engine
+from app.db.query_stats import QueryStatsMiddleware
 from app.core.sockets import socket_app
+from app.services.image_variants import VariantStaticFiles, shutdown_pool
 import asyncio
+import importlib
 
 
 app = FastAPI(title="lighthouse-backend")
 app.mount("/ws", socket_app)
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://localhost:3001",
-        "http://localhost:3002",
-        "http://localhost:3003",
-        "http://localhost:3004",
-        "http://localhost:5173",
-        "http://127.0.0.1:5173",
-    ],  # Frontend origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 
 @app.on_event("startup")
 async def create_tables():
-    # Temporarily bypass tenant checking during table creation
-    from app.core import tenancy
     import datetime
+    # record start time for basic uptime reporting
+    app.state.start_time = datetime.datetime.utcnow()
+
+    if settings.STARTUP_PROFILE == "production":
+        # alembic owns the schema and test personas are a dev convenience;
+        # a production worker boots without touching the database
+        return
+
+    # register every table, not just those of the routers this worker loaded
+    importlib.import_module("app.models")
+
+    # Temporarily bypass tenant checking during table creation
     token = tenancy._BYPASS_TENANT.set(True)
     try:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
-        # record start time for basic uptime reporting
-        app.state.start_time = datetime.datetime.utcnow()
     finally:
         tenancy._BYPASS_TENANT.reset(token)
 
     # In development, ensure test personas exist if DEV_DEFAULT_TENANT is configured
-    try:
-        from app.core.config import settings
-        if getattr(settings, "DEV_DEFAULT_TENANT", None):
-            try:
-                from app.scripts.seed_test_personas import seed_test_personas
-                await seed_test_personas()
-            except Exception as _e:
-                # avoid crashing startup for non-fatal seed issues
-                print("seed_test_personas error:", _e)
-    except Exception:
-        pass
+    if getattr(settings, "DEV_DEFAULT_TENANT", None):
+        try:
+            from app.scripts.seed_test_personas import seed_test_personas
+            await seed_test_personas()
+        except Exception as _e:
+            # avoid crashing startup for non-fatal seed issues
+            print("seed_test_personas error:", _e)
+
+
+@app.on_event("startup")
+async def start_tenant_cache_listener():
+    # apply tenant cache invalidations published by other workers
+    if settings.REDIS_URL:
+        app.state.tenant_cache_listener = asyncio.create_task(tenant_cache.listen_for_invalidations())
+
+
+@app.on_event("shutdown")
+async def stop_image_workers():
+    shutdown_pool()
+
+
+@app.on_event("shutdown")
+async def stop_tenant_cache_listener():
+    listener = getattr(app.state, "tenant_cache_listener", None)
+    if listener is not None:
+        listener.cancel()
 
 
 class TenantMiddleware(BaseHTTPMiddleware):
@@ -66,7 +75,7 @@ class TenantMiddleware(BaseHTTPMiddleware):
         # Skip tenant resolution for platform admin routes, auth routes, and root/docs routes
         if (request.url.path.startswith("/platform") or 
             request.url.path.startswith("/auth") or 
-            request.url.path in ["/", "/docs", "/redoc", "/openapi.json"] or
+            request.url.path in ["/", "/docs", "/redoc", "/openapi.json", "/metrics"] or
             request.url.path.startswith("/favicon")):
             request.state.tenant_id = None
             token = tenancy.CURRENT_TENANT.set(None)
@@ -90,31 +99,56 @@ class TenantMiddleware(BaseHTTPMiddleware):
 
 
 app.add_middleware(TenantMiddleware)
+# outside tenant resolution so rejections are cheap, inside the metrics so 429s are recorded
+app.add_middleware(RateLimitMiddleware)
+# outside the rate limiter so its 429s carry CORS headers the browser can read
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[
+        "http://localhost:3000",
+        "http://localhost:3001",
+        "http://localhost:3002",
+        "http://localhost:3003",
+        "http://localhost:3004",
+        "http://localhost:5173",
+        "http://127.0.0.1:5173",
+    ],  # Frontend origins
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.add_middleware(QueryStatsMiddleware)
+# outermost, so time spent in the middleware above is part of request latency
+app.add_middleware(metrics.MetricsMiddleware)
 
-# Serve uploaded files from /uploads
+# Serve uploaded files from /uploads; missing image variants are built on first request
 try:
-    app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+    app.mount("/uploads", VariantStaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
 except Exception:
     # if directory is missing or mount fails during some CI flows, ignore
     pass
 
-app.include_router(auth.router)
-app.include_router(recognition.router)
-app.include_router(rewards.router)
-app.include_router(badges.router)
-app.include_router(platform_admin.router)
-app.include_router(tenant_admin.router)
-app.include_router(tenant_lead.router)
-app.include_router(corporate_user.router)
-app.include_router(analytics.router)
-app.include_router(event_analytics.router)
-app.include_router(dashboard.router)
-app.include_router(admin_dashboard.router)
-app.include_router(milestones.router)
-app.include_router(events.router)
-app.include_router(event_studio.router)
-app.include_router(approvals.router)
-app.include_router(scanner.router)
+# Router modules under app/api, imported by name when the app is built.
+# API_ROUTERS restricts a worker to a subset so the rest are never imported.
+ROUTER_MODULES = (
+    "auth", "recognition", "rewards", "badges", "platform_admin", "tenant_admin",
+    "tenant_lead", "corporate_user", "analytics", "event_analytics", "dashboard",
+    "admin_dashboard", "milestones", "events", "event_studio", "approvals", "scanner",
+)
+
+
+def include_routers(application: FastAPI, names=None) -> None:
+    for name in names or ROUTER_MODULES:
+        application.include_router(importlib.import_module(f"app.api.{name}").router)
+
+
+include_routers(app, [n.strip() for n in (settings.API_ROUTERS or "").split(",") if n.strip()] or None)
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.get("/")
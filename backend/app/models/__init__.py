@@ -16,6 +16,13 @@ from .audit_logs import PlatformAuditLog
 from .transactions import Transaction, TransactionType
 from .events import Event, EventOption, EventRegistration, EventPickupLocation, EventTimeSlot, EventType, RegistrationStatus
 from .approvals import ApprovalRequest, ApprovalStatus
+from .redemption_latency import RedemptionLatencySketch
+from .insights import TenantInsightsSnapshot
+from .department_flows import DepartmentRecognitionFlow
+from .export_jobs import ExportJob, ExportJobStatus
+from .event_rollups import EventAnalyticsRollup
+from .directory_sync import DirectorySyncState
+from .email_outbox import EmailOutbox, EmailStatus
 
 __all__ = [
     "Tenant",
@@ -50,4 +57,13 @@ __all__ = [
     "RegistrationStatus",
     "ApprovalRequest",
     "ApprovalStatus",
+    "RedemptionLatencySketch",
+    "TenantInsightsSnapshot",
+    "DepartmentRecognitionFlow",
+    "ExportJob",
+    "ExportJobStatus",
+    "EventAnalyticsRollup",
+    "DirectorySyncState",
+    "EmailOutbox",
+    "EmailStatus",
 ]
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Date, Integer, BigInteger, UniqueConstraint
+import uuid
+
+from app.db.base import Base, TenantMixin
+
+
+class DepartmentRecognitionFlow(Base, TenantMixin):
+    """Count of approved recognitions from one department to another in a month.
+
+    Maintained incrementally when a recognition is approved; departments are
+    captured as they were at approval time ("Unassigned" when missing).
+    """
+    __tablename__ = "department_recognition_flows"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "month_start", "from_department", "to_department", name="uq_department_flow_cell"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    month_start = Column(Date, nullable=False, index=True)  # first day of the month
+    from_department = Column(String(100), nullable=False)
+    to_department = Column(String(100), nullable=False)
+    recognition_count = Column(Integer, nullable=False, default=0)
+    points_total = Column(BigInteger, nullable=False, default=0)
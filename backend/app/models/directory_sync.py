@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, JSON, DateTime, Text, UniqueConstraint
+import uuid
+
+from app.db.base import Base, TenantMixin
+
+
+class DirectorySyncState(Base, TenantMixin):
+    """Incremental sync cursor for one tenant's directory provider.
+
+    `watermark` is the newest provider last-modified timestamp applied
+    (Okta, Workday); `delta_token` is the opaque link/token for the next
+    incremental query (Graph delta). `last_full_sync_at` drives the periodic
+    full reconciliation.
+    """
+    __tablename__ = "directory_sync_states"
+    __table_args__ = (UniqueConstraint("tenant_id", "provider", name="uq_directory_sync_state"),)
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    provider = Column(String(50), nullable=False)
+    watermark = Column(DateTime(timezone=True), nullable=True)
+    delta_token = Column(Text, nullable=True)
+    last_sync_at = Column(DateTime(timezone=True), nullable=True)
+    last_full_sync_at = Column(DateTime(timezone=True), nullable=True)
+    last_mode = Column(String(10), nullable=True)
+    last_summary = Column(JSON, nullable=True)
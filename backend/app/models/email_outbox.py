@@ -0,0 +1,36 @@
+from enum import Enum as PyEnum
+from sqlalchemy import Column, String, Integer, DateTime, Text, Enum as SAEnum, Index
+import uuid
+
+from app.db.base import Base, TenantMixin, TimestampMixin
+
+
+class EmailStatus(PyEnum):
+    PENDING = "PENDING"
+    SENDING = "SENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+
+class EmailOutbox(Base, TenantMixin, TimestampMixin):
+    """An outgoing email, written in the same transaction as the event that
+    triggered it and delivered later by the outbox worker.
+
+    `next_attempt_at` schedules retries and rate-limit deferrals; a SENDING
+    row whose `locked_until` has passed belonged to a worker that died and
+    may be claimed again.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),)
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    html_body = Column(Text, nullable=False)
+    text_body = Column(Text, nullable=True)
+    status = Column(SAEnum(EmailStatus, name="emailstatus"), nullable=False, default=EmailStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, JSON, DateTime, UniqueConstraint
+import uuid
+
+from app.db.base import Base, TenantMixin
+
+
+class EventAnalyticsRollup(Base, TenantMixin):
+    """Cached per-event aggregates used by the year-in-review report.
+
+    `fingerprint` hashes the event's budget fields and its approval request
+    counts/timestamps; the rollup is recomputed only when it no longer
+    matches.
+    """
+    __tablename__ = "event_analytics_rollups"
+    __table_args__ = (UniqueConstraint("tenant_id", "event_id", name="uq_event_analytics_rollup"),)
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    event_id = Column(String(36), nullable=False, index=True)
+    fingerprint = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=False)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
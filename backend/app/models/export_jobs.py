@@ -0,0 +1,50 @@
+from enum import Enum as PyEnum
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Text, Enum as SAEnum, Index, text
+import uuid
+
+from app.db.base import Base, TenantMixin, TimestampMixin
+
+
+class ExportJobStatus(PyEnum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    EXPIRED = "EXPIRED"
+
+
+# rows covered by the one-active-job-per-dedupe_key index
+ACTIVE_WHERE = "status IN ('QUEUED', 'RUNNING')"
+
+
+class ExportJob(Base, TenantMixin, TimestampMixin):
+    """A background analytics export and the artifact it produced.
+
+    `dedupe_key` identifies the (tenant, event, type, format) request so
+    identical submissions while a job is queued/running attach to that job.
+    The partial unique index enforces that across API processes.
+    """
+    __tablename__ = "export_jobs"
+    __table_args__ = (
+        Index(
+            "uq_export_jobs_active_dedupe", "tenant_id", "dedupe_key", unique=True,
+            postgresql_where=text(ACTIVE_WHERE), sqlite_where=text(ACTIVE_WHERE),
+        ),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    event_id = Column(String(36), nullable=False, index=True)
+    export_type = Column(String(50), nullable=False)
+    format = Column(String(10), nullable=False, default="csv")
+    dedupe_key = Column(String(64), nullable=False, index=True)
+    status = Column(SAEnum(ExportJobStatus, name="exportjobstatus"), nullable=False, default=ExportJobStatus.QUEUED)
+    progress = Column(Integer, nullable=False, default=0)
+    filename = Column(String(255), nullable=True)
+    file_path = Column(String(500), nullable=True)
+    size_bytes = Column(BigInteger, nullable=True)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    # refreshed while a live worker holds the job; see EXPORT_STALE_SECONDS
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
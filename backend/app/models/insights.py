@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, JSON, DateTime, ForeignKey, Integer
+import uuid
+
+from app.db.base import Base
+
+
+class TenantInsightsSnapshot(Base):
+    """Precomputed payload for the platform-owner tenant insights view.
+
+    One row per tenant. `payload` is exactly what `/platform/tenant-insights`
+    returns; `generated_at` is when it was computed.
+    """
+    __tablename__ = "tenant_insights_snapshots"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    tenant_id = Column(String(36), ForeignKey("tenants.id"), nullable=False, unique=True, index=True)
+    payload = Column(JSON, nullable=False)
+    generated_at = Column(DateTime(timezone=True), nullable=False)
+    # wall-clock milliseconds spent computing the payload, for monitoring
+    build_ms = Column(Integer, nullable=True)
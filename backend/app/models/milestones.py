@@ -1,14 +1,21 @@
-from sqlalchemy import Column, String, Date, Boolean
+from sqlalchemy import Column, String, Date, Boolean, ForeignKey, UniqueConstraint
 import uuid
 
 from app.db.base import Base, TenantMixin, TimestampMixin
 
 
 class Milestone(Base, TenantMixin, TimestampMixin):
+    """A birthday/anniversary occurrence processed by the daily milestone job.
+
+    Unique per (user, type, date) so re-running the job for a day only
+    awards what is still missing.
+    """
     __tablename__ = "milestones"
+    __table_args__ = (UniqueConstraint("user_id", "type", "occurrence_date", name="uq_milestones_user_type_date"),)
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     # tenant_id provided by TenantMixin
     user_id = Column(String(36), nullable=False, index=True)
     type = Column(String(50), nullable=False)
-    occurrence_date = Column(Date, nullable=True)
+    occurrence_date = Column(Date, nullable=True, index=True)
     points_processed = Column(Boolean, nullable=False, server_default='false')
+    recognition_id = Column(String(36), ForeignKey("recognitions.id"), nullable=True)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Date, Integer, Float, JSON, DateTime, UniqueConstraint, func
+import uuid
+
+from app.db.base import Base, TenantMixin
+
+
+class RedemptionLatencySketch(Base, TenantMixin):
+    """Daily fulfilment-latency rollup for completed redemptions.
+
+    One row per (tenant, completion day). `digest` holds a serialised
+    `app.core.sketches.TDigest`; count and sum are kept alongside so the mean
+    stays exact regardless of sketch compression.
+    """
+    __tablename__ = "redemption_latency_sketches"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "day", name="uq_redemption_latency_tenant_day"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    day = Column(Date, nullable=False, index=True)
+    sample_count = Column(Integer, nullable=False, default=0)
+    total_seconds = Column(Float, nullable=False, default=0.0)
+    digest = Column(JSON, nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
@@ -1,6 +1,6 @@
 from enum import Enum as PyEnum
-from sqlalchemy import Column, String, ForeignKey, Enum as SAEnum, Boolean, Integer, BigInteger, Date
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, ForeignKey, Enum as SAEnum, Boolean, Integer, SmallInteger, BigInteger, Date, Index
+from sqlalchemy.orm import relationship, validates
 import uuid
 
 from app.db.base import Base, TenantMixin, TimestampMixin
@@ -14,8 +14,18 @@ class UserRole(PyEnum):
     CORPORATE_USER = "CORPORATE_USER"
 
 
+def month_day(value):
+    """Encode a date's month/day as MMDD (Feb 29 -> 229) for indexed lookups."""
+    return value.month * 100 + value.day if value is not None else None
+
+
 class User(Base, TimestampMixin):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_tenant_provider_external_id", "tenant_id", "sso_provider", "external_id", unique=True),
+        Index("ix_users_tenant_birthday_md", "tenant_id", "birthday_md"),
+        Index("ix_users_tenant_hire_md", "tenant_id", "hire_md"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     tenant_id = Column(String(36), ForeignKey("tenants.id"), nullable=True, index=True)  # NULL for Platform Admins
@@ -27,10 +37,21 @@ class User(Base, TimestampMixin):
     job_title = Column(String(100), nullable=True)
     date_of_birth = Column(Date, nullable=True)
     hire_date = Column(Date, nullable=True)
+    # month_day() of date_of_birth / hire_date, kept in sync by the validator
+    # below (bulk writers set them explicitly); milestone lookups range-scan these
+    birthday_md = Column(SmallInteger, nullable=True)
+    hire_md = Column(SmallInteger, nullable=True)
     avatar_url = Column(String(255), nullable=True)
     points_balance = Column(Integer, nullable=False, default=0)  # For Corporate Users to redeem
     lead_budget_balance = Column(BigInteger, nullable=False, default=0)  # For Tenant Leads to distribute
     is_active = Column(Boolean, nullable=False, default=True)
+    # sha256 of the HR-synced fields as last received from the HR feed; NULL for
+    # users never synced. Lets the nightly sync skip unchanged rows.
+    hr_fingerprint = Column(String(64), nullable=True)
+    # Directory (SSO/HRIS) identity, maintained by app/jobs/user_sync.py
+    external_id = Column(String(255), nullable=True)
+    sso_provider = Column(String(50), nullable=True)
+    manager_id = Column(String(36), ForeignKey("users.id"), nullable=True, index=True)
 
     def __init__(self, **kwargs):
         # Ensure Python-level defaults are present on plain instances (tests expect this)
@@ -39,3 +60,8 @@ class User(Base, TimestampMixin):
         if 'lead_budget_balance' not in kwargs:
             kwargs['lead_budget_balance'] = 0
         super().__init__(**kwargs)
+
+    @validates("date_of_birth", "hire_date")
+    def _sync_month_day(self, key, value):
+        setattr(self, "birthday_md" if key == "date_of_birth" else "hire_md", month_day(value))
+        return value
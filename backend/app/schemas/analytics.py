@@ -130,6 +130,23 @@ class ExportResponse(BaseModel):
     generated_at: datetime
 
 
+class ExportJobOut(BaseModel):
+    """Background export job status"""
+    job_id: str
+    event_id: str
+    type: str
+    format: str
+    status: str  # QUEUED, RUNNING, COMPLETED, FAILED, EXPIRED
+    progress: int
+    filename: Optional[str] = None
+    size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    download_url: Optional[str] = None
+
+
 class RoiMetrics(BaseModel):
     """ROI metrics for event"""
     total_budget: float
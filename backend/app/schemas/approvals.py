@@ -7,6 +7,8 @@ from typing import Optional
 from decimal import Decimal
 from datetime import datetime
 
+from app.models.approvals import ApprovalStatus
+
 
 class ApprovalRequestCreate(BaseModel):
     """Request body for creating an approval request"""
@@ -34,7 +36,7 @@ class ApprovalRequestResponse(BaseModel):
     budget_committed: int
     
     # Status
-    status: str
+    status: ApprovalStatus
     
     # QR Code
     qr_token: Optional[str] = None
@@ -52,10 +54,10 @@ class ApprovalRequestResponse(BaseModel):
     request_notes: Optional[str] = None
     approval_notes: Optional[str] = None
     created_at: datetime
-    updated_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
+        orm_mode = True
 
 
 class ApprovalRequestListItem(BaseModel):
@@ -81,13 +83,13 @@ class ApprovalRequestListItem(BaseModel):
     total_impact_hours: Decimal
     
     # Status
-    status: str
+    status: ApprovalStatus
     
     # Timestamps
     created_at: datetime
     
     class Config:
-        from_attributes = True
+        orm_mode = True
 
 
 class ApprovalDecision(BaseModel):
@@ -2,7 +2,7 @@
 Pydantic schemas for the Event Studio Wizard - multi-step event creation
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from decimal import Decimal
 from pydantic import BaseModel, Field, validator
@@ -215,6 +215,9 @@ class ImageUploadResponse(BaseModel):
     content_type: str
     size_bytes: int
     uploaded_at: datetime
+    variants: Optional[Dict[str, Dict[str, str]]] = Field(
+        None, description="Resized image URLs by variant and format, e.g. variants['thumb']['webp']"
+    )
 
 
 # ============================================================================
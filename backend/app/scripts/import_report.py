@@ -0,0 +1,87 @@
+"""Import-time report for the API process.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter and
+summarises where cold-start import time goes: the slowest modules by
+cumulative time and the app's own modules by self time.
+
+Usage (from backend/):
+    python -m app.scripts.import_report
+    python -m app.scripts.import_report --top 40 --json > import_report.json
+    API_ROUTERS=scanner python -m app.scripts.import_report
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+
+def measure(target: str = "app.main") -> List[Dict]:
+    """One entry per imported module: name, depth, self_us, cumulative_us."""
+    backend = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=backend,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": backend},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return rows
+
+
+def summarise(rows: List[Dict], top: int = 25) -> Dict:
+    total = next((r["cumulative_us"] for r in rows if r["depth"] == 0 and r["module"].startswith("app")), None)
+    top_level = {}
+    for r in rows:
+        package = r["module"].split(".")[0]
+        top_level[package] = top_level.get(package, 0) + r["self_us"]
+    return {
+        "total_ms": round((total or sum(r["self_us"] for r in rows)) / 1000, 1),
+        "modules": len(rows),
+        "slowest_cumulative": sorted(rows, key=lambda r: -r["cumulative_us"])[:top],
+        "app_self": sorted((r for r in rows if r["module"].startswith("app.")), key=lambda r: -r["self_us"])[:top],
+        "by_package_ms": {
+            k: round(v / 1000, 1) for k, v in sorted(top_level.items(), key=lambda kv: -kv[1])[:top]
+        },
+    }
+
+
+def _print(report: Dict) -> None:
+    print(f"import app.main: {report['total_ms']} ms across {report['modules']} modules\n")
+    print("by top-level package (self time):")
+    for package, ms in report["by_package_ms"].items():
+        print(f"  {ms:8.1f} ms  {package}")
+    print("\nslowest modules (cumulative):")
+    for r in report["slowest_cumulative"]:
+        print(f"  {r['cumulative_us'] / 1000:8.1f} ms  {r['module']}")
+    print("\napp modules (self):")
+    for r in report["app_self"]:
+        print(f"  {r['self_us'] / 1000:8.1f} ms  {r['module']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = summarise(measure(args.target), args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print(report)
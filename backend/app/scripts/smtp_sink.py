@@ -0,0 +1,163 @@
+"""Local SMTP sink for tests, benchmarks and development.
+
+A minimal asyncio SMTP server (HELO/EHLO, MAIL, RCPT, DATA, RSET, NOOP,
+QUIT) that keeps every accepted message in memory. `fail_every=n` answers
+every n-th DATA with a transient 451 and addresses in `reject` get a
+permanent 550, so the outbox worker's retry paths can be exercised.
+`connections` counts TCP sessions, which shows whether senders reuse them.
+
+    async with SMTPSink() as sink:
+        settings.SMTP_HOST, settings.SMTP_PORT = sink.host, sink.port
+        ...
+        assert sink.messages[0].rcpt_tos == ["a@example.com"]
+
+Run standalone with `python -m app.scripts.smtp_sink --port 1025` to
+print messages sent by a local API/worker.
+"""
+import asyncio
+from email import message_from_bytes, policy
+from typing import Iterable, List, Optional
+
+
+class SinkMessage:
+    __slots__ = ("mail_from", "rcpt_tos", "data")
+
+    def __init__(self, mail_from: str, rcpt_tos: List[str], data: bytes):
+        self.mail_from = mail_from
+        self.rcpt_tos = rcpt_tos
+        self.data = data
+
+    @property
+    def message(self):
+        return message_from_bytes(self.data, policy=policy.default)
+
+
+def _address(arg: str) -> str:
+    arg = arg.split(":", 1)[1].strip() if ":" in arg else arg
+    return arg.split()[0].strip("<>") if arg else ""
+
+
+class SMTPSink:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fail_every: int = 0,
+        reject: Iterable[str] = (),
+        on_message=None,
+    ):
+        self.host = host
+        self.port = port
+        self.fail_every = fail_every
+        self.reject = {r.lower() for r in reject}
+        self.on_message = on_message
+        self.messages: List[SinkMessage] = []
+        self.connections = 0
+        self.data_commands = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> "SMTPSink":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "SMTPSink":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+
+        async def reply(line: str):
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        mail_from, rcpt_tos = None, []
+        try:
+            await reply("220 smtp-sink ESMTP ready")
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                verb, _, arg = line.partition(" ")
+                verb = verb.upper()
+                if verb == "EHLO":
+                    await reply("250-smtp-sink")
+                    await reply("250-8BITMIME")
+                    await reply("250 SIZE 33554432")
+                elif verb == "HELO":
+                    await reply("250 smtp-sink")
+                elif verb == "MAIL":
+                    mail_from, rcpt_tos = _address(arg), []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    addr = _address(arg)
+                    if addr.lower() in self.reject:
+                        await reply("550 5.1.1 mailbox unavailable")
+                    else:
+                        rcpt_tos.append(addr)
+                        await reply("250 OK")
+                elif verb == "DATA":
+                    if mail_from is None or not rcpt_tos:
+                        await reply("503 5.5.1 need MAIL and RCPT first")
+                        continue
+                    await reply("354 end data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    while True:
+                        chunk = await reader.readline()
+                        if not chunk or chunk in (b".\r\n", b".\n"):
+                            break
+                        lines.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                    self.data_commands += 1
+                    if self.fail_every and self.data_commands % self.fail_every == 0:
+                        await reply("451 4.3.0 try again later")
+                    else:
+                        msg = SinkMessage(mail_from, rcpt_tos, b"".join(lines))
+                        self.messages.append(msg)
+                        if self.on_message is not None:
+                            self.on_message(msg)
+                        await reply("250 OK queued")
+                    mail_from, rcpt_tos = None, []
+                elif verb == "RSET":
+                    mail_from, rcpt_tos = None, []
+                    await reply("250 OK")
+                elif verb == "NOOP":
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 bye")
+                    break
+                else:
+                    await reply("502 5.5.2 command not implemented")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    args = parser.parse_args()
+
+    def _print(msg: SinkMessage):
+        parsed = msg.message
+        print(f"{msg.mail_from} -> {', '.join(msg.rcpt_tos)}: {parsed['Subject']}")
+
+    async def _main():
+        async with SMTPSink(args.host, args.port, on_message=_print) as sink:
+            print(f"SMTP sink listening on {sink.host}:{sink.port}")
+            await asyncio.Event().wait()
+
+    asyncio.run(_main())
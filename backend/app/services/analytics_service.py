@@ -3,6 +3,7 @@ Analytics Service for Phase 6: Post-Event Analytics and Reporting
 Calculates participation, budget reconciliation, and performance metrics
 """
 
+import logging
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,8 +13,8 @@ from decimal import Decimal
 from app.models.events import Event, EventOption
 from app.models.approvals import ApprovalRequest, ApprovalStatus
 from app.models.users import User, UserRole
-from app.db.utils import generate_id
-from app.core.logging import logger
+
+logger = logging.getLogger(__name__)
 
 
 class AnalyticsService:
@@ -6,7 +6,6 @@ ApprovalService: Core business logic for the Governance Loop
 - Notification triggering
 """
 
-import qrcode
 import io
 import base64
 import uuid
@@ -321,6 +320,9 @@ class ApprovalService:
         Generate a QR code for the approval token.
         Returns a data URL for embedding in responses.
         """
+        # qrcode pulls in PIL; only approvals need it, so keep it off the startup path
+        import qrcode
+
         qr = qrcode.QRCode(
             version=1,
             error_correction=qrcode.constants.ERROR_CORRECT_L,
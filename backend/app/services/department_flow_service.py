@@ -0,0 +1,248 @@
+"""Department -> department recognition flow matrix.
+
+Every approved recognition increments one cell of a per-tenant, per-month
+matrix (`DepartmentRecognitionFlow`). Collaboration analytics read the
+matrix instead of joining `recognitions` to `users` twice. History from
+before the matrix existed is loaded by `app/jobs/department_flow_backfill.py`.
+"""
+import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, func, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.db.upsert import insert_stmt
+from app.models.department_flows import DepartmentRecognitionFlow
+from app.models.recognition import Recognition, RecognitionStatus
+from app.models.users import User
+
+UNASSIGNED = "Unassigned"
+
+
+def month_start(value) -> datetime.date:
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return value.replace(day=1)
+
+
+async def _increment_cell(
+    db: AsyncSession,
+    tenant_id: str,
+    bucket: datetime.date,
+    from_dept: str,
+    to_dept: str,
+    count: int,
+    points: int,
+) -> None:
+    # upsert: concurrent approvals may be the first to touch the same new cell
+    insert = await insert_stmt(db, DepartmentRecognitionFlow)
+    await db.execute(
+        insert.values(
+            tenant_id=str(tenant_id),
+            month_start=bucket,
+            from_department=from_dept,
+            to_department=to_dept,
+            recognition_count=count,
+            points_total=int(points or 0),
+        ).on_conflict_do_update(
+            index_elements=["tenant_id", "month_start", "from_department", "to_department"],
+            set_={
+                "recognition_count": DepartmentRecognitionFlow.recognition_count + insert.excluded.recognition_count,
+                "points_total": DepartmentRecognitionFlow.points_total + insert.excluded.points_total,
+            },
+        )
+    )
+
+
+async def record_recognition_flow(
+    db: AsyncSession,
+    tenant_id: str,
+    nominator_id: str,
+    nominee_id: str,
+    points: int = 0,
+    when: Optional[datetime.datetime] = None,
+) -> None:
+    """Increment the matrix cell for one approved recognition. Does not commit.
+
+    The cell is bucketed by approval month (`when`, default now) and uses the
+    departments both users belong to at that moment.
+    """
+    res = await db.execute(select(User.id, User.department).where(User.id.in_([str(nominator_id), str(nominee_id)])))
+    departments = {str(uid): dept for uid, dept in res.all()}
+    from_dept = departments.get(str(nominator_id)) or UNASSIGNED
+    to_dept = departments.get(str(nominee_id)) or UNASSIGNED
+    bucket = month_start(when or datetime.datetime.utcnow())
+    await _increment_cell(db, tenant_id, bucket, from_dept, to_dept, 1, points)
+
+
+async def record_recognition_flows(
+    db: AsyncSession,
+    tenant_id: str,
+    flows: List[tuple],
+    when: Optional[datetime.datetime] = None,
+) -> int:
+    """Bulk variant of `record_recognition_flow` for (nominator_id, nominee_id,
+    points) tuples. Does not commit.
+
+    Departments are loaded in one query and flows aggregated per cell, so the
+    cost is one upsert per distinct department pair rather than per
+    recognition. Returns the number of cells touched.
+    """
+    if not flows:
+        return 0
+    ids = {str(uid) for nominator, nominee, _ in flows for uid in (nominator, nominee)}
+    res = await db.execute(select(User.id, User.department).where(User.id.in_(list(ids))))
+    departments = {str(uid): dept for uid, dept in res.all()}
+    bucket = month_start(when or datetime.datetime.utcnow())
+
+    totals: Dict[tuple, List[int]] = {}
+    for nominator, nominee, points in flows:
+        key = (departments.get(str(nominator)) or UNASSIGNED, departments.get(str(nominee)) or UNASSIGNED)
+        cell = totals.setdefault(key, [0, 0])
+        cell[0] += 1
+        cell[1] += int(points or 0)
+
+    for (from_dept, to_dept), (count, points) in totals.items():
+        await _increment_cell(db, tenant_id, bucket, from_dept, to_dept, count, points)
+    return len(totals)
+
+
+async def _load_cells(db: AsyncSession, tenant_id: str, start: Optional[datetime.date], end: Optional[datetime.date]):
+    stmt = (
+        select(
+            DepartmentRecognitionFlow.from_department,
+            DepartmentRecognitionFlow.to_department,
+            func.sum(DepartmentRecognitionFlow.recognition_count),
+            func.sum(DepartmentRecognitionFlow.points_total),
+        )
+        .where(DepartmentRecognitionFlow.tenant_id == str(tenant_id))
+        .group_by(DepartmentRecognitionFlow.from_department, DepartmentRecognitionFlow.to_department)
+    )
+    if start is not None:
+        stmt = stmt.where(DepartmentRecognitionFlow.month_start >= month_start(start))
+    if end is not None:
+        stmt = stmt.where(DepartmentRecognitionFlow.month_start <= month_start(end))
+    res = await db.execute(stmt)
+    return [(f, t, int(c or 0), int(p or 0)) for f, t, c, p in res.all()]
+
+
+def summarize_cells(cells: List[tuple]) -> Dict:
+    """Summary ratios from (from_dept, to_dept, count, points) cells.
+
+    Cross-department counts only include recognitions where both sides have a
+    known department, matching the legacy insights metric.
+    """
+    total = sum(c for _, _, c, _ in cells)
+    known = [(f, t, c) for f, t, c, _ in cells if f != UNASSIGNED and t != UNASSIGNED]
+    cross = sum(c for f, t, c in known if f != t)
+    intra = sum(c for f, t, c in known if f == t)
+
+    by_dept: Dict[str, Dict[str, int]] = {}
+    for f, t, c in known:
+        by_dept.setdefault(f, {"sent": 0, "sent_cross": 0, "received": 0, "received_cross": 0})
+        by_dept.setdefault(t, {"sent": 0, "sent_cross": 0, "received": 0, "received_cross": 0})
+        by_dept[f]["sent"] += c
+        by_dept[t]["received"] += c
+        if f != t:
+            by_dept[f]["sent_cross"] += c
+            by_dept[t]["received_cross"] += c
+
+    departments = []
+    for dept, d in sorted(by_dept.items()):
+        departments.append({
+            "department": dept,
+            "sent": d["sent"],
+            "received": d["received"],
+            "outbound_cross_pct": round(d["sent_cross"] / d["sent"] * 100, 2) if d["sent"] else 0.0,
+            "inbound_cross_pct": round(d["received_cross"] / d["received"] * 100, 2) if d["received"] else 0.0,
+        })
+
+    return {
+        "total_recognitions": total,
+        "cross_department": cross,
+        "intra_department": intra,
+        "cross_department_pct": round(cross / total * 100, 2) if total else 0.0,
+        "departments": departments,
+    }
+
+
+async def get_flow_matrix(
+    db: AsyncSession,
+    tenant_id: str,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+) -> Dict:
+    """Full department x department matrix for [start, end] months.
+
+    `matrix[i][j]` is the number of recognitions sent from `departments[i]`
+    to `departments[j]`; `links` is the same data as a sparse list for chord
+    charts.
+    """
+    cells = await _load_cells(db, tenant_id, start, end)
+    departments = sorted({f for f, _, _, _ in cells} | {t for _, t, _, _ in cells})
+    index = {d: i for i, d in enumerate(departments)}
+    matrix = [[0] * len(departments) for _ in departments]
+    for f, t, c, _ in cells:
+        matrix[index[f]][index[t]] += c
+
+    return {
+        "tenant_id": str(tenant_id),
+        "start_month": month_start(start).isoformat() if start else None,
+        "end_month": month_start(end).isoformat() if end else None,
+        "departments": departments,
+        "matrix": matrix,
+        "links": [
+            {"from": f, "to": t, "count": c, "points": p}
+            for f, t, c, p in sorted(cells, key=lambda x: -x[2])
+        ],
+        "summary": summarize_cells(cells),
+    }
+
+
+async def get_flow_summary(
+    db: AsyncSession,
+    tenant_id: str,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+) -> Dict:
+    return summarize_cells(await _load_cells(db, tenant_id, start, end))
+
+
+async def rebuild_department_flows(db: AsyncSession, tenant_id: str) -> int:
+    """Rebuild a tenant's matrix from approved recognitions (backfill/repair).
+
+    Historic rows are bucketed by recognition creation month since approval
+    time is not stored. Does not commit. Returns the number of cells written.
+    """
+    await db.execute(delete(DepartmentRecognitionFlow).where(DepartmentRecognitionFlow.tenant_id == str(tenant_id)))
+
+    sender = aliased(User)
+    receiver = aliased(User)
+    stmt = (
+        select(Recognition.created_at, sender.department, receiver.department, Recognition.points)
+        .join(sender, Recognition.nominator_id == sender.id)
+        .join(receiver, Recognition.nominee_id == receiver.id)
+        .where(Recognition.tenant_id == str(tenant_id), Recognition.status == RecognitionStatus.APPROVED)
+    )
+    cells: Dict[tuple, List[int]] = {}
+    result = await db.stream(stmt.execution_options(yield_per=1000))
+    async for created_at, from_dept, to_dept, points in result:
+        if created_at is None:
+            continue
+        key = (month_start(created_at), from_dept or UNASSIGNED, to_dept or UNASSIGNED)
+        cell = cells.setdefault(key, [0, 0])
+        cell[0] += 1
+        cell[1] += int(points or 0)
+
+    for (bucket, from_dept, to_dept), (count, points) in cells.items():
+        db.add(DepartmentRecognitionFlow(
+            tenant_id=str(tenant_id),
+            month_start=bucket,
+            from_department=from_dept,
+            to_department=to_dept,
+            recognition_count=count,
+            points_total=points,
+        ))
+    await db.flush()
+    return len(cells)
@@ -0,0 +1,395 @@
+"""Transactional email outbox.
+
+Request handlers call `enqueue_email`, which only adds an `EmailOutbox` row
+to the caller's session: the email is committed (or rolled back) together
+with the approval/recognition that caused it, and the request never waits
+on SMTP. Approving thousands of requests costs thousands of INSERTs, not
+thousands of SMTP handshakes.
+
+`drain_outbox` (run by `app/jobs/email_outbox.py`) claims due rows with
+`FOR UPDATE SKIP LOCKED`, so several workers can drain the same table, and
+delivers them over a small pool of persistent SMTP connections. Transient
+failures (4xx, dropped connections) are retried with exponential backoff
+up to `EMAIL_MAX_ATTEMPTS`; permanent 5xx rejections fail immediately.
+Each tenant is limited to `EMAIL_TENANT_RATE_PER_MINUTE` messages per
+worker; rows over the limit are pushed back without spending an attempt.
+"""
+import asyncio
+import datetime
+import logging
+import os
+import random
+import smtplib
+import time
+from email.message import EmailMessage
+from email.utils import formatdate
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import tenancy
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.email_outbox import EmailOutbox, EmailStatus
+
+logger = logging.getLogger(__name__)
+
+# how long a claimed row stays invisible to other workers
+LEASE_SECONDS = 300
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+# (ok, smtp code or None, error text)
+SendResult = Tuple[bool, Optional[int], Optional[str]]
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def enqueue_email(
+    db: AsyncSession,
+    tenant_id: str,
+    to_email: str,
+    subject: str,
+    html_body: str,
+    text_body: Optional[str] = None,
+) -> EmailOutbox:
+    """Queue an email in the caller's transaction. Does not flush or commit."""
+    row = EmailOutbox(
+        tenant_id=str(tenant_id),
+        to_email=to_email,
+        subject=subject[:255],
+        html_body=html_body,
+        text_body=text_body,
+        status=EmailStatus.PENDING,
+        attempts=0,
+        next_attempt_at=_utcnow(),
+    )
+    db.add(row)
+    return row
+
+
+def _from_email() -> str:
+    return settings.FROM_EMAIL or f"no-reply@{os.environ.get('HOSTNAME', 'example.com')}"
+
+
+def build_message(row: dict, from_email: Optional[str] = None) -> EmailMessage:
+    """MIME message for an outbox row. The Message-ID is derived from the row
+    id so a retry after an ambiguous failure can be de-duplicated downstream."""
+    sender = from_email or _from_email()
+    msg = EmailMessage()
+    msg["Subject"] = row["subject"]
+    msg["From"] = sender
+    msg["To"] = row["to_email"]
+    msg["Date"] = formatdate(localtime=False)
+    msg["Message-ID"] = f"<{row['id']}@{sender.rsplit('@', 1)[-1]}>"
+    msg.set_content(row.get("text_body") or "This is a multipart message in MIME format.")
+    msg.add_alternative(row["html_body"], subtype="html")
+    return msg
+
+
+def _smtp_error(exc: Exception) -> SendResult:
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        code, text = next(iter(exc.recipients.values()), (None, b""))
+        return False, code, text.decode("utf-8", "replace") if isinstance(text, bytes) else str(text)
+    if isinstance(exc, smtplib.SMTPResponseException):
+        text = exc.smtp_error
+        return False, exc.smtp_code, text.decode("utf-8", "replace") if isinstance(text, bytes) else str(text)
+    return False, None, str(exc) or exc.__class__.__name__
+
+
+def _discard(conn: Optional[smtplib.SMTP]) -> None:
+    """Close a connection we no longer trust without a QUIT round trip."""
+    if conn is not None:
+        try:
+            conn.close()
+        except OSError:
+            pass
+    return None
+
+
+class SMTPPool:
+    """A fixed number of persistent SMTP connections.
+
+    smtplib is blocking, so each batch runs in a worker thread; a connection
+    is only ever used by one thread at a time. Connections are opened lazily,
+    reused across batches and re-opened once when the server has dropped them.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        size: int = 2,
+        timeout: float = 10.0,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle: Optional[asyncio.Queue] = None
+
+    @classmethod
+    def from_settings(cls) -> "SMTPPool":
+        return cls(
+            settings.SMTP_HOST,
+            settings.SMTP_PORT,
+            settings.SMTP_USER,
+            settings.SMTP_PASS,
+            settings.SMTP_STARTTLS,
+            settings.EMAIL_SMTP_POOL_SIZE,
+        )
+
+    def _queue(self) -> asyncio.Queue:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(None)
+        return self._idle
+
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        conn.ehlo()
+        if self.starttls and conn.has_extn("starttls"):
+            conn.starttls()
+            conn.ehlo()
+        if self.username and self.password:
+            conn.login(self.username, self.password)
+        return conn
+
+    def _send_all(self, conn: Optional[smtplib.SMTP], messages: List[Tuple[str, EmailMessage]]):
+        results: Dict[str, SendResult] = {}
+        for key, msg in messages:
+            for attempt in (1, 2):
+                try:
+                    if conn is None:
+                        conn = self._connect()
+                    conn.send_message(msg)
+                    results[key] = (True, None, None)
+                    break
+                except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError) as exc:
+                    # stale pooled connection: reconnect once, then give up on this message
+                    conn = _discard(conn)
+                    if attempt == 2:
+                        results[key] = _smtp_error(exc)
+                except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as exc:
+                    # the server answered, so the connection is healthy and the
+                    # reply is final for this message
+                    results[key] = _smtp_error(exc)
+                    if conn is not None:
+                        try:
+                            conn.rset()
+                        except OSError:
+                            conn = _discard(conn)
+                    break
+                except OSError as exc:
+                    # socket errors and anything else smtplib raises (SMTPException
+                    # subclasses OSError): drop the connection and retry once
+                    conn = _discard(conn)
+                    if attempt == 2:
+                        results[key] = _smtp_error(exc)
+        return conn, results
+
+    async def send_batch(self, messages: List[Tuple[str, EmailMessage]]) -> Dict[str, SendResult]:
+        """Send (key, message) pairs, spread over the pool's connections."""
+        if not messages:
+            return {}
+        idle = self._queue()
+        shards = [messages[i::self.size] for i in range(min(self.size, len(messages)))]
+
+        async def run(shard):
+            conn = await idle.get()
+            try:
+                conn, results = await asyncio.to_thread(self._send_all, conn, shard)
+            except Exception as exc:
+                logger.exception("SMTP batch failed")
+                conn, results = _discard(conn), {key: _smtp_error(exc) for key, _ in shard}
+            finally:
+                idle.put_nowait(conn)
+            return results
+
+        merged: Dict[str, SendResult] = {}
+        for results in await asyncio.gather(*(run(s) for s in shards)):
+            merged.update(results)
+        return merged
+
+    async def close(self) -> None:
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            conn = self._idle.get_nowait()
+            if conn is not None:
+                try:
+                    await asyncio.to_thread(conn.quit)
+                except (smtplib.SMTPException, OSError):
+                    pass
+        self._idle = None
+
+
+class FileTransport:
+    """Development fallback when SMTP_HOST is unset: writes each message as an
+    .eml file under `directory` (uploads/ by default) for inspection."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.path.join(os.getcwd(), "uploads")
+
+    def _write(self, messages):
+        os.makedirs(self.directory, exist_ok=True)
+        for key, msg in messages:
+            with open(os.path.join(self.directory, f"notification-{key}.eml"), "wb") as fh:
+                fh.write(bytes(msg))
+        return {key: (True, None, None) for key, _ in messages}
+
+    async def send_batch(self, messages):
+        return await asyncio.to_thread(self._write, messages) if messages else {}
+
+    async def close(self) -> None:
+        return None
+
+
+def default_transport():
+    return SMTPPool.from_settings() if settings.SMTP_HOST else FileTransport()
+
+
+class TenantRateLimiter:
+    """Per-tenant token bucket: `per_minute` messages per minute with bursts
+    of up to `per_minute`. State is per worker process."""
+
+    def __init__(self, per_minute: int, clock=time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.clock = clock
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def take(self, tenant_id: str) -> float:
+        """Consume one token. Returns 0 when allowed, otherwise the number of
+        seconds until a token is available (nothing is consumed)."""
+        if self.rate <= 0:
+            return 0.0
+        now = self.clock()
+        tokens, last = self._buckets.get(tenant_id, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - last) * self.rate)
+        if tokens >= 1:
+            self._buckets[tenant_id] = (tokens - 1, now)
+            return 0.0
+        self._buckets[tenant_id] = (tokens, now)
+        return (1 - tokens) / self.rate
+
+
+def retry_backoff(attempts: int) -> float:
+    """Seconds before retry number `attempts` (1-based), with +/-20% jitter."""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+async def _claim(db: AsyncSession, batch_size: int, now: datetime.datetime) -> List[dict]:
+    stmt = (
+        select(
+            EmailOutbox.id, EmailOutbox.tenant_id, EmailOutbox.to_email, EmailOutbox.subject,
+            EmailOutbox.html_body, EmailOutbox.text_body, EmailOutbox.attempts,
+        )
+        .where(or_(
+            and_(EmailOutbox.status == EmailStatus.PENDING, EmailOutbox.next_attempt_at <= now),
+            and_(EmailOutbox.status == EmailStatus.SENDING, EmailOutbox.locked_until <= now),
+        ))
+        .order_by(EmailOutbox.next_attempt_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = [dict(r._mapping) for r in (await db.execute(stmt)).all()]
+    if rows:
+        lease = now + datetime.timedelta(seconds=LEASE_SECONDS)
+        await db.execute(
+            update(EmailOutbox),
+            [{"id": r["id"], "status": EmailStatus.SENDING, "locked_until": lease} for r in rows],
+        )
+    await db.commit()
+    return rows
+
+
+async def _record(db: AsyncSession, updates: List[dict]) -> None:
+    # ORM bulk UPDATE by primary key, one statement per distinct column set
+    for columns in {tuple(sorted(u)) for u in updates}:
+        await db.execute(update(EmailOutbox), [u for u in updates if tuple(sorted(u)) == columns])
+    await db.commit()
+
+
+async def drain_outbox(
+    session_factory=AsyncSessionLocal,
+    transport=None,
+    limiter: Optional[TenantRateLimiter] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> dict:
+    """Deliver due outbox rows until none are left (or `max_batches`).
+
+    Returns counts of sent, retried, failed and rate-limit deferred messages.
+    A transport created here is closed on return; a passed-in one is not.
+    """
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+    limiter = limiter or TenantRateLimiter(settings.EMAIL_TENANT_RATE_PER_MINUTE)
+    owned = transport is None
+    transport = transport or default_transport()
+    from_email = _from_email()
+    summary = {"sent": 0, "retried": 0, "failed": 0, "deferred": 0, "batches": 0}
+
+    try:
+        with tenancy.bypass_tenant_context():
+            async with session_factory() as db:
+                while max_batches is None or summary["batches"] < max_batches:
+                    now = _utcnow()
+                    rows = await _claim(db, batch_size, now)
+                    if not rows:
+                        break
+                    summary["batches"] += 1
+
+                    updates, ready = [], []
+                    for row in rows:
+                        wait = limiter.take(row["tenant_id"])
+                        if wait > 0:
+                            updates.append({
+                                "id": row["id"], "status": EmailStatus.PENDING, "locked_until": None,
+                                "next_attempt_at": now + datetime.timedelta(seconds=wait),
+                            })
+                            summary["deferred"] += 1
+                        else:
+                            ready.append(row)
+
+                    results = await transport.send_batch([(r["id"], build_message(r, from_email)) for r in ready])
+                    done = _utcnow()
+                    for row in ready:
+                        ok, code, error = results.get(row["id"], (False, None, "no result"))
+                        attempts = int(row["attempts"] or 0) + 1
+                        if ok:
+                            updates.append({
+                                "id": row["id"], "status": EmailStatus.SENT, "attempts": attempts,
+                                "sent_at": done, "locked_until": None, "last_error": None,
+                            })
+                            summary["sent"] += 1
+                        elif (code is not None and code >= 500) or attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                            updates.append({
+                                "id": row["id"], "status": EmailStatus.FAILED, "attempts": attempts,
+                                "locked_until": None, "last_error": f"{code or ''} {error}".strip(),
+                            })
+                            summary["failed"] += 1
+                            logger.warning("email %s to %s failed permanently: %s", row["id"], row["to_email"], error)
+                        else:
+                            updates.append({
+                                "id": row["id"], "status": EmailStatus.PENDING, "attempts": attempts,
+                                "locked_until": None, "last_error": f"{code or ''} {error}".strip(),
+                                "next_attempt_at": done + datetime.timedelta(seconds=retry_backoff(attempts)),
+                            })
+                            summary["retried"] += 1
+                    await _record(db, updates)
+    finally:
+        if owned:
+            await transport.close()
+    return summary
@@ -0,0 +1,315 @@
+"""Background generation of event analytics exports.
+
+`submit_export` records an `ExportJob` and hands it to an in-process worker
+pool (at most `EXPORT_MAX_WORKERS` generators at a time); the HTTP request
+returns immediately with the job id. The worker writes the artifact under
+`EXPORT_DIR/<tenant_id>/` and marks the job COMPLETED with an expiry, after
+which `cleanup_expired_exports` deletes the file.
+
+Job state lives in the database so status and download work from any API
+process that shares `EXPORT_DIR`. While a process holds a queued or running
+job it refreshes `heartbeat_at` every `EXPORT_HEARTBEAT_SECONDS`; a job
+silent for `EXPORT_STALE_SECONDS` was orphaned by a restart, so an identical
+request replaces it and the cleanup job fails it.
+"""
+import asyncio
+import datetime
+import hashlib
+import logging
+import os
+import uuid
+from typing import Optional, Tuple
+
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import tenancy
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.db.upsert import insert_stmt
+from app.models.export_jobs import ACTIVE_WHERE, ExportJob, ExportJobStatus
+
+logger = logging.getLogger(__name__)
+
+EXPORT_TYPES = ("participation", "distribution", "budget", "summary")
+ACTIVE_STATUSES = (ExportJobStatus.QUEUED, ExportJobStatus.RUNNING)
+
+_worker_slots: Optional[asyncio.Semaphore] = None
+# job id -> running task, so tasks are not garbage collected mid-flight
+_tasks: dict = {}
+# workers open their own sessions; overridable for tests
+session_factory = AsyncSessionLocal
+
+
+def _slots() -> asyncio.Semaphore:
+    global _worker_slots
+    if _worker_slots is None:
+        _worker_slots = asyncio.Semaphore(max(1, settings.EXPORT_MAX_WORKERS))
+    return _worker_slots
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _as_aware(value: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+def is_abandoned(job: ExportJob, now: Optional[datetime.datetime] = None) -> bool:
+    """A queued/running job whose worker has stopped heartbeating."""
+    if job.status not in ACTIVE_STATUSES:
+        return False
+    seen = _as_aware(job.heartbeat_at or job.created_at)
+    if seen is None:
+        return False
+    return ((now or _utcnow()) - seen).total_seconds() > settings.EXPORT_STALE_SECONDS
+
+
+async def _fail_abandoned(db: AsyncSession, job_ids, now: datetime.datetime) -> None:
+    await db.execute(
+        update(ExportJob)
+        .where(ExportJob.id.in_(list(job_ids)), ExportJob.status.in_(ACTIVE_STATUSES))
+        .values(status=ExportJobStatus.FAILED, error="export abandoned", completed_at=now)
+    )
+
+
+def dedupe_key(tenant_id: str, event_id: str, export_type: str, fmt: str) -> str:
+    raw = f"{tenant_id}:{event_id}:{export_type}:{fmt}".lower()
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def job_to_dict(job: ExportJob) -> dict:
+    return {
+        "job_id": job.id,
+        "event_id": job.event_id,
+        "type": job.export_type,
+        "format": job.format,
+        "status": job.status.value if hasattr(job.status, "value") else str(job.status),
+        "progress": job.progress,
+        "filename": job.filename,
+        "size": job.size_bytes,
+        "error": job.error,
+        "created_at": job.created_at,
+        "completed_at": job.completed_at,
+        "expires_at": job.expires_at,
+    }
+
+
+async def _active_job(db: AsyncSession, tenant_id: str, key: str) -> Optional[ExportJob]:
+    res = await db.execute(
+        select(ExportJob)
+        .where(
+            ExportJob.tenant_id == tenant_id,
+            ExportJob.dedupe_key == key,
+            ExportJob.status.in_(ACTIVE_STATUSES),
+        )
+        .execution_options(populate_existing=True)
+    )
+    return res.scalars().first()
+
+
+async def submit_export(
+    db: AsyncSession,
+    tenant_id: str,
+    user_id: str,
+    event_id: str,
+    export_type: str,
+    fmt: str = "csv",
+) -> Tuple[ExportJob, bool]:
+    """Queue an export, or return the identical job already queued/running.
+
+    Returns (job, created). Commits.
+    """
+    if export_type not in EXPORT_TYPES:
+        export_type = "summary"
+    if fmt != "csv":
+        raise ValueError("Only csv exports are supported")
+
+    key = dedupe_key(tenant_id, event_id, export_type, fmt)
+    job_id = str(uuid.uuid4())
+    now = _utcnow()
+    # The partial unique index on (tenant_id, dedupe_key) arbitrates between
+    # identical requests on any API process: only one INSERT lands while a
+    # job is queued/running, and every caller then reads that job back.
+    while True:
+        insert = await insert_stmt(db, ExportJob)
+        await db.execute(
+            insert.values(
+                id=job_id,
+                tenant_id=str(tenant_id),
+                created_by=str(user_id) if user_id else None,
+                event_id=str(event_id),
+                export_type=export_type,
+                format=fmt,
+                dedupe_key=key,
+                status=ExportJobStatus.QUEUED,
+                progress=0,
+                heartbeat_at=now,
+            ).on_conflict_do_nothing(
+                index_elements=["tenant_id", "dedupe_key"],
+                index_where=text(ACTIVE_WHERE),
+            )
+        )
+        job = await _active_job(db, str(tenant_id), key)
+        if job is not None and job.id != job_id and is_abandoned(job, now):
+            # its worker died: fail it and insert ours in the same transaction
+            await _fail_abandoned(db, [job.id], now)
+            continue
+        await db.commit()
+        # None only if the job we collided with finished in between; try again
+        if job is not None:
+            break
+
+    if job.id != job_id:
+        return job, False
+
+    _tasks[job.id] = asyncio.create_task(_run_job(job.id, str(tenant_id)))
+    return job, True
+
+
+async def get_export_job(db: AsyncSession, tenant_id: str, job_id: str) -> Optional[ExportJob]:
+    res = await db.execute(
+        select(ExportJob).where(ExportJob.id == str(job_id), ExportJob.tenant_id == str(tenant_id))
+    )
+    return res.scalar_one_or_none()
+
+
+async def _set_progress(db: AsyncSession, job: ExportJob, progress: int, status: Optional[ExportJobStatus] = None):
+    job.progress = progress
+    job.heartbeat_at = _utcnow()
+    if status is not None:
+        job.status = status
+    await db.commit()
+
+
+async def _generate_csv(db: AsyncSession, job: ExportJob) -> Tuple[str, bytes]:
+    # report modules are heavy and only needed by the worker
+    from app.services.analytics_service import AnalyticsService
+    from app.services.report_service import ReportService
+
+    report_service = ReportService(db)
+    stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    if job.export_type == "participation":
+        content = await report_service.generate_participation_csv(job.event_id)
+    elif job.export_type == "distribution":
+        content = await report_service.generate_distribution_csv(job.event_id)
+    elif job.export_type == "budget":
+        content = await report_service.generate_budget_csv(job.event_id)
+    else:
+        summary = await AnalyticsService(db).get_event_summary(event_id=job.event_id, tenant_id=job.tenant_id)
+        if "error" in summary:
+            raise ValueError(summary["error"])
+        content = await report_service.generate_summary_csv(job.event_id, summary)
+    filename = f"{job.export_type}_{job.event_id}_{stamp}.csv"
+    return filename, report_service.csv_to_bytes(content)
+
+
+def _write_artifact(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.part"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+async def _heartbeat(job_id: str) -> None:
+    """Keep `heartbeat_at` fresh while this process holds the job, including
+    while it waits for a worker slot or a long report query."""
+    while True:
+        await asyncio.sleep(settings.EXPORT_HEARTBEAT_SECONDS)
+        try:
+            async with session_factory() as db:
+                await db.execute(
+                    update(ExportJob)
+                    .where(ExportJob.id == job_id, ExportJob.status.in_(ACTIVE_STATUSES))
+                    .values(heartbeat_at=_utcnow())
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("export job %s heartbeat failed", job_id)
+
+
+async def _run_job(job_id: str, tenant_id: str) -> None:
+    token = tenancy.CURRENT_TENANT.set(tenant_id)
+    heartbeat = asyncio.create_task(_heartbeat(job_id))
+    try:
+        async with _slots():
+            async with session_factory() as db:
+                job = await get_export_job(db, tenant_id, job_id)
+                if job is None:
+                    return
+                try:
+                    job.started_at = _utcnow()
+                    await _set_progress(db, job, 10, ExportJobStatus.RUNNING)
+
+                    filename, data = await _generate_csv(db, job)
+                    await _set_progress(db, job, 80)
+
+                    path = os.path.join(settings.EXPORT_DIR, str(tenant_id), f"{job.id}.csv")
+                    await asyncio.to_thread(_write_artifact, path, data)
+
+                    now = _utcnow()
+                    job.filename = filename
+                    job.file_path = path
+                    job.size_bytes = len(data)
+                    job.completed_at = now
+                    job.expires_at = now + datetime.timedelta(seconds=settings.EXPORT_TTL_SECONDS)
+                    await _set_progress(db, job, 100, ExportJobStatus.COMPLETED)
+                except Exception as exc:
+                    logger.exception("export job %s failed", job_id)
+                    await db.rollback()
+                    job = await get_export_job(db, tenant_id, job_id)
+                    if job is not None:
+                        job.error = str(exc)
+                        job.completed_at = _utcnow()
+                        job.status = ExportJobStatus.FAILED
+                        await db.commit()
+    finally:
+        heartbeat.cancel()
+        tenancy.CURRENT_TENANT.reset(token)
+        _tasks.pop(job_id, None)
+
+
+def is_downloadable(job: ExportJob) -> bool:
+    if job.status != ExportJobStatus.COMPLETED or not job.file_path:
+        return False
+    expires_at = _as_aware(job.expires_at)
+    if expires_at is not None and expires_at <= _utcnow():
+        return False
+    return os.path.exists(job.file_path)
+
+
+async def cleanup_expired_exports(db: AsyncSession) -> int:
+    """Expire finished jobs past their TTL and delete their files.
+
+    Also fails QUEUED/RUNNING jobs whose heartbeat is older than
+    `EXPORT_STALE_SECONDS` (their process died). Commits; returns rows touched.
+    """
+    now = _utcnow()
+    res = await db.execute(
+        select(ExportJob).where(ExportJob.status.in_((ExportJobStatus.COMPLETED, *ACTIVE_STATUSES)))
+    )
+    touched = 0
+    for job in res.scalars().all():
+        if job.status == ExportJobStatus.COMPLETED:
+            expires_at = _as_aware(job.expires_at)
+            if expires_at is None or expires_at > now:
+                continue
+            if job.file_path:
+                try:
+                    os.remove(job.file_path)
+                except FileNotFoundError:
+                    pass
+            job.status = ExportJobStatus.EXPIRED
+            job.file_path = None
+            touched += 1
+        elif is_abandoned(job, now):
+            job.status = ExportJobStatus.FAILED
+            job.error = "export abandoned"
+            job.completed_at = now
+            touched += 1
+    await db.commit()
+    return touched
@@ -1,92 +1,269 @@
 import csv
+import hashlib
+import logging
 import os
 import asyncio
+import time
 from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
 from sqlalchemy import select, update, insert
 from app.db.session import AsyncSessionLocal
-from app.models.users import User, UserRole
+from app.models.users import User, UserRole, month_day
 
-async def sync_hr_data(file_path: str):
+logger = logging.getLogger(__name__)
+
+# rows per transaction; one prefetch query and at most two bulk statements each
+DEFAULT_CHUNK_SIZE = 1000
+
+SYNCED_FIELDS = ("full_name", "date_of_birth", "hire_date", "department", "job_title", "tenant_id")
+
+
+def hr_fingerprint(values: dict) -> str:
+    """Stable hash of the synced fields as they appear in the HR feed."""
+    parts = []
+    for field in SYNCED_FIELDS:
+        value = values.get(field)
+        if hasattr(value, "isoformat"):
+            value = value.isoformat()
+        parts.append("" if value is None else str(value).strip())
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _with_month_days(values: dict) -> dict:
+    """Bulk statements bypass the ORM validator, so derive the milestone
+    lookup columns here."""
+    out = dict(values)
+    if "date_of_birth" in values:
+        out["birthday_md"] = month_day(values["date_of_birth"])
+    if "hire_date" in values:
+        out["hire_md"] = month_day(values["hire_date"])
+    return out
+
+
+def _parse_date(value: Optional[str], field: str, email: str, errors: List[dict], line: int):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        errors.append({"line": line, "email": email, "error": f"Invalid {field} format: {value}"})
+        return None
+
+
+def _iter_chunks(file_path: str, chunk_size: int) -> Iterator[List[Tuple[int, dict]]]:
+    """Yield lists of (line_number, row) without loading the whole file."""
+    with open(file_path, mode='r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        chunk: List[Tuple[int, dict]] = []
+        for row in reader:
+            chunk.append((reader.line_num, row))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _parse_chunk(chunk: List[Tuple[int, dict]], errors: List[dict]) -> Tuple[Dict[str, Tuple[int, dict]], int]:
+    """Map email -> (line, incoming values). Empty CSV cells mean "keep the
+    current value" and are left out. A later row for the same email wins."""
+    parsed: Dict[str, Tuple[int, dict]] = {}
+    skipped = 0
+    for line, row in chunk:
+        email = (row.get('email') or '').strip()
+        if not email:
+            skipped += 1
+            continue
+        incoming = {
+            "full_name": row.get('full_name') or None,
+            "date_of_birth": _parse_date(row.get('dob'), "dob", email, errors, line),
+            "hire_date": _parse_date(row.get('hire_date'), "hire_date", email, errors, line),
+            "department": row.get('department') or None,
+            "job_title": row.get('job_title') or None,
+            "tenant_id": row.get('tenant_id') or None,
+        }
+        parsed[email] = (line, {k: v for k, v in incoming.items() if v is not None})
+    return parsed, skipped
+
+
+async def _apply_chunk(
+    db,
+    parsed: Dict[str, Tuple[int, dict]],
+    reactivate: bool = False,
+    tenants: Optional[set] = None,
+) -> Tuple[int, int, int]:
+    """Prefetch existing users for the chunk and write inserts/updates in bulk.
+
+    Rows whose fingerprint matches the stored one are skipped. With
+    `reactivate`, HR-managed users listed in the file are also set active.
+    Tenants touched by the chunk are added to `tenants` when given.
+    Returns (inserted, changed, unchanged).
+    """
+    res = await db.execute(
+        select(User.id, User.email, User.tenant_id, User.hr_fingerprint, User.is_active)
+        .where(User.email.in_(list(parsed)))
+    )
+    existing = {email: (uid, tid, fp, active) for uid, email, tid, fp, active in res.all()}
+
+    inserts = []
+    updates = []
+    unchanged = 0
+    for email, (_line, values) in parsed.items():
+        fingerprint = hr_fingerprint(values)
+        current = existing.get(email)
+        if tenants is not None:
+            tenants.add(values.get("tenant_id") or (current[1] if current else None))
+        if current is None:
+            inserts.append({
+                "email": email,
+                "role": UserRole.CORPORATE_USER,
+                "is_active": True,
+                "points_balance": 0,
+                "lead_budget_balance": 0,
+                "hr_fingerprint": fingerprint,
+                **_with_month_days({f: values.get(f) for f in SYNCED_FIELDS}),
+            })
+            continue
+        uid, _tenant, stored, active = current
+        wake = reactivate and stored is not None and not active
+        if stored == fingerprint and not wake:
+            unchanged += 1
+            continue
+        row = {"id": uid, "hr_fingerprint": fingerprint, **_with_month_days(values)}
+        if wake:
+            row["is_active"] = True
+        updates.append(row)
+
+    if inserts:
+        await db.execute(insert(User), inserts)
+    # ORM bulk UPDATE by primary key; rows only carry the columns present in the CSV
+    for columns in {tuple(sorted(u)) for u in updates}:
+        batch = [u for u in updates if tuple(sorted(u)) == columns]
+        await db.execute(update(User), batch)
+    return len(inserts), len(updates), unchanged
+
+
+async def _apply_rows_individually(
+    db,
+    parsed: Dict[str, Tuple[int, dict]],
+    errors: List[dict],
+    reactivate: bool = False,
+    tenants: Optional[set] = None,
+) -> Tuple[int, int, int]:
+    """Fallback when a bulk chunk fails: isolate bad rows with savepoints."""
+    totals = [0, 0, 0]
+    for email, (line, values) in parsed.items():
+        try:
+            async with db.begin_nested():
+                counts = await _apply_chunk(db, {email: (line, values)}, reactivate, tenants)
+            totals = [a + b for a, b in zip(totals, counts)]
+        except Exception as e:
+            errors.append({"line": line, "email": email, "error": str(e)})
+    return tuple(totals)
+
+
+async def _deactivate_missing(db, seen: set, tenants: set, chunk_size: int) -> int:
+    """Deactivate HR-managed users (non-NULL fingerprint) of the tenants in
+    the file who are absent from it. Other tenants are never touched."""
+    tenants = {t for t in tenants if t}
+    if not tenants:
+        return 0
+    res = await db.execute(
+        select(User.id, User.email).where(
+            User.tenant_id.in_(list(tenants)),
+            User.hr_fingerprint.isnot(None),
+            User.is_active == True,
+        )
+    )
+    missing = [uid for uid, email in res.all() if email not in seen]
+    for i in range(0, len(missing), chunk_size):
+        batch = missing[i:i + chunk_size]
+        await db.execute(update(User), [{"id": uid, "is_active": False} for uid in batch])
+        await db.commit()
+    return len(missing)
+
+
+async def sync_hr_data(
+    file_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    session_factory=AsyncSessionLocal,
+    deactivate_missing: bool = False,
+) -> Optional[dict]:
     """
     Syncs HR data from a CSV file into the users table.
     Expected CSV columns: email, dob, hire_date, full_name, department, job_title
+    (optional: tenant_id)
+
+    The file is streamed in chunks of `chunk_size` rows. Each chunk costs one
+    `IN` prefetch plus bulk INSERT/UPDATE statements in a single transaction.
+    Rows whose `hr_fingerprint` is unchanged since the last sync are skipped,
+    so a nightly run only writes what HR actually changed.
+
+    With `deactivate_missing=True` the file is treated as the full roster of
+    the tenants it mentions: their previously synced users not present in it
+    are deactivated (and reactivated if they reappear). This is skipped when
+    the file could not be read fully.
+    Bad rows are reported in the returned summary instead of aborting the run.
     """
     if not os.path.exists(file_path):
-        print(f"File not found: {file_path}")
-        return
+        logger.warning("HR sync file not found: %s", file_path)
+        return None
+
+    summary = {
+        "rows": 0, "inserted": 0, "changed": 0, "unchanged": 0, "deactivated": 0,
+        "skipped": 0, "chunks": 0, "errors": [],
+    }
+    errors = summary["errors"]
+    seen: set = set()
+    tenants: set = set()
+    started = time.perf_counter()
 
-    records = []
     try:
-        with open(file_path, mode='r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                records.append(row)
-    except Exception as e:
-        print(f"Error reading CSV: {e}")
-        return
-
-    print(f"Processing {len(records)} employee records...")
-    
-    async with AsyncSessionLocal() as db:
-        for row in records:
-            email = row.get('email')
-            if not email:
-                continue
-            
-            try:
-                # Parse dates with basic validation
-                dob = None
-                if row.get('dob'):
-                    try:
-                        dob = datetime.strptime(row.get('dob'), '%Y-%m-%d').date()
-                    except ValueError:
-                        print(f"Invalid DOB format for {email}: {row.get('dob')}")
-                
-                hire_date = None
-                if row.get('hire_date'):
-                    try:
-                        hire_date = datetime.strptime(row.get('hire_date'), '%Y-%m-%d').date()
-                    except ValueError:
-                        print(f"Invalid hire_date format for {email}: {row.get('hire_date')}")
-
-                # Check if user exists
-                stmt = select(User).where(User.email == email)
-                res = await db.execute(stmt)
-                user = res.scalar_one_or_none()
-
-                values = {
-                    "full_name": row.get('full_name') or (user.full_name if user else None),
-                    "date_of_birth": dob or (user.date_of_birth if user else None),
-                    "hire_date": hire_date or (user.hire_date if user else None),
-                    "department": row.get('department') or (user.department if user else None),
-                    "job_title": row.get('job_title') or (user.job_title if user else None),
-                    "tenant_id": row.get('tenant_id') or (user.tenant_id if user else None),
-                }
-
-                if user:
-                    # Update existing user
-                    await db.execute(
-                        update(User).where(User.id == user.id).values(**values)
+        async with session_factory() as db:
+            for chunk in _iter_chunks(file_path, chunk_size):
+                summary["rows"] += len(chunk)
+                summary["chunks"] += 1
+                parsed, skipped = _parse_chunk(chunk, errors)
+                summary["skipped"] += skipped
+                if not parsed:
+                    continue
+                seen.update(parsed)
+                try:
+                    inserted, changed, unchanged = await _apply_chunk(db, parsed, deactivate_missing, tenants)
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    inserted, changed, unchanged = await _apply_rows_individually(
+                        db, parsed, errors, deactivate_missing, tenants
                     )
-                else:
-                    # Insert new user (defaulting to CORPORATE_USER)
-                    # Note: In a real multi-tenant app, you'd need tenant_id from context or CSV
-                    new_user_data = {
-                        "email": email,
-                        "role": UserRole.CORPORATE_USER,
-                        "is_active": True,
-                        **values
-                    }
-                    await db.execute(insert(User).values(**new_user_data))
-                
-                await db.commit()
-            except Exception as e:
-                await db.rollback()
-                print(f"Error syncing user {email}: {e}")
-    
-    print("HR Sync Completed successfully.")
+                    await db.commit()
+                summary["inserted"] += inserted
+                summary["changed"] += changed
+                summary["unchanged"] += unchanged
+
+            if deactivate_missing and seen:
+                summary["deactivated"] = await _deactivate_missing(db, seen, tenants, chunk_size)
+    except (OSError, csv.Error) as e:
+        logger.warning("Error reading HR sync CSV %s: %s", file_path, e)
+        errors.append({"line": None, "email": None, "error": f"Error reading CSV: {e}"})
+
+    elapsed = time.perf_counter() - started
+    summary["elapsed_seconds"] = round(elapsed, 3)
+    summary["rows_per_second"] = round(summary["rows"] / elapsed, 1) if elapsed > 0 else None
+
+    for err in errors:
+        if err["line"] is not None:  # the read error was logged above
+            logger.warning("Error syncing user %s (line %s): %s", err["email"], err["line"], err["error"])
+    logger.info(
+        "HR sync completed: %d rows in %d chunks, %d inserted, %d changed, %d unchanged, "
+        "%d deactivated, %d skipped, %d errors (%s rows/sec)",
+        summary["rows"], summary["chunks"], summary["inserted"], summary["changed"], summary["unchanged"],
+        summary["deactivated"], summary["skipped"], len(errors), summary["rows_per_second"],
+    )
+    return summary
 
 if __name__ == "__main__":
     # For manual testing
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     data_path = os.path.join(os.path.dirname(__file__), "..", "..", "data", "hr_sync.csv")
     asyncio.run(sync_hr_data(data_path))
@@ -0,0 +1,183 @@
+"""Resized WebP/JPEG derivatives of uploaded images.
+
+Feeds and the event wizard used to load gift photos and recognition media
+at full upload size. Every stored image now gets `thumb` and `medium`
+variants in WebP and JPEG next to the original:
+
+    /uploads/gifts/ab/<sha>.png -> /uploads/gifts/ab/<sha>_thumb.webp
+                                   /uploads/gifts/ab/<sha>_medium.jpg ...
+
+Decoding and resizing is CPU bound, so it runs in a process pool
+(`IMAGE_PROCESS_WORKERS`). Uploads call `schedule_variants`, which returns
+immediately; `VariantStaticFiles` serves `/uploads` and builds a missing
+variant on its first request, so old uploads and uploads whose background
+job has not finished yet still resolve.
+"""
+import asyncio
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from starlette.exceptions import HTTPException
+from starlette.staticfiles import StaticFiles
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# longest edge in pixels; images are never upscaled
+VARIANT_SIZES = {"thumb": 320, "medium": 1024}
+FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+SOURCE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif")
+
+_VARIANT_NAME = re.compile(
+    r"^(?P<stem>.+)_(?P<variant>%s)\.(?P<fmt>%s)$" % ("|".join(VARIANT_SIZES), "|".join(FORMATS))
+)
+
+_pool: Optional[ProcessPoolExecutor] = None
+# source path -> in-flight render, so concurrent requests share one job
+_inflight: Dict[str, asyncio.Future] = {}
+# scheduled background renders, so tasks are not garbage collected mid-flight
+_tasks: set = set()
+
+
+def _executor() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=max(1, settings.IMAGE_PROCESS_WORKERS))
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def is_variant_source(url: Optional[str]) -> bool:
+    return bool(url) and url.startswith("/uploads/") and url.lower().endswith(SOURCE_EXTENSIONS)
+
+
+def variant_urls(url: Optional[str]) -> Optional[Dict[str, Dict[str, str]]]:
+    """`{"thumb": {"webp": ..., "jpg": ...}, "medium": {...}}` for a local
+    image URL, or None for anything else (external URLs, HTML e-cards)."""
+    if not is_variant_source(url):
+        return None
+    stem = os.path.splitext(url)[0]
+    return {
+        variant: {fmt: f"{stem}_{variant}.{fmt}" for fmt in FORMATS}
+        for variant in VARIANT_SIZES
+    }
+
+
+def render_variants(source: str) -> List[str]:
+    """Write every variant of `source` that does not exist yet. Runs in a
+    worker process; returns the paths written."""
+    from PIL import Image, ImageOps
+
+    stem = os.path.splitext(source)[0]
+    todo = [
+        (variant, fmt) for variant in VARIANT_SIZES for fmt in FORMATS
+        if not os.path.exists(f"{stem}_{variant}.{fmt}")
+    ]
+    if not todo:
+        return []
+
+    written = []
+    with Image.open(source) as img:
+        img.seek(0)  # first frame of animated GIF/WebP
+        img = ImageOps.exif_transpose(img)
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        rgba = img.convert("RGBA") if has_alpha else img.convert("RGB")
+        if has_alpha:
+            flat = Image.new("RGB", rgba.size, (255, 255, 255))
+            flat.paste(rgba, mask=rgba.getchannel("A"))
+        else:
+            flat = rgba
+
+        for variant, fmt in todo:
+            base = rgba if fmt == "webp" else flat
+            resized = base.copy()
+            resized.thumbnail((VARIANT_SIZES[variant],) * 2, Image.LANCZOS)
+            path = f"{stem}_{variant}.{fmt}"
+            # unique per writer: another worker may be rendering the same variant
+            tmp = f"{path}.{os.getpid()}.{uuid4().hex}.part"
+            if fmt == "webp":
+                resized.save(tmp, FORMATS[fmt], quality=80, method=4)
+            else:
+                resized.save(tmp, FORMATS[fmt], quality=82, optimize=True, progressive=True)
+            os.replace(tmp, path)
+            written.append(path)
+    return written
+
+
+async def _render(source: str) -> List[str]:
+    future = _inflight.get(source)
+    if future is None:
+        loop = asyncio.get_running_loop()
+        future = asyncio.ensure_future(loop.run_in_executor(_executor(), render_variants, source))
+        _inflight[source] = future
+        future.add_done_callback(lambda _: _inflight.pop(source, None))
+    return await asyncio.shield(future)
+
+
+def _local_path(url: str) -> str:
+    return os.path.join(settings.UPLOAD_DIR, *url[len("/uploads/"):].split("/"))
+
+
+def schedule_variants(url: Optional[str]) -> None:
+    """Render variants for an uploaded image in the background."""
+    if not is_variant_source(url):
+        return
+
+    async def run():
+        try:
+            await _render(_local_path(url))
+        except Exception:
+            logger.exception("image variants failed for %s", url)
+
+    task = asyncio.create_task(run())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def _find_source(root: str, stem: str) -> Optional[str]:
+    for ext in SOURCE_EXTENSIONS:
+        candidate = os.path.join(root, stem + ext)
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+async def ensure_variant(root: str, path: str) -> bool:
+    """Build the variant named by `path` (relative to `root`) from its
+    original if it is missing. Returns True when the file now exists."""
+    match = _VARIANT_NAME.match(path.replace(os.sep, "/"))
+    if match is None:
+        return False
+    root = os.path.realpath(root)
+    source = _find_source(root, match.group("stem"))
+    if source is None or not os.path.realpath(source).startswith(root + os.sep):
+        return False
+    try:
+        await _render(source)
+    except Exception:
+        logger.exception("lazy image variant failed for %s", path)
+        return False
+    return os.path.isfile(os.path.join(root, path))
+
+
+class VariantStaticFiles(StaticFiles):
+    """StaticFiles that generates a missing image variant on first request."""
+
+    async def get_response(self, path: str, scope):
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as exc:
+            if exc.status_code != 404 or not await ensure_variant(self.directory, path):
+                raise
+        return await super().get_response(path, scope)
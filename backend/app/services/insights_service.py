@@ -0,0 +1,307 @@
+"""Tenant insights for the platform-owner dashboard.
+
+`compute_tenant_insights` runs the (expensive) analytics queries for one
+tenant. Results are persisted as a `TenantInsightsSnapshot` so the API can
+serve them instantly; snapshots are rebuilt by `refresh_stale_snapshots`
+(scheduled job) or on demand via `schedule_refresh`.
+"""
+import asyncio
+import datetime
+import logging
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import select, func, desc, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import tenancy
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.db.upsert import insert_stmt
+from app.models.insights import TenantInsightsSnapshot
+from app.models.recognition import Recognition
+from app.models.tenants import Tenant
+from app.models.users import User, UserRole
+from app.services.department_flow_service import get_flow_summary
+
+logger = logging.getLogger(__name__)
+
+# tenants whose snapshot is currently being rebuilt in this process
+_refreshing: set = set()
+# scheduled background rebuilds, so tasks are not garbage collected mid-flight
+_tasks: set = set()
+
+
+async def compute_tenant_insights(db: AsyncSession, tenant_id: str) -> Dict:
+    """Compute the full insights payload for a tenant.
+
+    Returns: recognition velocity, dark zone users, budget burn, cross-dept
+    collaboration (approved recognitions only), top recognizers and
+    participation rate.
+    """
+    # 1. RECOGNITION VELOCITY (current 7 days vs previous 7 days)
+    today = datetime.datetime.utcnow().date()
+    current_week_start = today - datetime.timedelta(days=7)
+    previous_week_start = today - datetime.timedelta(days=14)
+    previous_week_end = today - datetime.timedelta(days=7)
+
+    current_q = await db.execute(
+        select(func.count(Recognition.id))
+        .where(Recognition.tenant_id == tenant_id, Recognition.created_at >= current_week_start)
+    )
+    current_count = current_q.scalar() or 0
+
+    previous_q = await db.execute(
+        select(func.count(Recognition.id))
+        .where(Recognition.tenant_id == tenant_id, Recognition.created_at >= previous_week_start, Recognition.created_at < previous_week_end)
+    )
+    previous_count = previous_q.scalar() or 0
+
+    if previous_count == 0:
+        growth_pct = 100.0 if current_count > 0 else 0.0
+    else:
+        growth_pct = round(((current_count - previous_count) / previous_count) * 100, 2)
+
+    # 2. THE "DARK ZONE" (Users with no recognition in last 30 days)
+    # One grouped query: last recognition per corporate user, filtered in SQL.
+    dark_zone_start = today - datetime.timedelta(days=30)
+    last_rec = func.max(Recognition.created_at).label("last_rec")
+    dark_zone_q = await db.execute(
+        select(User.id, User.full_name, User.job_title, User.department, last_rec)
+        .join(Recognition, User.id == Recognition.nominee_id, isouter=True)
+        .where(User.tenant_id == tenant_id, User.role == UserRole.CORPORATE_USER)
+        .group_by(User.id, User.full_name, User.job_title, User.department)
+        .having(or_(func.max(Recognition.created_at).is_(None), func.max(Recognition.created_at) < dark_zone_start))
+    )
+    dark_zone_users = []
+    for row in dark_zone_q.fetchall():
+        last_rec_date = row[4]
+        if last_rec_date:
+            if isinstance(last_rec_date, str):
+                last_rec_date = datetime.datetime.fromisoformat(last_rec_date)
+            days_since = (today - last_rec_date.date()).days
+        else:
+            days_since = 999  # Never recognized
+
+        dark_zone_users.append({
+            "id": str(row[0]),
+            "full_name": row[1],
+            "job_title": row[2],
+            "department": row[3],
+            "days_since_recognition": days_since
+        })
+
+    dark_zone_count = len(dark_zone_users)
+
+    # 3. BUDGET BURN RATE (tenant master budget utilization)
+    tenant_q = await db.execute(select(Tenant).where(Tenant.id == tenant_id))
+    tenant = tenant_q.scalar_one_or_none()
+
+    if tenant:
+        current_balance = int(tenant.master_budget_balance or 0)
+        # Total points distributed
+        total_points_q = await db.execute(
+            select(func.coalesce(func.sum(Recognition.points), 0))
+            .where(Recognition.tenant_id == tenant_id)
+        )
+        total_distributed = int(total_points_q.scalar() or 0)
+
+        total_capacity = current_balance + total_distributed
+        if total_capacity > 0:
+            burn_rate_pct = round((total_distributed / total_capacity) * 100, 2)
+        else:
+            burn_rate_pct = 0.0
+    else:
+        current_balance = 0
+        total_distributed = 0
+        total_capacity = 0
+        burn_rate_pct = 0.0
+
+    # 4. CROSS-DEPARTMENT COLLABORATION (approved awards where sender and receiver are in different departments)
+    # Read from the department flow matrix, which only counts approved
+    # recognitions: pending and rejected nominations no longer inflate the
+    # figure as they did when it was joined from `recognitions` directly.
+    # Tenants created before the matrix need app/jobs/department_flow_backfill.py.
+    # `total_recognitions_tracked` comes from the same matrix so the two agree.
+    flow = await get_flow_summary(db, tenant_id)
+    total_recs = flow["total_recognitions"]
+    cross_dept_count = flow["cross_department"]
+    cross_dept_pct = flow["cross_department_pct"]
+
+    # 5. TOP 5 RECOGNITION CHAMPIONS (users who sent the most awards this month)
+    month_ago = today - datetime.timedelta(days=30)
+    champions_q = await db.execute(
+        select(User.id, User.full_name, User.job_title, func.count(Recognition.id).label('awards_sent'))
+        .join(Recognition, User.id == Recognition.nominator_id)
+        .where(Recognition.tenant_id == tenant_id, Recognition.created_at >= month_ago)
+        .group_by(User.id)
+        .order_by(desc('awards_sent'))
+        .limit(5)
+    )
+    champions = []
+    for row in champions_q.fetchall():
+        champions.append({
+            "id": str(row[0]),
+            "full_name": row[1],
+            "job_title": row[2],
+            "awards_sent": int(row[3])
+        })
+
+    # 6. PARTICIPATION RATE (% of active users who sent or received at least one recognition)
+    total_users_q = await db.execute(
+        select(func.count(User.id))
+        .where(User.tenant_id == tenant_id, User.role == UserRole.CORPORATE_USER, User.is_active == True)
+    )
+    total_active_users = total_users_q.scalar() or 0
+
+    if total_active_users > 0:
+        engaged_q = await db.execute(
+            select(func.count(func.distinct(User.id)))
+            .select_from(User)
+            .join(Recognition, or_(User.id == Recognition.nominator_id, User.id == Recognition.nominee_id))
+            .where(Recognition.tenant_id == tenant_id, User.tenant_id == tenant_id, User.role == UserRole.CORPORATE_USER)
+        )
+        engaged_users = engaged_q.scalar() or 0
+        participation_rate = round((engaged_users / total_active_users) * 100, 2)
+    else:
+        participation_rate = 0.0
+
+    # Sort dark zone users by days_since_recognition (highest first) for visibility
+    dark_zone_users_sorted = sorted(dark_zone_users, key=lambda x: x['days_since_recognition'], reverse=True)
+
+    return {
+        "tenant_id": tenant_id,
+        "timestamp": datetime.datetime.utcnow().isoformat(),
+        "recognition_velocity": {
+            "current_week": int(current_count),
+            "previous_week": int(previous_count),
+            "growth_percentage": growth_pct,
+            "trend": "UP" if growth_pct > 0 else ("DOWN" if growth_pct < 0 else "FLAT"),
+            "interpretation": "Culture is accelerating" if growth_pct > 20 else ("Culture is declining" if growth_pct < -20 else "Culture is stable")
+        },
+        "participation_rate": participation_rate,
+        "dark_zone": {
+            "count": dark_zone_count,
+            "users": dark_zone_users_sorted[:10],
+            "severity": "CRITICAL" if dark_zone_count > 10 else ("HIGH" if dark_zone_count > 5 else "NORMAL")
+        },
+        "budget_metrics": {
+            "current_balance_paise": current_balance,
+            "total_distributed_paise": total_distributed,
+            "burn_rate_percentage": burn_rate_pct,
+            "capacity": total_capacity,
+            "monthly_run_rate": int(total_distributed / 30) if total_distributed > 0 else 0,
+            "health": "SUSTAINABLE" if burn_rate_pct < 70 else ("WARNING" if burn_rate_pct < 90 else "CRITICAL")
+        },
+        "cross_dept_collaboration": {
+            "percentage": cross_dept_pct,
+            "total_cross_dept_awards": int(cross_dept_count),
+            "interpretation": "Silos being broken down" if cross_dept_pct > 50 else ("Silos present" if cross_dept_pct > 25 else "Heavy silos detected")
+        },
+        "top_champions": champions,
+        "metrics_summary": {
+            "total_recognitions_tracked": int(total_recs),
+            "active_user_count": int(total_active_users),
+            "period": "Last 30 days"
+        }
+    }
+
+
+async def get_snapshot(db: AsyncSession, tenant_id: str) -> Optional[TenantInsightsSnapshot]:
+    q = await db.execute(select(TenantInsightsSnapshot).where(TenantInsightsSnapshot.tenant_id == tenant_id))
+    return q.scalar_one_or_none()
+
+
+async def refresh_snapshot(db: AsyncSession, tenant_id: str) -> TenantInsightsSnapshot:
+    """Recompute and persist the snapshot for one tenant. Commits."""
+    started = time.perf_counter()
+    payload = await compute_tenant_insights(db, tenant_id)
+    build_ms = int((time.perf_counter() - started) * 1000)
+
+    # upsert: a first-time API build can race the background refresh or the job
+    insert = await insert_stmt(db, TenantInsightsSnapshot)
+    await db.execute(
+        insert.values(
+            tenant_id=tenant_id,
+            payload=payload,
+            generated_at=datetime.datetime.utcnow(),
+            build_ms=build_ms,
+        ).on_conflict_do_update(
+            index_elements=["tenant_id"],
+            set_={
+                "payload": insert.excluded.payload,
+                "generated_at": insert.excluded.generated_at,
+                "build_ms": insert.excluded.build_ms,
+            },
+        )
+    )
+    await db.commit()
+    q = await db.execute(
+        select(TenantInsightsSnapshot)
+        .where(TenantInsightsSnapshot.tenant_id == tenant_id)
+        .execution_options(populate_existing=True)
+    )
+    return q.scalar_one()
+
+
+def _naive_utc(value: datetime.datetime) -> datetime.datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def is_snapshot_stale(db: AsyncSession, snap: TenantInsightsSnapshot) -> bool:
+    """A snapshot is stale when it is older than the max age or enough new
+    recognitions have been created since it was generated."""
+    generated_at = _naive_utc(snap.generated_at)
+    age = (datetime.datetime.utcnow() - generated_at).total_seconds()
+    if age >= settings.INSIGHTS_SNAPSHOT_MAX_AGE_SECONDS:
+        return True
+    q = await db.execute(
+        select(func.count(Recognition.id))
+        .where(Recognition.tenant_id == snap.tenant_id, Recognition.created_at > generated_at)
+    )
+    return int(q.scalar() or 0) >= settings.INSIGHTS_SNAPSHOT_ACTIVITY_THRESHOLD
+
+
+async def _refresh_in_background(tenant_id: str):
+    token = tenancy._BYPASS_TENANT.set(True)
+    try:
+        async with AsyncSessionLocal() as session:
+            await refresh_snapshot(session, tenant_id)
+    except Exception:
+        logger.exception("Failed to refresh insights snapshot for tenant %s", tenant_id)
+    finally:
+        tenancy._BYPASS_TENANT.reset(token)
+        _refreshing.discard(tenant_id)
+
+
+def schedule_refresh(tenant_id: str) -> bool:
+    """Kick off a background rebuild unless one is already running for the
+    tenant in this process. Returns True if a new refresh was scheduled."""
+    if tenant_id in _refreshing:
+        return False
+    _refreshing.add(tenant_id)
+    task = asyncio.create_task(_refresh_in_background(tenant_id))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return True
+
+
+async def refresh_stale_snapshots(force: bool = False) -> int:
+    """Scheduled entry point: rebuild snapshots for every tenant whose
+    snapshot is missing or stale. Returns the number rebuilt."""
+    rebuilt = 0
+    with tenancy.bypass_tenant_context():
+        async with AsyncSessionLocal() as session:
+            tenant_ids = [r[0] for r in (await session.execute(select(Tenant.id))).all()]
+            for tenant_id in tenant_ids:
+                try:
+                    snap = await get_snapshot(session, tenant_id)
+                    if force or snap is None or await is_snapshot_stale(session, snap):
+                        await refresh_snapshot(session, tenant_id)
+                        rebuilt += 1
+                except Exception:
+                    await session.rollback()
+                    logger.exception("Failed to refresh insights snapshot for tenant %s", tenant_id)
+    return rebuilt
@@ -0,0 +1,163 @@
+"""Redemption fulfilment latency rollups.
+
+Completed redemptions feed a per-tenant, per-day t-digest
+(`RedemptionLatencySketch`). Percentiles over any date range are answered by
+merging the daily digests, so the cost of a query depends on the number of
+days requested rather than the number of redemptions.
+"""
+import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.sketches import TDigest
+from app.db.upsert import insert_stmt
+from app.models.redemption_latency import RedemptionLatencySketch
+from app.models.redemptions import Redemption, RedemptionStatus
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _latency_seconds(created_at, completed_at) -> Optional[float]:
+    """Seconds between creation and completion, or None if not computable.
+
+    `created_at` comes back timezone-aware from the DB while `completed_at` is
+    written with a naive `utcnow()`, so both are normalised to naive UTC first.
+    """
+    if not isinstance(created_at, datetime.datetime) or not isinstance(completed_at, datetime.datetime):
+        return None
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    if completed_at.tzinfo is not None:
+        completed_at = completed_at.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    delta = (completed_at - created_at).total_seconds()
+    return delta if delta >= 0 else None
+
+
+async def record_redemption_latency(db: AsyncSession, tenant_id: str, created_at, completed_at) -> bool:
+    """Add one completed redemption to its tenant/day sketch.
+
+    Runs inside the caller's transaction (no commit) so the rollup is updated
+    atomically with the status change. Returns False if the timestamps were
+    unusable and nothing was recorded.
+    """
+    seconds = _latency_seconds(created_at, completed_at)
+    if seconds is None:
+        return False
+    day = completed_at.date()
+
+    # Create the day's row if needed without racing other completions (a
+    # duplicate INSERT would abort the caller's transaction), then lock it:
+    # merging into the digest happens here, not in SQL.
+    insert = await insert_stmt(db, RedemptionLatencySketch)
+    await db.execute(
+        insert.values(tenant_id=str(tenant_id), day=day, sample_count=0, total_seconds=0.0)
+        .on_conflict_do_nothing(index_elements=["tenant_id", "day"])
+    )
+    stmt = (
+        select(RedemptionLatencySketch)
+        .where(RedemptionLatencySketch.tenant_id == str(tenant_id), RedemptionLatencySketch.day == day)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    row = (await db.execute(stmt)).scalar_one()
+
+    digest = TDigest.from_dict(row.digest)
+    digest.add(seconds)
+    # assign a fresh dict so the JSON column is flagged dirty
+    row.digest = digest.to_dict()
+    row.sample_count = int(row.sample_count or 0) + 1
+    row.total_seconds = float(row.total_seconds or 0.0) + seconds
+    await db.flush()
+    return True
+
+
+async def get_latency_quantiles(
+    db: AsyncSession,
+    tenant_id: Optional[str] = None,
+    start_date: Optional[datetime.date] = None,
+    end_date: Optional[datetime.date] = None,
+    quantiles: Iterable[float] = DEFAULT_QUANTILES,
+) -> Dict:
+    """Merge daily sketches in [start_date, end_date] and report percentiles.
+
+    `tenant_id=None` merges across every tenant visible to the session (used by
+    the SUPER_ADMIN aggregate view). Count and mean are exact; percentiles carry
+    the t-digest's approximation error.
+    """
+    stmt = select(
+        RedemptionLatencySketch.sample_count,
+        RedemptionLatencySketch.total_seconds,
+        RedemptionLatencySketch.digest,
+    )
+    if tenant_id is not None:
+        stmt = stmt.where(RedemptionLatencySketch.tenant_id == str(tenant_id))
+    if start_date is not None:
+        stmt = stmt.where(RedemptionLatencySketch.day >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(RedemptionLatencySketch.day <= end_date)
+
+    res = await db.execute(stmt)
+    merged = TDigest()
+    samples = 0
+    total = 0.0
+    for count, seconds, digest in res.all():
+        samples += int(count or 0)
+        total += float(seconds or 0.0)
+        merged.merge(TDigest.from_dict(digest))
+
+    out = {
+        "samples": samples,
+        "average_seconds": (total / samples) if samples else None,
+        "min_seconds": merged.min if samples else None,
+        "max_seconds": merged.max if samples else None,
+    }
+    for q in quantiles:
+        key = f"p{round(q * 100, 1):g}_seconds"
+        out[key] = merged.quantile(q) if samples else None
+    return out
+
+
+async def rebuild_latency_sketches(db: AsyncSession, tenant_id: Optional[str] = None) -> int:
+    """Recompute daily sketches from the redemptions table (backfill/repair).
+
+    Existing sketches in scope are replaced. Rows are streamed so memory stays
+    bounded by the number of distinct tenant/day buckets. Does not commit.
+    """
+    del_stmt = delete(RedemptionLatencySketch)
+    if tenant_id is not None:
+        del_stmt = del_stmt.where(RedemptionLatencySketch.tenant_id == str(tenant_id))
+    await db.execute(del_stmt)
+
+    stmt = select(Redemption.tenant_id, Redemption.created_at, Redemption.completed_at).where(
+        Redemption.status == RedemptionStatus.COMPLETED,
+        Redemption.completed_at.isnot(None),
+    )
+    if tenant_id is not None:
+        stmt = stmt.where(Redemption.tenant_id == str(tenant_id))
+
+    buckets: Dict[tuple, list] = {}
+    result = await db.stream(stmt.execution_options(yield_per=1000))
+    async for t_id, created, completed in result:
+        seconds = _latency_seconds(created, completed)
+        if seconds is None:
+            continue
+        key = (str(t_id), completed.date())
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = [TDigest(), 0, 0.0]
+        bucket[0].add(seconds)
+        bucket[1] += 1
+        bucket[2] += seconds
+
+    for (t_id, day), (digest, count, total) in buckets.items():
+        db.add(RedemptionLatencySketch(
+            tenant_id=t_id,
+            day=day,
+            sample_count=count,
+            total_seconds=total,
+            digest=digest.to_dict(),
+        ))
+    await db.flush()
+    return len(buckets)
@@ -1,11 +1,28 @@
-from datetime import datetime, timedelta
-from sqlalchemy import select, and_, extract
+import asyncio
+import calendar
+import logging
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, insert, and_, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import tenancy
+from app.core.config import settings
 from app.db.session import AsyncSessionLocal
-from app.models.users import User, UserRole
-from app.models.recognition import Recognition, RecognitionStatus
+from app.models.users import User, UserRole, month_day
+from app.models.budgets import DepartmentBudget, BudgetLedger
+from app.models.milestones import Milestone
+from app.models.recognition import Recognition, RecognitionStatus, AwardCategory
+from app.services.department_flow_service import record_recognition_flows
 from app.services.recognition_service import create_recognition, approve_recognition
 
+logger = logging.getLogger(__name__)
+
+MILESTONE_POINTS = 100
+SYSTEM_DEPARTMENT = "System"
+
 class MilestonePayload:
     def __init__(self, nominee_id, points, message, value_tag, badge_id=None, is_public=True):
         self.nominee_id = nominee_id
@@ -15,58 +32,263 @@ class MilestonePayload:
         self.badge_id = badge_id
         self.is_public = is_public
 
-async def process_daily_milestones(db: AsyncSession = None):
+LEAP_DAY = 229
+
+
+def observed_date(value: date, year: int) -> date:
+    """The date `value`'s anniversary is celebrated in `year`.
+
+    Feb 29 falls on Mar 1 in common years.
+    """
+    try:
+        return value.replace(year=year)
+    except ValueError:
+        return date(year, 3, 1)
+
+
+def next_occurrence(value: date, today: date) -> date:
+    """First observed anniversary of `value` on or after `today`."""
+    this_year = observed_date(value, today.year)
+    return this_year if this_year >= today else observed_date(value, today.year + 1)
+
+
+def month_day_window(column, start: date, end: date):
+    """WHERE clause matching MMDD `column` values observed in [start, end].
+
+    A window crossing New Year becomes two ranges; in common years a window
+    containing Mar 1 also matches Feb 29. Uses the (tenant_id, *_md) indexes.
+    """
+    if (end - start).days >= 365:
+        return column.isnot(None)
+    lo, hi = month_day(start), month_day(end)
+    clause = column.between(lo, hi) if lo <= hi else or_(column >= lo, column <= hi)
+    for year in {start.year, end.year}:
+        if not calendar.isleap(year) and start <= date(year, 3, 1) <= end:
+            clause = or_(clause, column == LEAP_DAY)
+            break
+    return clause
+
+
+async def process_daily_milestones(
+    db: AsyncSession = None,
+    today: date = None,
+    session_factory=AsyncSessionLocal,
+    concurrency: int = None,
+) -> dict:
     """
     Check for birthdays and anniversaries today and create system-generated recognitions.
+
+    Celebrants are found with one indexed query and grouped by tenant. Each
+    tenant is awarded in its own transaction with bulk inserts; the nominator
+    is resolved once per run and budgets once per tenant. Without `db`,
+    tenants run concurrently (at most `MILESTONE_MAX_CONCURRENCY`), each with
+    its own session; with `db` they run one after another in that session.
+
+    Safe to re-run: `Milestone` rows record what was granted for the
+    day, so a re-run after a crash only awards what is still missing.
+    Returns a summary.
     """
-    if db is None:
-        async with AsyncSessionLocal() as session:
-            await _process_milestones_logic(session)
+    today = today or datetime.utcnow().date()
+    started = time.perf_counter()
+    summary = {"date": today.isoformat(), "tenants": 0, "awarded": 0, "already_awarded": 0,
+               "skipped_budget": 0, "failed_tenants": []}
+
+    if db is not None:
+        nominator = await _system_nominator(db)
+        celebrants = await _find_celebrants(db, today)
+        for tenant_id, users in celebrants.items():
+            await _run_tenant(db, tenant_id, users, nominator, today, summary)
     else:
-        await _process_milestones_logic(db)
+        async with session_factory() as session:
+            nominator = await _system_nominator(session)
+            celebrants = await _find_celebrants(session, today)
+        slots = asyncio.Semaphore(max(1, concurrency or settings.MILESTONE_MAX_CONCURRENCY))
+
+        async def _worker(tenant_id, users):
+            async with slots:
+                token = tenancy.CURRENT_TENANT.set(tenant_id)
+                try:
+                    async with session_factory() as session:
+                        await _run_tenant(session, tenant_id, users, nominator, today, summary)
+                finally:
+                    tenancy.CURRENT_TENANT.reset(token)
+
+        await asyncio.gather(*(_worker(tid, users) for tid, users in celebrants.items()))
+
+    summary["tenants"] = len(celebrants)
+    summary["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    logger.info("milestones %s", summary)
+    return summary
+
 
 async def _process_milestones_logic(db: AsyncSession):
-    today = datetime.utcnow()
-    month = today.month
-    day = today.day
+    return await process_daily_milestones(db)
+
+
+class _Nominator:
+    """The user system recognitions are sent from, and the budget they draw on."""
+    __slots__ = ("id", "department")
+
+    def __init__(self, id, department):
+        self.id = id
+        self.department = department
 
-    # Find users with milestones today
+
+async def _system_nominator(db: AsyncSession) -> Optional[_Nominator]:
+    # A PLATFORM_OWNER is the "nominator" for system recognitions; without a
+    # department it draws on the optional "System" budget
+    res = await db.execute(
+        select(User.id, User.department).where(User.role == UserRole.PLATFORM_OWNER).limit(1)
+    )
+    row = res.first()
+    return _Nominator(row[0], row[1] or SYSTEM_DEPARTMENT) if row else None
+
+
+async def _find_celebrants(db: AsyncSession, today: date) -> Dict[str, list]:
+    """Active tenant users with a birthday or anniversary observed today, by tenant."""
     # Note: We filter for users with a tenant_id to avoid processing platform admins
-    stmt = select(User).where(
-        and_(
-            User.is_active == True,
-            User.tenant_id != None
+    res = await db.execute(
+        select(
+            User.id, User.tenant_id, User.email, User.full_name, User.department,
+            User.date_of_birth, User.hire_date,
+        ).where(
+            and_(
+                User.is_active == True,
+                User.tenant_id != None,
+                or_(month_day_window(User.birthday_md, today, today), month_day_window(User.hire_md, today, today)),
+            )
         )
     )
-    res = await db.execute(stmt)
-    users = res.scalars().all()
+    by_tenant: Dict[str, list] = {}
+    for row in res.all():
+        by_tenant.setdefault(str(row.tenant_id), []).append(row)
+    return by_tenant
 
+
+def _due_milestones(users: list, today: date) -> List[Tuple[object, str, int]]:
+    due = []
     for user in users:
-        # Check Birthday
-        if user.date_of_birth and user.date_of_birth.month == month and user.date_of_birth.day == day:
-            age = today.year - user.date_of_birth.year
-            await create_system_recognition(db, user, "BIRTHDAY", years=age)
-        
-        # Check Anniversary
-        if user.hire_date and user.hire_date.month == month and user.hire_date.day == day:
+        if user.date_of_birth and observed_date(user.date_of_birth, today.year) == today:
+            due.append((user, "BIRTHDAY", today.year - user.date_of_birth.year))
+        if user.hire_date and observed_date(user.hire_date, today.year) == today:
             years = today.year - user.hire_date.year
             if years > 0:
-                await create_system_recognition(db, user, "ANNIVERSARY", years=years)
+                due.append((user, "ANNIVERSARY", years))
+    return due
 
-    await db.commit()
 
-async def create_system_recognition(db: AsyncSession, user: User, m_type: str, years: int = None):
-    # Find a PLATFORM_OWNER to be the "nominator" for system recognitions
-    system_nominator_stmt = select(User).where(User.role == UserRole.PLATFORM_OWNER).limit(1)
-    nominator_res = await db.execute(system_nominator_stmt)
-    system_nominator = nominator_res.scalar_one_or_none()
-    
-    if not system_nominator:
+async def _run_tenant(db: AsyncSession, tenant_id: str, users: list, nominator, today: date, summary: dict):
+    try:
+        counts = await _award_tenant(db, tenant_id, users, nominator, today)
+        await db.commit()
+    except IntegrityError:
+        # a concurrent run committed the same awards first
+        await db.rollback()
+        logger.warning("milestones for tenant %s already awarded by another run", tenant_id)
+        return
+    except Exception:
+        await db.rollback()
+        logger.exception("milestone awards failed for tenant %s", tenant_id)
+        summary["failed_tenants"].append(tenant_id)
+        return
+    for key, value in counts.items():
+        summary[key] += value
+
+
+async def _award_tenant(db: AsyncSession, tenant_id: str, users: list, nominator, today: date) -> dict:
+    """Create today's milestone recognitions for one tenant. Does not commit."""
+    counts = {"awarded": 0, "already_awarded": 0, "skipped_budget": 0}
+    due = _due_milestones(users, today)
+    if not due:
+        return counts
+
+    res = await db.execute(
+        select(Milestone.user_id, Milestone.type).where(
+            Milestone.tenant_id == tenant_id,
+            Milestone.occurrence_date == today,
+            Milestone.points_processed == True,
+        )
+    )
+    done = {(str(uid), m_type) for uid, m_type in res.all()}
+    pending = [d for d in due if (str(d[0].id), d[1]) not in done]
+    counts["already_awarded"] = len(due) - len(pending)
+
+    def budget_department(user):
         # Fallback to the user themselves if no platform owner exists (unlikely in prod)
-        nominator_id = user.id
-    else:
-        nominator_id = system_nominator.id
+        return nominator.department if nominator else user.department
+
+    departments = {budget_department(user) for user, _, _ in pending} - {None}
+    budgets = {}
+    if departments:
+        res = await db.execute(
+            select(DepartmentBudget).where(
+                DepartmentBudget.tenant_id == tenant_id,
+                DepartmentBudget.department_id.in_(list(departments)),
+            ).with_for_update()
+        )
+        budgets = {b.department_id: b for b in res.scalars().all()}
+
+    recognitions, awards, ledger, flows = [], [], [], []
+    for user, m_type, years in pending:
+        department = budget_department(user)
+        budget = budgets.get(department)
+        if budget is None and department != SYSTEM_DEPARTMENT:
+            logger.warning("no budget for %s milestone of %s (department %s)", m_type, user.email, department)
+            counts["skipped_budget"] += 1
+            continue
+        if budget is not None:
+            if budget.used_amount + MILESTONE_POINTS > budget.allocated_amount:
+                logger.warning("insufficient budget for %s milestone of %s", m_type, user.email)
+                counts["skipped_budget"] += 1
+                continue
+            budget.used_amount += MILESTONE_POINTS
 
+        nominator_id = nominator.id if nominator else user.id
+        message, value_tag = milestone_message(m_type, years, user.full_name, user.department)
+        rec_id = str(uuid.uuid4())
+        recognitions.append({
+            "id": rec_id,
+            "tenant_id": tenant_id,
+            "nominator_id": nominator_id,
+            "nominee_id": user.id,
+            "value_tag": value_tag,
+            "award_category": AwardCategory.ECARD,
+            "points": MILESTONE_POINTS,
+            "points_awarded": MILESTONE_POINTS,
+            "message": message,
+            "is_public": True,
+            "status": RecognitionStatus.APPROVED,
+        })
+        awards.append({
+            "tenant_id": tenant_id,
+            "user_id": user.id,
+            "type": m_type,
+            "occurrence_date": today,
+            "points_processed": True,
+            "recognition_id": rec_id,
+        })
+        if budget is not None:
+            ledger.append({
+                "tenant_id": tenant_id,
+                "department_id": department,
+                "delta_amount": -MILESTONE_POINTS,
+                "reason": "RECOGNITION",
+                "reference_id": rec_id,
+            })
+        flows.append((nominator_id, user.id, MILESTONE_POINTS))
+
+    if recognitions:
+        await db.execute(insert(Recognition), recognitions)
+        await db.execute(insert(Milestone), awards)
+        if ledger:
+            await db.execute(insert(BudgetLedger), ledger)
+        await record_recognition_flows(db, tenant_id, flows)
+    counts["awarded"] = len(recognitions)
+    return counts
+
+
+def milestone_message(m_type: str, years: Optional[int], full_name: str, department: Optional[str]) -> Tuple[str, str]:
+    """(message, value_tag) for a BIRTHDAY or ANNIVERSARY recognition."""
     # Add ordinal suffix (1st, 2nd, 3rd, etc.)
     ordinal = "th"
     if years:
@@ -77,16 +299,32 @@ async def create_system_recognition(db: AsyncSession, user: User, m_type: str, y
 
     if m_type == "BIRTHDAY":
         age_str = f" {years}{ordinal}" if years else ""
-        message = f"Happy{age_str} Birthday, {user.full_name}! 🎂 We're so glad to have you on the team. Wishing you a wonderful year ahead!"
+        message = f"Happy{age_str} Birthday, {full_name}! 🎂 We're so glad to have you on the team. Wishing you a wonderful year ahead!"
         value_tag = "Community"
     else:
         years_str = f"{years}{ordinal}" if years else f"{years}"
-        message = f"Happy {years_str} Work Anniversary, {user.full_name}! 🎉 Thank you for your incredible contribution to {user.department or 'the company'} over the years."
+        message = f"Happy {years_str} Work Anniversary, {full_name}! 🎉 Thank you for your incredible contribution to {department or 'the company'} over the years."
         value_tag = "Legacy"
+    return message, value_tag
+
+
+async def create_system_recognition(db: AsyncSession, user: User, m_type: str, years: int = None):
+    """Create and approve a single milestone recognition outside the daily job."""
+    # Find a PLATFORM_OWNER to be the "nominator" for system recognitions
+    system_nominator_stmt = select(User).where(User.role == UserRole.PLATFORM_OWNER).limit(1)
+    nominator_res = await db.execute(system_nominator_stmt)
+    system_nominator = nominator_res.scalar_one_or_none()
+    
+    if not system_nominator:
+        # Fallback to the user themselves if no platform owner exists (unlikely in prod)
+        nominator_id = user.id
+    else:
+        nominator_id = system_nominator.id
 
+    message, value_tag = milestone_message(m_type, years, user.full_name, user.department)
     payload = MilestonePayload(
         nominee_id=user.id,
-        points=100, # Reward them with 100 points for their milestone
+        points=MILESTONE_POINTS, # Reward them with 100 points for their milestone
         message=message,
         value_tag=value_tag,
         is_public=True
@@ -4,11 +4,14 @@ from uuid import uuid4
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.services.email_outbox import enqueue_email
+
 logger = logging.getLogger(__name__)
 
 
 def send_recognition_email(tenant_id: str, to_email: str, subject: str, html_body: str):
-    """Best-effort email sender. If SMTP_* environment variables are configured it will
+    """Synchronous best-effort sender kept for scripts; request handlers should
+    use `enqueue_email` so delivery happens in the outbox worker. If SMTP_* environment variables are configured it will
     attempt to send via SMTP, otherwise it will write a notification file under uploads/.
     """
     try:
@@ -61,7 +64,7 @@ class NotificationService:
         approval_request,
     ):
         """
-        Send notification when approval request is approved.
+        Queue notification when approval request is approved.
         Includes QR code for the user to save/print.
         """
         try:
@@ -91,14 +94,16 @@ class NotificationService:
             <p>See you at the event!</p>
             """
 
-            send_recognition_email(
+            # committed together with the approval by the caller
+            enqueue_email(
+                db,
                 tenant_id=approval_request.tenant_id,
                 to_email=user.email,
                 subject=subject,
                 html_body=html_body,
             )
 
-            logger.info(f"Sent approval notification to {user.email}")
+            logger.info(f"Queued approval notification to {user.email}")
 
         except Exception as e:
             logger.exception(f"Failed to send approval notification: {e}")
@@ -110,7 +115,7 @@ class NotificationService:
         alternatives: Optional[List] = None,
     ):
         """
-        Send notification when approval request is declined.
+        Queue notification when approval request is declined.
         Includes alternative event options the user can join instead.
         """
         try:
@@ -149,14 +154,16 @@ class NotificationService:
             <p>Visit the Event Studio to explore other opportunities!</p>
             """
 
-            send_recognition_email(
+            # committed together with the decline by the caller
+            enqueue_email(
+                db,
                 tenant_id=approval_request.tenant_id,
                 to_email=user.email,
                 subject=subject,
                 html_body=html_body,
             )
 
-            logger.info(f"Sent decline notification to {user.email}")
+            logger.info(f"Queued decline notification to {user.email}")
 
         except Exception as e:
             logger.exception(f"Failed to send decline notification: {e}")
@@ -6,6 +6,7 @@ from app.models.points_ledger import PointsLedger
 from app.models.budgets import DepartmentBudget, BudgetLedger
 from uuid import UUID
 from app.models.recognition import RecognitionStatus
+from app.services.department_flow_service import record_recognition_flow
 from sqlalchemy import select, func
 import os
 from uuid import uuid4
@@ -180,5 +181,7 @@ async def approve_recognition(db: AsyncSession, tenant_id: str, recognition_id:
         )
         db.add(budget_ledger)
 
+    await record_recognition_flow(db, tenant_id, rec.nominator_id, rec.nominee_id, rec.points)
+
     await db.flush()
     return rec
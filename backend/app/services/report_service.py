@@ -3,6 +3,7 @@ Report Service for Phase 6: Export analytics as CSV/PDF
 Generates distribution logs, participation reports, budget reconciliation
 """
 
+import logging
 from typing import Dict, List, BinaryIO
 from io import StringIO, BytesIO
 import csv
@@ -12,7 +13,8 @@ from sqlalchemy import select
 
 from app.models.events import Event
 from app.models.approvals import ApprovalRequest, ApprovalStatus
-from app.core.logging import logger
+
+logger = logging.getLogger(__name__)
 
 
 class ReportService:
@@ -3,6 +3,7 @@ Scanner Service for Phase 5: Day-of-Event Logistics
 Handles QR code verification and gift distribution at events
 """
 
+import logging
 from typing import Optional, Dict, List
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,8 +13,8 @@ from decimal import Decimal
 from app.models.approvals import ApprovalRequest, ApprovalStatus
 from app.models.events import Event, EventOption
 from app.models.users import User
-from app.db.utils import generate_id
-from app.core.logging import logger
+
+logger = logging.getLogger(__name__)
 
 
 class ScannerService:
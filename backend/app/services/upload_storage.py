@@ -0,0 +1,123 @@
+"""Content-addressed storage for user uploads.
+
+`store_upload` streams an `UploadFile` to a temporary file in
+`UPLOAD_CHUNK_BYTES` chunks, hashing as it goes and aborting as soon as the
+size limit is crossed, so a request never holds a whole upload in memory
+and oversized files are rejected without being written in full. Disk
+writes run in worker threads to keep the event loop free.
+
+Partial files live in `UPLOAD_TMP_DIR`, outside the directory served at
+/uploads. The finished file is renamed to
+`<UPLOAD_DIR>/<subdir>/<sha[:2]>/<sha><ext>`. If that path already exists
+the same bytes were uploaded before and the temporary copy is dropped, so a
+popular e-card image or gift photo is stored once however many times it is
+uploaded.
+"""
+import asyncio
+import hashlib
+import os
+import re
+from typing import NamedTuple, Optional
+from uuid import uuid4
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+
+_EXTENSION = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+
+class UploadTooLarge(ValueError):
+    def __init__(self, limit: int):
+        super().__init__(f"File size exceeds {limit // (1024 * 1024)}MB limit")
+        self.limit = limit
+
+
+class StoredUpload(NamedTuple):
+    key: str  # path relative to the subdir, e.g. "ab/ab12...ef.png"
+    url: str
+    sha256: str
+    size: int
+    content_type: Optional[str]
+    deduplicated: bool
+
+
+def safe_extension(filename: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if _EXTENSION.match(ext) else ""
+
+
+def upload_path(*parts: str) -> str:
+    return os.path.join(settings.UPLOAD_DIR, *parts)
+
+
+def public_url(*parts: str) -> str:
+    return "/uploads/" + "/".join(p.strip("/") for p in parts if p)
+
+
+def _tmp_dir() -> str:
+    return settings.UPLOAD_TMP_DIR or os.path.normpath(settings.UPLOAD_DIR) + ".tmp"
+
+
+def _open_temp():
+    tmp_dir = _tmp_dir()
+    os.makedirs(tmp_dir, exist_ok=True)
+    path = os.path.join(tmp_dir, f"{uuid4().hex}.part")
+    return path, open(path, "wb")
+
+
+def _discard(fh, path: str) -> None:
+    fh.close()
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _commit(fh, tmp_path: str, final_path: str) -> bool:
+    """Move the temp file into place. Returns True when the content was
+    already stored."""
+    fh.close()
+    if os.path.exists(final_path):
+        os.remove(tmp_path)
+        return True
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(tmp_path, final_path)
+    return False
+
+
+async def store_upload(
+    file: UploadFile,
+    subdir: str = "media",
+    max_bytes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> StoredUpload:
+    """Stream `file` into content-addressed storage under `subdir`.
+
+    Raises `UploadTooLarge` once more than `max_bytes` have been received
+    (default `UPLOAD_MAX_BYTES`); nothing is left on disk in that case.
+    """
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_BYTES
+    digest = hashlib.sha256()
+    size = 0
+
+    tmp_path, fh = await asyncio.to_thread(_open_temp)
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            digest.update(chunk)
+            await asyncio.to_thread(fh.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(_discard, fh, tmp_path)
+        raise
+
+    sha = digest.hexdigest()
+    key = f"{sha[:2]}/{sha}{safe_extension(file.filename)}"
+    existed = await asyncio.to_thread(_commit, fh, tmp_path, upload_path(subdir, key))
+    return StoredUpload(key, public_url(subdir, key), sha, size, file.content_type, existed)
@@ -0,0 +1,368 @@
+"""
+Year-in-review analytics: tenant-wide aggregation across many events.
+
+Per-event aggregates are computed with grouped queries over
+`approval_requests` / `event_options` and cached as `EventAnalyticsRollup`
+rows. Each request re-fingerprints the events in range with a single grouped
+query and only recomputes the events whose fingerprint changed, so a year
+with dozens of finished events costs a handful of queries.
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select, func, distinct
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.upsert import insert_stmt
+from app.models.approvals import ApprovalRequest, ApprovalStatus
+from app.models.event_rollups import EventAnalyticsRollup
+from app.models.events import Event, EventOption
+from app.models.users import User
+
+logger = logging.getLogger(__name__)
+
+
+def _num(value) -> float:
+    if value is None:
+        return 0.0
+    if isinstance(value, Decimal):
+        return float(value)
+    return float(value)
+
+
+def _iso(value) -> Optional[str]:
+    # aggregates like MAX() lose the column type on some backends (sqlite)
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+def _status_name(value) -> str:
+    return value.value if hasattr(value, "value") else str(value)
+
+
+def _rate(part: float, whole: float) -> float:
+    return round(part / whole * 100, 1) if whole else 0.0
+
+
+class YearInReviewService:
+    """Aggregates participation, spend and collection across a tenant's events"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_year_in_review(
+        self,
+        tenant_id: str,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        force: bool = False,
+    ) -> Dict:
+        """
+        Aggregate every event whose `event_date` falls in [start_date, end_date].
+
+        Returns:
+            {
+                "start_date", "end_date",
+                "totals": {events, budget, spend, approved, collected,
+                           collection_rate, unique_participants,
+                           active_employees, participation_rate},
+                "by_department": [...],
+                "by_event_type": [...],
+                "by_month": [...],
+                "events": [...per-event rollups...],
+                "cache": {"events": int, "recomputed": int},
+            }
+        """
+        events = await self._load_events(tenant_id, start_date, end_date)
+        event_ids = [e["event_id"] for e in events]
+
+        status_rows = await self._status_rows(tenant_id, event_ids)
+        fingerprints = {
+            e["event_id"]: self._fingerprint(e, status_rows.get(e["event_id"], []))
+            for e in events
+        }
+
+        cached = await self._load_rollups(tenant_id, event_ids)
+        stale = [
+            eid for eid in event_ids
+            if force or eid not in cached or cached[eid].fingerprint != fingerprints[eid]
+        ]
+        fresh: Dict[str, Dict] = {}
+        if stale:
+            stale_ids = set(stale)
+            fresh = await self._compute_rollups(
+                tenant_id,
+                [e for e in events if e["event_id"] in stale_ids],
+                status_rows,
+            )
+            now = datetime.datetime.now(datetime.timezone.utc)
+            # upsert: concurrent requests for the same period may both find
+            # a rollup missing and write it
+            for eid, payload in fresh.items():
+                insert = await insert_stmt(self.db, EventAnalyticsRollup)
+                await self.db.execute(
+                    insert.values(
+                        tenant_id=str(tenant_id),
+                        event_id=eid,
+                        payload=payload,
+                        fingerprint=fingerprints[eid],
+                        computed_at=now,
+                    ).on_conflict_do_update(
+                        index_elements=["tenant_id", "event_id"],
+                        set_={
+                            "payload": insert.excluded.payload,
+                            "fingerprint": insert.excluded.fingerprint,
+                            "computed_at": insert.excluded.computed_at,
+                        },
+                    )
+                )
+            await self.db.commit()
+
+        rollups = [fresh[eid] if eid in fresh else cached[eid].payload for eid in event_ids]
+        report = self._aggregate(rollups)
+        report["totals"].update(await self._participation(tenant_id, event_ids))
+        report.update({
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "cache": {"events": len(event_ids), "recomputed": len(stale)},
+        })
+        return report
+
+    # ------------------------------------------------------------------
+    # queries
+    # ------------------------------------------------------------------
+    async def _load_events(self, tenant_id: str, start_date: datetime.date, end_date: datetime.date) -> List[Dict]:
+        start = datetime.datetime.combine(start_date, datetime.time.min)
+        end = datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time.min)
+        result = await self.db.execute(
+            select(
+                Event.id,
+                Event.name,
+                Event.event_type,
+                Event.event_date,
+                Event.event_budget_amount,
+                Event.budget_committed,
+            )
+            .where(Event.tenant_id == tenant_id, Event.event_date >= start, Event.event_date < end)
+            .order_by(Event.event_date)
+        )
+        return [
+            {
+                "event_id": eid,
+                "event_name": name,
+                "event_type": _status_name(etype) if etype is not None else None,
+                "event_date": _iso(edate),
+                "total_budget": _num(budget),
+                "budget_committed": _num(committed),
+            }
+            for eid, name, etype, edate, budget, committed in result.all()
+        ]
+
+    async def _status_rows(self, tenant_id: str, event_ids: List[str]) -> Dict[str, List[tuple]]:
+        """Per event, per status: counts, sums and latest activity timestamps.
+
+        Doubles as the change fingerprint: any new request, decision,
+        cancellation or collection moves one of these values.
+        """
+        if not event_ids:
+            return {}
+        result = await self.db.execute(
+            select(
+                ApprovalRequest.event_id,
+                ApprovalRequest.status,
+                func.count(ApprovalRequest.id),
+                func.coalesce(func.sum(ApprovalRequest.is_collected), 0),
+                func.coalesce(func.sum(ApprovalRequest.estimated_cost), 0),
+                func.max(ApprovalRequest.created_at),
+                func.max(ApprovalRequest.approved_at),
+                func.max(ApprovalRequest.declined_at),
+                func.max(ApprovalRequest.collected_at),
+            )
+            .where(ApprovalRequest.tenant_id == tenant_id, ApprovalRequest.event_id.in_(event_ids))
+            .group_by(ApprovalRequest.event_id, ApprovalRequest.status)
+        )
+        rows: Dict[str, List[tuple]] = {}
+        for eid, st, count, collected, cost, created, approved, declined, coll_at in result.all():
+            rows.setdefault(eid, []).append((
+                _status_name(st), int(count), int(collected or 0), _num(cost),
+                _iso(created), _iso(approved), _iso(declined), _iso(coll_at),
+            ))
+        for eid in rows:
+            rows[eid].sort()
+        return rows
+
+    @staticmethod
+    def _fingerprint(event: Dict, status_rows: List[tuple]) -> str:
+        raw = json.dumps([event, status_rows], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def _load_rollups(self, tenant_id: str, event_ids: List[str]) -> Dict[str, EventAnalyticsRollup]:
+        if not event_ids:
+            return {}
+        result = await self.db.execute(
+            select(EventAnalyticsRollup).where(
+                EventAnalyticsRollup.tenant_id == tenant_id,
+                EventAnalyticsRollup.event_id.in_(event_ids),
+            )
+        )
+        return {r.event_id: r for r in result.scalars().all()}
+
+    async def _compute_rollups(self, tenant_id: str, events: List[Dict], status_rows: Dict[str, List[tuple]]) -> Dict[str, Dict]:
+        event_ids = [e["event_id"] for e in events]
+        approved = (
+            ApprovalRequest.tenant_id == tenant_id,
+            ApprovalRequest.event_id.in_(event_ids),
+            ApprovalRequest.status == ApprovalStatus.APPROVED,
+        )
+
+        dept_result = await self.db.execute(
+            select(
+                ApprovalRequest.event_id,
+                User.department,
+                func.count(ApprovalRequest.id),
+                func.coalesce(func.sum(ApprovalRequest.is_collected), 0),
+                func.coalesce(func.sum(ApprovalRequest.estimated_cost), 0),
+            )
+            .join(User, User.id == ApprovalRequest.user_id)
+            .where(*approved)
+            .group_by(ApprovalRequest.event_id, User.department)
+        )
+        by_dept: Dict[str, Dict[str, Dict]] = {}
+        for eid, dept, count, collected, cost in dept_result.all():
+            dept = dept or "Unassigned"
+            entry = by_dept.setdefault(eid, {}).setdefault(dept, {"approved": 0, "collected": 0, "spend": 0.0})
+            entry["approved"] += int(count)
+            entry["collected"] += int(collected or 0)
+            entry["spend"] += _num(cost)
+
+        opt_result = await self.db.execute(
+            select(
+                ApprovalRequest.event_id,
+                EventOption.id,
+                EventOption.option_name,
+                EventOption.cost_per_unit,
+                func.count(ApprovalRequest.id),
+                func.coalesce(func.sum(ApprovalRequest.is_collected), 0),
+                func.coalesce(func.sum(ApprovalRequest.estimated_cost), 0),
+            )
+            .join(EventOption, EventOption.id == ApprovalRequest.event_option_id)
+            .where(*approved)
+            .group_by(ApprovalRequest.event_id, EventOption.id, EventOption.option_name, EventOption.cost_per_unit)
+        )
+        by_option: Dict[str, List[Dict]] = {}
+        for eid, oid, oname, unit_cost, count, collected, cost in opt_result.all():
+            by_option.setdefault(eid, []).append({
+                "option_id": oid,
+                "option_name": oname,
+                "cost_per_unit": _num(unit_cost) if unit_cost is not None else None,
+                "approved": int(count),
+                "collected": int(collected or 0),
+                "spend": _num(cost),
+            })
+
+        out = {}
+        for event in events:
+            eid = event["event_id"]
+            requests = {name: count for name, count, *_ in status_rows.get(eid, [])}
+            approved_row = next((r for r in status_rows.get(eid, []) if r[0] == ApprovalStatus.APPROVED.value), None)
+            approved_count = approved_row[1] if approved_row else 0
+            collected = approved_row[2] if approved_row else 0
+            spend = approved_row[3] if approved_row else 0.0
+            out[eid] = {
+                **event,
+                "requests": requests,
+                "approved": approved_count,
+                "collected": collected,
+                "collection_rate": _rate(collected, approved_count),
+                "spend": round(spend, 2),
+                "budget_utilization": _rate(spend, event["total_budget"]),
+                "by_department": [
+                    {"department": d, **v} for d, v in sorted(by_dept.get(eid, {}).items())
+                ],
+                "by_option": sorted(by_option.get(eid, []), key=lambda o: -o["approved"]),
+            }
+        return out
+
+    async def _participation(self, tenant_id: str, event_ids: List[str]) -> Dict:
+        unique = 0
+        if event_ids:
+            result = await self.db.execute(
+                select(func.count(distinct(ApprovalRequest.user_id))).where(
+                    ApprovalRequest.tenant_id == tenant_id,
+                    ApprovalRequest.event_id.in_(event_ids),
+                    ApprovalRequest.status == ApprovalStatus.APPROVED,
+                )
+            )
+            unique = int(result.scalar() or 0)
+        result = await self.db.execute(
+            select(func.count(User.id)).where(User.tenant_id == tenant_id, User.is_active == True)
+        )
+        active = int(result.scalar() or 0)
+        return {
+            "unique_participants": unique,
+            "active_employees": active,
+            "participation_rate": _rate(unique, active),
+        }
+
+    # ------------------------------------------------------------------
+    # aggregation of cached rollups
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _aggregate(rollups: Iterable[Dict]) -> Dict:
+        rollups = list(rollups)
+        totals = {"events": len(rollups), "budget": 0.0, "spend": 0.0, "approved": 0, "collected": 0}
+        departments: Dict[str, Dict] = {}
+        event_types: Dict[str, Dict] = {}
+        months: Dict[str, Dict] = {}
+
+        for r in rollups:
+            totals["budget"] += r["total_budget"]
+            totals["spend"] += r["spend"]
+            totals["approved"] += r["approved"]
+            totals["collected"] += r["collected"]
+
+            for d in r["by_department"]:
+                entry = departments.setdefault(d["department"], {"approved": 0, "collected": 0, "spend": 0.0, "events": 0})
+                entry["approved"] += d["approved"]
+                entry["collected"] += d["collected"]
+                entry["spend"] += d["spend"]
+                entry["events"] += 1
+
+            etype = r.get("event_type") or "UNKNOWN"
+            entry = event_types.setdefault(etype, {"events": 0, "approved": 0, "collected": 0, "spend": 0.0})
+            entry["events"] += 1
+            entry["approved"] += r["approved"]
+            entry["collected"] += r["collected"]
+            entry["spend"] += r["spend"]
+
+            month = (r.get("event_date") or "")[:7] or "unknown"
+            entry = months.setdefault(month, {"events": 0, "approved": 0, "collected": 0, "spend": 0.0})
+            entry["events"] += 1
+            entry["approved"] += r["approved"]
+            entry["collected"] += r["collected"]
+            entry["spend"] += r["spend"]
+
+        totals["budget"] = round(totals["budget"], 2)
+        totals["spend"] = round(totals["spend"], 2)
+        totals["collection_rate"] = _rate(totals["collected"], totals["approved"])
+        totals["budget_utilization"] = _rate(totals["spend"], totals["budget"])
+
+        def _rows(groups: Dict[str, Dict], key: str) -> List[Dict]:
+            return [
+                {key: k, **v, "spend": round(v["spend"], 2), "collection_rate": _rate(v["collected"], v["approved"])}
+                for k, v in sorted(groups.items())
+            ]
+
+        return {
+            "totals": totals,
+            "by_department": _rows(departments, "department"),
+            "by_event_type": _rows(event_types, "event_type"),
+            "by_month": _rows(months, "month"),
+            "events": rollups,
+        }
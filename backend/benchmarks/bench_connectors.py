@@ -0,0 +1,117 @@
+"""Benchmark the directory connectors against the local fake provider.
+
+Serves a synthetic directory of N users on a local socket (uvicorn) with an
+artificial per-request latency and measures how fast each connector streams
+it, optionally also writing it through `sync_users`.
+
+Usage (from backend/):
+    python -m benchmarks.bench_connectors --users 20000 --latency 0.02
+    python -m benchmarks.bench_connectors --users 20000 --throttle-every 25 --sync
+
+Compare `--prefetch 0`/`--concurrency 1` with the defaults to see the effect
+of page prefetch and parallel offset fetches.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+import app.models  # noqa: F401  (register all tables)
+from app.models.tenants import Tenant
+from app.integrations import okta, azure_ad, workday
+from app.integrations.http_client import close_http_client
+from app.jobs.user_sync import sync_users, _mapped
+from benchmarks.fake_provider import build_fake_provider_app, serve_fake_provider, synthetic_directory
+
+
+def _clients(base: str, page_size: int, prefetch_depth: int, concurrency: int):
+    return {
+        "okta": (okta.OktaClient(base, "token", page_size=page_size, prefetch_depth=prefetch_depth).fetch_users,
+                 okta.map_to_local),
+        "azure_ad": (azure_ad.AzureADClient("bench", "cid", "secret", page_size=page_size,
+                                            prefetch_depth=prefetch_depth, login_url=base, graph_url=base).fetch_users,
+                     azure_ad.map_to_local),
+        "workday": (workday.WorkdayClient(base, "key", page_size=page_size, concurrency=concurrency).fetch_employees,
+                    workday.map_to_local),
+    }
+
+
+async def _count(source) -> int:
+    n = 0
+    async for _ in source:
+        n += 1
+    return n
+
+
+async def _sync(db_url, provider, fetch, mapper):
+    tmp = None
+    if not db_url:
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        db_url = f"sqlite+aiosqlite:///{tmp.name}"
+    engine = create_async_engine(db_url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as session:
+            tenant = Tenant(name=f"Bench {provider}", subdomain=f"bench-{uuid.uuid4().hex[:8]}")
+            session.add(tenant)
+            await session.commit()
+            tenant_id = tenant.id
+        started = time.perf_counter()
+        summary = await sync_users(tenant_id, provider, _mapped(fetch(), mapper), session_factory=session_factory)
+        elapsed = time.perf_counter() - started
+    finally:
+        await engine.dispose()
+        if tmp is not None:
+            os.unlink(tmp.name)
+    return summary["fetched"], elapsed, f"  inserted={summary['inserted']} managers_linked={summary['managers_linked']}"
+
+
+async def main(args):
+    users = synthetic_directory(args.users)
+    app = build_fake_provider_app(users, max_page_size=args.page_size, latency=args.latency,
+                                  throttle_every=args.throttle_every)
+    server, task = await serve_fake_provider(app, port=args.port)
+    base = f"http://127.0.0.1:{args.port}"
+
+    try:
+        for name, (fetch, mapper) in _clients(base, args.page_size, args.prefetch, args.concurrency).items():
+            before = app.state.stats["requests"]
+            if args.sync:
+                # the same directory is served to every provider, so each gets its own database
+                fetched, elapsed, extra = await _sync(args.db, name, fetch, mapper)
+            else:
+                started = time.perf_counter()
+                fetched = await _count(fetch())
+                elapsed = time.perf_counter() - started
+                extra = ""
+            print(
+                f"{name:<9} {fetched:>7} users {elapsed:7.2f}s {fetched / elapsed:9.0f} users/s  "
+                f"requests={app.state.stats['requests'] - before}{extra}"
+            )
+        print(f"throttled responses: {app.state.stats['throttled']}")
+    finally:
+        await close_http_client()
+        server.should_exit = True
+        await task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every provider request")
+    parser.add_argument("--throttle-every", type=int, default=0, help="answer every n-th request with 429")
+    parser.add_argument("--prefetch", type=int, default=2, help="cursor pages fetched ahead (Okta/Azure AD)")
+    parser.add_argument("--concurrency", type=int, default=4, help="parallel offset pages (Workday)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sync", action="store_true", help="also write users through sync_users")
+    parser.add_argument("--db", default=None, help="database URL (default: a temporary SQLite file per provider)")
+    asyncio.run(main(parser.parse_args()))
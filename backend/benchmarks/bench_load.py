@@ -0,0 +1,331 @@
+"""End-to-end load test for the hot API paths.
+
+Boots the app in-process against a local database (or drives a running
+server with --url), loads a synthetic dataset from `benchmarks.dataset` at
+--preset scale, then runs a weighted mix of realistic requests from
+--concurrency virtual users for --duration seconds.
+Per scenario it reports throughput, error rate and p50/p95/p99 latency.
+
+Results can be written as JSON (--out) and compared with an earlier result
+(--baseline). A scenario regresses when its p95 grows, or its throughput
+drops, by more than --tolerance; the process then exits with status 1 so the
+run can gate CI.
+
+Usage (from backend/):
+    python -m benchmarks.bench_load --duration 30 --concurrency 32
+    python -m benchmarks.bench_load --preset medium --out load.json
+    python -m benchmarks.bench_load --baseline load.json --tolerance 0.2
+    python -m benchmarks.bench_load --scenarios wall_feed,balance --url http://localhost:18000
+
+Latencies measured in-process include the ASGI client but not the network;
+compare runs made the same way.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+# name -> (weight, builder); builders return (method, path, role, json body)
+SCENARIOS = {}
+
+
+def scenario(name: str, weight: int):
+    def register(fn):
+        SCENARIOS[name] = (weight, fn)
+        return fn
+    return register
+
+
+@scenario("recognition_create", 10)
+def _recognition_create(tenant, rng):
+    nominee = rng.choice(tenant["users"])
+    return "POST", "/recognition/", "user", {"nominee_id": nominee, "message": "Thanks for the help on the release"}
+
+
+@scenario("give_check", 5)
+def _give_check(tenant, rng):
+    nominee = rng.choice(tenant["users"])
+    return "POST", "/recognition/give-check", "lead", {
+        "nominee_id": nominee, "award_category": "BRONZE", "message": "Great launch",
+    }
+
+
+@scenario("wall_feed", 25)
+def _wall_feed(tenant, rng):
+    return "GET", "/recognition/feed?limit=50", "user", None
+
+
+@scenario("balance", 20)
+def _balance(tenant, rng):
+    return "GET", "/user/points", "user", None
+
+
+@scenario("redemption", 5)
+def _redemption(tenant, rng):
+    return "POST", "/user/redeem", "user", {"reward_id": rng.choice(tenant["rewards"])}
+
+
+@scenario("qr_scan", 10)
+def _qr_scan(tenant, rng):
+    return "POST", "/scanner/verify", "admin", {"qr_token": rng.choice(tenant["qr_tokens"]), "event_id": tenant["event_id"]}
+
+
+@scenario("scanner_dashboard", 5)
+def _scanner_dashboard(tenant, rng):
+    return "GET", f"/scanner/event/{tenant['event_id']}/dashboard", "admin", None
+
+
+@scenario("tenant_dashboard", 5)
+def _tenant_dashboard(tenant, rng):
+    return "GET", "/tenant/dashboard", "admin", None
+
+
+@scenario("dashboard_stats", 5)
+def _dashboard_stats(tenant, rng):
+    return "GET", "/dashboard/stats", "admin", None
+
+
+@scenario("platform_overview", 2)
+def _platform_overview(tenant, rng):
+    return "GET", "/platform/overview", "platform", None
+
+
+@scenario("admin_stats", 2)
+def _admin_stats(tenant, rng):
+    return "GET", "/admin/stats", "platform", None
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarise(samples, elapsed: float) -> dict:
+    """samples: {scenario: [(latency_seconds, status)]} -> per-scenario stats
+    with latencies in milliseconds. Status 0 means the request raised."""
+    out = {}
+    for name, rows in sorted(samples.items()):
+        latencies = sorted(latency for latency, _ in rows)
+        statuses = Counter(str(status) for _, status in rows)
+        errors = sum(n for status, n in statuses.items() if status == "0" or status.startswith("5"))
+        out[name] = {
+            "requests": len(rows),
+            "throughput_rps": round(len(rows) / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            "statuses": dict(sorted(statuses.items())),
+        }
+    return out
+
+
+def compare(current: dict, baseline: dict, tolerance: float, min_requests: int = 50) -> list:
+    """Rows of (scenario, metric, baseline, current, change, regressed) for
+    scenarios present in both results. Scenarios with fewer than
+    `min_requests` samples in either run are shown but never flagged."""
+    rows = []
+    for name, now in current.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        enough = min(now["requests"], before["requests"]) >= min_requests
+        for metric, higher_is_worse in (("p95_ms", True), ("p99_ms", True), ("throughput_rps", False)):
+            old, new = before.get(metric) or 0.0, now.get(metric) or 0.0
+            change = (new - old) / old if old else 0.0
+            regressed = change > tolerance if higher_is_worse else change < -tolerance
+            # p99 is reported for context; it is too noisy to gate on
+            rows.append((name, metric, old, new, change, enough and regressed and metric != "p99_ms"))
+        # new failures are a regression regardless of sample size
+        old, new = before.get("error_rate", 0.0), now.get("error_rate", 0.0)
+        rows.append((name, "error_%", old * 100, new * 100, new - old, new - old > 0.01))
+    return rows
+
+
+def _print_results(results: dict, elapsed: float) -> None:
+    print(f"{'scenario':<20} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for name, r in results.items():
+        print(
+            f"{name:<20} {r['requests']:7d} {r['throughput_rps']:8.1f} {r['error_rate'] * 100:6.1f} "
+            f"{r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['p99_ms']:8.1f}  {r['statuses']}"
+        )
+    total = sum(r["requests"] for r in results.values())
+    print(f"{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} rps)")
+
+
+def _print_comparison(rows) -> bool:
+    print(f"\n{'scenario':<20} {'metric':<15} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, metric, old, new, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<20} {metric:<15} {old:10.1f} {new:10.1f} {change * 100:+7.1f}%{flag}")
+    return any(row[-1] for row in rows)
+
+
+def _tokens(dataset: dict) -> dict:
+    from app.core.auth import create_access_token
+
+    def token(sub, tenant_id, role):
+        return {"Authorization": f"Bearer {create_access_token({'sub': sub, 'tenant_id': tenant_id, 'role': role})}"}
+
+    platform = token(dataset["platform_owner"], None, "PLATFORM_OWNER")
+    for tenant in dataset["tenants"]:
+        # scenarios use the tenant's first event and the shared reward catalog
+        tenant["event_id"] = tenant["events"][0]["id"]
+        tenant["qr_tokens"] = tenant["events"][0]["qr_tokens"]
+        tenant["rewards"] = dataset["rewards"]
+        tenant["headers"] = {
+            "admin": token(tenant["admin"], tenant["id"], "TENANT_ADMIN"),
+            "lead": token(tenant["lead"], tenant["id"], "TENANT_LEAD"),
+            "platform": platform,
+            # a handful of signed-in users per tenant is enough to spread row locks
+            "user": [token(u, tenant["id"], "CORPORATE_USER") for u in tenant["users"][:20]],
+        }
+    return dataset
+
+
+async def drive(client, dataset: dict, names, concurrency: int, duration: float, warmup: float, seed_value: int):
+    weights = [SCENARIOS[n][0] for n in names]
+    samples = defaultdict(list)
+    started = time.perf_counter()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+
+    async def worker(index: int):
+        rng = random.Random(seed_value * 1000 + index)
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            name = rng.choices(names, weights)[0]
+            tenant = rng.choice(dataset["tenants"])
+            method, path, role, body = SCENARIOS[name][1](tenant, rng)
+            headers = tenant["headers"][role]
+            if isinstance(headers, list):
+                headers = rng.choice(headers)
+            t0 = time.perf_counter()
+            try:
+                resp = await client.request(method, path, headers=headers, json=body)
+                status = resp.status_code
+            except Exception:
+                status = 0
+            t1 = time.perf_counter()
+            if t0 >= measure_from:
+                samples[name].append((t1 - t0, status))
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return samples, time.perf_counter() - measure_from
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+async def main(args) -> int:
+    os.environ["DATABASE_URL"] = args.db
+    # the benchmark creates the schema itself; workers boot as in production
+    os.environ.setdefault("STARTUP_PROFILE", "production")
+
+    import httpx
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.db.base import Base
+    import app.models  # noqa: F401  (register all tables)
+
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()] if args.scenarios else list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    engine = create_async_engine(args.db)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    from benchmarks.dataset import PRESETS, generate
+
+    scale = PRESETS[args.preset]._replace(**{k: v for k, v in (("tenants", args.tenants), ("users", args.users)) if v})
+    manifest = await generate(engine, scale, seed=args.seed)
+    await engine.dispose()
+    dataset = _tokens(manifest)
+    print(f"seeded {sum(manifest['rows'].values())} rows ({scale.tenants} tenants, {scale.users} users) "
+          f"in {manifest['seconds']:.1f}s")
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30)
+        application = None
+    else:
+        from app.main import app as application
+
+        await application.router.startup()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=application, raise_app_exceptions=False), base_url="http://bench", timeout=30)
+    try:
+        samples, elapsed = await drive(client, dataset, names, args.concurrency, args.duration, args.warmup, args.seed)
+    finally:
+        await client.aclose()
+        if application is not None:
+            await application.router.shutdown()
+
+    results = summarise(samples, elapsed)
+    _print_results(results, elapsed)
+
+    if args.out:
+        report = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "database": args.db.split(":", 1)[0],
+                "target": args.url or "in-process",
+                "scale": scale._asdict(),
+                "concurrency": args.concurrency,
+                "duration_s": args.duration,
+                "seed": args.seed,
+            },
+            "scenarios": results,
+        }
+        with open(args.out, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"wrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)["scenarios"]
+        if _print_comparison(compare(results, baseline, args.tolerance, args.min_requests)):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=None, help="async SQLAlchemy URL (default: temp SQLite file)")
+    parser.add_argument("--url", default=None, help="drive a running server instead of booting the app in-process")
+    parser.add_argument("--preset", default="small", help="dataset preset from benchmarks.dataset")
+    parser.add_argument("--tenants", type=int, default=None, help="override the preset's tenant count")
+    parser.add_argument("--users", type=int, default=None, help="override the preset's user count")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds of traffic discarded first")
+    parser.add_argument("--scenarios", default="", help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=None, help="write results as JSON")
+    parser.add_argument("--baseline", default=None, help="JSON result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (0.2 = 20%%)")
+    parser.add_argument("--min-requests", type=int, default=50, help="samples a scenario needs before it can be flagged")
+    args = parser.parse_args()
+
+    args.db = args.db or f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_load.db')}"
+    sys.exit(asyncio.run(main(args)))
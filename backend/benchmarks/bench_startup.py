@@ -0,0 +1,117 @@
+"""Cold-start benchmark for an API worker.
+
+Each sample boots a fresh interpreter that imports `app.main`, runs the
+startup handlers and serves a first request, timing every phase and counting
+the SQL statements issued before the first request. Samples run for the
+development and production startup profiles against a database whose schema
+already exists (as after `alembic upgrade head`).
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --db postgresql+asyncpg://... --profiles production
+    python -m benchmarks.bench_startup --routers scanner,events
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# runs in the child interpreter; prints one JSON line
+_CHILD = r"""
+import asyncio, json, time
+t0 = time.perf_counter()
+from app.main import app
+t1 = time.perf_counter()
+
+async def boot():
+    await app.router.startup()
+    t2 = time.perf_counter()
+    # harness imports, kept out of the timed phases
+    from app.db.session import statement_cache_stats
+    import httpx
+    stats = statement_cache_stats()
+    t2b = time.perf_counter()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        resp = await client.get("/")
+    t3 = time.perf_counter()
+    await app.router.shutdown()
+    return t2, t3 - t2b, resp.status_code, stats
+
+t2, first_request, status, stats = asyncio.run(boot())
+print(json.dumps({
+    "import_s": t1 - t0,
+    "startup_s": t2 - t1,
+    "first_request_s": first_request,
+    "total_s": t2 - t0 + first_request,
+    "status": status,
+    "startup_statements": stats["compiled"] + stats["cache_hits"] + stats["uncached"],
+}))
+"""
+
+
+async def _prepare_schema(db_url: str) -> None:
+    from app.db.base import Base
+    import app.models  # noqa: F401  (register all tables)
+
+    engine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+def _sample(db_url: str, profile: str, routers: str) -> dict:
+    env = {
+        **os.environ,
+        "PYTHONPATH": BACKEND,
+        "DATABASE_URL": db_url,
+        "STARTUP_PROFILE": profile,
+    }
+    if routers:
+        env["API_ROUTERS"] = routers
+    proc = subprocess.run([sys.executable, "-c", _CHILD], cwd=BACKEND, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(db_url: str, profiles, runs: int, routers: str, as_json: bool) -> dict:
+    asyncio.run(_prepare_schema(db_url))
+    results = {}
+    for profile in profiles:
+        samples = [_sample(db_url, profile, routers) for _ in range(runs)]
+        results[profile] = {
+            key: round(statistics.median(s[key] for s in samples), 4)
+            for key in ("import_s", "startup_s", "first_request_s", "total_s", "startup_statements")
+        }
+    if as_json:
+        print(json.dumps({"runs": runs, "routers": routers or "all", "profiles": results}, indent=2))
+    else:
+        print(f"median of {runs} cold starts, routers: {routers or 'all'}")
+        print(f"{'profile':<12} {'import':>8} {'startup':>8} {'1st req':>8} {'total':>8} {'SQL':>5}")
+        for profile, r in results.items():
+            print(
+                f"{profile:<12} {r['import_s']:8.3f} {r['startup_s']:8.3f} {r['first_request_s']:8.3f} "
+                f"{r['total_s']:8.3f} {int(r['startup_statements']):5d}"
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=None, help="async SQLAlchemy URL (default: temp SQLite file)")
+    parser.add_argument("--profiles", default="development,production")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--routers", default="", help="API_ROUTERS subset to load (default: all)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    db_url = args.db or f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_startup.db')}"
+    main(db_url, [p.strip() for p in args.profiles.split(",") if p.strip()], args.runs, args.routers, args.json)
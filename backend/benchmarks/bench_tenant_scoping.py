@@ -0,0 +1,154 @@
+"""Benchmark automatic tenant scoping and its effect on the statement cache.
+
+Runs the same mix of ORM queries for requests rotating over many tenants,
+once with the previous per-request option (a new `with_loader_criteria`
+closing over the tenant id) and once with the shared `TENANT_CRITERIA`
+option whose tenant is a bound parameter. For each it reports throughput,
+the time spent adding the criteria plus computing the statement cache key
+(the per-execute Python overhead), and how many statements were compiled.
+
+Usage (from backend/):
+    python -m benchmarks.bench_tenant_scoping --tenants 200 --requests 5000
+    python -m benchmarks.bench_tenant_scoping --db postgresql+asyncpg://...
+
+`compiled` should equal the number of distinct queries however many tenants
+are served; if it grows with --tenants, tenant ids are leaking into the
+statement cache key.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, aliased, with_loader_criteria
+
+from app.core import tenancy
+from app.db import session as db_session
+from app.db.base import Base, TenantMixin
+import app.models  # noqa: F401  (register all tables)
+from app.models.recognition import Recognition
+from app.models.users import User
+
+
+def _legacy_listener(execute_state):
+    """The previous implementation: a fresh option per execute."""
+    if not execute_state.is_select or tenancy.is_bypass_enabled():
+        return
+    tenant = tenancy.CURRENT_TENANT.get(None)
+    if tenant is None:
+        return
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(TenantMixin, lambda cls: cls.tenant_id == tenant, include_aliases=True)
+    )
+
+
+def _queries():
+    nominee = aliased(User)
+    return [
+        lambda: select(User).where(User.is_active == True).limit(20),  # noqa: E712
+        lambda: select(Recognition).order_by(Recognition.created_at.desc()).limit(20),
+        lambda: select(func.count(Recognition.id)).where(Recognition.points > 0),
+        lambda: select(Recognition.id, nominee.full_name).join(nominee, nominee.id == Recognition.nominee_id).limit(20),
+    ]
+
+
+async def _seed(Session, tenants, per_tenant):
+    async with Session() as db:
+        users, recs = [], []
+        for t in tenants:
+            ids = [str(uuid.uuid4()) for _ in range(per_tenant)]
+            for i, uid in enumerate(ids):
+                users.append({"id": uid, "tenant_id": t, "email": f"{uid}@bench.example", "full_name": f"U{i}",
+                              "role": "CORPORATE_USER", "is_active": True, "points_balance": 0, "lead_budget_balance": 0})
+                recs.append({"id": str(uuid.uuid4()), "tenant_id": t, "nominator_id": ids[i - 1],
+                             "nominee_id": uid, "points": 10, "status": "APPROVED"})
+        await db.execute(insert(User), users)
+        await db.execute(insert(Recognition), recs)
+        await db.commit()
+
+
+def _criteria_overhead(listener_kind: str, tenants, rounds: int) -> float:
+    """Microseconds to scope one statement and derive its cache key."""
+    stmt = select(Recognition).where(Recognition.points > 0)
+    started = time.perf_counter()
+    for i in range(rounds):
+        token = tenancy.CURRENT_TENANT.set(tenants[i % len(tenants)])
+        try:
+            if listener_kind == "legacy":
+                tenant = tenancy.CURRENT_TENANT.get()
+                scoped = stmt.options(
+                    with_loader_criteria(TenantMixin, lambda cls: cls.tenant_id == tenant, include_aliases=True)
+                )
+            else:
+                scoped = stmt.options(db_session.TENANT_CRITERIA)
+            scoped._generate_cache_key()
+        finally:
+            tenancy.CURRENT_TENANT.reset(token)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+async def _run_once(label, run_engine, tenants, requests):
+    queries = _queries()
+    rng = random.Random(3)
+    db_session.reset_statement_cache_stats()
+    started = time.perf_counter()
+    async with AsyncSession(run_engine) as db:
+        for _ in range(requests):
+            token = tenancy.CURRENT_TENANT.set(rng.choice(tenants))
+            try:
+                for q in queries:
+                    (await db.execute(q())).all()
+            finally:
+                tenancy.CURRENT_TENANT.reset(token)
+    elapsed = time.perf_counter() - started
+    stats = db_session.statement_cache_stats()
+    overhead = _criteria_overhead(label, tenants, 5000)
+    print(
+        f"{label:<8} {requests * len(queries) / elapsed:9.0f} queries/s  "
+        f"criteria+cache key {overhead:6.1f} us/stmt  "
+        f"compiled={stats['compiled']} cache_hits={stats['cache_hits']} hit_ratio={stats['hit_ratio']}"
+    )
+
+
+async def main(db_url: str, tenant_count: int, per_tenant: int, requests: int):
+    engine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    tenants = [str(uuid.uuid4()) for _ in range(tenant_count)]
+    with tenancy.bypass_tenant_context():
+        await _seed(lambda: AsyncSession(engine), tenants, per_tenant)
+    await engine.dispose()
+    print(f"{tenant_count} tenants x {per_tenant} users, {requests} requests of 4 queries, backend {engine.dialect.name}")
+
+    # swap the app's listener for the legacy one for the first run
+    event.remove(Session, "do_orm_execute", db_session._add_tenant_criteria)
+    try:
+        for label, listener in (("legacy", _legacy_listener), ("shared", db_session._add_tenant_criteria)):
+            # fresh engine per run so the compiled cache starts empty
+            run_engine = create_async_engine(db_url)
+            event.listen(Session, "do_orm_execute", listener)
+            try:
+                await _run_once(label, run_engine, tenants, requests)
+            finally:
+                event.remove(Session, "do_orm_execute", listener)
+                await run_engine.dispose()
+    finally:
+        event.listen(Session, "do_orm_execute", db_session._add_tenant_criteria)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=None, help="async SQLAlchemy URL (default: temp SQLite file)")
+    parser.add_argument("--tenants", type=int, default=200)
+    parser.add_argument("--users-per-tenant", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    db_url = args.db or f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_tenant_scoping.db')}"
+    asyncio.run(main(db_url, args.tenants, args.users_per_tenant, args.requests))
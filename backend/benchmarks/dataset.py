@@ -0,0 +1,377 @@
+"""Deterministic synthetic multi-tenant dataset for performance testing.
+
+Builds tenants whose sizes follow a Zipf distribution (a few large tenants,
+a long tail of small ones), users with departments, birthdays and hire dates,
+recognition history concentrated on a minority of very active users, a
+points ledger (recognition credits, grants and redemption debits with their
+redemption rows), a global reward catalog, and gifting events whose
+approval requests carry QR tokens.
+
+Every id, token and value comes from `--seed`, so the same seed and scale
+always produce the same rows. Timestamps are relative to --anchor, which
+defaults to today (UTC midnight).
+
+Rows are written through bulk paths rather than the ORM. PostgreSQL over
+asyncpg uses COPY. Other databases use executemany in batches of --batch
+rows. Each tenant is committed separately, and memory use stays flat
+whatever the scale.
+
+Usage (from backend/):
+    python -m benchmarks.dataset --preset small
+    python -m benchmarks.dataset --db postgresql+asyncpg://... --preset large --seed 7
+    python -m benchmarks.dataset --preset medium --users 200000 --ledger-rows 5000000
+
+Load into an empty schema (alembic upgrade head, or let the generator
+create_all). Re-running with the same seed against the same database
+collides on primary keys by design.
+"""
+import argparse
+import asyncio
+import enum
+import os
+import random
+import tempfile
+import time
+import uuid
+from bisect import bisect_left
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from decimal import Decimal
+from itertools import accumulate
+from typing import NamedTuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.base import Base
+import app.models  # noqa: F401  (register all tables)
+from app.models.approvals import ApprovalRequest, ApprovalStatus
+from app.models.events import Event, EventOption, EventType
+from app.models.global_rewards import GlobalReward
+from app.models.points_ledger import PointsLedger
+from app.models.recognition import AwardCategory, Recognition, RecognitionStatus
+from app.models.redemptions import Redemption, RedemptionStatus
+from app.models.tenants import Tenant
+from app.models.users import User, UserRole, month_day
+
+
+class Scale(NamedTuple):
+    tenants: int
+    users: int
+    recognitions: int
+    ledger_rows: int
+    events_per_tenant: int
+    approvals_per_event: int
+    rewards: int = 200
+    # Zipf exponent of tenant sizes; 0 makes all tenants the same size
+    tenant_skew: float = 1.0
+    # exponent of the power law picking who gives and receives recognition
+    activity_skew: float = 1.1
+
+
+PRESETS = {
+    "small": Scale(tenants=5, users=500, recognitions=5_000, ledger_rows=10_000, events_per_tenant=1, approvals_per_event=200),
+    "medium": Scale(tenants=50, users=50_000, recognitions=500_000, ledger_rows=1_000_000, events_per_tenant=2, approvals_per_event=5_000),
+    "large": Scale(tenants=500, users=1_000_000, recognitions=5_000_000, ledger_rows=20_000_000, events_per_tenant=2, approvals_per_event=50_000),
+}
+
+DEPARTMENTS = ["Engineering", "Sales", "Operations", "Support", "Marketing", "Product", "Finance", "Human Resources"]
+DEPARTMENT_WEIGHTS = [30, 18, 15, 12, 8, 8, 5, 4]
+MESSAGES = [
+    "Thanks for jumping on the incident last night",
+    "Great demo to the customer today",
+    "Really appreciate the help with onboarding",
+    "Shipped ahead of schedule, well done",
+    "Thanks for covering my shift",
+]
+# recognition points and how often each is given
+POINTS = [(0, AwardCategory.ECARD), (100, AwardCategory.BRONZE), (250, AwardCategory.SILVER), (500, AwardCategory.GOLD)]
+POINTS_WEIGHTS = [50, 30, 15, 5]
+
+# id namespaces, one per kind of row
+_TENANT, _USER, _RECOGNITION, _LEDGER, _REDEMPTION, _REWARD, _EVENT, _OPTION, _APPROVAL, _QR = range(1, 11)
+
+
+def make_id(seed: int, kind: int, n: int) -> str:
+    """Deterministic, collision-free UUID: seed in the top 32 bits, the kind
+    of row in the next 16, the row number in the low 62."""
+    return str(uuid.UUID(int=((seed & 0xFFFFFFFF) << 96) | (kind << 80) | n, version=4))
+
+
+def tenant_sizes(total: int, count: int, skew: float, minimum: int = 3) -> list:
+    """Split `total` users over `count` tenants proportionally to 1/rank^skew
+    (largest remainder), each tenant getting at least `minimum`."""
+    weights = [1 / (rank + 1) ** skew for rank in range(count)]
+    spare = max(total - minimum * count, 0)
+    exact = [spare * w / sum(weights) for w in weights]
+    sizes = [int(x) for x in exact]
+    for i in sorted(range(count), key=lambda i: exact[i] - sizes[i], reverse=True)[: spare - sum(sizes)]:
+        sizes[i] += 1
+    return [s + minimum for s in sizes]
+
+
+def _split(total: int, sizes: list, grand_total: int) -> list:
+    """Per-tenant share of `total` proportional to tenant size."""
+    shares = [total * s // grand_total for s in sizes]
+    shares[0] += total - sum(shares)
+    return shares
+
+
+class _Loader:
+    """Buffers rows per table and writes them in bulk."""
+
+    def __init__(self, conn, batch: int):
+        self.conn = conn
+        self.batch = batch
+        self.copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "asyncpg"
+        self.buffers = {}
+        self.counts = {}
+        self.seconds = {}
+
+    async def add(self, table, columns, row) -> None:
+        buf = self.buffers.setdefault(table, (columns, []))[1]
+        buf.append(row)
+        if len(buf) >= self.batch:
+            await self.flush(table)
+
+    async def flush(self, table=None) -> None:
+        tables = [table] if table is not None else list(self.buffers)
+        for t in tables:
+            columns, rows = self.buffers.get(t, (None, []))
+            if not rows:
+                continue
+            started = time.perf_counter()
+            if self.copy:
+                raw = (await self.conn.get_raw_connection()).driver_connection
+                records = [tuple(v.name if isinstance(v, enum.Enum) else v for v in row) for row in rows]
+                await raw.copy_records_to_table(t.name, records=records, columns=columns)
+            else:
+                await self.conn.execute(t.insert(), [dict(zip(columns, row)) for row in rows])
+            self.seconds[t.name] = self.seconds.get(t.name, 0.0) + time.perf_counter() - started
+            self.counts[t.name] = self.counts.get(t.name, 0) + len(rows)
+            rows.clear()
+
+
+_USER_COLUMNS = ("id", "tenant_id", "email", "full_name", "role", "department", "job_title", "date_of_birth",
+                 "hire_date", "birthday_md", "hire_md", "points_balance", "lead_budget_balance", "is_active", "created_at")
+_RECOGNITION_COLUMNS = ("id", "tenant_id", "nominator_id", "nominee_id", "points", "points_awarded", "message",
+                        "is_public", "status", "award_category", "high_five_count", "created_at")
+_LEDGER_COLUMNS = ("id", "tenant_id", "user_id", "delta", "reason", "reference_id", "created_at")
+_REDEMPTION_COLUMNS = ("id", "tenant_id", "user_id", "reward_id", "points_used", "status", "provider_name", "created_at")
+_APPROVAL_COLUMNS = ("id", "tenant_id", "event_id", "user_id", "event_option_id", "lead_id", "impact_hours_per_week",
+                     "impact_duration_weeks", "total_impact_hours", "estimated_cost", "status", "qr_token",
+                     "budget_committed", "notification_sent", "is_collected", "created_at")
+
+
+class _Picker:
+    """Power-law choice over 0..n-1: low indexes are picked most often."""
+
+    def __init__(self, n: int, skew: float):
+        self.cum = list(accumulate(1 / (i + 1) ** skew for i in range(n)))
+        self.total = self.cum[-1]
+
+    def __call__(self, rng: random.Random) -> int:
+        return bisect_left(self.cum, rng.random() * self.total)
+
+
+async def generate(engine, scale: Scale, seed: int = 1, anchor: datetime = None, batch: int = 5000,
+                   sample_users: int = 50, sample_tokens: int = 200, log=None) -> dict:
+    """Load the dataset and return a manifest: row counts, load timings and a
+    sample of ids (per tenant: admin, lead, users, events and QR tokens) for
+    driving traffic against it."""
+    anchor = anchor or datetime.combine(datetime.now(timezone.utc).date(), dtime.min, tzinfo=timezone.utc)
+    sizes = tenant_sizes(scale.users, scale.tenants, scale.tenant_skew)
+    recognitions = _split(scale.recognitions, sizes, sum(sizes))
+    ledger_rows = _split(scale.ledger_rows, sizes, sum(sizes))
+    rng = random.Random(seed)
+    manifest = {"seed": seed, "anchor": anchor.isoformat(), "tenants": []}
+    started = time.perf_counter()
+
+    def ago(r, mean_days=60.0, cap_days=730.0):
+        # recent activity dominates: exponential age, capped at two years
+        return anchor - timedelta(days=min(r.expovariate(1 / mean_days), cap_days))
+
+    async with engine.connect() as conn:
+        loader = _Loader(conn, batch)
+        rewards = [(make_id(seed, _REWARD, i), 50 * (1 + i % 40)) for i in range(scale.rewards)]
+        for rid, cost in rewards:
+            await loader.add(GlobalReward.__table__, ("id", "title", "provider", "points_cost", "is_enabled"),
+                             (rid, f"Reward {rid[-6:]}", rng.choice(["Amazon", "Flipkart", "Swiggy", "Myntra"]), cost, True))
+        owner = make_id(seed, _USER, 0)
+        await loader.add(User.__table__, _USER_COLUMNS, (
+            owner, None, f"owner.{seed}@synthetic.example", "Platform Owner", UserRole.PLATFORM_OWNER, None, None,
+            None, None, None, None, 0, 0, True, anchor,
+        ))
+        manifest["platform_owner"] = owner
+        manifest["rewards"] = [rid for rid, _ in rewards[:20]]
+        for t, size in enumerate(sizes):
+            tenant_id = make_id(seed, _TENANT, t)
+            await loader.add(Tenant.__table__, ("id", "name", "subdomain", "master_budget_balance", "status", "suspended", "created_at"),
+                             (tenant_id, f"Synthetic {t}", f"synthetic-{seed}-{t}", 100_000_000, "active", False, ago(rng, 365)))
+        await loader.flush()
+        await conn.commit()
+
+        user_base = 1
+        recognition_no = ledger_no = redemption_no = event_no = option_no = approval_no = 0
+        for t, size in enumerate(sizes):
+            tenant_id = make_id(seed, _TENANT, t)
+            trng = random.Random(seed * 1_000_003 + t)
+            users = [make_id(seed, _USER, user_base + k) for k in range(size)]
+            user_base += size
+            leads = max(1, size // 50)
+            for k, uid in enumerate(users):
+                role = UserRole.TENANT_ADMIN if k == 0 else UserRole.TENANT_LEAD if k <= leads else UserRole.CORPORATE_USER
+                born = date(1965, 1, 1) + timedelta(days=trng.randrange(365 * 38))
+                hired = anchor.date() - timedelta(days=int(trng.expovariate(1 / 900)) % 9000)
+                await loader.add(User.__table__, _USER_COLUMNS, (
+                    uid, tenant_id, f"u{user_base - size + k}.{seed}@t{t}.synthetic.example", f"User {uid[-8:]}", role,
+                    trng.choices(DEPARTMENTS, DEPARTMENT_WEIGHTS)[0], None, born, hired, month_day(born), month_day(hired),
+                    0, 5_000_000 if role is UserRole.TENANT_LEAD else 0, trng.random() > 0.03, ago(trng, 400, 3000),
+                ))
+            await loader.flush(User.__table__)
+
+            # activity: recognitions credit nominees; the rest of the ledger is
+            # grants and redemptions, which only spend what a user has
+            pick = _Picker(size, scale.activity_skew)
+            balance = [0] * size
+            ledger_left = ledger_rows[t]
+            for _ in range(recognitions[t]):
+                nominator, nominee = pick(trng), pick(trng)
+                if nominee == nominator:
+                    nominee = (nominee + 1) % size
+                points, category = trng.choices(POINTS, POINTS_WEIGHTS)[0]
+                rec_id = make_id(seed, _RECOGNITION, recognition_no)
+                recognition_no += 1
+                created = ago(trng)
+                await loader.add(Recognition.__table__, _RECOGNITION_COLUMNS, (
+                    rec_id, tenant_id, users[nominator], users[nominee], points, points, trng.choice(MESSAGES),
+                    trng.random() > 0.1, RecognitionStatus.APPROVED if trng.random() > 0.05 else RecognitionStatus.PENDING,
+                    category, int(trng.paretovariate(1.5)) - 1, created,
+                ))
+                if points and ledger_left > 0:
+                    balance[nominee] += points
+                    ledger_left -= 1
+                    await loader.add(PointsLedger.__table__, _LEDGER_COLUMNS, (
+                        make_id(seed, _LEDGER, ledger_no), tenant_id, users[nominee], points, "RECOGNITION", rec_id, created,
+                    ))
+                    ledger_no += 1
+            for _ in range(ledger_left):
+                k = pick(trng)
+                created = ago(trng)
+                reward_id, cost = rewards[trng.randrange(len(rewards))]
+                if balance[k] >= cost and trng.random() < 0.4:
+                    redemption_id = make_id(seed, _REDEMPTION, redemption_no)
+                    redemption_no += 1
+                    balance[k] -= cost
+                    await loader.add(Redemption.__table__, _REDEMPTION_COLUMNS, (
+                        redemption_id, tenant_id, users[k], reward_id, cost,
+                        RedemptionStatus.COMPLETED if trng.random() > 0.05 else RedemptionStatus.PENDING, "synthetic", created,
+                    ))
+                    row = (make_id(seed, _LEDGER, ledger_no), tenant_id, users[k], -cost, "REDEMPTION", redemption_id, created)
+                else:
+                    delta = trng.choice((50, 100, 100, 200, 500))
+                    balance[k] += delta
+                    row = (make_id(seed, _LEDGER, ledger_no), tenant_id, users[k], delta, "GIVE_CHECK", None, created)
+                ledger_no += 1
+                await loader.add(PointsLedger.__table__, _LEDGER_COLUMNS, row)
+
+            events = []
+            for e in range(scale.events_per_tenant):
+                event_id = make_id(seed, _EVENT, event_no)
+                event_no += 1
+                day = anchor + timedelta(days=trng.randint(-30, 60))
+                await loader.add(Event.__table__, (
+                    "id", "tenant_id", "name", "event_type", "event_budget_amount", "budget_committed", "event_date",
+                    "registration_start_date", "registration_end_date", "is_active", "created_at",
+                ), (event_id, tenant_id, f"Gifting {t}.{e}", EventType.GIFTING, Decimal(1_000_000), Decimal(0), day,
+                    day - timedelta(days=30), day - timedelta(days=1), 1, day - timedelta(days=45)))
+                options = [make_id(seed, _OPTION, option_no + i) for i in range(4)]
+                option_no += 4
+                count = min(scale.approvals_per_event, size)
+                for i, oid in enumerate(options):
+                    await loader.add(EventOption.__table__, (
+                        "id", "tenant_id", "event_id", "option_name", "option_type", "total_available", "committed_count",
+                        "is_active", "created_at",
+                    ), (oid, tenant_id, event_id, f"Gift {i + 1}", "GIFT", count, 0, 1, day - timedelta(days=45)))
+                events.append((event_id, options, count, day))
+            await loader.flush(Event.__table__)
+            await loader.flush(EventOption.__table__)
+
+            manifest_events = []
+            for event_id, options, count, day in events:
+                tokens = []
+                for k in trng.sample(range(size), count):
+                    status = trng.choices(
+                        (ApprovalStatus.APPROVED, ApprovalStatus.PENDING, ApprovalStatus.DECLINED), (85, 10, 5))[0]
+                    token = uuid.UUID(make_id(seed, _QR, approval_no)).hex if status is ApprovalStatus.APPROVED else None
+                    if token and len(tokens) < sample_tokens:
+                        tokens.append(token)
+                    hours = trng.choice((1, 2, 3))
+                    weeks = trng.choice((1, 4, 8))
+                    await loader.add(ApprovalRequest.__table__, _APPROVAL_COLUMNS, (
+                        make_id(seed, _APPROVAL, approval_no), tenant_id, event_id, users[k], trng.choice(options),
+                        users[1 + trng.randrange(leads)], Decimal(hours), weeks, Decimal(hours * weeks), Decimal(0), status, token,
+                        int(status is ApprovalStatus.APPROVED), 0,
+                        int(token is not None and day < anchor and trng.random() < 0.7), day - timedelta(days=trng.randint(2, 30)),
+                    ))
+                    approval_no += 1
+                manifest_events.append({"id": event_id, "qr_tokens": tokens})
+            await loader.flush()
+
+            # balances are whatever the ledger says
+            ledger_sum = (
+                select(func.coalesce(func.sum(PointsLedger.delta), 0))
+                .where(PointsLedger.user_id == User.id)
+                .scalar_subquery()
+            )
+            await conn.execute(update(User).where(User.tenant_id == tenant_id).values(points_balance=ledger_sum))
+            await conn.commit()
+
+            manifest["tenants"].append({
+                "id": tenant_id, "users_total": size, "admin": users[0], "lead": users[1],
+                "users": users[leads + 1: leads + 1 + sample_users], "events": manifest_events,
+            })
+            if log:
+                log(f"tenant {t + 1}/{len(sizes)}: {size} users, {recognitions[t]} recognitions, "
+                    f"{ledger_rows[t]} ledger rows ({time.perf_counter() - started:.0f}s)")
+
+    manifest["rows"] = dict(loader.counts)
+    manifest["seconds"] = round(time.perf_counter() - started, 2)
+    manifest["load_seconds"] = {name: round(s, 2) for name, s in loader.seconds.items()}
+    return manifest
+
+
+async def main(db_url: str, scale: Scale, seed: int, anchor, batch: int, create: bool, quiet: bool) -> dict:
+    engine = create_async_engine(db_url)
+    try:
+        if create:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        manifest = await generate(engine, scale, seed=seed, anchor=anchor, batch=batch, log=None if quiet else print)
+    finally:
+        await engine.dispose()
+    total = sum(manifest["rows"].values())
+    print(f"{total} rows in {manifest['seconds']:.1f}s ({total / max(manifest['seconds'], 1e-9):.0f} rows/s)")
+    for name, count in sorted(manifest["rows"].items(), key=lambda kv: -kv[1]):
+        print(f"  {name:<20} {count:>12}  {manifest['load_seconds'].get(name, 0):8.1f}s in inserts")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=None, help="async SQLAlchemy URL (default: temp SQLite file)")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    for field in Scale._fields:
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(PRESETS['small']._asdict()[field]), default=None)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--anchor", type=date.fromisoformat, default=None, help="date timestamps are relative to")
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--no-create", action="store_true", help="schema already exists (e.g. alembic upgrade head)")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    overrides = {f: getattr(args, f) for f in Scale._fields if getattr(args, f) is not None}
+    scale = PRESETS[args.preset]._replace(**overrides)
+    anchor = datetime.combine(args.anchor, dtime.min, tzinfo=timezone.utc) if args.anchor else None
+    db_url = args.db or f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'dataset.db')}"
+    print(f"loading {scale} into {db_url.split('@')[-1]}")
+    asyncio.run(main(db_url, scale, args.seed, anchor, args.batch, not args.no_create, args.quiet))
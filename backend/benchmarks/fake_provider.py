@@ -0,0 +1,239 @@
+"""Local fake directory provider for tests and benchmarks.
+
+`build_fake_provider_app(users)` returns an ASGI app that serves the same
+directory through Okta, Microsoft Graph and Workday shaped endpoints:
+
+- `GET  /api/v1/users?limit=&after=&filter=`  Okta, `Link: rel="next"` cursor
+- `POST /{tenant}/oauth2/v2.0/token`          Azure AD client-credentials token
+- `GET  /v1.0/users?$top=&$skiptoken=`        Graph, `@odata.nextLink` cursor
+- `GET  /v1.0/users/delta?$deltatoken=`       Graph delta query, `@odata.deltaLink`
+- `GET  /workers?limit=&offset=&updatedFrom=` Workday, `{"total", "data"}`
+
+Each user carries `updated_at`, `active` and `deleted`; tests edit the list
+in place (bumping `updated_at`) to simulate directory changes. Like the real
+APIs, unfiltered Okta lists hide deactivated users while incremental
+queries return them, Graph lists hide deleted users and the delta query
+returns them as `@removed` tombstones.
+
+`latency` adds a per-request delay and `throttle_every=n` answers every n-th
+request with 429 + `Retry-After` so connectors' backoff is exercised.
+Request counts are kept on `app.state.stats`.
+
+Tests mount the app in-process with `httpx.ASGITransport`; benchmarks run it
+on a real socket with `serve_fake_provider()`.
+"""
+import asyncio
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+BASE_UPDATED_AT = "2026-01-01T00:00:00+00:00"
+
+
+def _ts(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def synthetic_directory(n: int, fanout: int = 8, prefix: str = "ext") -> List[Dict]:
+    """`n` users in a manager tree with the given fan-out (deterministic).
+
+    User i was last updated i hours before `BASE_UPDATED_AT`.
+    """
+    base = _ts(BASE_UPDATED_AT)
+    users = []
+    for i in range(n):
+        ext = f"{prefix}-{i:07d}"
+        users.append({
+            "id": ext,
+            "email": f"{ext}@fake.example",
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "manager_id": f"{prefix}-{(i - 1) // fanout:07d}" if i else None,
+            "updated_at": (base - timedelta(hours=i)).isoformat(),
+            "active": True,
+            "deleted": False,
+        })
+    return users
+
+
+def _okta(u: Dict) -> Dict:
+    return {
+        "id": u["id"],
+        "status": "ACTIVE" if u["active"] else "DEPROVISIONED",
+        "lastUpdated": _ts(u["updated_at"]).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "profile": {
+            "email": u["email"],
+            "firstName": u["first_name"],
+            "lastName": u["last_name"],
+            "managerId": u["manager_id"],
+        },
+    }
+
+
+def _graph(u: Dict) -> Dict:
+    return {
+        "id": u["id"],
+        "mail": u["email"],
+        "userPrincipalName": u["email"],
+        "givenName": u["first_name"],
+        "surname": u["last_name"],
+        "accountEnabled": u["active"],
+        "manager": {"id": u["manager_id"]} if u["manager_id"] else None,
+    }
+
+
+def _workday(u: Dict) -> Dict:
+    return {
+        "employeeId": u["id"],
+        "email": u["email"],
+        "firstName": u["first_name"],
+        "lastName": u["last_name"],
+        "managerEmployeeId": u["manager_id"],
+        "active": u["active"],
+        "lastModified": u["updated_at"],
+    }
+
+
+def build_fake_provider_app(
+    users: List[Dict],
+    max_page_size: int = 200,
+    latency: float = 0.0,
+    throttle_every: int = 0,
+    retry_after: str = "0",
+) -> Starlette:
+    stats = {"requests": 0, "throttled": 0}
+
+    async def _gate(request: Request) -> Optional[JSONResponse]:
+        stats["requests"] += 1
+        if latency:
+            await asyncio.sleep(latency)
+        if throttle_every and stats["requests"] % throttle_every == 0:
+            stats["throttled"] += 1
+            return JSONResponse({"errorCode": "E0000047"}, status_code=429, headers={"Retry-After": retry_after})
+        return None
+
+    def _limit(value: Optional[str], default: int) -> int:
+        return max(1, min(int(value or default), max_page_size))
+
+    async def okta_users(request: Request):
+        blocked = await _gate(request)
+        if blocked:
+            return blocked
+        limit = _limit(request.query_params.get("limit"), 200)
+        start = int(request.query_params.get("after") or 0)
+        filter_ = request.query_params.get("filter")
+        if filter_:
+            match = re.fullmatch(r'lastUpdated gt "(.+)"', filter_)
+            if not match:
+                return JSONResponse({"errorCode": "E0000031"}, status_code=400)
+            since = _ts(match.group(1))
+            listed = [u for u in users if not u["deleted"] and _ts(u["updated_at"]) > since]
+        else:
+            listed = [u for u in users if not u["deleted"] and u["active"]]
+        page = listed[start:start + limit]
+        headers = {}
+        if start + limit < len(listed):
+            params = {"limit": limit, "after": start + limit}
+            if filter_:
+                params["filter"] = filter_
+            headers["Link"] = f'<{request.url.replace(query=urlencode(params))}>; rel="next"'
+        return JSONResponse([_okta(u) for u in page], headers=headers)
+
+    async def azure_token(request: Request):
+        blocked = await _gate(request)
+        if blocked:
+            return blocked
+        form = await request.form()
+        if form.get("grant_type") != "client_credentials":
+            return JSONResponse({"error": "unsupported_grant_type"}, status_code=400)
+        return JSONResponse({"access_token": "fake-token", "token_type": "Bearer", "expires_in": 3600})
+
+    async def graph_users(request: Request):
+        blocked = await _gate(request)
+        if blocked:
+            return blocked
+        if request.headers.get("Authorization") != "Bearer fake-token":
+            return JSONResponse({"error": {"code": "InvalidAuthenticationToken"}}, status_code=401)
+        limit = _limit(request.query_params.get("$top"), 100)
+        start = int(request.query_params.get("$skiptoken") or 0)
+        listed = [u for u in users if not u["deleted"]]
+        body = {"value": [_graph(u) for u in listed[start:start + limit]]}
+        if start + limit < len(listed):
+            query = urlencode({"$top": limit, "$skiptoken": start + limit})
+            body["@odata.nextLink"] = str(request.url.replace(query=query))
+        return JSONResponse(body)
+
+    async def graph_delta(request: Request):
+        blocked = await _gate(request)
+        if blocked:
+            return blocked
+        if request.headers.get("Authorization") != "Bearer fake-token":
+            return JSONResponse({"error": {"code": "InvalidAuthenticationToken"}}, status_code=401)
+        prefer = request.headers.get("Prefer", "")
+        match = re.search(r"odata\.maxpagesize=(\d+)", prefer)
+        limit = _limit(match.group(1) if match else None, 100)
+        token = request.query_params.get("$deltatoken")
+        if token == "expired":
+            return JSONResponse({"error": {"code": "syncStateNotFound"}}, status_code=410)
+        if token:
+            since = _ts(token)
+            listed = [u for u in users if _ts(u["updated_at"]) > since]
+        else:
+            listed = [u for u in users if not u["deleted"]]
+        start = int(request.query_params.get("$skiptoken") or 0)
+        body = {"value": [
+            {"id": u["id"], "@removed": {"reason": "deleted"}} if u["deleted"] else _graph(u)
+            for u in listed[start:start + limit]
+        ]}
+        if start + limit < len(listed):
+            params = {"$skiptoken": start + limit}
+            if token:
+                params["$deltatoken"] = token
+            body["@odata.nextLink"] = str(request.url.replace(query=urlencode(params)))
+        else:
+            latest = max([_ts(u["updated_at"]) for u in users] or [_ts(BASE_UPDATED_AT)])
+            body["@odata.deltaLink"] = str(request.url.replace(query=urlencode({"$deltatoken": latest.isoformat()})))
+        return JSONResponse(body)
+
+    async def workday_workers(request: Request):
+        blocked = await _gate(request)
+        if blocked:
+            return blocked
+        limit = _limit(request.query_params.get("limit"), 100)
+        offset = int(request.query_params.get("offset") or 0)
+        listed = [u for u in users if not u["deleted"]]
+        if request.query_params.get("updatedFrom"):
+            since = _ts(request.query_params["updatedFrom"])
+            listed = [u for u in listed if _ts(u["updated_at"]) >= since]
+        return JSONResponse({"total": len(listed), "data": [_workday(u) for u in listed[offset:offset + limit]]})
+
+    app = Starlette(routes=[
+        Route("/api/v1/users", okta_users),
+        Route("/{tenant}/oauth2/v2.0/token", azure_token, methods=["POST"]),
+        Route("/v1.0/users", graph_users),
+        Route("/v1.0/users/delta", graph_delta),
+        Route("/workers", workday_workers),
+    ])
+    app.state.stats = stats
+    return app
+
+
+async def serve_fake_provider(app: Starlette, host: str = "127.0.0.1", port: int = 8765):
+    """Start `app` with uvicorn in the current loop; returns (server, task).
+
+    Stop it with `server.should_exit = True` and await the task.
+    """
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning", access_log=False))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server, task
@@ -0,0 +1,42 @@
+"""Add redemption_latency_sketches (daily t-digest rollups)
+
+Revision ID: 0021_redemption_latency
+Revises: 0020_add_analytics_indices
+Create Date: 2026-02-02 10:00:00.000000
+
+One row per tenant and completion day holding a serialised t-digest of
+redemption fulfilment latency, so /analytics/redemptions/velocity can merge
+daily sketches instead of sampling the redemptions table.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0021_redemption_latency'
+down_revision = '0020_add_analytics_indices'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'redemption_latency_sketches',
+        sa.Column('id', sa.String(36), nullable=False),
+        sa.Column('tenant_id', sa.String(36), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('sample_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_seconds', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('digest', sa.JSON(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tenant_id', 'day', name='uq_redemption_latency_tenant_day'),
+    )
+    op.create_index(op.f('ix_redemption_latency_sketches_tenant_id'), 'redemption_latency_sketches', ['tenant_id'], unique=False)
+    op.create_index(op.f('ix_redemption_latency_sketches_day'), 'redemption_latency_sketches', ['day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_redemption_latency_sketches_day'), table_name='redemption_latency_sketches')
+    op.drop_index(op.f('ix_redemption_latency_sketches_tenant_id'), table_name='redemption_latency_sketches')
+    op.drop_table('redemption_latency_sketches')
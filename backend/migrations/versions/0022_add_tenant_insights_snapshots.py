@@ -0,0 +1,36 @@
+"""Add tenant_insights_snapshots
+
+Revision ID: 0022_tenant_insights_snapshots
+Revises: 0021_redemption_latency
+Create Date: 2026-02-03 10:00:00.000000
+
+Stores the precomputed /platform/tenant-insights payload per tenant.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0022_tenant_insights_snapshots'
+down_revision = '0021_redemption_latency'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tenant_insights_snapshots',
+        sa.Column('id', sa.String(36), nullable=False),
+        sa.Column('tenant_id', sa.String(36), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('generated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('build_ms', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_tenant_insights_snapshots_tenant_id'), 'tenant_insights_snapshots', ['tenant_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tenant_insights_snapshots_tenant_id'), table_name='tenant_insights_snapshots')
+    op.drop_table('tenant_insights_snapshots')
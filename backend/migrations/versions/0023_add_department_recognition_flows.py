@@ -0,0 +1,41 @@
+"""Add department_recognition_flows
+
+Revision ID: 0023_department_flows
+Revises: 0022_tenant_insights_snapshots
+Create Date: 2026-02-05 10:00:00.000000
+
+Per-tenant, per-month department -> department recognition counts,
+incremented when a recognition is approved.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0023_department_flows'
+down_revision = '0022_tenant_insights_snapshots'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'department_recognition_flows',
+        sa.Column('id', sa.String(36), nullable=False),
+        sa.Column('tenant_id', sa.String(36), nullable=False),
+        sa.Column('month_start', sa.Date(), nullable=False),
+        sa.Column('from_department', sa.String(100), nullable=False),
+        sa.Column('to_department', sa.String(100), nullable=False),
+        sa.Column('recognition_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('points_total', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tenant_id', 'month_start', 'from_department', 'to_department', name='uq_department_flow_cell'),
+    )
+    op.create_index(op.f('ix_department_recognition_flows_tenant_id'), 'department_recognition_flows', ['tenant_id'], unique=False)
+    op.create_index(op.f('ix_department_recognition_flows_month_start'), 'department_recognition_flows', ['month_start'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_department_recognition_flows_month_start'), table_name='department_recognition_flows')
+    op.drop_index(op.f('ix_department_recognition_flows_tenant_id'), table_name='department_recognition_flows')
+    op.drop_table('department_recognition_flows')
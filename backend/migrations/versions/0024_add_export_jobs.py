@@ -0,0 +1,60 @@
+"""Add export_jobs
+
+Revision ID: 0024_export_jobs
+Revises: 0023_department_flows
+Create Date: 2026-02-06 10:00:00.000000
+
+Background analytics export jobs and their downloadable artifacts.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0024_export_jobs'
+down_revision = '0023_department_flows'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'export_jobs',
+        sa.Column('id', sa.String(36), nullable=False),
+        sa.Column('tenant_id', sa.String(36), nullable=False),
+        sa.Column('event_id', sa.String(36), nullable=False),
+        sa.Column('export_type', sa.String(50), nullable=False),
+        sa.Column('format', sa.String(10), nullable=False),
+        sa.Column('dedupe_key', sa.String(64), nullable=False),
+        sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'COMPLETED', 'FAILED', 'EXPIRED', name='exportjobstatus'), nullable=False),
+        sa.Column('progress', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('filename', sa.String(255), nullable=True),
+        sa.Column('file_path', sa.String(500), nullable=True),
+        sa.Column('size_bytes', sa.BigInteger(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('created_by', sa.String(36), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_export_jobs_tenant_id'), 'export_jobs', ['tenant_id'], unique=False)
+    op.create_index(op.f('ix_export_jobs_event_id'), 'export_jobs', ['event_id'], unique=False)
+    op.create_index(op.f('ix_export_jobs_dedupe_key'), 'export_jobs', ['dedupe_key'], unique=False)
+    # at most one queued/running job per identical request, across API processes
+    op.create_index(
+        'uq_export_jobs_active_dedupe', 'export_jobs', ['tenant_id', 'dedupe_key'], unique=True,
+        postgresql_where=sa.text("status IN ('QUEUED', 'RUNNING')"),
+        sqlite_where=sa.text("status IN ('QUEUED', 'RUNNING')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_export_jobs_active_dedupe', table_name='export_jobs')
+    op.drop_index(op.f('ix_export_jobs_dedupe_key'), table_name='export_jobs')
+    op.drop_index(op.f('ix_export_jobs_event_id'), table_name='export_jobs')
+    op.drop_index(op.f('ix_export_jobs_tenant_id'), table_name='export_jobs')
+    op.drop_table('export_jobs')
+    sa.Enum(name='exportjobstatus').drop(op.get_bind(), checkfirst=True)
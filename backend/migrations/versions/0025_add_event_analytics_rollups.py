@@ -0,0 +1,42 @@
+"""Add event_analytics_rollups
+
+Revision ID: 0025_event_analytics_rollups
+Revises: 0024_export_jobs
+Create Date: 2026-02-09 10:00:00.000000
+
+Cached per-event aggregates for the year-in-review report.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0025_event_analytics_rollups'
+down_revision = '0024_export_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'event_analytics_rollups',
+        sa.Column('id', sa.String(36), nullable=False),
+        sa.Column('tenant_id', sa.String(36), nullable=False),
+        sa.Column('event_id', sa.String(36), nullable=False),
+        sa.Column('fingerprint', sa.String(64), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tenant_id', 'event_id', name='uq_event_analytics_rollup'),
+    )
+    op.create_index(op.f('ix_event_analytics_rollups_tenant_id'), 'event_analytics_rollups', ['tenant_id'], unique=False)
+    op.create_index(op.f('ix_event_analytics_rollups_event_id'), 'event_analytics_rollups', ['event_id'], unique=False)
+    # the year-in-review fingerprint query groups approvals by event and status
+    op.create_index('idx_approval_requests_event_status', 'approval_requests', ['event_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_approval_requests_event_status', table_name='approval_requests')
+    op.drop_index(op.f('ix_event_analytics_rollups_event_id'), table_name='event_analytics_rollups')
+    op.drop_index(op.f('ix_event_analytics_rollups_tenant_id'), table_name='event_analytics_rollups')
+    op.drop_table('event_analytics_rollups')
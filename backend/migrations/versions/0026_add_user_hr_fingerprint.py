@@ -0,0 +1,25 @@
+"""Add users.hr_fingerprint
+
+Revision ID: 0026_user_hr_fingerprint
+Revises: 0025_event_analytics_rollups
+Create Date: 2026-02-10 10:00:00.000000
+
+Content hash of the HR-synced user fields, used to skip unchanged rows.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0026_user_hr_fingerprint'
+down_revision = '0025_event_analytics_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('hr_fingerprint', sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'hr_fingerprint')
@@ -0,0 +1,40 @@
+"""Add directory identity columns to users
+
+Revision ID: 0027_user_directory_identity
+Revises: 0026_user_hr_fingerprint
+Create Date: 2026-02-11 10:00:00.000000
+
+external_id / sso_provider / manager_id used by the SSO & HRIS user sync.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0027_user_directory_identity'
+down_revision = '0026_user_hr_fingerprint'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('external_id', sa.String(255), nullable=True))
+    op.add_column('users', sa.Column('sso_provider', sa.String(50), nullable=True))
+    op.add_column('users', sa.Column('manager_id', sa.String(36), nullable=True))
+    op.create_foreign_key('fk_users_manager_id_users', 'users', 'users', ['manager_id'], ['id'])
+    op.create_index(op.f('ix_users_manager_id'), 'users', ['manager_id'], unique=False)
+    op.create_index(
+        'ix_users_tenant_provider_external_id',
+        'users',
+        ['tenant_id', 'sso_provider', 'external_id'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_tenant_provider_external_id', table_name='users')
+    op.drop_index(op.f('ix_users_manager_id'), table_name='users')
+    op.drop_constraint('fk_users_manager_id_users', 'users', type_='foreignkey')
+    op.drop_column('users', 'manager_id')
+    op.drop_column('users', 'sso_provider')
+    op.drop_column('users', 'external_id')
@@ -0,0 +1,40 @@
+"""Add directory_sync_states
+
+Revision ID: 0028_directory_sync_states
+Revises: 0027_user_directory_identity
+Create Date: 2026-02-12 10:00:00.000000
+
+Per-tenant, per-provider watermark / delta token for incremental user sync.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0028_directory_sync_states'
+down_revision = '0027_user_directory_identity'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'directory_sync_states',
+        sa.Column('id', sa.String(36), nullable=False),
+        sa.Column('tenant_id', sa.String(36), nullable=False),
+        sa.Column('provider', sa.String(50), nullable=False),
+        sa.Column('watermark', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('delta_token', sa.Text(), nullable=True),
+        sa.Column('last_sync_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_full_sync_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_mode', sa.String(10), nullable=True),
+        sa.Column('last_summary', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tenant_id', 'provider', name='uq_directory_sync_state'),
+    )
+    op.create_index(op.f('ix_directory_sync_states_tenant_id'), 'directory_sync_states', ['tenant_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_directory_sync_states_tenant_id'), table_name='directory_sync_states')
+    op.drop_table('directory_sync_states')
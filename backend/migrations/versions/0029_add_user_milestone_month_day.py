@@ -0,0 +1,55 @@
+"""Add indexed month/day milestone columns to users
+
+Revision ID: 0029_user_milestone_month_day
+Revises: 0028_directory_sync_states
+Create Date: 2026-02-13 10:00:00.000000
+
+birthday_md / hire_md hold MMDD of date_of_birth / hire_date so birthday and
+anniversary lookups are index range scans.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0029_user_milestone_month_day'
+down_revision = '0028_directory_sync_states'
+branch_labels = None
+depends_on = None
+
+
+def _month_day(col):
+    return sa.cast(sa.extract('month', col) * 100 + sa.extract('day', col), sa.SmallInteger)
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('birthday_md', sa.SmallInteger(), nullable=True))
+    op.add_column('users', sa.Column('hire_md', sa.SmallInteger(), nullable=True))
+
+    users = sa.table(
+        'users',
+        sa.column('date_of_birth', sa.Date),
+        sa.column('hire_date', sa.Date),
+        sa.column('birthday_md', sa.SmallInteger),
+        sa.column('hire_md', sa.SmallInteger),
+    )
+    op.execute(
+        users.update()
+        .where(users.c.date_of_birth.isnot(None))
+        .values(birthday_md=_month_day(users.c.date_of_birth))
+    )
+    op.execute(
+        users.update()
+        .where(users.c.hire_date.isnot(None))
+        .values(hire_md=_month_day(users.c.hire_date))
+    )
+
+    op.create_index('ix_users_tenant_birthday_md', 'users', ['tenant_id', 'birthday_md'], unique=False)
+    op.create_index('ix_users_tenant_hire_md', 'users', ['tenant_id', 'hire_md'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_tenant_hire_md', table_name='users')
+    op.drop_index('ix_users_tenant_birthday_md', table_name='users')
+    op.drop_column('users', 'hire_md')
+    op.drop_column('users', 'birthday_md')
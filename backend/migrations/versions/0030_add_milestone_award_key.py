@@ -0,0 +1,32 @@
+"""Make milestones the idempotency record of the daily milestone job
+
+Revision ID: 0030_milestone_award_key
+Revises: 0029_user_milestone_month_day
+Create Date: 2026-02-14 10:00:00.000000
+
+Adds milestones.recognition_id and a unique (user_id, type, occurrence_date)
+key so re-running the job for a day cannot award twice.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0030_milestone_award_key'
+down_revision = '0029_user_milestone_month_day'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('milestones', sa.Column('recognition_id', sa.String(36), nullable=True))
+    op.create_foreign_key('fk_milestones_recognition_id', 'milestones', 'recognitions', ['recognition_id'], ['id'])
+    op.create_unique_constraint('uq_milestones_user_type_date', 'milestones', ['user_id', 'type', 'occurrence_date'])
+    op.create_index(op.f('ix_milestones_occurrence_date'), 'milestones', ['occurrence_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_milestones_occurrence_date'), table_name='milestones')
+    op.drop_constraint('uq_milestones_user_type_date', 'milestones', type_='unique')
+    op.drop_constraint('fk_milestones_recognition_id', 'milestones', type_='foreignkey')
+    op.drop_column('milestones', 'recognition_id')
@@ -19,6 +19,8 @@ os.environ.setdefault('DEV_DEFAULT_TENANT', 'dev-tenant')
 os.environ.setdefault('JWT_SECRET', 'test_secret_key_for_testing_only')
 os.environ.setdefault('JWT_ALGORITHM', 'HS256')
 os.environ.setdefault('DATABASE_URL', 'sqlite+aiosqlite:///:memory:')
+# the suite fires many requests from one client; tests/test_rate_limit.py covers limiting
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
 
 # Prefer in-memory SQLite for tests by default unless explicitly opting into Postgres.
 # Set `USE_PG_FOR_TESTS=1` in the environment to use the external DATABASE_URL instead.
@@ -46,6 +48,8 @@ from app.models.budgets import BudgetPool
 from app.core.config import settings
 from httpx import AsyncClient
 from app.main import app
+from app.db.query_stats import track_queries
+from contextlib import contextmanager
 
 
 @pytest_asyncio.fixture
@@ -54,6 +58,20 @@ async def client():
         yield client
 
 
+@pytest.fixture
+def assert_max_queries():
+    """`with assert_max_queries(n): ...` fails if the block (including any
+    requests made through `client`) executes more than n SQL statements."""
+    @contextmanager
+    def _assert_max_queries(limit):
+        with track_queries() as stats:
+            yield stats
+        if stats.count > limit:
+            top = "\n".join(f"  {n}x {shape[:200]}" for shape, n in stats.shapes.most_common(5))
+            pytest.fail(f"{stats.count} SQL statements executed, expected at most {limit}:\n{top}")
+    return _assert_max_queries
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create an instance of the default event loop for the test session."""
@@ -91,6 +109,12 @@ async def create_tables(test_engine):
         await session.commit()
 
 
+@pytest.fixture
+def session_factory(test_engine, create_tables):
+    """Session factory for code that opens its own sessions (jobs, workers)."""
+    return sessionmaker(bind=test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
 @pytest_asyncio.fixture
 async def db_session(test_engine, create_tables):
     """Create a test database session."""
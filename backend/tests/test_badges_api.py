@@ -14,7 +14,7 @@ async def client():
 
 class TestBadgesAPI:
     @pytest.mark.asyncio
-    async def test_create_and_get_badge(self, client, tenant_admin_user):
+    async def test_create_and_get_badge(self, client, tenant_admin_user, assert_max_queries):
         token = create_access_token({
             "sub": str(tenant_admin_user.id),
             "role": tenant_admin_user.role.value,
@@ -37,7 +37,8 @@ class TestBadgesAPI:
         badge_id = data["id"]
 
         # get badge
-        resp = await client.get(f"/badges/{badge_id}", headers=headers)
+        with assert_max_queries(1):
+            resp = await client.get(f"/badges/{badge_id}", headers=headers)
         assert resp.status_code == 200
         data = resp.json()
         assert data["id"] == badge_id
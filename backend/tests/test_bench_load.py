@@ -0,0 +1,29 @@
+from benchmarks.bench_load import compare, percentile, summarise
+
+
+class TestLoadReport:
+    def test_percentiles_use_nearest_rank(self):
+        values = [i / 1000 for i in range(1, 101)]
+        assert percentile(values, 50) == 0.05
+        assert percentile(values, 95) == 0.095
+        assert percentile(values, 99) == 0.099
+        assert percentile([], 95) == 0.0
+
+    def test_summary_counts_errors_and_statuses(self):
+        samples = {"feed": [(0.01, 200)] * 8 + [(0.5, 500), (0.02, 0)]}
+        result = summarise(samples, elapsed=2.0)["feed"]
+        assert result["requests"] == 10
+        assert result["throughput_rps"] == 5.0
+        assert result["error_rate"] == 0.2
+        assert result["statuses"] == {"0": 1, "200": 8, "500": 1}
+        assert result["p50_ms"] == 10.0 and result["max_ms"] == 500.0
+
+    def test_regressions_respect_tolerance_and_sample_size(self):
+        base = {"requests": 100, "p95_ms": 100.0, "p99_ms": 150.0, "throughput_rps": 50.0, "error_rate": 0.0}
+        slower = dict(base, p95_ms=130.0, p99_ms=400.0)
+        flagged = {(name, metric) for name, metric, *_, regressed in compare({"feed": slower}, {"feed": base}, 0.2) if regressed}
+        assert flagged == {("feed", "p95_ms")}
+
+        assert not any(r[-1] for r in compare({"feed": dict(slower, requests=10)}, {"feed": base}, 0.2))
+        failing = dict(base, requests=10, error_rate=0.5)
+        assert [r[1] for r in compare({"feed": failing}, {"feed": base}, 0.2) if r[-1]] == ["error_%"]
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.base import Base
+from app.models.approvals import ApprovalRequest
+from app.models.points_ledger import PointsLedger
+from app.models.users import User
+from benchmarks.dataset import Scale, generate, make_id, tenant_sizes
+
+SCALE = Scale(tenants=4, users=120, recognitions=600, ledger_rows=900, events_per_tenant=1, approvals_per_event=30, rewards=10)
+ANCHOR = datetime(2026, 1, 15, tzinfo=timezone.utc)
+
+
+async def _load(path, seed):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    manifest = await generate(engine, SCALE, seed=seed, anchor=ANCHOR, batch=100)
+    return engine, manifest
+
+
+class TestDatasetGenerator:
+    def test_tenant_sizes_are_skewed_and_exact(self):
+        sizes = tenant_sizes(1000, 10, skew=1.0)
+        assert sum(sizes) == 1000
+        assert sizes == sorted(sizes, reverse=True)
+        assert sizes[0] > 5 * sizes[-1]
+        assert tenant_sizes(30, 10, skew=1.0) == [3] * 10
+
+    def test_ids_are_deterministic_and_distinct(self):
+        assert make_id(7, 2, 5) == make_id(7, 2, 5)
+        assert len({make_id(7, 2, n) for n in range(1000)} | {make_id(8, 2, n) for n in range(1000)}) == 2000
+
+    @pytest.mark.asyncio
+    async def test_same_seed_same_rows(self, tmp_path):
+        first, m1 = await _load(tmp_path / "a.db", seed=3)
+        second, m2 = await _load(tmp_path / "b.db", seed=3)
+        try:
+            assert m1["rows"] == m2["rows"]
+            assert m1["rows"]["users"] == SCALE.users + 1  # plus the platform owner
+            assert m1["rows"]["recognitions"] == SCALE.recognitions
+            assert m1["rows"]["points_ledger"] == SCALE.ledger_rows
+            assert m1["tenants"] == m2["tenants"]
+
+            query = select(PointsLedger.id, PointsLedger.user_id, PointsLedger.delta).order_by(PointsLedger.id)
+            async with first.connect() as a, second.connect() as b:
+                assert (await a.execute(query)).all() == (await b.execute(query)).all()
+        finally:
+            await first.dispose()
+            await second.dispose()
+
+    @pytest.mark.asyncio
+    async def test_balances_match_ledger_and_qr_tokens_resolve(self, tmp_path):
+        engine, manifest = await _load(tmp_path / "c.db", seed=5)
+        try:
+            async with engine.connect() as conn:
+                balances = dict((await conn.execute(select(User.id, User.points_balance))).all())
+                sums = dict((await conn.execute(
+                    select(PointsLedger.user_id, func.sum(PointsLedger.delta)).group_by(PointsLedger.user_id)
+                )).all())
+                assert all(balances[uid] == total for uid, total in sums.items())
+                assert min(balances.values()) >= 0
+
+                token = manifest["tenants"][0]["events"][0]["qr_tokens"][0]
+                owner = (await conn.execute(
+                    select(ApprovalRequest.tenant_id).where(ApprovalRequest.qr_token == token)
+                )).scalar_one()
+                assert owner == manifest["tenants"][0]["id"]
+        finally:
+            await engine.dispose()
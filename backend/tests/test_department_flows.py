@@ -0,0 +1,130 @@
+import datetime
+import uuid
+import pytest
+from sqlalchemy import select
+
+from app.jobs import department_flow_backfill
+from app.models.department_flows import DepartmentRecognitionFlow
+from app.models.recognition import Recognition, RecognitionStatus
+from app.models.users import User, UserRole
+from app.services.department_flow_service import (
+    UNASSIGNED,
+    record_recognition_flow,
+    record_recognition_flows,
+    get_flow_matrix,
+    get_flow_summary,
+    summarize_cells,
+)
+
+
+async def _user(db_session, tenant_id, department):
+    user = User(
+        email=f"flow_{uuid.uuid4().hex}@testcompany.com",
+        full_name=f"{department or 'No'} Dept",
+        role=UserRole.CORPORATE_USER,
+        tenant_id=tenant_id,
+        department=department,
+        is_active=True,
+    )
+    db_session.add(user)
+    await db_session.flush()
+    return user
+
+
+class TestSummarizeCells:
+    def test_ratios_exclude_unassigned(self):
+        cells = [
+            ("Eng", "Sales", 3, 300),
+            ("Eng", "Eng", 1, 100),
+            ("Sales", "Eng", 1, 0),
+            (UNASSIGNED, "Eng", 5, 0),
+        ]
+        s = summarize_cells(cells)
+        assert s["total_recognitions"] == 10
+        assert s["cross_department"] == 4
+        assert s["intra_department"] == 1
+        assert s["cross_department_pct"] == 40.0
+        eng = next(d for d in s["departments"] if d["department"] == "Eng")
+        assert eng["sent"] == 4
+        assert eng["outbound_cross_pct"] == 75.0
+        assert eng["received"] == 2
+        assert eng["inbound_cross_pct"] == 50.0
+
+    def test_empty(self):
+        s = summarize_cells([])
+        assert s["total_recognitions"] == 0
+        assert s["cross_department_pct"] == 0.0
+
+
+class TestDepartmentFlowService:
+    @pytest.mark.asyncio
+    async def test_record_and_query_matrix(self, db_session, test_tenant):
+        eng = await _user(db_session, test_tenant.id, "Engineering")
+        sales = await _user(db_session, test_tenant.id, "Sales")
+        nodept = await _user(db_session, test_tenant.id, None)
+
+        jan = datetime.datetime(2026, 1, 15)
+        feb = datetime.datetime(2026, 2, 3)
+        await record_recognition_flow(db_session, test_tenant.id, eng.id, sales.id, 100, when=jan)
+        await record_recognition_flow(db_session, test_tenant.id, eng.id, sales.id, 250, when=jan)
+        await record_recognition_flow(db_session, test_tenant.id, sales.id, sales.id, 0, when=feb)
+        await record_recognition_flow(db_session, test_tenant.id, nodept.id, eng.id, 0, when=feb)
+        await db_session.commit()
+
+        full = await get_flow_matrix(db_session, test_tenant.id)
+        assert full["departments"] == ["Engineering", "Sales", UNASSIGNED]
+        i = {d: n for n, d in enumerate(full["departments"])}
+        assert full["matrix"][i["Engineering"]][i["Sales"]] == 2
+        assert full["matrix"][i["Sales"]][i["Sales"]] == 1
+        assert full["matrix"][i[UNASSIGNED]][i["Engineering"]] == 1
+        assert full["links"][0] == {"from": "Engineering", "to": "Sales", "count": 2, "points": 350}
+
+        jan_only = await get_flow_summary(db_session, test_tenant.id, datetime.date(2026, 1, 1), datetime.date(2026, 1, 31))
+        assert jan_only["total_recognitions"] == 2
+        assert jan_only["cross_department_pct"] == 100.0
+
+        feb_only = await get_flow_summary(db_session, test_tenant.id, datetime.date(2026, 2, 20), None)
+        assert feb_only["total_recognitions"] == 2
+        assert feb_only["cross_department"] == 0
+        assert feb_only["intra_department"] == 1
+
+    @pytest.mark.asyncio
+    async def test_existing_cell_is_incremented_not_duplicated(self, session_factory, db_session, test_tenant):
+        eng = await _user(db_session, test_tenant.id, "Engineering")
+        sales = await _user(db_session, test_tenant.id, "Sales")
+        when = datetime.datetime(2026, 3, 2)
+        # another transaction already created and committed the cell
+        await record_recognition_flow(db_session, test_tenant.id, eng.id, sales.id, 40, when=when)
+        await db_session.commit()
+
+        async with session_factory() as other:
+            await record_recognition_flows(other, test_tenant.id, [(eng.id, sales.id, 10), (eng.id, sales.id, 5)], when=when)
+            await other.commit()
+
+        rows = (await db_session.execute(
+            select(DepartmentRecognitionFlow).where(DepartmentRecognitionFlow.tenant_id == test_tenant.id)
+        )).scalars().all()
+        assert [(r.recognition_count, r.points_total) for r in rows] == [(3, 55)]
+
+
+class TestDepartmentFlowBackfill:
+    @pytest.mark.asyncio
+    async def test_backfill_rebuilds_history_from_approved_recognitions(self, db_session, test_tenant):
+        eng = await _user(db_session, test_tenant.id, "Engineering")
+        sales = await _user(db_session, test_tenant.id, "Sales")
+        created = datetime.datetime(2025, 5, 10)
+        for status in (RecognitionStatus.APPROVED, RecognitionStatus.APPROVED, RecognitionStatus.PENDING):
+            db_session.add(Recognition(
+                tenant_id=test_tenant.id, nominator_id=eng.id, nominee_id=sales.id, points=10,
+                status=status, created_at=created,
+            ))
+        await db_session.commit()
+
+        assert (await get_flow_summary(db_session, test_tenant.id))["total_recognitions"] == 0
+        assert await department_flow_backfill.run(tenant_id=test_tenant.id) == 1
+        # re-running replaces rather than double counts
+        assert await department_flow_backfill.run(tenant_id=test_tenant.id) == 1
+
+        summary = await get_flow_summary(db_session, test_tenant.id)
+        assert summary["total_recognitions"] == 2
+        assert summary["cross_department_pct"] == 100.0
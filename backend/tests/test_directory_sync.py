@@ -0,0 +1,133 @@
+import datetime
+import uuid
+import pytest
+import httpx
+from sqlalchemy import select, update
+
+from app.jobs.user_sync import sync_from_provider
+from app.models.directory_sync import DirectorySyncState
+from app.models.users import User
+from benchmarks.fake_provider import build_fake_provider_app, synthetic_directory
+
+BASE = "http://fake.provider"
+OKTA = {"base_url": BASE, "token": "token"}
+AZURE = {"tenant_id": "dir", "client_id": "cid", "client_secret": "secret", "login_url": BASE, "graph_url": BASE}
+WORKDAY = {"base_url": BASE, "api_key": "key"}
+
+
+def _touch(user, **changes):
+    user.update(changes)
+    user["updated_at"] = "2026-03-01T12:00:00+00:00"
+
+
+async def _users(factory, prefix):
+    async with factory() as session:
+        res = await session.execute(
+            select(User.external_id, User.full_name, User.is_active).where(User.external_id.like(f"{prefix}-%"))
+        )
+        return {ext: (name, active) for ext, name, active in res.all()}
+
+
+async def _state(factory, tenant_id, provider):
+    async with factory() as session:
+        res = await session.execute(
+            select(DirectorySyncState).where(
+                DirectorySyncState.tenant_id == tenant_id, DirectorySyncState.provider == provider
+            )
+        )
+        return res.scalar_one()
+
+
+class TestDirectoryDeltaSync:
+    @pytest.mark.asyncio
+    async def test_okta_delta_uses_watermark(self, session_factory, test_tenant):
+        tenant_id = test_tenant.id
+        prefix = uuid.uuid4().hex[:8]
+        directory = synthetic_directory(40, fanout=4, prefix=prefix)
+        app = build_fake_provider_app(directory)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as http:
+            first = await sync_from_provider("okta", tenant_id, OKTA, session_factory=session_factory, http=http)
+            assert first["mode"] == "full"
+            assert first["inserted"] == 40
+
+            state = await _state(session_factory, tenant_id, "okta")
+            assert state.watermark is not None and state.last_full_sync_at is not None
+
+            _touch(directory[5], first_name="Renamed")
+            _touch(directory[6], active=False)
+            second = await sync_from_provider("okta", tenant_id, OKTA, session_factory=session_factory, http=http)
+
+        assert second["mode"] == "delta"
+        # the two changes plus the newest user, re-read by the watermark overlap
+        assert second["fetched"] == 3
+        assert second["unchanged"] == 1
+        assert second["updated"] == 1
+        assert second["deactivated"] == 1
+        users = await _users(session_factory, prefix)
+        assert users[f"{prefix}-0000005"] == ("Renamed Last5", True)
+        assert users[f"{prefix}-0000006"][1] is False
+        assert sum(1 for _, active in users.values() if active) == 39
+
+    @pytest.mark.asyncio
+    async def test_full_reconciliation_deactivates_missing(self, session_factory, test_tenant):
+        tenant_id = test_tenant.id
+        prefix = uuid.uuid4().hex[:8]
+        directory = synthetic_directory(20, prefix=prefix)
+        app = build_fake_provider_app(directory)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as http:
+            await sync_from_provider("workday", tenant_id, WORKDAY, session_factory=session_factory, http=http)
+            removed = directory.pop()
+            # a delta run cannot see the removal
+            delta = await sync_from_provider("workday", tenant_id, WORKDAY, session_factory=session_factory, http=http)
+            assert delta["mode"] == "delta"
+            assert delta["deactivated"] == 0
+
+            # once the full interval has elapsed the next run reconciles
+            async with session_factory() as session:
+                await session.execute(
+                    update(DirectorySyncState)
+                    .where(DirectorySyncState.tenant_id == tenant_id, DirectorySyncState.provider == "workday")
+                    .values(last_full_sync_at=datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=2))
+                )
+                await session.commit()
+            full = await sync_from_provider("workday", tenant_id, WORKDAY, session_factory=session_factory, http=http)
+
+        assert full["mode"] == "full"
+        assert full["deactivated"] == 1
+        users = await _users(session_factory, prefix)
+        assert users[removed["id"]][1] is False
+        assert sum(1 for _, active in users.values() if active) == 19
+
+    @pytest.mark.asyncio
+    async def test_graph_delta_link_and_tombstones(self, session_factory, test_tenant):
+        tenant_id = test_tenant.id
+        prefix = uuid.uuid4().hex[:8]
+        directory = synthetic_directory(30, prefix=prefix)
+        app = build_fake_provider_app(directory)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as http:
+            first = await sync_from_provider("azure_ad", tenant_id, AZURE, session_factory=session_factory, http=http)
+            assert first["mode"] == "full" and first["inserted"] == 30
+            state = await _state(session_factory, tenant_id, "azure_ad")
+            assert "deltatoken=" in state.delta_token
+
+            _touch(directory[3], deleted=True)
+            _touch(directory[4], last_name="Changed")
+            second = await sync_from_provider("azure_ad", tenant_id, AZURE, session_factory=session_factory, http=http)
+            assert second["mode"] == "delta"
+            assert (second["fetched"], second["deactivated"], second["updated"]) == (2, 1, 1)
+
+            # an expired delta link falls back to a full pull
+            async with session_factory() as session:
+                await session.execute(
+                    update(DirectorySyncState)
+                    .where(DirectorySyncState.tenant_id == tenant_id, DirectorySyncState.provider == "azure_ad")
+                    .values(delta_token=f"{BASE}/v1.0/users/delta?$deltatoken=expired")
+                )
+                await session.commit()
+            third = await sync_from_provider("azure_ad", tenant_id, AZURE, session_factory=session_factory, http=http)
+
+        assert third["mode"] == "full"
+        assert third["fetched"] == 29
+        users = await _users(session_factory, prefix)
+        assert users[f"{prefix}-0000003"][1] is False
+        assert users[f"{prefix}-0000004"] == ("First4 Changed", True)
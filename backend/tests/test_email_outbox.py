@@ -0,0 +1,161 @@
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.email_outbox import EmailOutbox, EmailStatus
+from app.services.email_outbox import SMTPPool, TenantRateLimiter, drain_outbox, enqueue_email
+from app.scripts.smtp_sink import SMTPSink
+
+
+async def _queue(factory, tenant_id, addresses):
+    async with factory() as db:
+        rows = [enqueue_email(db, tenant_id, addr, f"Hello {addr}", f"<p>{addr}</p>") for addr in addresses]
+        await db.commit()
+        return [r.id for r in rows]
+
+
+async def _rows(factory, ids):
+    async with factory() as db:
+        res = await db.execute(select(EmailOutbox).where(EmailOutbox.id.in_(ids)))
+        return {r.id: r for r in res.scalars().all()}
+
+
+def _pool(sink, size=2):
+    return SMTPPool(sink.host, sink.port, starttls=False, size=size)
+
+
+def _addresses(n):
+    prefix = uuid.uuid4().hex[:8]
+    return [f"{prefix}-{i}@example.com" for i in range(n)]
+
+
+class TestEmailOutbox:
+    @pytest.mark.asyncio
+    async def test_enqueue_is_part_of_the_callers_transaction(self, session_factory, test_tenant):
+        addr = _addresses(1)[0]
+        async with session_factory() as db:
+            enqueue_email(db, test_tenant.id, addr, "Dropped", "<p>x</p>")
+            await db.rollback()
+        async with session_factory() as db:
+            res = await db.execute(select(EmailOutbox).where(EmailOutbox.to_email == addr))
+            assert res.scalars().all() == []
+
+    @pytest.mark.asyncio
+    async def test_drain_delivers_over_pooled_connections(self, session_factory, test_tenant):
+        ids = await _queue(session_factory, test_tenant.id, _addresses(25))
+        async with SMTPSink() as sink:
+            pool = _pool(sink, size=2)
+            try:
+                summary = await drain_outbox(session_factory, pool, TenantRateLimiter(1000), batch_size=10)
+                assert summary["sent"] >= 25
+                # connections are reused across batches
+                assert sink.connections <= 2
+                again = await drain_outbox(session_factory, pool, TenantRateLimiter(1000))
+                assert again["sent"] == 0
+            finally:
+                await pool.close()
+
+        rows = await _rows(session_factory, ids)
+        assert all(r.status == EmailStatus.SENT and r.attempts == 1 for r in rows.values())
+        delivered = {m.rcpt_tos[0]: m.message for m in sink.messages}
+        row = rows[ids[0]]
+        assert delivered[row.to_email]["Subject"] == row.subject
+        assert delivered[row.to_email]["Message-ID"].startswith(f"<{row.id}@")
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_is_retried_with_backoff(self, session_factory, test_tenant):
+        ids = await _queue(session_factory, test_tenant.id, _addresses(1))
+        async with SMTPSink(fail_every=1) as sink:
+            pool = _pool(sink)
+            try:
+                summary = await drain_outbox(session_factory, pool, TenantRateLimiter(1000))
+            finally:
+                await pool.close()
+        assert summary["retried"] == 1
+        row = (await _rows(session_factory, ids))[ids[0]]
+        assert row.status == EmailStatus.PENDING and row.attempts == 1
+        assert row.last_error.startswith("451")
+        assert row.next_attempt_at.replace(tzinfo=None) > datetime.datetime.utcnow()
+
+        # make it due again; a healthy server accepts it
+        async with session_factory() as db:
+            row = await db.get(EmailOutbox, ids[0])
+            row.next_attempt_at = datetime.datetime.now(datetime.timezone.utc)
+            await db.commit()
+        async with SMTPSink() as sink:
+            pool = _pool(sink)
+            try:
+                summary = await drain_outbox(session_factory, pool, TenantRateLimiter(1000))
+            finally:
+                await pool.close()
+        row = (await _rows(session_factory, ids))[ids[0]]
+        assert row.status == EmailStatus.SENT and row.attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_permanent_rejection_fails_without_retry(self, session_factory, test_tenant):
+        bad, good = _addresses(2)
+        ids = await _queue(session_factory, test_tenant.id, [bad, good])
+        async with SMTPSink(reject=[bad]) as sink:
+            pool = _pool(sink, size=1)
+            try:
+                summary = await drain_outbox(session_factory, pool, TenantRateLimiter(1000))
+            finally:
+                await pool.close()
+        assert summary["failed"] == 1 and summary["sent"] == 1
+        rows = {r.to_email: r for r in (await _rows(session_factory, ids)).values()}
+        assert rows[bad].status == EmailStatus.FAILED and rows[bad].last_error.startswith("550")
+        assert rows[good].status == EmailStatus.SENT
+
+    @pytest.mark.asyncio
+    async def test_rejection_keeps_the_pooled_connection(self, session_factory, test_tenant):
+        addresses = _addresses(4)
+        rejected = addresses[::2]
+        await _queue(session_factory, test_tenant.id, addresses)
+        async with SMTPSink(reject=rejected) as sink:
+            pool = _pool(sink, size=1)
+            try:
+                summary = await drain_outbox(session_factory, pool, TenantRateLimiter(1000))
+            finally:
+                await pool.close()
+        assert summary["failed"] == 2 and summary["sent"] == 2
+        assert sink.connections == 1
+        assert sorted(m.rcpt_tos[0] for m in sink.messages) == sorted(addresses[1::2])
+
+    @pytest.mark.asyncio
+    async def test_attempts_are_capped(self, session_factory, test_tenant, monkeypatch):
+        monkeypatch.setattr(settings, "EMAIL_MAX_ATTEMPTS", 1)
+        ids = await _queue(session_factory, test_tenant.id, _addresses(1))
+        async with SMTPSink(fail_every=1) as sink:
+            pool = _pool(sink)
+            try:
+                await drain_outbox(session_factory, pool, TenantRateLimiter(1000))
+            finally:
+                await pool.close()
+        assert (await _rows(session_factory, ids))[ids[0]].status == EmailStatus.FAILED
+
+    @pytest.mark.asyncio
+    async def test_tenant_rate_limit_defers_without_spending_attempts(self, session_factory, test_tenant):
+        ids = await _queue(session_factory, test_tenant.id, _addresses(5))
+        async with SMTPSink() as sink:
+            pool = _pool(sink)
+            try:
+                summary = await drain_outbox(session_factory, pool, TenantRateLimiter(3))
+            finally:
+                await pool.close()
+        assert summary["sent"] == 3 and summary["deferred"] == 2
+        rows = (await _rows(session_factory, ids)).values()
+        deferred = [r for r in rows if r.status == EmailStatus.PENDING]
+        assert len(deferred) == 2 and all(r.attempts == 0 for r in deferred)
+
+    def test_token_bucket_refills(self):
+        now = [0.0]
+        limiter = TenantRateLimiter(60, clock=lambda: now[0])
+        for _ in range(60):
+            assert limiter.take("t1") == 0
+        assert limiter.take("t1") == pytest.approx(1.0)
+        assert limiter.take("t2") == 0
+        now[0] += 1.0
+        assert limiter.take("t1") == 0
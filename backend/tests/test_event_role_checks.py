@@ -0,0 +1,70 @@
+import datetime
+import pytest
+import pytest_asyncio
+
+from app.core.auth import create_access_token
+from app.models.approvals import ApprovalRequest, ApprovalStatus
+from app.models.events import Event, EventOption, EventType
+
+
+def _headers(user):
+    token = create_access_token({"sub": str(user.id), "role": user.role.value, "tenant_id": str(user.tenant_id)})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest_asyncio.fixture
+async def approval(db_session, test_tenant, tenant_admin_user):
+    when = datetime.datetime(2026, 5, 20)
+    event = Event(
+        tenant_id=test_tenant.id, name="Team Day", event_type=EventType.GIFTING,
+        event_budget_amount=5000, budget_committed=0, event_date=when,
+        registration_start_date=when - datetime.timedelta(days=30),
+        registration_end_date=when - datetime.timedelta(days=1),
+    )
+    db_session.add(event)
+    await db_session.flush()
+    option = EventOption(
+        tenant_id=test_tenant.id, event_id=event.id, option_name="Hamper",
+        option_type="GIFT", total_available=10, cost_per_unit=500,
+    )
+    db_session.add(option)
+    await db_session.flush()
+    request = ApprovalRequest(
+        tenant_id=test_tenant.id, event_id=event.id, event_option_id=option.id,
+        user_id=tenant_admin_user.id, lead_id=tenant_admin_user.id,
+        impact_hours_per_week=0, impact_duration_weeks=0, total_impact_hours=0,
+        estimated_cost=500, status=ApprovalStatus.PENDING,
+    )
+    db_session.add(request)
+    await db_session.commit()
+    return request
+
+
+class TestEventDayRoleChecks:
+    """Routes authorising by role against the JWT's string role claim."""
+
+    @pytest.mark.asyncio
+    async def test_tenant_admin_is_allowed(self, client, approval, tenant_admin_user):
+        headers = _headers(tenant_admin_user)
+        for path in (
+            f"/approvals/{approval.id}",
+            f"/scanner/event/{approval.event_id}/inventory",
+            f"/analytics/event/{approval.event_id}/summary",
+            f"/analytics/event/{approval.event_id}/insights",
+        ):
+            resp = await client.get(path, headers=headers)
+            assert resp.status_code == 200, (path, resp.text)
+
+    @pytest.mark.asyncio
+    async def test_corporate_user_is_forbidden(self, client, approval, corporate_user):
+        headers = _headers(corporate_user)
+        for path in (
+            f"/approvals/{approval.id}",
+            f"/scanner/event/{approval.event_id}/inventory",
+            f"/scanner/event/{approval.event_id}/dashboard",
+            f"/analytics/event/{approval.event_id}/summary",
+            f"/analytics/event/{approval.event_id}/timeline",
+            f"/analytics/event/{approval.event_id}/roi",
+        ):
+            resp = await client.get(path, headers=headers)
+            assert resp.status_code == 403, (path, resp.text)
@@ -0,0 +1,213 @@
+import asyncio
+import datetime
+import os
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.core.auth import create_access_token
+from app.core.config import settings
+from app.models.events import Event, EventType
+from app.models.export_jobs import ExportJob, ExportJobStatus
+from app.services import export_job_service
+
+
+async def _wait_for(db_session, tenant_id, job_id, timeout=5.0):
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        db_session.expire_all()
+        job = await export_job_service.get_export_job(db_session, tenant_id, job_id)
+        if job.status not in export_job_service.ACTIVE_STATUSES:
+            return job
+        await asyncio.sleep(0.05)
+    raise AssertionError("export job did not finish")
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch, session_factory):
+    monkeypatch.setattr(settings, "EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(export_job_service, "session_factory", session_factory)
+    return tmp_path
+
+
+@pytest.fixture
+def fake_report(monkeypatch):
+    calls = []
+
+    async def _generate(db, job):
+        calls.append(job.id)
+        await asyncio.sleep(0.05)
+        return f"{job.export_type}_{job.event_id}.csv", b"Department,Registered\nEng,3\n"
+
+    monkeypatch.setattr(export_job_service, "_generate_csv", _generate)
+    return calls
+
+
+class TestExportJobs:
+    def test_dedupe_key_is_stable(self):
+        a = export_job_service.dedupe_key("t1", "e1", "summary", "csv")
+        assert a == export_job_service.dedupe_key("t1", "e1", "SUMMARY", "CSV")
+        assert a != export_job_service.dedupe_key("t2", "e1", "summary", "csv")
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_a_job(self, db_session, test_tenant, export_dir, fake_report):
+        tenant_id = test_tenant.id
+        first, created = await export_job_service.submit_export(db_session, tenant_id, None, "evt-1", "budget")
+        second, created_again = await export_job_service.submit_export(db_session, tenant_id, None, "evt-1", "budget")
+        assert created and not created_again
+        first_id = first.id
+        assert second.id == first_id
+
+        job = await _wait_for(db_session, tenant_id, first_id)
+        assert job.status == ExportJobStatus.COMPLETED
+        assert job.progress == 100
+        assert fake_report == [first_id]
+        assert export_job_service.is_downloadable(job)
+        with open(job.file_path, "rb") as fh:
+            assert fh.read().startswith(b"Department")
+
+        # once finished, a new request starts a fresh job
+        third, created = await export_job_service.submit_export(db_session, tenant_id, None, "evt-1", "budget")
+        assert created and third.id != first_id
+        await _wait_for(db_session, tenant_id, third.id)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_from_separate_sessions_share_a_job(self, session_factory, db_session, test_tenant, export_dir, fake_report):
+        # each session stands in for a different API worker
+        async def submit():
+            async with session_factory() as db:
+                job, created = await export_job_service.submit_export(db, test_tenant.id, None, "evt-2", "summary")
+                return job.id, created
+
+        results = await asyncio.gather(*(submit() for _ in range(4)))
+        assert len({job_id for job_id, _ in results}) == 1
+        assert [created for _, created in results].count(True) == 1
+        await _wait_for(db_session, test_tenant.id, results[0][0])
+
+    @pytest.mark.asyncio
+    async def test_database_allows_one_active_job_per_key(self, session_factory, test_tenant):
+        key = export_job_service.dedupe_key(test_tenant.id, "evt-3", "summary", "csv")
+
+        def job(status):
+            return ExportJob(tenant_id=test_tenant.id, event_id="evt-3", export_type="summary",
+                             format="csv", dedupe_key=key, status=status)
+
+        async with session_factory() as db:
+            db.add_all([job(ExportJobStatus.COMPLETED), job(ExportJobStatus.FAILED), job(ExportJobStatus.QUEUED)])
+            await db.commit()
+            db.add(job(ExportJobStatus.RUNNING))
+            with pytest.raises(IntegrityError):
+                await db.commit()
+
+    @pytest.mark.asyncio
+    async def test_failed_generation_is_recorded(self, db_session, test_tenant, export_dir, monkeypatch):
+        tenant_id = test_tenant.id
+
+        async def _boom(db, job):
+            raise ValueError("Event not found")
+
+        monkeypatch.setattr(export_job_service, "_generate_csv", _boom)
+        job, _ = await export_job_service.submit_export(db_session, tenant_id, None, "missing", "summary")
+        job = await _wait_for(db_session, tenant_id, job.id)
+        assert job.status == ExportJobStatus.FAILED
+        assert job.error == "Event not found"
+        assert not export_job_service.is_downloadable(job)
+
+    @pytest.mark.asyncio
+    async def test_cleanup_removes_expired_artifacts(self, db_session, test_tenant, export_dir, fake_report):
+        tenant_id = test_tenant.id
+        job, _ = await export_job_service.submit_export(db_session, tenant_id, None, "evt-2", "participation")
+        job = await _wait_for(db_session, tenant_id, job.id)
+        job_id, path = job.id, job.file_path
+        assert os.path.exists(path)
+
+        job.expires_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=1)
+        await db_session.commit()
+
+        assert await export_job_service.cleanup_expired_exports(db_session) == 1
+        assert not os.path.exists(path)
+        db_session.expire_all()
+        job = await export_job_service.get_export_job(db_session, tenant_id, job_id)
+        assert job.status == ExportJobStatus.EXPIRED
+
+    @pytest.mark.asyncio
+    async def test_request_replaces_job_with_stale_heartbeat(self, db_session, test_tenant, export_dir, fake_report):
+        tenant_id = test_tenant.id
+        stale = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=settings.EXPORT_STALE_SECONDS + 5)
+        orphan = ExportJob(tenant_id=tenant_id, event_id="evt-4", export_type="summary", format="csv",
+                           dedupe_key=export_job_service.dedupe_key(tenant_id, "evt-4", "summary", "csv"),
+                           status=ExportJobStatus.RUNNING, progress=10, heartbeat_at=stale)
+        db_session.add(orphan)
+        await db_session.commit()
+        orphan_id = orphan.id
+
+        job, created = await export_job_service.submit_export(db_session, tenant_id, None, "evt-4", "summary")
+        assert created and job.id != orphan_id
+        assert (await _wait_for(db_session, tenant_id, job.id)).status == ExportJobStatus.COMPLETED
+        orphan = await export_job_service.get_export_job(db_session, tenant_id, orphan_id)
+        assert orphan.status == ExportJobStatus.FAILED
+        assert orphan.error == "export abandoned"
+
+    @pytest.mark.asyncio
+    async def test_cleanup_fails_only_silent_active_jobs(self, db_session, test_tenant):
+        tenant_id = test_tenant.id
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+        def job(event_id, heartbeat_at):
+            return ExportJob(tenant_id=tenant_id, event_id=event_id, export_type="summary", format="csv",
+                             dedupe_key=export_job_service.dedupe_key(tenant_id, event_id, "summary", "csv"),
+                             status=ExportJobStatus.RUNNING, heartbeat_at=heartbeat_at)
+
+        silent = job("evt-5", now - datetime.timedelta(seconds=settings.EXPORT_STALE_SECONDS + 5))
+        # a long export started well before the TTL but still heartbeating
+        busy = job("evt-6", now)
+        busy.created_at = now - datetime.timedelta(seconds=settings.EXPORT_TTL_SECONDS + 5)
+        db_session.add_all([silent, busy])
+        await db_session.commit()
+        silent_id, busy_id = silent.id, busy.id
+
+        assert await export_job_service.cleanup_expired_exports(db_session) == 1
+        db_session.expire_all()
+        assert (await export_job_service.get_export_job(db_session, tenant_id, silent_id)).status == ExportJobStatus.FAILED
+        assert (await export_job_service.get_export_job(db_session, tenant_id, busy_id)).status == ExportJobStatus.RUNNING
+
+
+def _headers(user):
+    token = create_access_token({"sub": str(user.id), "role": user.role.value, "tenant_id": str(user.tenant_id)})
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestExportJobAPI:
+    @pytest.mark.asyncio
+    async def test_queue_poll_and_download(self, client, db_session, test_tenant, tenant_admin_user, export_dir, fake_report):
+        when = datetime.datetime(2026, 4, 1)
+        event = Event(
+            tenant_id=test_tenant.id, name="Offsite", event_type=EventType.GIFTING,
+            event_budget_amount=1000, budget_committed=0, event_date=when,
+            registration_start_date=when - datetime.timedelta(days=30),
+            registration_end_date=when - datetime.timedelta(days=1),
+        )
+        db_session.add(event)
+        await db_session.commit()
+        headers = _headers(tenant_admin_user)
+
+        resp = await client.post(f"/analytics/event/{event.id}/export", json={"format": "csv", "type": "budget"}, headers=headers)
+        assert resp.status_code == 202
+        job_url = f"/analytics/event/{event.id}/export/jobs/{resp.json()['job_id']}"
+
+        for _ in range(100):
+            job = (await client.get(job_url, headers=headers)).json()
+            if job["status"] not in ("QUEUED", "RUNNING"):
+                break
+            await asyncio.sleep(0.05)
+        assert job["status"] == "COMPLETED"
+        assert job["download_url"] == f"{job_url}/download"
+
+        download = await client.get(job["download_url"], headers=headers)
+        assert download.status_code == 200
+        assert download.content.startswith(b"Department")
+
+    @pytest.mark.asyncio
+    async def test_corporate_user_cannot_export(self, client, corporate_user):
+        resp = await client.post("/analytics/event/evt-1/export", json={"format": "csv", "type": "budget"}, headers=_headers(corporate_user))
+        assert resp.status_code == 403
@@ -0,0 +1,128 @@
+import csv
+import logging
+import uuid
+import pytest
+from sqlalchemy import select, text
+
+from app.models.users import User
+from app.services.hr_sync import sync_hr_data
+
+FIELDS = ["email", "dob", "hire_date", "full_name", "department", "job_title", "tenant_id"]
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: row.get(k, "") for k in FIELDS})
+
+
+class TestHRSync:
+    @pytest.mark.asyncio
+    async def test_chunked_insert_then_update(self, tmp_path, session_factory, db_session, test_tenant):
+        prefix = uuid.uuid4().hex[:8]
+        rows = [
+            {
+                "email": f"{prefix}_{i}@hr.test",
+                "dob": "1990-05-17",
+                "hire_date": "2020-01-06",
+                "full_name": f"Employee {i}",
+                "department": "Engineering" if i % 2 else "Sales",
+                "job_title": "Engineer",
+                "tenant_id": test_tenant.id,
+            }
+            for i in range(25)
+        ]
+        rows.append({"email": "", "full_name": "No email"})
+        path = tmp_path / "hr.csv"
+        _write_csv(path, rows)
+
+        summary = await sync_hr_data(str(path), chunk_size=10, session_factory=session_factory)
+        assert summary["rows"] == 26
+        assert summary["chunks"] == 3
+        assert summary["inserted"] == 25
+        assert summary["changed"] == 0
+        assert summary["skipped"] == 1
+        assert summary["errors"] == []
+        assert summary["rows_per_second"] > 0
+
+        # second run: blank cells keep current values, bad dates are reported
+        _write_csv(path, [
+            {"email": f"{prefix}_0@hr.test", "department": "Finance"},
+            {"email": f"{prefix}_1@hr.test", "dob": "17/05/1990", "job_title": "Lead"},
+        ])
+        summary = await sync_hr_data(str(path), chunk_size=10, session_factory=session_factory)
+        assert summary["changed"] == 2
+        assert summary["inserted"] == 0
+        assert len(summary["errors"]) == 1
+        assert "dob" in summary["errors"][0]["error"]
+
+        res = await db_session.execute(
+            select(User).where(User.email.in_([f"{prefix}_0@hr.test", f"{prefix}_1@hr.test"])).order_by(User.email)
+        )
+        first, second = res.scalars().all()
+        assert first.department == "Finance"
+        assert first.full_name == "Employee 0"
+        assert second.job_title == "Lead"
+        assert str(second.date_of_birth) == "1990-05-17"
+
+    @pytest.mark.asyncio
+    async def test_bad_row_does_not_abort_chunk(self, tmp_path, session_factory, db_session, test_engine, caplog):
+        prefix = uuid.uuid4().hex[:8]
+        bad = f"{prefix}_bad@hr.test"
+        async with test_engine.begin() as conn:
+            await conn.execute(text(
+                f"CREATE TRIGGER reject_{prefix} BEFORE INSERT ON users "
+                f"WHEN NEW.email = '{bad}' BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+            ))
+        try:
+            path = tmp_path / "hr.csv"
+            _write_csv(path, [
+                {"email": f"{prefix}_a@hr.test", "full_name": "A"},
+                {"email": bad, "full_name": "Bad"},
+                {"email": f"{prefix}_b@hr.test", "full_name": "B"},
+            ])
+            with caplog.at_level(logging.INFO, logger="app.services.hr_sync"):
+                summary = await sync_hr_data(str(path), chunk_size=10, session_factory=session_factory)
+        finally:
+            async with test_engine.begin() as conn:
+                await conn.execute(text(f"DROP TRIGGER reject_{prefix}"))
+
+        assert summary["inserted"] == 2
+        assert [e["email"] for e in summary["errors"]] == [bad]
+        warnings = [r.getMessage() for r in caplog.records if r.levelno == logging.WARNING]
+        assert len(warnings) == 1 and bad in warnings[0]
+        assert any(r.getMessage().startswith("HR sync completed") for r in caplog.records)
+        res = await db_session.execute(select(User.email).where(User.email.like(f"{prefix}_%")))
+        assert sorted(r[0] for r in res.all()) == [f"{prefix}_a@hr.test", f"{prefix}_b@hr.test"]
+
+    @pytest.mark.asyncio
+    async def test_unchanged_rows_are_skipped_and_missing_deactivated(self, tmp_path, session_factory, db_session, test_tenant):
+        prefix = uuid.uuid4().hex[:8]
+        rows = [
+            {"email": f"{prefix}_{i}@hr.test", "full_name": f"E{i}", "department": "Ops", "tenant_id": test_tenant.id}
+            for i in range(6)
+        ]
+        path = tmp_path / "hr.csv"
+        _write_csv(path, rows)
+        first = await sync_hr_data(str(path), chunk_size=4, session_factory=session_factory, deactivate_missing=True)
+        assert first["inserted"] == 6
+
+        same = await sync_hr_data(str(path), chunk_size=4, session_factory=session_factory, deactivate_missing=True)
+        assert (same["inserted"], same["changed"], same["unchanged"], same["deactivated"]) == (0, 0, 6, 0)
+
+        rows[0]["job_title"] = "Manager"
+        _write_csv(path, rows[:5])
+        churn = await sync_hr_data(str(path), chunk_size=4, session_factory=session_factory, deactivate_missing=True)
+        assert (churn["inserted"], churn["changed"], churn["unchanged"], churn["deactivated"]) == (0, 1, 4, 1)
+
+        res = await db_session.execute(select(User.is_active).where(User.email == f"{prefix}_5@hr.test"))
+        assert res.scalar_one() is False
+
+        _write_csv(path, rows)
+        back = await sync_hr_data(str(path), chunk_size=4, session_factory=session_factory, deactivate_missing=True)
+        assert (back["changed"], back["unchanged"], back["deactivated"]) == (1, 5, 0)
+        db_session.expire_all()
+        res = await db_session.execute(select(User.is_active).where(User.email == f"{prefix}_5@hr.test"))
+        assert res.scalar_one() is True
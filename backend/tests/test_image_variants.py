@@ -0,0 +1,99 @@
+import io
+import os
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.datastructures import Headers, UploadFile
+from starlette.routing import Mount
+
+from app.core.config import settings
+from app.services import image_variants
+from app.services.upload_storage import store_upload
+
+PIL = pytest.importorskip("PIL")
+from PIL import Image  # noqa: E402
+
+
+def _png(width=1600, height=900, alpha=False) -> bytes:
+    mode = "RGBA" if alpha else "RGB"
+    img = Image.effect_noise((width, height), 64).convert(mode)
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+async def _store(data: bytes, subdir="gifts"):
+    upload = UploadFile(io.BytesIO(data), filename="photo.png", headers=Headers({"content-type": "image/png"}))
+    return await store_upload(upload, subdir)
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "IMAGE_PROCESS_WORKERS", 1)
+    yield tmp_path
+    image_variants.shutdown_pool()
+
+
+class TestImageVariants:
+    def test_variant_urls(self):
+        urls = image_variants.variant_urls("/uploads/gifts/ab/abc.png")
+        assert urls["thumb"]["webp"] == "/uploads/gifts/ab/abc_thumb.webp"
+        assert urls["medium"]["jpg"] == "/uploads/gifts/ab/abc_medium.jpg"
+        assert image_variants.variant_urls("https://cdn.example.com/a.png") is None
+        assert image_variants.variant_urls("/uploads/ecard-1.html") is None
+        assert image_variants.variant_urls(None) is None
+
+    @pytest.mark.asyncio
+    async def test_render_resizes_without_upscaling(self, upload_dir):
+        stored = await _store(_png(alpha=True))
+        source = os.path.join(str(upload_dir), "gifts", stored.key)
+        written = image_variants.render_variants(source)
+        assert len(written) == 4
+        stem = os.path.splitext(source)[0]
+        with Image.open(f"{stem}_thumb.webp") as img:
+            assert max(img.size) == image_variants.VARIANT_SIZES["thumb"]
+        with Image.open(f"{stem}_medium.jpg") as img:
+            assert img.format == "JPEG" and img.mode == "RGB"
+            assert max(img.size) == image_variants.VARIANT_SIZES["medium"]
+        assert os.path.getsize(f"{stem}_thumb.webp") < stored.size / 10
+        # second call has nothing left to do
+        assert image_variants.render_variants(source) == []
+
+        small = await _store(_png(100, 50))
+        small_source = os.path.join(str(upload_dir), "gifts", small.key)
+        image_variants.render_variants(small_source)
+        with Image.open(os.path.splitext(small_source)[0] + "_medium.webp") as img:
+            assert img.size == (100, 50)
+
+    @pytest.mark.asyncio
+    async def test_missing_variant_is_generated_on_first_request(self, upload_dir):
+        stored = await _store(_png())
+        app = Starlette(routes=[Mount("/uploads", image_variants.VariantStaticFiles(directory=str(upload_dir)))])
+        thumb_url = image_variants.variant_urls(stored.url)["thumb"]["webp"]
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            resp = await client.get(thumb_url)
+            assert resp.status_code == 200
+            assert resp.headers["content-type"] == "image/webp"
+            assert len(resp.content) < stored.size
+
+            original = await client.get(stored.url)
+            assert original.status_code == 200 and original.content[:4] == b"\x89PNG"
+
+            missing = await client.get("/uploads/gifts/zz/nothing_thumb.webp")
+            assert missing.status_code == 404
+            escape = await client.get("/uploads/../secret_thumb.webp")
+            assert escape.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_schedule_renders_in_background(self, upload_dir):
+        stored = await _store(_png())
+        image_variants.schedule_variants(stored.url)
+        for task in list(image_variants._tasks):
+            await task
+        stem = os.path.splitext(os.path.join(str(upload_dir), "gifts", stored.key))[0]
+        for variant in image_variants.VARIANT_SIZES:
+            for fmt in image_variants.FORMATS:
+                assert os.path.isfile(f"{stem}_{variant}.{fmt}")
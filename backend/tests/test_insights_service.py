@@ -0,0 +1,87 @@
+import asyncio
+import uuid
+import datetime
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.insights import TenantInsightsSnapshot
+from app.models.recognition import Recognition, RecognitionStatus
+from app.models.users import User, UserRole
+from app.services import department_flow_service, insights_service
+
+
+class TestInsightsSnapshots:
+    @pytest.mark.asyncio
+    async def test_dark_zone_uses_last_recognition(self, db_session, test_tenant, tenant_admin_user):
+        recent = User(email=f"recent_{uuid.uuid4().hex[:8]}@test.com", full_name="Recent", role=UserRole.CORPORATE_USER, tenant_id=test_tenant.id, is_active=True)
+        never = User(email=f"never_{uuid.uuid4().hex[:8]}@test.com", full_name="Never", role=UserRole.CORPORATE_USER, tenant_id=test_tenant.id, is_active=True)
+        db_session.add_all([recent, never])
+        await db_session.commit()
+        db_session.add(Recognition(tenant_id=test_tenant.id, nominator_id=tenant_admin_user.id, nominee_id=recent.id, points=10, status=RecognitionStatus.APPROVED))
+        await db_session.commit()
+
+        payload = await insights_service.compute_tenant_insights(db_session, test_tenant.id)
+        dark_ids = {u["id"] for u in payload["dark_zone"]["users"]}
+        assert never.id in dark_ids
+        assert recent.id not in dark_ids
+
+    @pytest.mark.asyncio
+    async def test_totals_and_cross_dept_share_the_approved_matrix(self, db_session, test_tenant):
+        eng = User(email=f"eng_{uuid.uuid4().hex[:8]}@test.com", full_name="Eng", role=UserRole.CORPORATE_USER, tenant_id=test_tenant.id, department="Engineering", is_active=True)
+        sales = User(email=f"sales_{uuid.uuid4().hex[:8]}@test.com", full_name="Sales", role=UserRole.CORPORATE_USER, tenant_id=test_tenant.id, department="Sales", is_active=True)
+        db_session.add_all([eng, sales])
+        await db_session.commit()
+        for status in (RecognitionStatus.APPROVED, RecognitionStatus.PENDING):
+            db_session.add(Recognition(tenant_id=test_tenant.id, nominator_id=eng.id, nominee_id=sales.id, points=10, status=status))
+        await db_session.commit()
+        await department_flow_service.rebuild_department_flows(db_session, test_tenant.id)
+        await db_session.commit()
+
+        payload = await insights_service.compute_tenant_insights(db_session, test_tenant.id)
+        assert payload["metrics_summary"]["total_recognitions_tracked"] == 1
+        assert payload["cross_dept_collaboration"]["total_cross_dept_awards"] == 1
+        assert payload["cross_dept_collaboration"]["percentage"] == 100.0
+
+    @pytest.mark.asyncio
+    async def test_snapshot_goes_stale_after_activity(self, db_session, test_tenant, tenant_admin_user, monkeypatch):
+        monkeypatch.setattr(settings, "INSIGHTS_SNAPSHOT_ACTIVITY_THRESHOLD", 2)
+        snap = await insights_service.refresh_snapshot(db_session, test_tenant.id)
+        assert snap.payload["tenant_id"] == test_tenant.id
+        assert await insights_service.is_snapshot_stale(db_session, snap) is False
+
+        later = datetime.datetime.utcnow() + datetime.timedelta(seconds=5)
+        for _ in range(2):
+            db_session.add(Recognition(tenant_id=test_tenant.id, nominator_id=tenant_admin_user.id, nominee_id=tenant_admin_user.id, points=5, created_at=later))
+        await db_session.commit()
+        assert await insights_service.is_snapshot_stale(db_session, snap) is True
+
+    @pytest.mark.asyncio
+    async def test_concurrent_refreshes_upsert_one_row(self, session_factory, db_session, test_tenant):
+        async def refresh():
+            async with session_factory() as db:
+                return await insights_service.refresh_snapshot(db, test_tenant.id)
+
+        first, second = await asyncio.gather(refresh(), refresh())
+        assert first.id == second.id
+        count = await db_session.execute(
+            select(func.count(TenantInsightsSnapshot.id)).where(TenantInsightsSnapshot.tenant_id == test_tenant.id)
+        )
+        assert count.scalar() == 1
+
+    @pytest.mark.asyncio
+    async def test_scheduled_refresh_is_referenced_until_done(self, monkeypatch):
+        release = asyncio.Event()
+
+        async def refresh(tenant_id):
+            await release.wait()
+            insights_service._refreshing.discard(tenant_id)
+
+        monkeypatch.setattr(insights_service, "_refresh_in_background", refresh)
+        assert insights_service.schedule_refresh("t-1") is True
+        assert insights_service.schedule_refresh("t-1") is False
+        (task,) = insights_service._tasks
+        release.set()
+        await task
+        await asyncio.sleep(0)
+        assert not insights_service._tasks
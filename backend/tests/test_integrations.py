@@ -0,0 +1,119 @@
+import uuid
+import pytest
+import httpx
+from sqlalchemy import select
+
+from app.integrations import okta, azure_ad, workday
+from app.integrations.http_client import ProviderError, prefetch, request_with_backoff, retry_delay
+from app.jobs.user_sync import sync_users, _mapped
+from app.models.users import User
+from benchmarks.fake_provider import build_fake_provider_app, synthetic_directory
+
+BASE = "http://fake.provider"
+
+
+def _http(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=BASE)
+
+
+async def _collect(source):
+    return [item async for item in source]
+
+
+class TestConnectors:
+    @pytest.mark.asyncio
+    async def test_okta_follows_link_pagination(self):
+        users = synthetic_directory(45, prefix="okta")
+        app = build_fake_provider_app(users)
+        async with _http(app) as http:
+            client = okta.OktaClient(BASE, "token", page_size=10, http=http)
+            fetched = await _collect(client.fetch_users())
+        assert [u["id"] for u in fetched] == [u["id"] for u in users]
+        assert app.state.stats["requests"] == 5
+        mapped = okta.map_to_local(fetched[3])
+        assert mapped["email"] == users[3]["email"]
+        assert mapped["manager_external_id"] == users[3]["manager_id"]
+
+    @pytest.mark.asyncio
+    async def test_azure_ad_token_and_next_link(self):
+        users = synthetic_directory(25, prefix="aad")
+        app = build_fake_provider_app(users)
+        async with _http(app) as http:
+            client = azure_ad.AzureADClient("dir", "cid", "secret", page_size=10, http=http,
+                                            login_url=BASE, graph_url=BASE)
+            fetched = await _collect(client.fetch_users())
+        assert len(fetched) == 25
+        # one token request, three pages
+        assert app.state.stats["requests"] == 4
+        assert azure_ad.map_to_local(fetched[0])["manager_external_id"] is None
+        assert azure_ad.map_to_local(fetched[1])["manager_external_id"] == users[0]["id"]
+
+    @pytest.mark.asyncio
+    async def test_workday_concurrent_offsets_keep_order(self):
+        users = synthetic_directory(95, prefix="wd")
+        app = build_fake_provider_app(users, latency=0.001)
+        async with _http(app) as http:
+            client = workday.WorkdayClient(BASE, "key", page_size=10, http=http, concurrency=4)
+            fetched = await _collect(client.fetch_employees())
+        assert [e["employeeId"] for e in fetched] == [u["id"] for u in users]
+        assert app.state.stats["requests"] == 10
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_requests_are_retried(self):
+        users = synthetic_directory(30, prefix="rl")
+        app = build_fake_provider_app(users, throttle_every=2)
+        async with _http(app) as http:
+            client = okta.OktaClient(BASE, "token", page_size=10, http=http)
+            fetched = await _collect(client.fetch_users())
+        assert len(fetched) == 30
+        assert app.state.stats["throttled"] >= 2
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        app = build_fake_provider_app([], throttle_every=1)
+        async with _http(app) as http:
+            with pytest.raises(ProviderError) as exc:
+                await request_with_backoff(http, "GET", "/api/v1/users", max_retries=2)
+        assert exc.value.status_code == 429
+        assert app.state.stats["requests"] == 3
+
+    def test_retry_delay_prefers_retry_after(self):
+        resp = httpx.Response(429, headers={"Retry-After": "7"})
+        assert retry_delay(resp, attempt=0) == 7.0
+        assert 0 <= retry_delay(httpx.Response(503), attempt=3, base=0.5) <= 4.0
+
+    @pytest.mark.asyncio
+    async def test_prefetch_propagates_producer_errors(self):
+        async def pages():
+            yield 1
+            raise RuntimeError("boom")
+
+        seen = []
+        with pytest.raises(RuntimeError):
+            async for page in prefetch(pages(), depth=1):
+                seen.append(page)
+        assert seen == [1]
+
+
+class TestConnectorSync:
+    @pytest.mark.asyncio
+    async def test_okta_stream_feeds_sync_users(self, session_factory, test_tenant):
+        prefix = uuid.uuid4().hex[:8]
+        users = synthetic_directory(60, fanout=4, prefix=prefix)
+        app = build_fake_provider_app(users, throttle_every=5)
+        async with _http(app) as http:
+            client = okta.OktaClient(BASE, "token", page_size=25, http=http)
+            summary = await sync_users(
+                test_tenant.id, "okta", _mapped(client.fetch_users(), okta.map_to_local),
+                batch_size=20, session_factory=session_factory,
+            )
+        assert summary["fetched"] == 60
+        assert summary["inserted"] == 60
+        assert summary["unresolved_managers"] == 0
+
+        async with session_factory() as session:
+            res = await session.execute(
+                select(User.external_id, User.manager_id, User.id).where(User.external_id.like(f"{prefix}-%"))
+            )
+            rows = {ext: (mgr, uid) for ext, mgr, uid in res.all()}
+        assert rows[f"{prefix}-0000005"][0] == rows[f"{prefix}-0000001"][1]
@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import metrics
+from app.core.cache import get_cached_balance, set_cached_balance
+from app.db.session import timed_pool_class
+
+
+def _sample(body: str, prefix: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not in metrics output")
+
+
+class TestHistogram:
+    def test_buckets_are_cumulative(self):
+        hist = metrics.Histogram("t_seconds", "test", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            hist.observe("/x", value=value)
+        lines = hist.render()
+        assert 't_seconds_bucket{route="/x",le="0.1"} 1' in lines
+        assert 't_seconds_bucket{route="/x",le="1"} 3' in lines
+        assert 't_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+        assert 't_seconds_count{route="/x"} 4' in lines
+        assert 't_seconds_sum{route="/x"} 4.05' in lines
+
+    def test_label_values_are_escaped(self):
+        counter = metrics.Counter("t_total", "test", ("path",))
+        counter.inc('a"b\\c')
+        assert counter.render()[-1] == 't_total{path="a\\"b\\\\c"} 1'
+
+
+class TestMetricsEndpoint:
+    @pytest.mark.asyncio
+    async def test_requests_are_recorded_by_route_template(self, client):
+        before = metrics.REQUESTS.value("GET", "/badges/{badge_id}", "422")
+        await client.get("/badges/not-a-uuid")
+        await client.get("/badges/also-not-a-uuid")
+        assert metrics.REQUESTS.value("GET", "/badges/{badge_id}", "422") == before + 2
+
+        resp = await client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = resp.text
+        assert "# TYPE http_request_duration_seconds histogram" in body
+        assert _sample(body, 'http_request_duration_seconds_count{method="GET",route="/badges/{badge_id}"}') >= 2
+        assert 'http_response_size_bytes_bucket{method="GET",route="/badges/{badge_id}",le="100"}' in body
+        assert "http_requests_in_flight 1" in body  # the scrape itself
+        assert 'sqlalchemy_statement_cache_total{result="hit"}' in body
+
+    @pytest.mark.asyncio
+    async def test_unknown_paths_share_one_label(self, client):
+        before = metrics.REQUESTS.value("GET", metrics.UNMATCHED_ROUTE, "404")
+        await client.get("/no-such-page/1")
+        await client.get("/no-such-page/2")
+        assert metrics.REQUESTS.value("GET", metrics.UNMATCHED_ROUTE, "404") == before + 2
+
+
+class TestCacheAndPoolMetrics:
+    @pytest.mark.asyncio
+    async def test_balance_cache_hits_and_misses(self):
+        hits = metrics.CACHE_REQUESTS.value("balance", "hit")
+        misses = metrics.CACHE_REQUESTS.value("balance", "miss")
+        await get_cached_balance("balance:t-metrics:u-1")
+        await set_cached_balance("balance:t-metrics:u-1", 10)
+        assert await get_cached_balance("balance:t-metrics:u-1") == 10
+        assert metrics.CACHE_REQUESTS.value("balance", "hit") == hits + 1
+        assert metrics.CACHE_REQUESTS.value("balance", "miss") == misses + 1
+
+    @pytest.mark.asyncio
+    async def test_pool_checkout_wait_is_observed(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/pool.db", poolclass=timed_pool_class("test"))
+        try:
+            before = metrics.POOL_WAIT.snapshot("test")["count"]
+            for _ in range(3):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            await engine.dispose()  # the recreated pool keeps reporting
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            assert metrics.POOL_WAIT.snapshot("test")["count"] == before + 4
+        finally:
+            await engine.dispose()
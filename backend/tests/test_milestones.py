@@ -116,3 +116,110 @@ async def test_milestone_automation_service(db_session, milestone_users, tenant_
     print(f"DEBUG MESSAGES: {messages}")
     assert any("Happy 30th Birthday" in m for m in messages)
     assert any("Happy 2nd Work Anniversary" in m for m in messages)
+
+
+class TestMilestoneCalendar:
+    def test_leap_day_observed_on_march_first(self):
+        from app.services.milestone_service import next_occurrence, observed_date
+
+        leapling = date(1992, 2, 29)
+        assert observed_date(leapling, 2027) == date(2027, 3, 1)
+        assert observed_date(leapling, 2028) == date(2028, 2, 29)
+        assert next_occurrence(leapling, date(2027, 3, 2)) == date(2028, 2, 29)
+        assert next_occurrence(date(1990, 12, 31), date(2026, 12, 31)) == date(2026, 12, 31)
+
+    def test_month_day_maintained_on_write(self):
+        u = User(email="md@test.com", role=UserRole.CORPORATE_USER, date_of_birth=date(1992, 2, 29))
+        assert u.birthday_md == 229 and u.hire_md is None
+        u.hire_date = date(2020, 12, 31)
+        assert u.hire_md == 1231
+        u.date_of_birth = None
+        assert u.birthday_md is None
+
+    @pytest.mark.asyncio
+    async def test_window_queries(self, db_session, test_tenant):
+        from app.services.milestone_service import month_day_window
+
+        uid = uuid.uuid4().hex[:8]
+        births = {
+            "dec30": date(1990, 12, 30),
+            "jan02": date(1991, 1, 2),
+            "feb29": date(1992, 2, 29),
+            "mar01": date(1993, 3, 1),
+            "jun15": date(1994, 6, 15),
+        }
+        db_session.add_all([
+            User(email=f"{name}_{uid}@test.com", full_name=name, date_of_birth=dob,
+                 tenant_id=test_tenant.id, role=UserRole.CORPORATE_USER)
+            for name, dob in births.items()
+        ])
+        await db_session.commit()
+
+        async def names(start, end):
+            res = await db_session.execute(
+                select(User.full_name).where(
+                    User.tenant_id == test_tenant.id, month_day_window(User.birthday_md, start, end)
+                )
+            )
+            return sorted(res.scalars().all())
+
+        # across New Year
+        assert await names(date(2026, 12, 28), date(2027, 1, 3)) == ["dec30", "jan02"]
+        # common year: Feb 29 is celebrated on Mar 1
+        assert await names(date(2027, 3, 1), date(2027, 3, 1)) == ["feb29", "mar01"]
+        assert await names(date(2027, 2, 28), date(2027, 2, 28)) == []
+        # leap year: on its own day only
+        assert await names(date(2028, 2, 29), date(2028, 2, 29)) == ["feb29"]
+        assert await names(date(2028, 3, 1), date(2028, 3, 1)) == ["mar01"]
+        assert len(await names(date(2026, 1, 1), date(2027, 1, 1))) == 5
+
+
+class TestDailyMilestoneJob:
+    @pytest.mark.asyncio
+    async def test_batched_run_is_idempotent_per_day(self, session_factory, db_session, test_tenant):
+        from app.models.milestones import Milestone
+        from app.models.tenants import Tenant
+
+        day = date(2027, 3, 1)
+        uid = uuid.uuid4().hex[:8]
+        other = Tenant(name="Other", subdomain=f"other-{uid}")
+        db_session.add(other)
+        await db_session.commit()
+        tenant_ids = [test_tenant.id, other.id]
+
+        users = [User(email=f"po_{uid}@test.com", full_name="System", role=UserRole.PLATFORM_OWNER, is_active=True)]
+        for n, tenant_id in enumerate(tenant_ids):
+            users += [
+                User(email=f"leap_{n}_{uid}@test.com", full_name=f"Leap {n}", date_of_birth=date(1992, 2, 29),
+                     tenant_id=tenant_id, role=UserRole.CORPORATE_USER, is_active=True),
+                User(email=f"anniv_{n}_{uid}@test.com", full_name=f"Anniv {n}", hire_date=date(2024, 3, 1),
+                     tenant_id=tenant_id, role=UserRole.CORPORATE_USER, is_active=True),
+                User(email=f"new_{n}_{uid}@test.com", full_name=f"New {n}", hire_date=day,
+                     tenant_id=tenant_id, role=UserRole.CORPORATE_USER, is_active=True),
+                User(email=f"gone_{n}_{uid}@test.com", full_name=f"Gone {n}", date_of_birth=date(1980, 3, 1),
+                     tenant_id=tenant_id, role=UserRole.CORPORATE_USER, is_active=False),
+            ]
+        db_session.add_all(users)
+        await db_session.commit()
+        user_ids = [u.id for u in users]
+
+        first = await process_daily_milestones(today=day, session_factory=session_factory, concurrency=2)
+        again = await process_daily_milestones(today=day, session_factory=session_factory, concurrency=2)
+
+        assert first["awarded"] >= 4 and not first["failed_tenants"]
+        assert again["awarded"] == 0
+        assert again["already_awarded"] >= 4
+
+        async with session_factory() as session:
+            recs = (await session.execute(
+                select(Recognition).where(Recognition.nominee_id.in_(user_ids))
+            )).scalars().all()
+            marks = (await session.execute(
+                select(Milestone).where(Milestone.user_id.in_(user_ids))
+            )).scalars().all()
+        assert len(recs) == 4
+        assert {r.tenant_id for r in recs} == set(tenant_ids)
+        assert all(r.status.value == "APPROVED" and r.points == 100 for r in recs)
+        assert sum("Happy 35th Birthday" in r.message for r in recs) == 2
+        assert sum("Happy 3rd Work Anniversary" in r.message for r in recs) == 2
+        assert sorted(m.recognition_id for m in marks) == sorted(r.id for r in recs)
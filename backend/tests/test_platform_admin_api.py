@@ -179,4 +179,22 @@ class TestTenantAdminAPI:
 
         response = await client.post("/platform/create-tenant-admin", json=admin_data, headers=headers)
         assert response.status_code == 400
-        assert "Email already exists" in response.json()["detail"]
\ No newline at end of file
+        assert "Email already exists" in response.json()["detail"]
+
+class TestTenantInsightsAPI:
+    @pytest.mark.asyncio
+    async def test_insights_served_from_snapshot(self, client, platform_admin_token, test_tenant):
+        """First call builds the snapshot; later calls return the same payload."""
+        headers = {"Authorization": f"Bearer {platform_admin_token}"}
+
+        first = await client.get(f"/platform/tenant-insights/{test_tenant.id}", headers=headers)
+        assert first.status_code == 200
+        data = first.json()
+        assert data["tenant_id"] == test_tenant.id
+        assert "recognition_velocity" in data
+        assert data["generated_at"] is not None
+        assert data["stale"] is False
+
+        second = await client.get(f"/platform/tenant-insights/{test_tenant.id}", headers=headers)
+        assert second.status_code == 200
+        assert second.json()["generated_at"] == data["generated_at"]
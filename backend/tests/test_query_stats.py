@@ -0,0 +1,94 @@
+import logging
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import metrics
+from app.core.config import settings
+from app.db import query_stats
+from app.db.query_stats import QueryStatsMiddleware, statement_shape, track_queries
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    eng = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/queries.db")
+    yield eng
+    await eng.dispose()
+
+
+def _app(engine):
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/items/{count}")
+    async def items(count: int):
+        async with engine.connect() as conn:
+            for i in range(count):
+                await conn.execute(text("SELECT :i"), {"i": i})
+        return {"ok": True}
+
+    return app
+
+
+class TestStatementShape:
+    def test_in_lists_and_whitespace_collapse(self):
+        assert statement_shape("SELECT a FROM t WHERE id IN (?, ?, ?)") == "SELECT a FROM t WHERE id IN (?)"
+        assert statement_shape("SELECT a\n  FROM t WHERE id IN ($1, $2)") == "SELECT a FROM t WHERE id IN (?)"
+        assert statement_shape("INSERT INTO t (a, b) VALUES (?, ?)") == "INSERT INTO t (a, b) VALUES (?)"
+
+
+class TestQueryStats:
+    @pytest.mark.asyncio
+    async def test_nested_trackers_both_count(self, engine):
+        with track_queries() as outer:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                with track_queries() as inner:
+                    await conn.execute(text("SELECT 2"))
+        assert (outer.count, inner.count) == (2, 1)
+        assert outer.seconds >= inner.seconds > 0
+
+    @pytest.mark.asyncio
+    async def test_response_headers_and_metrics(self, engine, monkeypatch):
+        monkeypatch.setattr(settings, "SQL_STATS_HEADERS", None)
+        monkeypatch.setattr(settings, "STARTUP_PROFILE", "development")
+        before = query_stats.QUERIES_PER_REQUEST.snapshot("GET", "/items/{count}")
+        async with AsyncClient(app=_app(engine), base_url="http://t") as client:
+            resp = await client.get("/items/3")
+            assert resp.headers["x-db-queries"] == "3"
+            assert float(resp.headers["x-db-time-ms"]) >= 0
+
+            monkeypatch.setattr(settings, "STARTUP_PROFILE", "production")
+            resp = await client.get("/items/2")
+            assert "x-db-queries" not in resp.headers
+        after = query_stats.QUERIES_PER_REQUEST.snapshot("GET", "/items/{count}")
+        assert after["count"] == before["count"] + 2
+        assert after["sum"] == before["sum"] + 5
+
+    @pytest.mark.asyncio
+    async def test_repeated_statement_is_reported(self, engine, monkeypatch, caplog):
+        monkeypatch.setattr(settings, "SQL_REPEAT_WARN_THRESHOLD", 5)
+        before = query_stats.REPEATED_STATEMENTS.value("GET", "/items/{count}")
+        async with AsyncClient(app=_app(engine), base_url="http://t") as client:
+            with caplog.at_level(logging.WARNING, logger="app.db.query_stats"):
+                await client.get("/items/5")
+                assert not caplog.records
+                await client.get("/items/6")
+        assert "possible N+1 in GET /items/{count}: statement ran 6 times" in caplog.text
+        assert query_stats.REPEATED_STATEMENTS.value("GET", "/items/{count}") == before + 1
+        assert "db_repeated_statement_requests_total" in metrics.render()
+
+    @pytest.mark.asyncio
+    async def test_assert_max_queries_fails_over_the_limit(self, engine, assert_max_queries):
+        async with engine.connect() as conn:
+            with assert_max_queries(2):
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 1"))
+            with pytest.raises(pytest.fail.Exception, match="3 SQL statements executed, expected at most 2"):
+                with assert_max_queries(2):
+                    for _ in range(3):
+                        await conn.execute(text("SELECT 1"))
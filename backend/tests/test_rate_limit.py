@@ -0,0 +1,221 @@
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from starlette.responses import PlainTextResponse
+
+from app.core import rate_limit
+from app.core.auth import create_access_token
+from app.core.config import settings
+from app.core.rate_limit import RateLimitMiddleware, TokenBuckets, parse_route_costs, route_cost
+from app.db.session import WaitTracker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+async def _ok(scope, receive, send):
+    await PlainTextResponse("ok")(scope, receive, send)
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "REDIS_URL", None)
+    monkeypatch.setattr(settings, "RATE_LIMIT_TENANT_PER_SECOND", 10.0)
+    monkeypatch.setattr(settings, "RATE_LIMIT_TENANT_BURST", 6)
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_PER_SECOND", 1.0)
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_BURST", 4)
+    monkeypatch.setattr(settings, "LOAD_SHED_POOL_WAIT_MS", 100.0)
+    return settings
+
+
+def _client(middleware):
+    return AsyncClient(app=middleware, base_url="http://testserver")
+
+
+def _auth(sub, tenant="t-1"):
+    return {"Authorization": f"Bearer {create_access_token({'sub': sub, 'tenant_id': tenant})}"}
+
+
+class TestTokenBuckets:
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        buckets = TokenBuckets(clock=clock)
+        assert [buckets.take("k", rate=2, burst=3) for _ in range(3)] == [0, 0, 0]
+        assert buckets.take("k", rate=2, burst=3) == pytest.approx(0.5)
+        clock.now += 0.5
+        assert buckets.take("k", rate=2, burst=3) == 0
+        clock.now += 60
+        assert [buckets.take("k", rate=2, burst=3) for _ in range(4)][-1] > 0  # refill is capped at burst
+
+    def test_cost_and_rejection_spends_nothing(self):
+        clock = FakeClock()
+        buckets = TokenBuckets(clock=clock)
+        assert buckets.take("k", rate=1, burst=10, cost=8) == 0
+        assert buckets.take("k", rate=1, burst=10, cost=5) == pytest.approx(3)
+        assert buckets.take("k", rate=1, burst=10, cost=2) == 0
+
+
+class TestRouteCosts:
+    def test_longest_prefix_and_method(self):
+        costs = {("*", "/admin"): 2, ("*", "/admin/stats"): 10, ("POST", "/uploads"): 5}
+        assert route_cost("GET", "/admin/stats/daily", costs) == 10
+        assert route_cost("GET", "/admin/users", costs) == 2
+        assert route_cost("GET", "/uploads/x", costs) == 1
+        assert route_cost("POST", "/uploads/x", costs) == 5
+
+    def test_parse_overrides(self):
+        assert parse_route_costs("GET /analytics=8, /exports = 20,,") == {
+            ("GET", "/analytics"): 8, ("*", "/exports"): 20,
+        }
+        assert parse_route_costs(None) == {}
+
+
+class TestRateLimitMiddleware:
+    @pytest.mark.asyncio
+    async def test_user_limit_returns_429_with_retry_after(self, limits):
+        mw = RateLimitMiddleware(_ok, buckets=TokenBuckets(clock=FakeClock()), pool_wait=WaitTracker())
+        async with _client(mw) as client:
+            statuses = [(await client.get("/badges", headers=_auth("u1"))).status_code for _ in range(5)]
+            assert statuses == [200, 200, 200, 200, 429]
+            resp = await client.get("/badges", headers=_auth("u1"))
+            assert resp.json() == {"detail": "Rate limit exceeded"}
+            assert resp.headers["retry-after"] == "1"
+            # another user of the same tenant has their own bucket
+            assert (await client.get("/badges", headers=_auth("u2"))).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_tenant_bucket_is_shared_by_its_users(self, limits):
+        mw = RateLimitMiddleware(_ok, buckets=TokenBuckets(clock=FakeClock()), pool_wait=WaitTracker())
+        before = rate_limit.REJECTED.value("tenant")
+        async with _client(mw) as client:
+            for user in ("a", "a", "a", "b", "b", "b"):
+                assert (await client.get("/badges", headers=_auth(user))).status_code == 200
+            resp = await client.get("/badges", headers=_auth("c"))
+            assert resp.status_code == 429
+            assert resp.json()["detail"] == "Tenant rate limit exceeded"
+            assert (await client.get("/badges", headers=_auth("c", tenant="t-2"))).status_code == 200
+        assert rate_limit.REJECTED.value("tenant") == before + 1
+
+    @pytest.mark.asyncio
+    async def test_route_cost_spends_more_tokens(self, limits, monkeypatch):
+        monkeypatch.setattr(settings, "RATE_LIMIT_ROUTE_COSTS", "GET /reports=3")
+        mw = RateLimitMiddleware(_ok, buckets=TokenBuckets(clock=FakeClock()), pool_wait=WaitTracker())
+        async with _client(mw) as client:
+            assert (await client.get("/reports/x", headers=_auth("u1"))).status_code == 200
+            resp = await client.get("/reports/x", headers=_auth("u1"))
+            assert resp.status_code == 429
+            assert resp.headers["retry-after"] == "2"
+            assert (await client.get("/badges", headers=_auth("u1"))).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_anonymous_requests_are_limited_by_address(self, limits):
+        mw = RateLimitMiddleware(_ok, buckets=TokenBuckets(clock=FakeClock()), pool_wait=WaitTracker())
+        async with _client(mw) as client:
+            anonymous = {"X-Tenant-ID": "t-1"}
+            statuses = [(await client.get("/auth/login", headers=anonymous)).status_code for _ in range(5)]
+            assert statuses == [200, 200, 200, 200, 429]
+            # the unverified tenant header spent nothing from t-1's bucket
+            for user in ("a", "a", "a", "b", "b", "b"):
+                assert (await client.get("/badges", headers=_auth(user))).status_code == 200
+            # exempt paths and static uploads are never limited
+            assert (await client.get("/metrics")).status_code == 200
+            assert (await client.get("/uploads/ab/cd.png")).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_load_shedding_on_pool_wait(self, limits):
+        clock = FakeClock()
+        wait = WaitTracker(clock=clock)
+        mw = RateLimitMiddleware(_ok, buckets=TokenBuckets(clock=clock), pool_wait=wait)
+        for _ in range(10):
+            wait.observe(0.15)  # above the 100ms threshold, below twice it
+        async with _client(mw) as client:
+            assert (await client.get("/badges", headers=_auth("u1"))).status_code == 200
+            shed = await client.get("/analytics/summary", headers=_auth("u1"))
+            assert shed.status_code == 429
+            assert shed.headers["retry-after"] == str(settings.LOAD_SHED_RETRY_AFTER_SECONDS)
+
+            for _ in range(10):
+                wait.observe(0.5)
+            assert (await client.get("/badges", headers=_auth("u2"))).status_code == 429
+
+            clock.now += 10  # nothing checked out for a while: the wait decays
+            assert (await client.get("/analytics/summary", headers=_auth("u3"))).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_redis_windows_shared_across_workers(self, limits, monkeypatch):
+        counters = {}
+
+        async def fake_increment(key, window_seconds=60, amount=1):
+            counters[key] = counters.get(key, 0) + amount
+            return counters[key]
+
+        monkeypatch.setattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+        monkeypatch.setattr(rate_limit.redis_client, "rate_limit_increment", fake_increment)
+        monkeypatch.setattr(rate_limit.time, "time", lambda: 1_000_001.0)  # stay inside one window
+        workers = [RateLimitMiddleware(_ok, pool_wait=WaitTracker()) for _ in range(2)]
+        statuses = []
+        for i in range(5):
+            async with _client(workers[i % 2]) as client:
+                statuses.append((await client.get("/badges", headers=_auth("u1"))).status_code)
+        assert statuses == [200, 200, 200, 200, 429]
+        assert "rl:user:u1:250000" in counters  # 4s windows (burst / rate)
+        assert any(key.startswith("rl:user:u1:") for key in counters)
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_falls_back_to_local_buckets(self, limits, monkeypatch):
+        async def broken(*args, **kwargs):
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+        monkeypatch.setattr(rate_limit.redis_client, "rate_limit_increment", broken)
+        mw = RateLimitMiddleware(_ok, buckets=TokenBuckets(clock=FakeClock()), pool_wait=WaitTracker())
+        async with _client(mw) as client:
+            statuses = [(await client.get("/badges", headers=_auth("u1"))).status_code for _ in range(5)]
+        assert statuses == [200, 200, 200, 200, 429]
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_setting(self, limits, monkeypatch):
+        monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+        mw = RateLimitMiddleware(_ok, buckets=TokenBuckets(clock=FakeClock()), pool_wait=WaitTracker())
+        async with _client(mw) as client:
+            statuses = {(await client.get("/badges", headers=_auth("u1"))).status_code for _ in range(10)}
+        assert statuses == {200}
+
+    @pytest.mark.asyncio
+    async def test_preflight_is_not_charged(self, limits):
+        mw = RateLimitMiddleware(_ok, buckets=TokenBuckets(clock=FakeClock()), pool_wait=WaitTracker())
+        async with _client(mw) as client:
+            statuses = [(await client.options("/badges", headers=_auth("u1"))).status_code for _ in range(10)]
+            assert statuses == [200] * 10
+            # the preflights spent nothing from the user's bucket
+            statuses = [(await client.get("/badges", headers=_auth("u1"))).status_code for _ in range(5)]
+            assert statuses == [200, 200, 200, 200, 429]
+
+
+class TestRateLimitCors:
+    ORIGIN = "http://localhost:5173"
+
+    @pytest.mark.asyncio
+    async def test_429_carries_cors_headers(self, limits, client):
+        headers = {**_auth("u1", tenant=f"cors-{uuid4().hex}"), "Origin": self.ORIGIN}
+        for _ in range(settings.RATE_LIMIT_USER_BURST + 1):
+            resp = await client.get("/auth/rate-limit-probe", headers=headers)
+        assert resp.status_code == 429
+        assert resp.headers["access-control-allow-origin"] == self.ORIGIN
+
+    @pytest.mark.asyncio
+    async def test_preflight_is_never_rejected(self, limits, client):
+        preflight = {"Origin": self.ORIGIN, "Access-Control-Request-Method": "GET",
+                     "Access-Control-Request-Headers": "authorization"}
+        # more than the anonymous address bucket holds
+        for _ in range(2 * settings.RATE_LIMIT_USER_BURST):
+            resp = await client.options("/auth/rate-limit-probe", headers=preflight)
+            assert resp.status_code == 200
+            assert resp.headers["access-control-allow-origin"] == self.ORIGIN
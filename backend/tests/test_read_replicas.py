@@ -0,0 +1,107 @@
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db import session as db_session_module
+from app.db.base import Base
+from app.db.session import ReplicaRouter, engine_options, get_read_db
+from app.models.tenants import Tenant
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _router(lags, **kw):
+    """Router over fake engines whose probe returns lags[name] (an exception
+    instance is raised)."""
+    calls = []
+
+    async def probe(engine):
+        calls.append(engine)
+        value = lags[engine]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    router = ReplicaRouter("primary", list(lags), max_lag=5, check_interval=10, probe=probe, **kw)
+    return router, calls
+
+
+class TestReplicaRouter:
+    @pytest.mark.asyncio
+    async def test_round_robin_over_healthy_replicas(self):
+        router, _ = _router({"r1": 0, "r2": 1})
+        assert [await router.choose() for _ in range(4)] == ["r1", "r2", "r1", "r2"]
+
+    @pytest.mark.asyncio
+    async def test_lagging_or_failing_replicas_are_skipped(self):
+        router, _ = _router({"r1": 30, "r2": ConnectionError("down"), "r3": 0})
+        assert {await router.choose() for _ in range(6)} == {"r3"}
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_primary(self):
+        router, _ = _router({"r1": 30})
+        assert await router.choose() == "primary"
+        no_replicas = ReplicaRouter("primary", [])
+        assert await no_replicas.choose() == "primary"
+
+    @pytest.mark.asyncio
+    async def test_lag_is_rechecked_after_interval(self):
+        clock = _Clock()
+        lags = {"r1": 30}
+        router, calls = _router(lags, clock=clock)
+        assert await router.choose() == "primary"
+        lags["r1"] = 0
+        assert await router.choose() == "primary"  # cached verdict
+        assert len(calls) == 1
+        clock.now = 11
+        assert await router.choose() == "r1"
+        assert len(calls) == 2
+
+    def test_pool_options_only_for_server_databases(self):
+        assert engine_options("sqlite+aiosqlite:///:memory:") == {}
+        opts = engine_options("postgresql+asyncpg://u:p@db/app")
+        assert {"pool_size", "max_overflow", "pool_recycle", "pool_timeout", "pool_pre_ping"} <= set(opts)
+
+
+class TestGetReadDb:
+    @pytest.mark.asyncio
+    async def test_reads_are_served_by_the_replica(self, tmp_path, monkeypatch):
+        primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/primary.db")
+        replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/replica.db")
+        try:
+            for eng in (primary, replica):
+                async with eng.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+            marker = f"replica-{uuid.uuid4().hex[:8]}"
+            async with replica.begin() as conn:
+                await conn.execute(Tenant.__table__.insert().values(id=str(uuid.uuid4()), name=marker, subdomain=marker, master_budget_balance=0))
+
+            async def read_names():
+                gen = get_read_db()
+                db = await gen.__anext__()
+                try:
+                    return (await db.execute(select(Tenant.name))).scalars().all()
+                finally:
+                    await gen.aclose()
+
+            monkeypatch.setattr(db_session_module, "replica_router", ReplicaRouter(primary, [replica]))
+            assert marker in await read_names()
+
+            async def lagging(_engine):
+                return 3600.0
+
+            monkeypatch.setattr(
+                db_session_module, "replica_router", ReplicaRouter(primary, [replica], probe=lagging)
+            )
+            assert marker not in await read_names()
+        finally:
+            await primary.dispose()
+            await replica.dispose()
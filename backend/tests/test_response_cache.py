@@ -0,0 +1,143 @@
+import pytest
+
+from app.core import metrics, response_cache
+from app.core.auth import create_access_token
+from app.core.config import settings
+
+
+def _headers(user, **extra):
+    token = create_access_token({
+        "sub": str(user.id),
+        "role": user.role.value,
+        "tenant_id": str(user.tenant_id) if user.tenant_id else None,
+    })
+    return {"Authorization": f"Bearer {token}", **extra}
+
+
+def _super_admin(platform_admin_user):
+    token = create_access_token({"sub": platform_admin_user.email, "role": "SUPER_ADMIN"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+
+class TestEtagMatching:
+    def test_if_none_match_forms(self):
+        assert response_cache.etag_matches('"abc"', '"abc"')
+        assert response_cache.etag_matches('"x", W/"abc"', '"abc"')
+        assert response_cache.etag_matches("*", '"abc"')
+        assert not response_cache.etag_matches('"abcd"', '"abc"')
+        assert not response_cache.etag_matches(None, '"abc"')
+
+
+class TestBadgeListCache:
+    @pytest.mark.asyncio
+    async def test_etag_304_and_invalidation_on_write(self, client, tenant_admin_user, assert_max_queries):
+        headers = _headers(tenant_admin_user)
+        first = await client.get("/badges/", headers=headers)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "private, no-cache"
+
+        hits = metrics.CACHE_REQUESTS.value("response", "hit")
+        with assert_max_queries(0):
+            again = await client.get("/badges/", headers=headers)
+            revalidated = await client.get("/badges/", headers={**headers, "If-None-Match": etag})
+        assert again.content == first.content and again.headers["etag"] == etag
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+        assert metrics.CACHE_REQUESTS.value("response", "hit") == hits + 2
+
+        created = await client.post("/badges/", json={"name": "Cached Badge", "points_value": 5}, headers=headers)
+        assert created.status_code == 201
+        after = await client.get("/badges/", headers={**headers, "If-None-Match": etag})
+        assert after.status_code == 200
+        assert after.headers["etag"] != etag
+        assert created.json()["id"] in {b["id"] for b in after.json()}
+
+        deleted = await client.delete(f"/badges/{created.json()['id']}", headers=headers)
+        assert deleted.status_code == 204
+        assert created.json()["id"] not in {b["id"] for b in (await client.get("/badges/", headers=headers)).json()}
+
+    @pytest.mark.asyncio
+    async def test_key_includes_tenant_and_query(self, client, tenant_admin_user):
+        headers = _headers(tenant_admin_user)
+        created = await client.post("/badges/", json={"name": "Tenant Only", "points_value": 1}, headers=headers)
+        badge_id = created.json()["id"]
+
+        own = await client.get("/badges/", headers=headers)
+        other = await client.get("/badges/", headers={"X-Tenant-ID": "some-other-tenant"})
+        assert badge_id in {b["id"] for b in own.json()}
+        assert badge_id not in {b["id"] for b in other.json()}
+
+        page = await client.get("/badges/?limit=1&offset=0", headers=headers)
+        assert len(page.json()) == 1
+
+
+class TestCatalogCaches:
+    @pytest.mark.asyncio
+    async def test_global_rewards_shared_by_admin_and_user_catalogs(self, client, platform_admin_user, corporate_user):
+        admin = _super_admin(platform_admin_user)
+        user = _headers(corporate_user)
+        listed = await client.get("/platform/rewards", headers=admin)
+        catalog = await client.get("/user/rewards", headers=user)
+        assert listed.status_code == catalog.status_code == 200
+
+        revalidated = await client.get("/user/rewards", headers={**user, "If-None-Match": catalog.headers["etag"]})
+        assert revalidated.status_code == 304
+
+        added = await client.post("/platform/rewards", json={"title": "Cached Mug", "points_cost": 0}, headers=admin)
+        assert added.status_code == 200
+        reward_id = added.json()["id"]
+        assert reward_id in {r["id"] for r in (await client.get("/platform/rewards", headers=admin)).json()}
+
+        fresh = await client.get("/user/rewards", headers={**user, "If-None-Match": catalog.headers["etag"]})
+        assert fresh.status_code == 200
+        entry = next(r for r in fresh.json() if r["id"] == reward_id)
+        assert entry["can_afford"] is True
+
+    @pytest.mark.asyncio
+    async def test_disabled_setting_bypasses_cache(self, client, tenant_admin_user, monkeypatch, assert_max_queries):
+        monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+        headers = _headers(tenant_admin_user)
+        first = await client.get("/rewards/", headers=headers)
+        with assert_max_queries(1) as stats:
+            second = await client.get("/rewards/", headers={**headers, "If-None-Match": first.headers["etag"]})
+        assert stats.count == 1
+        assert second.status_code == 304  # ETags still work, the body is just rebuilt
+
+
+class TestRedisVersions:
+    @pytest.mark.asyncio
+    async def test_bump_in_another_worker_invalidates(self, client, tenant_admin_user, monkeypatch):
+        fake = FakeRedis()
+
+        async def get_redis():
+            return fake
+
+        monkeypatch.setattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+        monkeypatch.setattr(response_cache.redis_client, "get_redis", get_redis)
+        headers = _headers(tenant_admin_user)
+        first = await client.get("/rewards/", headers=headers)
+        assert (await client.get("/rewards/", headers=headers)).headers["etag"] == first.headers["etag"]
+        hits = metrics.CACHE_REQUESTS.value("response", "hit")
+
+        # another worker committed a write: only the shared counter moved
+        await fake.incr("respcache:version:rewards")
+        await client.get("/rewards/", headers=headers)
+        assert metrics.CACHE_REQUESTS.value("response", "hit") == hits
+        assert fake.data["respcache:version:rewards"] == "1"
+
+        await response_cache.bump("rewards")
+        assert fake.data["respcache:version:rewards"] == "2"
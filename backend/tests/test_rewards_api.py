@@ -7,8 +7,9 @@ from app.models.rewards import Reward
 
 class TestRewardsAPI:
     @pytest.mark.asyncio
-    async def test_list_rewards(self, client):
-        response = await client.get("/rewards/")
+    async def test_list_rewards(self, client, assert_max_queries):
+        with assert_max_queries(1):
+            response = await client.get("/rewards/")
         assert response.status_code == 200
         assert isinstance(response.json(), list)
 
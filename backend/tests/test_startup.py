@@ -0,0 +1,32 @@
+import pytest
+from fastapi import FastAPI
+
+from app import main
+from app.core.config import settings
+
+
+class _NoDatabase:
+    def begin(self):
+        raise AssertionError("production startup must not touch the database")
+
+
+class TestStartupProfile:
+    @pytest.mark.asyncio
+    async def test_production_skips_schema_and_seeding(self, monkeypatch):
+        monkeypatch.setattr(settings, "STARTUP_PROFILE", "production")
+        monkeypatch.setattr(settings, "DEV_DEFAULT_TENANT", "dev-tenant")
+        monkeypatch.setattr(main, "engine", _NoDatabase())
+        await main.create_tables()
+        assert main.app.state.start_time is not None
+
+    def test_router_subset(self):
+        application = FastAPI()
+        main.include_routers(application, ["scanner"])
+        paths = {route.path for route in application.routes}
+        assert any(p.startswith("/scanner") for p in paths)
+        assert not any(p.startswith("/recognition") for p in paths)
+
+    def test_all_routers_are_registered(self):
+        paths = {route.path for route in main.app.routes}
+        for prefix in ("/auth", "/recognition", "/approvals", "/scanner", "/analytics/event"):
+            assert any(p.startswith(prefix) for p in paths), prefix
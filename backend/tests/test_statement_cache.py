@@ -0,0 +1,83 @@
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from app.core import tenancy
+from app.db.session import reset_statement_cache_stats, statement_cache_stats
+from app.models.recognition import Recognition
+from app.models.users import User
+
+
+async def _seed(db, tenants):
+    for tenant_id in tenants:
+        db.add(Recognition(nominator_id=str(uuid.uuid4()), nominee_id=str(uuid.uuid4()), points=5, tenant_id=tenant_id))
+    await db.commit()
+
+
+class TestTenantCriteriaCache:
+    @pytest.mark.asyncio
+    async def test_scoping_is_per_tenant_and_reuses_compiled_sql(self, db_session):
+        tenants = [str(uuid.uuid4()) for _ in range(5)]
+        await _seed(db_session, tenants)
+        query = lambda: select(Recognition).where(Recognition.points >= 5)  # noqa: E731
+
+        token = tenancy.CURRENT_TENANT.set(tenants[0])
+        try:
+            await db_session.execute(query())  # warm the cache
+        finally:
+            tenancy.CURRENT_TENANT.reset(token)
+
+        reset_statement_cache_stats()
+        for tenant_id in tenants * 3:
+            token = tenancy.CURRENT_TENANT.set(tenant_id)
+            try:
+                rows = (await db_session.execute(query())).scalars().all()
+            finally:
+                tenancy.CURRENT_TENANT.reset(token)
+            assert [r.tenant_id for r in rows] == [tenant_id]
+
+        stats = statement_cache_stats()
+        assert stats["compiled"] == 0
+        assert stats["cache_hits"] == len(tenants) * 3
+        assert stats["hit_ratio"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_aliases_are_scoped(self, db_session):
+        tenants = [str(uuid.uuid4()) for _ in range(2)]
+        await _seed(db_session, tenants)
+        other = aliased(Recognition)
+        token = tenancy.CURRENT_TENANT.set(tenants[1])
+        try:
+            rows = (await db_session.execute(
+                select(Recognition.tenant_id, other.tenant_id).join(other, other.points == Recognition.points)
+            )).all()
+        finally:
+            tenancy.CURRENT_TENANT.reset(token)
+        assert rows == [(tenants[1], tenants[1])]
+
+    @pytest.mark.asyncio
+    async def test_bypass_and_ignore_tenant_skip_scoping(self, db_session):
+        tenants = [str(uuid.uuid4()) for _ in range(2)]
+        await _seed(db_session, tenants)
+        stmt = select(Recognition.tenant_id).where(Recognition.tenant_id.in_(tenants))
+        token = tenancy.CURRENT_TENANT.set(tenants[0])
+        try:
+            scoped = (await db_session.execute(stmt)).scalars().all()
+            ignored = (await db_session.execute(stmt.execution_options(ignore_tenant=True))).scalars().all()
+            with tenancy.bypass_tenant_context():
+                bypassed = (await db_session.execute(stmt)).scalars().all()
+        finally:
+            tenancy.CURRENT_TENANT.reset(token)
+        assert scoped == [tenants[0]]
+        assert sorted(ignored) == sorted(tenants) == sorted(bypassed)
+
+    @pytest.mark.asyncio
+    async def test_users_are_scoped(self, db_session, test_tenant):
+        token = tenancy.CURRENT_TENANT.set(str(uuid.uuid4()))
+        try:
+            rows = (await db_session.execute(select(User).where(User.tenant_id == test_tenant.id))).scalars().all()
+        finally:
+            tenancy.CURRENT_TENANT.reset(token)
+        assert rows == []
@@ -0,0 +1,165 @@
+import asyncio
+import datetime
+
+import pytest
+import pytest_asyncio
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+
+from app.core import tenant_cache
+from app.core.auth import create_access_token
+from app.core.config import settings
+from app.core.module_access import check_module_access
+from app.models.subscriptions import TenantSubscription
+
+guarded = FastAPI()
+
+
+@guarded.get("/coach")
+async def coach(allowed=Depends(check_module_access("ai_coach"))):
+    return {"ok": allowed}
+
+
+@pytest_asyncio.fixture
+async def guarded_client():
+    async with AsyncClient(app=guarded, base_url="http://testserver") as client:
+        yield client
+
+
+def _user_headers(corporate_user):
+    token = create_access_token({
+        "sub": str(corporate_user.id), "role": corporate_user.role.value, "tenant_id": str(corporate_user.tenant_id),
+    })
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _owner_headers(platform_admin_user):
+    token = create_access_token({"sub": platform_admin_user.email, "role": platform_admin_user.role.value})
+    return {"Authorization": f"Bearer {token}"}
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = messages
+        self.channels = []
+        self.closed = False
+
+    async def subscribe(self, channel):
+        self.channels.append(channel)
+
+    async def listen(self):
+        yield {"type": "subscribe", "data": 1}
+        while True:
+            yield await self.messages.get()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeRedis:
+    def __init__(self):
+        self.messages = asyncio.Queue()
+        self.pubsubs = []
+        self.published = []
+
+    def pubsub(self):
+        self.pubsubs.append(FakePubSub(self.messages))
+        return self.pubsubs[-1]
+
+    async def publish(self, channel, data):
+        self.published.append((channel, data))
+        await self.messages.put({"type": "message", "channel": channel, "data": data})
+
+
+class TestModuleAccess:
+    @pytest.mark.asyncio
+    async def test_guard_uses_cache_and_sees_flag_updates(
+        self, client, guarded_client, corporate_user, platform_admin_user, assert_max_queries
+    ):
+        headers = _user_headers(corporate_user)
+        with assert_max_queries(1):
+            assert (await guarded_client.get("/coach", headers=headers)).status_code == 200
+        with assert_max_queries(0):
+            assert (await guarded_client.get("/coach", headers=headers)).status_code == 200
+
+        resp = await client.patch(
+            f"/platform/tenants/{corporate_user.tenant_id}/feature_flags",
+            json={"ai_coach_enabled": False},
+            headers=_owner_headers(platform_admin_user),
+        )
+        assert resp.status_code == 200
+        denied = await guarded_client.get("/coach", headers=headers)
+        assert denied.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_unknown_tenant_is_404_and_not_cached(self, guarded_client, assert_max_queries):
+        token = create_access_token({"sub": "nobody", "role": "CORPORATE_USER", "tenant_id": "no-such-tenant"})
+        headers = {"Authorization": f"Bearer {token}"}
+        for _ in range(2):
+            with assert_max_queries(1):
+                assert (await guarded_client.get("/coach", headers=headers)).status_code == 404
+
+
+class TestTenantInfo:
+    @pytest.mark.asyncio
+    async def test_metadata_plan_and_suspension(self, client, db_session, test_tenant, subscription_plan, platform_admin_user):
+        db_session.add(TenantSubscription(
+            tenant_id=test_tenant.id, plan_id=subscription_plan.id, start_date=datetime.date.today(), is_active=True,
+        ))
+        await db_session.commit()
+
+        info = await tenant_cache.get_tenant_info(db_session, test_tenant.id)
+        assert (info.id, info.subdomain, info.status, info.suspended) == (
+            str(test_tenant.id), test_tenant.subdomain, "active", False,
+        )
+        assert info.plan == "Basic"
+        assert info.feature_flags == {}
+
+        owner = _owner_headers(platform_admin_user)
+        assert (await client.post(f"/platform/tenants/{test_tenant.id}/suspend", headers=owner)).status_code == 200
+        info = await tenant_cache.get_tenant_info(db_session, test_tenant.id)
+        assert (info.status, info.suspended) == ("suspended", True)
+
+        assert (await client.post(f"/platform/tenants/{test_tenant.id}/unsuspend", headers=owner)).status_code == 200
+        info = await tenant_cache.get_tenant_info(db_session, test_tenant.id)
+        assert (info.status, info.suspended) == ("active", False)
+
+    @pytest.mark.asyncio
+    async def test_entries_expire_after_ttl(self, db_session, test_tenant, monkeypatch, assert_max_queries):
+        monkeypatch.setattr(settings, "TENANT_CACHE_TTL_SECONDS", 0)
+        await tenant_cache.get_tenant_info(db_session, test_tenant.id)
+        with assert_max_queries(1):
+            await tenant_cache.get_tenant_info(db_session, test_tenant.id)
+
+
+class TestInvalidationAcrossWorkers:
+    @pytest.mark.asyncio
+    async def test_published_invalidation_drops_entry(self, db_session, test_tenant, monkeypatch):
+        fake = FakeRedis()
+
+        async def get_redis():
+            return fake
+
+        monkeypatch.setattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+        monkeypatch.setattr(tenant_cache.redis_client, "get_redis", get_redis)
+        listener = asyncio.create_task(tenant_cache.listen_for_invalidations())
+        try:
+            await asyncio.sleep(0)
+            assert fake.pubsubs[0].channels == [tenant_cache.CHANNEL]
+
+            await tenant_cache.get_tenant_info(db_session, test_tenant.id)
+            assert str(test_tenant.id) in tenant_cache._entries
+            # another worker invalidated the tenant: only its message reaches us
+            await fake.publish(tenant_cache.CHANNEL, str(test_tenant.id))
+            for _ in range(5):
+                await asyncio.sleep(0)
+            assert str(test_tenant.id) not in tenant_cache._entries
+
+            fake.published.clear()
+            await tenant_cache.invalidate(test_tenant.id)
+            assert fake.published == [(tenant_cache.CHANNEL, str(test_tenant.id))]
+        finally:
+            listener.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await listener
+        assert fake.pubsubs[0].closed
@@ -0,0 +1,87 @@
+import hashlib
+import io
+import os
+
+import pytest
+from starlette.datastructures import Headers, UploadFile
+
+from app.core.config import settings
+from app.services.upload_storage import UploadTooLarge, safe_extension, store_upload
+
+
+def _upload(data: bytes, filename="card.png", content_type="image/png"):
+    return UploadFile(io.BytesIO(data), filename=filename, headers=Headers({"content-type": content_type}))
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "UPLOAD_TMP_DIR", None)
+    return tmp_path / "uploads"
+
+
+def _stored_files(root):
+    return sorted(
+        os.path.relpath(os.path.join(d, f), root)
+        for d, _, files in os.walk(root) for f in files
+    )
+
+
+class TestUploadStorage:
+    @pytest.mark.asyncio
+    async def test_streams_and_hashes_in_chunks(self, upload_dir):
+        data = os.urandom(10_000)
+        stored = await store_upload(_upload(data), "media", chunk_size=1024)
+        sha = hashlib.sha256(data).hexdigest()
+        assert stored.sha256 == sha and stored.size == len(data)
+        assert stored.key == f"{sha[:2]}/{sha}.png"
+        assert stored.url == f"/uploads/media/{sha[:2]}/{sha}.png"
+        with open(upload_dir / "media" / sha[:2] / f"{sha}.png", "rb") as fh:
+            assert fh.read() == data
+        assert not stored.deduplicated
+
+    @pytest.mark.asyncio
+    async def test_identical_content_is_stored_once(self, upload_dir):
+        data = b"same e-card image" * 100
+        first = await store_upload(_upload(data, "a.png"), "gifts")
+        second = await store_upload(_upload(data, "b.png"), "gifts")
+        assert first.url == second.url and second.deduplicated
+        assert _stored_files(upload_dir) == [os.path.join("gifts", first.key)]
+
+    @pytest.mark.asyncio
+    async def test_size_limit_is_enforced_while_streaming(self, upload_dir):
+        reads = []
+
+        class CountingUpload(UploadFile):
+            async def read(self, size=-1):
+                chunk = await super().read(size)
+                reads.append(len(chunk))
+                return chunk
+
+        upload = CountingUpload(io.BytesIO(b"x" * 50_000), filename="big.jpg")
+        with pytest.raises(UploadTooLarge):
+            await store_upload(upload, "media", max_bytes=4096, chunk_size=1024)
+        # stopped right after crossing the limit rather than reading everything
+        assert sum(reads) <= 4096 + 1024
+        assert _stored_files(upload_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_partial_file_is_kept_outside_the_served_directory(self, upload_dir):
+        partial = []
+
+        class PeekingUpload(UploadFile):
+            async def read(self, size=-1):
+                partial.extend(_stored_files(upload_dir.parent))
+                return await super().read(size)
+
+        await store_upload(PeekingUpload(io.BytesIO(b"x" * 4096), filename="a.png"), "media", chunk_size=1024)
+        # while streaming, only the .part file exists, beside the served tree
+        assert partial and all(p.startswith("uploads.tmp" + os.sep) for p in partial)
+        assert _stored_files(upload_dir.parent / "uploads.tmp") == []
+
+    def test_extension_is_sanitised(self):
+        assert safe_extension("photo.JPG") == ".jpg"
+        assert safe_extension("../../etc/passwd") == ""
+        assert safe_extension("x.php%00.png") == ".png"
+        assert safe_extension("a.reallylongextension") == ""
+        assert safe_extension(None) == ""
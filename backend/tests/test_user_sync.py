@@ -0,0 +1,109 @@
+import uuid
+import pytest
+from sqlalchemy import select
+
+from app.jobs.user_sync import sync_users
+from app.models.users import User, UserRole
+
+
+async def _stream(records):
+    for r in records:
+        yield r
+
+
+def _directory(prefix, n, fanout=3):
+    return [
+        {
+            "external_id": f"{prefix}-{i}",
+            "email": f"{prefix}_{i}@dir.test",
+            "first_name": "User",
+            "last_name": str(i),
+            "manager_external_id": f"{prefix}-{(i - 1) // fanout}" if i else None,
+        }
+        for i in range(n)
+    ]
+
+
+class TestUserSync:
+    @pytest.mark.asyncio
+    async def test_bulk_upsert_and_manager_links(self, session_factory, db_session, test_tenant):
+        tenant_id = test_tenant.id
+        prefix = uuid.uuid4().hex[:8]
+        directory = _directory(prefix, 10)
+
+        summary = await sync_users(tenant_id, "okta", _stream(directory), batch_size=4, session_factory=session_factory)
+        assert summary["fetched"] == 10
+        assert summary["inserted"] == 10
+        assert summary["managers_linked"] == 9
+        assert summary["unresolved_managers"] == 0
+
+        res = await db_session.execute(
+            select(User.external_id, User.id, User.manager_id, User.full_name).where(User.sso_provider == "okta", User.tenant_id == tenant_id)
+        )
+        rows = {ext: (uid, mgr, name) for ext, uid, mgr, name in res.all()}
+        assert rows[f"{prefix}-0"][1] is None
+        assert rows[f"{prefix}-4"][1] == rows[f"{prefix}-1"][0]
+        assert rows[f"{prefix}-9"][2] == "User 9"
+
+        again = await sync_users(tenant_id, "okta", _stream(directory), batch_size=4, session_factory=session_factory)
+        assert (again["inserted"], again["updated"], again["unchanged"], again["managers_linked"]) == (0, 0, 10, 0)
+
+        directory[9]["manager_external_id"] = f"{prefix}-0"
+        directory[8]["manager_external_id"] = "missing"
+        moved = await sync_users(tenant_id, "okta", _stream(directory), batch_size=4, session_factory=session_factory)
+        assert moved["managers_linked"] == 2
+        assert moved["unresolved_managers"] == 1
+
+        db_session.expire_all()
+        res = await db_session.execute(
+            select(User.external_id, User.manager_id).where(User.external_id.in_([f"{prefix}-8", f"{prefix}-9"]))
+        )
+        managers = dict(res.all())
+        assert managers[f"{prefix}-8"] is None
+        assert managers[f"{prefix}-9"] == rows[f"{prefix}-0"][0]
+
+    @pytest.mark.asyncio
+    async def test_existing_email_is_adopted(self, session_factory, db_session, test_tenant):
+        tenant_id = test_tenant.id
+        prefix = uuid.uuid4().hex[:8]
+        invited = User(
+            email=f"{prefix}_0@dir.test",
+            full_name="Invited",
+            role=UserRole.CORPORATE_USER,
+            tenant_id=tenant_id,
+            is_active=True,
+        )
+        db_session.add(invited)
+        await db_session.commit()
+        invited_id = invited.id
+
+        summary = await sync_users(tenant_id, "azure_ad", _stream(_directory(prefix, 2)), session_factory=session_factory)
+        assert summary["adopted"] == 1
+        assert summary["inserted"] == 1
+
+        db_session.expire_all()
+        res = await db_session.execute(select(User.external_id, User.sso_provider).where(User.id == invited_id))
+        assert res.one() == (f"{prefix}-0", "azure_ad")
+
+    @pytest.mark.asyncio
+    async def test_platform_account_email_is_a_conflict(self, session_factory, db_session, test_tenant):
+        prefix = uuid.uuid4().hex[:8]
+        owner = User(
+            email=f"{prefix}_0@dir.test",
+            full_name="Platform Owner",
+            role=UserRole.PLATFORM_OWNER,
+            tenant_id=None,
+            is_active=True,
+        )
+        db_session.add(owner)
+        await db_session.commit()
+        owner_id = owner.id
+
+        summary = await sync_users(test_tenant.id, "okta", _stream(_directory(prefix, 2)), session_factory=session_factory)
+        assert summary["conflicts"] == 1
+        assert summary["adopted"] == 0
+        assert summary["inserted"] == 1
+
+        db_session.expire_all()
+        res = await db_session.execute(select(User.tenant_id, User.external_id, User.role).where(User.id == owner_id))
+        assert res.one() == (None, None, UserRole.PLATFORM_OWNER)
@@ -0,0 +1,186 @@
+import asyncio
+import datetime
+import uuid
+import pytest
+from sqlalchemy import func, select
+
+from app.core.auth import create_access_token
+from app.models.approvals import ApprovalRequest, ApprovalStatus
+from app.models.event_rollups import EventAnalyticsRollup
+from app.models.events import Event, EventOption, EventType
+from app.models.users import User, UserRole
+from app.services.year_in_review_service import YearInReviewService
+
+
+async def _user(db_session, tenant_id, department):
+    user = User(
+        email=f"yir_{uuid.uuid4().hex}@testcompany.com",
+        full_name="Participant",
+        role=UserRole.CORPORATE_USER,
+        tenant_id=tenant_id,
+        department=department,
+        is_active=True,
+    )
+    db_session.add(user)
+    await db_session.flush()
+    return user
+
+
+async def _event(db_session, tenant_id, name, when, budget=10000):
+    event = Event(
+        tenant_id=tenant_id,
+        name=name,
+        event_type=EventType.GIFTING,
+        event_budget_amount=budget,
+        budget_committed=0,
+        event_date=when,
+        registration_start_date=when - datetime.timedelta(days=30),
+        registration_end_date=when - datetime.timedelta(days=1),
+    )
+    db_session.add(event)
+    await db_session.flush()
+    option = EventOption(
+        tenant_id=tenant_id,
+        event_id=event.id,
+        option_name=f"{name} gift",
+        option_type="GIFT",
+        total_available=100,
+        cost_per_unit=500,
+    )
+    db_session.add(option)
+    await db_session.flush()
+    return event, option
+
+
+def _approval(tenant_id, event, option, user, lead, status=ApprovalStatus.APPROVED, collected=False):
+    return ApprovalRequest(
+        tenant_id=tenant_id,
+        event_id=event.id,
+        event_option_id=option.id,
+        user_id=user.id,
+        lead_id=lead.id,
+        impact_hours_per_week=0,
+        impact_duration_weeks=0,
+        total_impact_hours=0,
+        estimated_cost=500,
+        status=status,
+        is_collected=1 if collected else 0,
+    )
+
+
+class TestYearInReview:
+    @pytest.mark.asyncio
+    async def test_aggregates_and_only_recomputes_changed_events(self, db_session, test_tenant):
+        tenant_id = test_tenant.id
+        eng = await _user(db_session, tenant_id, "Engineering")
+        sales = await _user(db_session, tenant_id, "Sales")
+        lead = await _user(db_session, tenant_id, "Engineering")
+
+        spring, spring_opt = await _event(db_session, tenant_id, "Spring", datetime.datetime(2026, 3, 10))
+        autumn, autumn_opt = await _event(db_session, tenant_id, "Autumn", datetime.datetime(2026, 10, 5))
+        await _event(db_session, tenant_id, "Last year", datetime.datetime(2025, 12, 20))
+
+        db_session.add_all([
+            _approval(tenant_id, spring, spring_opt, eng, lead, collected=True),
+            _approval(tenant_id, spring, spring_opt, sales, lead),
+            _approval(tenant_id, spring, spring_opt, lead, lead, status=ApprovalStatus.DECLINED),
+            _approval(tenant_id, autumn, autumn_opt, eng, lead, collected=True),
+        ])
+        await db_session.commit()
+        autumn_id = autumn.id
+
+        service = YearInReviewService(db_session)
+        report = await service.get_year_in_review(tenant_id, datetime.date(2026, 1, 1), datetime.date(2026, 12, 31))
+
+        totals = report["totals"]
+        assert totals["events"] == 2
+        assert totals["approved"] == 3
+        assert totals["collected"] == 2
+        assert totals["spend"] == 1500.0
+        assert totals["budget"] == 20000.0
+        assert totals["unique_participants"] == 2
+        assert totals["collection_rate"] == 66.7
+        depts = {d["department"]: d for d in report["by_department"]}
+        assert depts["Engineering"]["approved"] == 2
+        assert depts["Engineering"]["events"] == 2
+        assert depts["Sales"]["collected"] == 0
+        assert [m["month"] for m in report["by_month"]] == ["2026-03", "2026-10"]
+        spring_rollup = next(e for e in report["events"] if e["event_name"] == "Spring")
+        assert spring_rollup["requests"] == {"APPROVED": 2, "DECLINED": 1}
+        assert report["cache"] == {"events": 2, "recomputed": 2}
+
+        again = await service.get_year_in_review(tenant_id, datetime.date(2026, 1, 1), datetime.date(2026, 12, 31))
+        assert again["cache"]["recomputed"] == 0
+        assert again["totals"] == totals
+
+        db_session.add(_approval(tenant_id, autumn, autumn_opt, sales, lead, collected=True))
+        await db_session.commit()
+
+        changed = await service.get_year_in_review(tenant_id, datetime.date(2026, 1, 1), datetime.date(2026, 12, 31))
+        assert changed["cache"]["recomputed"] == 1
+        assert changed["totals"]["approved"] == 4
+        autumn_rollup = next(e for e in changed["events"] if e["event_id"] == autumn_id)
+        assert autumn_rollup["collection_rate"] == 100.0
+
+
+    @pytest.mark.asyncio
+    async def test_overlapping_requests_both_write_the_rollup(self, session_factory, db_session, test_tenant, monkeypatch):
+        tenant_id = test_tenant.id
+        eng = await _user(db_session, tenant_id, "Engineering")
+        event, option = await _event(db_session, tenant_id, "Overlap", datetime.datetime(2027, 6, 1))
+        db_session.add(_approval(tenant_id, event, option, eng, eng))
+        await db_session.commit()
+
+        # hold both requests until each has seen the rollup as missing
+        arrived, both = [], asyncio.Event()
+        compute = YearInReviewService._compute_rollups
+
+        async def _compute_after_both_read(self, *args):
+            arrived.append(self)
+            if len(arrived) == 2:
+                both.set()
+            await both.wait()
+            return await compute(self, *args)
+
+        monkeypatch.setattr(YearInReviewService, "_compute_rollups", _compute_after_both_read)
+
+        async def report():
+            async with session_factory() as db:
+                return await YearInReviewService(db).get_year_in_review(
+                    tenant_id, datetime.date(2027, 1, 1), datetime.date(2027, 12, 31)
+                )
+
+        first, second = await asyncio.gather(report(), report())
+        assert first["cache"]["recomputed"] == second["cache"]["recomputed"] == 1
+        assert first["totals"]["approved"] == second["totals"]["approved"] == 1
+        rows = await db_session.execute(
+            select(func.count(EventAnalyticsRollup.id)).where(EventAnalyticsRollup.event_id == event.id)
+        )
+        assert rows.scalar() == 1
+
+
+def _headers(user):
+    token = create_access_token({"sub": str(user.id), "role": user.role.value, "tenant_id": str(user.tenant_id)})
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestYearInReviewAPI:
+    @pytest.mark.asyncio
+    async def test_tenant_admin_gets_report(self, client, db_session, test_tenant, tenant_admin_user):
+        lead = await _user(db_session, test_tenant.id, "Engineering")
+        event, option = await _event(db_session, test_tenant.id, "Summer", datetime.datetime(2026, 6, 1))
+        db_session.add(_approval(test_tenant.id, event, option, lead, lead, collected=True))
+        await db_session.commit()
+
+        resp = await client.get(
+            "/analytics/event/year-in-review",
+            params={"start_date": "2026-01-01", "end_date": "2026-12-31"},
+            headers=_headers(tenant_admin_user),
+        )
+        assert resp.status_code == 200
+        assert resp.json()["totals"]["collected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_corporate_user_is_forbidden(self, client, corporate_user):
+        resp = await client.get("/analytics/event/year-in-review", headers=_headers(corporate_user))
+        assert resp.status_code == 403
@@ -1,6 +1,9 @@
 import React, { useState, useEffect } from 'react';
 import { Calendar, BarChart3, TrendingUp, Download, AlertCircle } from 'lucide-react';
 
+const EXPORT_POLL_INTERVAL_MS = 1000;
+const EXPORT_TIMEOUT_MS = 5 * 60 * 1000;
+
 const AnalyticsDashboard = ({ eventId }) => {
   const [summary, setSummary] = useState(null);
   const [timeline, setTimeline] = useState(null);
@@ -58,14 +61,29 @@ const AnalyticsDashboard = ({ eventId }) => {
 
       if (!response.ok) throw new Error('Export failed');
 
-      const blob = await response.blob();
+      // The report is generated in the background: poll the job until it finishes
+      let job = await response.json();
+      const deadline = Date.now() + EXPORT_TIMEOUT_MS;
+      while (job.status === 'QUEUED' || job.status === 'RUNNING') {
+        if (Date.now() > deadline) throw new Error('Export is taking too long, try again later');
+        await new Promise((resolve) => setTimeout(resolve, EXPORT_POLL_INTERVAL_MS));
+        const jobRes = await fetch(`/api/analytics/event/${eventId}/export/jobs/${job.job_id}`);
+        if (!jobRes.ok) throw new Error('Export failed');
+        job = await jobRes.json();
+      }
+
+      if (job.status !== 'COMPLETED' || !job.download_url) {
+        throw new Error(job.error || 'Export failed');
+      }
+
+      const fileRes = await fetch(`/api${job.download_url}`);
+      if (!fileRes.ok) throw new Error('Download failed');
+
+      const blob = await fileRes.blob();
       const url = window.URL.createObjectURL(blob);
       const a = document.createElement('a');
       a.href = url;
-      a.download = response.headers
-        .get('content-disposition')
-        ?.split('filename=')[1]
-        ?.replace(/"/g, '') || `analytics_${exportFormat}.csv`;
+      a.download = job.filename || `analytics_${exportFormat}.csv`;
       a.click();
       window.URL.revokeObjectURL(url);
     } catch (err) {